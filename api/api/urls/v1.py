@@ -9,7 +9,7 @@ from rest_framework import permissions, routers
 
 from app_analytics.views import SDKAnalyticsFlags, SelfHostedTelemetryAPIView
 from environments.identities.traits.views import SDKTraits
-from environments.identities.views import SDKIdentities
+from environments.identities.views import SDKIdentities, SDKIdentitiesBulk
 from environments.sdk.views import SDKEnvironmentAPIView
 from features.feature_health.views import feature_health_webhook
 from features.views import SDKFeatureStates, get_multivariate_options
@@ -68,6 +68,11 @@ urlpatterns = [
         name="get-multivariate-options",
     ),
     re_path(r"^identities/$", SDKIdentities.as_view(), name="sdk-identities"),
+    re_path(
+        r"^bulk-identities/$",
+        SDKIdentitiesBulk.as_view(),
+        name="sdk-identities-bulk",
+    ),
     re_path(r"^traits/", include(traits_router.urls), name="traits"),
     re_path(r"^analytics/flags/$", SDKAnalyticsFlags.as_view(), name="analytics-flags"),
     re_path(r"^analytics/telemetry/$", SelfHostedTelemetryAPIView.as_view()),
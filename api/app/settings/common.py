@@ -686,6 +686,9 @@ if ENABLE_DB_LOGGING:
     logging.getLogger("django.db.backends").setLevel(logging.DEBUG)
 
 CACHE_FLAGS_SECONDS = env.int("CACHE_FLAGS_SECONDS", default=0)
+# Serve expired flags for up to this many seconds while they're rebuilt
+# in the background.
+CACHE_FLAGS_STALE_SECONDS = env.int("CACHE_FLAGS_STALE_SECONDS", default=0)
 FLAGS_CACHE_LOCATION = "environment-flags"
 CHARGEBEE_CACHE_LOCATION = "chargebee-objects"
 
@@ -699,6 +702,42 @@ ENVIRONMENT_CACHE_LOCATION = env.str(
     "ENVIRONMENT_CACHE_LOCATION", default=ENVIRONMENT_CACHE_NAME
 )
 
+# Concurrent misses on the flags and environment document caches are coalesced
+# so that only one rebuild runs per key. Other processes wait up to
+# CACHE_SINGLE_FLIGHT_WAIT_SECONDS for the result before rebuilding themselves.
+CACHE_SINGLE_FLIGHT_LEASE_SECONDS = env.int(
+    "CACHE_SINGLE_FLIGHT_LEASE_SECONDS", default=30
+)
+CACHE_SINGLE_FLIGHT_WAIT_SECONDS = env.float(
+    "CACHE_SINGLE_FLIGHT_WAIT_SECONDS", default=5.0
+)
+
+# In-process (L1) cache in front of the environment and environment document
+# caches. Invalidations are broadcast to all processes over Redis pub/sub when
+# ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL is set.
+ENVIRONMENT_LOCAL_CACHE_SECONDS = env.int("ENVIRONMENT_LOCAL_CACHE_SECONDS", default=0)
+ENVIRONMENT_LOCAL_CACHE_MAX_ENTRIES = env.int(
+    "ENVIRONMENT_LOCAL_CACHE_MAX_ENTRIES", default=1000
+)
+ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL = env.str(
+    "ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL", default=""
+)
+
+# Environment document rebuilds triggered by audit logs within this many seconds
+# of each other are coalesced into a single task (TASK_PROCESSOR run method only).
+ENVIRONMENT_UPDATE_DEBOUNCE_SECONDS = env.int(
+    "ENVIRONMENT_UPDATE_DEBOUNCE_SECONDS", default=0
+)
+ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_NAME = "environment-update-debounce"
+ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_BACKEND = env.str(
+    "ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_BACKEND",
+    default="django.core.cache.backends.db.DatabaseCache",
+)
+ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_LOCATION = env.str(
+    "ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_LOCATION",
+    default=ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_NAME,
+)
+
 GET_FLAGS_ENDPOINT_CACHE_SECONDS = env.int(
     "GET_FLAGS_ENDPOINT_CACHE_SECONDS", default=0
 )
@@ -732,6 +771,12 @@ CACHE_BAD_ENVIRONMENTS_AFTER_FAILURES = env.int(
 )
 
 CACHE_PROJECT_SEGMENTS_SECONDS = env.int("CACHE_PROJECT_SEGMENTS_SECONDS", 0)
+# Keep each project's segments mapped for the flag engine in memory. Invalidated
+# when segments change, across processes if ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL
+# is set.
+CACHE_PROJECT_SEGMENT_CONTEXTS_SECONDS = env.int(
+    "CACHE_PROJECT_SEGMENT_CONTEXTS_SECONDS", 0
+)
 PROJECT_SEGMENTS_CACHE_LOCATION = "project-segments"
 
 ENVIRONMENT_SEGMENTS_CACHE_NAME = "environment-segments"
@@ -744,6 +789,50 @@ ENVIRONMENT_SEGMENTS_CACHE_BACKEND = env(
     "django.core.cache.backends.locmem.LocMemCache",
 )
 
+# Segments translated to ClickHouse predicates, for segment membership counts and
+# members pages. Keyed on the segment version, so entries needn't be invalidated.
+SEGMENT_PREDICATES_CACHE_NAME = "segment-predicates"
+SEGMENT_PREDICATES_CACHE_SECONDS = env.int("CACHE_SEGMENT_PREDICATES_SECONDS", 0)
+SEGMENT_PREDICATES_CACHE_LOCATION = env(
+    "SEGMENT_PREDICATES_CACHE_LOCATION", "segment-predicates"
+)
+SEGMENT_PREDICATES_CACHE_BACKEND = env(
+    "CACHE_SEGMENT_PREDICATES_BACKEND",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+# Pages of an environment's edge identity overrides, as listed in the dashboard.
+# Not invalidated when overrides change, so keep this short.
+EDGE_IDENTITY_OVERRIDES_CACHE_NAME = "edge-identity-overrides"
+EDGE_IDENTITY_OVERRIDES_CACHE_SECONDS = env.int(
+    "CACHE_EDGE_IDENTITY_OVERRIDES_SECONDS", 0
+)
+EDGE_IDENTITY_OVERRIDES_CACHE_LOCATION = env(
+    "EDGE_IDENTITY_OVERRIDES_CACHE_LOCATION", "edge-identity-overrides"
+)
+EDGE_IDENTITY_OVERRIDES_CACHE_BACKEND = env(
+    "CACHE_EDGE_IDENTITY_OVERRIDES_BACKEND",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+# Evaluate identity flags in memory against a cached snapshot of the environment's
+# flags and segment overrides. Disabled when set to 0.
+ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_NAME = "environment-flags-snapshot"
+ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS = env.int(
+    "CACHE_ENVIRONMENT_FLAGS_SNAPSHOT_SECONDS", 0
+)
+ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_LOCATION = env(
+    "ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_LOCATION", "environment-flags-snapshot"
+)
+ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_BACKEND = env(
+    "CACHE_ENVIRONMENT_FLAGS_SNAPSHOT_BACKEND",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+# Maximum number of identities that can be identified in a single request to the
+# bulk identities endpoint.
+SDK_BULK_IDENTIFY_MAX_IDENTITIES = env.int("SDK_BULK_IDENTIFY_MAX_IDENTITIES", 100)
+
 CACHE_ENVIRONMENT_DOCUMENT_LOCATION = env(
     "CACHE_ENVIRONMENT_DOCUMENT_LOCATION", default="environment-documents"
 )
@@ -756,9 +845,19 @@ CACHE_ENVIRONMENT_DOCUMENT_MODE = env.enum(
     default=EnvironmentDocumentCacheMode.EXPIRING.value,
 )
 CACHE_ENVIRONMENT_DOCUMENT_SECONDS = env.int("CACHE_ENVIRONMENT_DOCUMENT_SECONDS", 0)
+# Serve expired environment documents for up to this many seconds while they're
+# rebuilt in the background. Only applies to the EXPIRING cache mode.
+CACHE_ENVIRONMENT_DOCUMENT_STALE_SECONDS = env.int(
+    "CACHE_ENVIRONMENT_DOCUMENT_STALE_SECONDS", default=0
+)
 CACHE_ENVIRONMENT_DOCUMENT_OPTIONS = env.json(
     "CACHE_ENVIRONMENT_DOCUMENT_OPTIONS", default=None
 )
+# Store environment documents in the cache as rendered (and gzipped) JSON
+# so that the SDK environment document endpoint can serve them as-is.
+CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = env.bool(
+    "CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED", default=False
+)
 
 if (
     CACHE_ENVIRONMENT_DOCUMENT_MODE == EnvironmentDocumentCacheMode.PERSISTENT
@@ -861,6 +960,10 @@ CACHES = {
         ),
         "OPTIONS": CACHE_ENVIRONMENT_DOCUMENT_OPTIONS or {},
     },
+    ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_NAME: {
+        "BACKEND": ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_BACKEND,
+        "LOCATION": ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_LOCATION,
+    },
     GET_FLAGS_ENDPOINT_CACHE_NAME: {
         "BACKEND": GET_FLAGS_ENDPOINT_CACHE_BACKEND,
         "LOCATION": GET_FLAGS_ENDPOINT_CACHE_LOCATION,
@@ -874,6 +977,21 @@ CACHES = {
         "LOCATION": ENVIRONMENT_SEGMENTS_CACHE_LOCATION,
         "TIMEOUT": ENVIRONMENT_SEGMENTS_CACHE_SECONDS,
     },
+    SEGMENT_PREDICATES_CACHE_NAME: {
+        "BACKEND": SEGMENT_PREDICATES_CACHE_BACKEND,
+        "LOCATION": SEGMENT_PREDICATES_CACHE_LOCATION,
+        "TIMEOUT": SEGMENT_PREDICATES_CACHE_SECONDS,
+    },
+    EDGE_IDENTITY_OVERRIDES_CACHE_NAME: {
+        "BACKEND": EDGE_IDENTITY_OVERRIDES_CACHE_BACKEND,
+        "LOCATION": EDGE_IDENTITY_OVERRIDES_CACHE_LOCATION,
+        "TIMEOUT": EDGE_IDENTITY_OVERRIDES_CACHE_SECONDS,
+    },
+    ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_NAME: {
+        "BACKEND": ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_BACKEND,
+        "LOCATION": ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_LOCATION,
+        "TIMEOUT": ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS,
+    },
     USER_THROTTLE_CACHE_NAME: {
         "BACKEND": USER_THROTTLE_CACHE_BACKEND,
         "LOCATION": USER_THROTTLE_CACHE_LOCATION,
@@ -1033,6 +1151,13 @@ ENVIRONMENTS_TABLE_NAME_DYNAMO = env.str("ENVIRONMENTS_TABLE_NAME_DYNAMO", "")
 # V2 was created to improve storage over overrides data.
 ENVIRONMENTS_V2_TABLE_NAME_DYNAMO = env.str("ENVIRONMENTS_V2_TABLE_NAME_DYNAMO", "")
 
+# Number of threads used to query identity overrides in the V2 table
+# concurrently, one sort key prefix (i.e. feature) per query, when reading
+# them for many features at once. 0 uses a single environment-wide query.
+ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS = env.int(
+    "ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS", default=0
+)
+
 # DynamoDB table name for storing identities
 IDENTITIES_TABLE_NAME_DYNAMO = env.str("IDENTITIES_TABLE_NAME_DYNAMO", "")
 
@@ -1150,6 +1275,16 @@ EDGE_REQUEST_SIGNING_KEY = env.str("EDGE_REQUEST_SIGNING_KEY", None)
 # Aws Event bus used for sending identity migration events
 IDENTITY_MIGRATION_EVENT_BUS_NAME = env.str("IDENTITY_MIGRATION_EVENT_BUS_NAME", None)
 
+# Identity migrations split the identities into this many pk ranges, migrated
+# concurrently and checkpointed so that an interrupted migration can be resumed.
+IDENTITY_MIGRATION_PARTITIONS = env.int("IDENTITY_MIGRATION_PARTITIONS", 1)
+IDENTITY_MIGRATION_MAX_WORKERS = env.int("IDENTITY_MIGRATION_MAX_WORKERS", 4)
+# Estimated write capacity units a single identity migration run may spend
+# before stopping to be resumed later. 0 means no limit.
+IDENTITY_MIGRATION_WRITE_CAPACITY_BUDGET = env.int(
+    "IDENTITY_MIGRATION_WRITE_CAPACITY_BUDGET", 0
+)
+
 # Should be a string representing a timezone aware datetime, e.g. 2022-03-31T12:35:00Z
 EDGE_RELEASE_DATETIME = env.datetime("EDGE_RELEASE_DATETIME", None)
 # Note: using django.utils.timezone.now doesn't work reliably in settings so we use
@@ -1194,6 +1329,23 @@ ENABLE_TASK_PROCESSOR_HEALTH_CHECK = env.bool(
 # Allows us to prevent the postpone decorator from running things async
 ENABLE_POSTPONE_DECORATOR = env.bool("ENABLE_POSTPONE_DECORATOR", default=True)
 
+# Number of threads per process delivering user data to identity integrations
+# (Amplitude, Segment, etc.) in micro-batches. 0 starts a thread per identify
+# call and integration instead.
+IDENTITY_INTEGRATIONS_DELIVERY_WORKERS = env.int(
+    "IDENTITY_INTEGRATIONS_DELIVERY_WORKERS", default=0
+)
+# User data waiting for delivery beyond this is dropped.
+IDENTITY_INTEGRATIONS_DELIVERY_QUEUE_SIZE = env.int(
+    "IDENTITY_INTEGRATIONS_DELIVERY_QUEUE_SIZE", default=10000
+)
+IDENTITY_INTEGRATIONS_DELIVERY_BATCH_SIZE = env.int(
+    "IDENTITY_INTEGRATIONS_DELIVERY_BATCH_SIZE", default=100
+)
+IDENTITY_INTEGRATIONS_DELIVERY_LINGER_SECONDS = env.float(
+    "IDENTITY_INTEGRATIONS_DELIVERY_LINGER_SECONDS", default=1.0
+)
+
 ENABLE_CLEAN_UP_OLD_TASKS = env.bool("ENABLE_CLEAN_UP_OLD_TASKS", default=True)
 TASK_DELETE_RETENTION_DAYS = env.int("TASK_DELETE_RETENTION_DAYS", default=30)
 TASK_DELETE_BATCH_SIZE = env.int("TASK_DELETE_BATCH_SIZE", default=2000)
@@ -1521,6 +1673,17 @@ CLICKHOUSE_CONNECTION_CLIENT_NAME = "flagsmith-core-api"
 #  https://github.com/Flagsmith/flagsmith/issues/8033
 EXPERIMENTATION_CLICKHOUSE_URL = env.str("EXPERIMENTATION_CLICKHOUSE_URL", default=None)
 
+# Number of event objects delivered concurrently to a warehouse connection, each
+# worker with its own warehouse client. 1 delivers them one at a time.
+WAREHOUSE_DELIVERY_MAX_WORKERS = env.int("WAREHOUSE_DELIVERY_MAX_WORKERS", default=1)
+
+# Consecutive event objects are combined into one warehouse insert up to this
+# many compressed bytes, so small objects do not each create a part. 0 inserts
+# every object on its own.
+WAREHOUSE_DELIVERY_COMPACTION_MAX_BYTES = env.int(
+    "WAREHOUSE_DELIVERY_COMPACTION_MAX_BYTES", default=0
+)
+
 SEGMENT_MEMBERSHIP_REFRESH_INTERVAL_HOURS = env.int(
     "SEGMENT_MEMBERSHIP_REFRESH_INTERVAL_HOURS", default=6
 )
@@ -1539,6 +1702,21 @@ SEGMENT_MEMBERSHIP_DELETE_REFRESH_DELAY_SECONDS = env.int(
     "SEGMENT_MEMBERSHIP_DELETE_REFRESH_DELAY_SECONDS",
     default=120,  # We can expect the identity deletion to propagate by T+120 seconds based on Edge CDC SLO.
 )
+# Refresh counts from the identities ingested since the previous refresh,
+# rather than recounting every identity. Segments whose definition changed are
+# still recounted in full, as is the whole project once per full refresh interval.
+SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_ENABLED = env.bool(
+    "SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_ENABLED", default=False
+)
+SEGMENT_MEMBERSHIP_FULL_REFRESH_INTERVAL_HOURS = env.int(
+    "SEGMENT_MEMBERSHIP_FULL_REFRESH_INTERVAL_HOURS", default=24
+)
+# Identities ingested within this many seconds of a refresh are left to the
+# next one, as rows stamped with an earlier `ingested_at` can still become
+# visible meanwhile, e.g. through asynchronous inserts or replication.
+SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_LAG_SECONDS = env.int(
+    "SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_LAG_SECONDS", default=60
+)
 
 # Always installed: the router fences the `clickhouse` app's migrations off
 # the default Postgres database whether or not a CH alias is configured.
@@ -1,15 +1,31 @@
-from threading import Lock
+"""
+In-process buffers for SDK usage data.
+
+Request threads only increment a counter in one of a number of shards, each
+guarded by its own lock, so that they rarely contend with one another. The
+buffered counts are flushed on a fixed interval by a background thread,
+started lazily once per process, so that no request pays for a flush.
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+import typing
+from abc import ABC, abstractmethod
 
 from django.conf import settings
-from django.utils import timezone
+from django.db import close_old_connections
 
 from app_analytics.mappers import (
+    map_api_usage_cache_to_track_requests_data,
     map_feature_evaluation_cache_to_track_feature_evaluations_by_environment_kwargs,
 )
 from app_analytics.models import Resource
 from app_analytics.tasks import (
     track_feature_evaluations_by_environment,
-    track_request,
+    track_requests,
 )
 from app_analytics.types import (
     APIUsageCacheKey,
@@ -17,27 +33,109 @@ from app_analytics.types import (
     Labels,
 )
 
+logger = logging.getLogger(__name__)
+
+KeyT = typing.TypeVar("KeyT", bound=typing.Hashable)
+
+SHARD_COUNT = 16
+
+
+class _Shard(typing.Generic[KeyT]):
+    def __init__(self) -> None:
+        self.counts: dict[KeyT, int] = {}
+        self.lock = threading.Lock()
+
+
+class _ShardedCounterCache(ABC, typing.Generic[KeyT]):
+    flusher_thread_name: str
 
-class APIUsageCache:
     def __init__(self) -> None:
-        self._cache: dict[APIUsageCacheKey, int] = {}
-        self._last_flushed_at = timezone.now()
-        self._lock = Lock()
-
-    def _flush(self) -> None:
-        for key, value in self._cache.items():
-            track_request.run_in_thread(
-                kwargs={
-                    "resource": key.resource.value,
-                    "host": key.host,
-                    "environment_key": key.environment_key,
-                    "count": value,
-                    "labels": dict(key.labels),
-                }
-            )
-
-        self._cache = {}
-        self._last_flushed_at = timezone.now()
+        self._shards: list[_Shard[KeyT]] = [_Shard() for _ in range(SHARD_COUNT)]
+        self._shard_indexes = itertools.count()
+        self._thread_local = threading.local()
+        self._flusher_lock = threading.Lock()
+        self._flusher_pid: int | None = None
+
+    def flush(self) -> None:
+        """
+        Flush all buffered counts. Called periodically by the flusher thread.
+        """
+        counts: dict[KeyT, int] = {}
+        for shard in self._shards:
+            with shard.lock:
+                shard_counts, shard.counts = shard.counts, {}
+            for key, count in shard_counts.items():
+                counts[key] = counts.get(key, 0) + count
+
+        if counts:
+            self._flush(counts)
+
+    @abstractmethod
+    def _flush(self, counts: dict[KeyT, int]) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _get_flush_interval_seconds(self) -> int:
+        raise NotImplementedError()
+
+    def _increment(self, key: KeyT, count: int) -> None:
+        self._ensure_flusher()
+
+        shard = self._get_shard()
+        with shard.lock:
+            shard.counts[key] = shard.counts.get(key, 0) + count
+
+    def _get_shard(self) -> _Shard[KeyT]:
+        # Pin each thread to a shard, spreading threads evenly across shards.
+        try:
+            return self._thread_local.shard  # type: ignore[no-any-return]
+        except AttributeError:
+            shard = self._shards[next(self._shard_indexes) % SHARD_COUNT]
+            self._thread_local.shard = shard
+            return shard
+
+    def _ensure_flusher(self) -> None:
+        """
+        Start the flusher thread, once per process. The pid is checked so
+        that forked workers start their own thread.
+        """
+        if self._flusher_pid == os.getpid():
+            return
+
+        with self._flusher_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            threading.Thread(
+                target=self._run_flusher,
+                name=self.flusher_thread_name,
+                daemon=True,
+            ).start()
+
+    def _run_flusher(self) -> None:  # pragma: no cover
+        while True:
+            time.sleep(max(self._get_flush_interval_seconds(), 1))
+            # Flushing can query the database, and this thread outlives any
+            # request that would close its connection.
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush %s.", type(self).__name__)
+            finally:
+                close_old_connections()
+
+
+class APIUsageCache(_ShardedCounterCache[APIUsageCacheKey]):
+    flusher_thread_name = "api-usage-cache-flusher"
+
+    def _flush(self, counts: dict[APIUsageCacheKey, int]) -> None:
+        track_requests.run_in_thread(
+            kwargs={"requests": map_api_usage_cache_to_track_requests_data(counts)}
+        )
+
+    def _get_flush_interval_seconds(self) -> int:
+        return settings.API_USAGE_CACHE_SECONDS
 
     def track_request(
         self,
@@ -52,31 +150,20 @@ class APIUsageCache:
             environment_key=environment_key,
             labels=tuple(sorted(labels.items())),
         )
-        with self._lock:
-            if key not in self._cache:
-                self._cache[key] = 1
-            else:
-                self._cache[key] += 1
-            if (
-                timezone.now() - self._last_flushed_at
-            ).seconds > settings.API_USAGE_CACHE_SECONDS:
-                self._flush()
-
-
-class FeatureEvaluationCache:
-    def __init__(self) -> None:
-        self._cache: dict[FeatureEvaluationCacheKey, int] = {}
-        self._last_flushed_at = timezone.now()
-        self._lock = Lock()
+        self._increment(key, 1)
+
+
+class FeatureEvaluationCache(_ShardedCounterCache[FeatureEvaluationCacheKey]):
+    flusher_thread_name = "feature-evaluation-cache-flusher"
 
-    def _flush(self) -> None:
+    def _flush(self, counts: dict[FeatureEvaluationCacheKey, int]) -> None:
         for kwargs in map_feature_evaluation_cache_to_track_feature_evaluations_by_environment_kwargs(
-            self._cache
+            counts
         ):
             track_feature_evaluations_by_environment.delay(kwargs=dict(kwargs))
 
-        self._cache = {}
-        self._last_flushed_at = timezone.now()
+    def _get_flush_interval_seconds(self) -> int:
+        return settings.FEATURE_EVALUATION_CACHE_SECONDS
 
     def track_feature_evaluation(
         self,
@@ -90,13 +177,4 @@ class FeatureEvaluationCache:
             environment_id=environment_id,
             labels=tuple((sorted(labels.items()))),
         )
-        with self._lock:
-            if key not in self._cache:
-                self._cache[key] = evaluation_count
-            else:
-                self._cache[key] += evaluation_count
-
-            if (
-                timezone.now() - self._last_flushed_at
-            ).seconds > settings.FEATURE_EVALUATION_CACHE_SECONDS:
-                self._flush()
+        self._increment(key, evaluation_count)
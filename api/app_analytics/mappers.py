@@ -14,16 +14,18 @@ from app_analytics.constants import (
     TRACK_HEADERS,
 )
 from app_analytics.dataclasses import FeatureEvaluationData, UsageData
-from app_analytics.models import FeatureEvaluationRaw, Resource
+from app_analytics.models import APIUsageRaw, FeatureEvaluationRaw, Resource
 from app_analytics.types import (
     AnnotatedAPIUsageBucket,
     AnnotatedAPIUsageKey,
+    APIUsageCacheKey,
     FeatureEvaluationCacheKey,
     InputLabels,
     KnownSDK,
     Labels,
     TrackFeatureEvaluationsByEnvironmentData,
     TrackFeatureEvaluationsByEnvironmentKwargs,
+    TrackRequestData,
 )
 from integrations.flagsmith.client import get_openfeature_client
 
@@ -218,6 +220,38 @@ def map_feature_evaluation_cache_to_track_feature_evaluations_by_environment_kwa
     ]
 
 
+def map_api_usage_cache_to_track_requests_data(
+    cache: dict[APIUsageCacheKey, int],
+) -> list[TrackRequestData]:
+    return [
+        {
+            "resource": cache_key.resource.value,
+            "host": cache_key.host,
+            "environment_key": cache_key.environment_key,
+            "count": count,
+            "labels": dict(cache_key.labels),  # type: ignore[typeddict-item]
+        }
+        for cache_key, count in cache.items()
+    ]
+
+
+def map_track_requests_data_to_api_usage_raw(
+    requests: list[TrackRequestData],
+    environment_ids_by_key: dict[str, int],
+) -> list[APIUsageRaw]:
+    return [
+        APIUsageRaw(
+            resource=request["resource"],
+            host=request["host"],
+            environment_id=environment_ids_by_key[request["environment_key"]],
+            count=request["count"],
+            labels=request["labels"],
+        )
+        for request in requests
+        if request["environment_key"] in environment_ids_by_key
+    ]
+
+
 def map_feature_evaluation_data_to_feature_evaluation_raw(
     environment_id: int,
     feature_evaluations: list[TrackFeatureEvaluationsByEnvironmentData],
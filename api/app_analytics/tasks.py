@@ -11,7 +11,10 @@ from task_processor.decorators import (
 )
 
 from app_analytics.constants import ANALYTICS_READ_BUCKET_SIZE
-from app_analytics.mappers import map_feature_evaluation_data_to_feature_evaluation_raw
+from app_analytics.mappers import (
+    map_feature_evaluation_data_to_feature_evaluation_raw,
+    map_track_requests_data_to_api_usage_raw,
+)
 from app_analytics.models import (
     APIUsageBucket,
     APIUsageRaw,
@@ -29,6 +32,7 @@ from app_analytics.track import (
 from app_analytics.types import (
     Labels,
     TrackFeatureEvaluationsByEnvironmentKwargs,
+    TrackRequestData,
 )
 from environments.models import Environment
 
@@ -143,6 +147,39 @@ def track_request(
             )
 
 
+@register_task_handler()
+def track_requests(requests: list[TrackRequestData]) -> None:
+    """
+    Store a batch of buffered API usage counts, resolving each environment
+    key once and writing all counts in a single query.
+    """
+    environments_by_key = {
+        environment_key: environment
+        for environment_key in {request["environment_key"] for request in requests}
+        if (environment := Environment.get_from_cache(environment_key))
+    }
+    if settings.USE_POSTGRES_FOR_ANALYTICS:
+        APIUsageRaw.objects.bulk_create(
+            map_track_requests_data_to_api_usage_raw(
+                requests=requests,
+                environment_ids_by_key={
+                    environment_key: environment.id
+                    for environment_key, environment in environments_by_key.items()
+                },
+            )
+        )
+    elif settings.INFLUXDB_TOKEN:
+        for request in requests:
+            if environment := environments_by_key.get(request["environment_key"]):
+                track_request_influxdb(
+                    resource=Resource(request["resource"]),
+                    host=request["host"],
+                    environment=environment,
+                    count=request["count"],
+                    labels=request["labels"],
+                )
+
+
 track_feature_evaluation_influxdb_v2 = register_task_handler()(
     track_feature_evaluation_influxdb_v2_service
 )
@@ -57,6 +57,14 @@ class TrackFeatureEvaluationsByEnvironmentKwargs(TypedDict):
     feature_evaluations: list[TrackFeatureEvaluationsByEnvironmentData]
 
 
+class TrackRequestData(TypedDict):
+    resource: int
+    host: str
+    environment_key: str
+    count: int
+    labels: "Labels"
+
+
 class AnnotatedAPIUsageBucket(TypedDict):
     count: int
     created_at__date: date
@@ -149,7 +149,7 @@ class AuditLog(LifecycleModel):  # type: ignore[misc]
             return
 
         from environments.models import Environment
-        from environments.tasks import process_environment_update
+        from environments.tasks import schedule_process_environment_update
 
         environments_filter = Q()
         if self.environment_id:
@@ -165,4 +165,4 @@ class AuditLog(LifecycleModel):  # type: ignore[misc]
                 updated_at=self.created_date
             )
 
-        process_environment_update.delay(args=(self.id,))
+        schedule_process_environment_update(self)
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+# Lets incremental segment membership refreshes skip the granules without
+# recently ingested rows.
+_FORWARD_DDL = """\
+ALTER TABLE IDENTITIES
+    ADD INDEX IF NOT EXISTS ingested_at_minmax ingested_at TYPE minmax GRANULARITY 1
+"""
+
+_REVERSE_DDL = """\
+ALTER TABLE IDENTITIES
+    DROP INDEX IF EXISTS ingested_at_minmax
+"""
+
+
+class Migration(migrations.Migration):
+    # ClickHouse has no transactional DDL.
+    atomic = False
+
+    dependencies = [
+        ("clickhouse", "0003_identities_is_deleted"),
+    ]
+
+    operations = [
+        migrations.RunSQL(_FORWARD_DDL, reverse_sql=_REVERSE_DDL),
+    ]
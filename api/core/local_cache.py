@@ -0,0 +1,200 @@
+"""
+In-process (L1) cache tier for hot, read-mostly cache entries.
+
+A `LocalCache` sits in front of a shared Django cache (e.g. Redis or the
+database cache) and keeps a bounded number of entries in the worker's memory
+for a short time, so that repeated reads of the same keys don't cost a network
+round trip each.
+
+Entries are invalidated across processes by publishing the invalidated keys
+to a Redis pub/sub channel (`ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL`).
+Every process subscribes to the channel on a daemon thread and evicts the keys
+from its own local caches. When no Redis URL is configured, staleness in
+other processes is bounded by the local cache timeout.
+"""
+
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import typing
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from redis import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "flagsmith:local-cache:invalidations"
+SOCKET_TIMEOUT = 1
+RECONNECT_INTERVAL_SECONDS = 1
+
+_local_caches: dict[str, "LocalCache"] = {}
+_subscriber_lock = threading.Lock()
+_subscriber_pid: int | None = None
+
+
+class LocalCache:
+    """
+    A thread-safe, TTL-bound LRU cache private to the current process.
+
+    A `timeout` of 0 disables the cache: reads always miss and writes are
+    ignored, while invalidations are still broadcast to other processes.
+
+    Values are shared by every thread of the process. Set `copy_values` to
+    store them pickled instead, so that each read returns a copy of its own,
+    e.g. for model instances that callers may mutate.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: int,
+        max_entries: int,
+        *,
+        copy_values: bool = False,
+    ) -> None:
+        self.name = name
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.copy_values = copy_values
+
+        self._entries: OrderedDict[str, tuple[float, typing.Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        _local_caches[name] = self
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.timeout > 0 and self.max_entries > 0
+
+    def get(self, key: str) -> typing.Any:
+        if not self.is_enabled:
+            return None
+
+        _ensure_invalidation_subscriber()
+
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(value) if self.copy_values else value
+
+    def set(self, key: str, value: typing.Any) -> None:
+        if not self.is_enabled:
+            return
+
+        if self.copy_values:
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys: typing.Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, keys: typing.Iterable[str]) -> None:
+        """
+        Evict the given keys from this cache in the current process and in
+        every other process subscribed to invalidations.
+        """
+        keys = list(keys)
+        self.delete_many(keys)
+        publish_invalidation(self.name, keys)
+
+
+def publish_invalidation(cache_name: str, keys: list[str]) -> None:
+    if not (keys and settings.ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL):
+        return
+
+    try:
+        _get_client().publish(
+            INVALIDATION_CHANNEL,
+            json.dumps({"cache": cache_name, "keys": keys}),
+        )
+    except RedisError:
+        logger.exception("Failed to publish local cache invalidation.")
+
+
+def handle_invalidation_message(data: bytes | str) -> None:
+    try:
+        payload = json.loads(data)
+        local_cache = _local_caches[payload["cache"]]
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Ignoring malformed local cache invalidation message.")
+        return
+
+    local_cache.delete_many(payload["keys"])
+
+
+def clear_local_caches() -> None:
+    for local_cache in _local_caches.values():
+        local_cache.clear()
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> Redis:
+    return Redis.from_url(  # type: ignore[return-value]
+        settings.ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL,
+        socket_timeout=SOCKET_TIMEOUT,
+        socket_keepalive=True,
+    )
+
+
+def _ensure_invalidation_subscriber() -> None:
+    """
+    Start the invalidation subscriber thread, once per process. The pid is
+    checked so that forked workers start their own thread.
+    """
+    global _subscriber_pid
+
+    if (
+        not settings.ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL
+        or _subscriber_pid == os.getpid()
+    ):
+        return
+
+    with _subscriber_lock:
+        if _subscriber_pid == os.getpid():
+            return
+        _subscriber_pid = os.getpid()
+        threading.Thread(
+            target=_run_invalidation_subscriber,
+            name="local-cache-invalidation-subscriber",
+            daemon=True,
+        ).start()
+
+
+def _run_invalidation_subscriber() -> None:  # pragma: no cover
+    # No socket timeout here, as the subscription is expected to stay idle
+    client: Redis = Redis.from_url(  # type: ignore[assignment]
+        settings.ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL,
+        socket_keepalive=True,
+    )
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)  # type: ignore[no-untyped-call]
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            for message in pubsub.listen():
+                handle_invalidation_message(message["data"])
+        except RedisError:
+            logger.exception("Local cache invalidation subscriber disconnected.")
+        # Invalidations may have been missed while disconnected.
+        clear_local_caches()
+        time.sleep(RECONNECT_INTERVAL_SECONDS)
@@ -0,0 +1,183 @@
+"""
+Request coalescing ("single-flight") for expensive cache rebuilds.
+
+When a hot cache entry expires or is deleted, every worker thread that misses
+it would otherwise rebuild it concurrently. `get_or_set` makes sure that:
+
+- within a process, only one thread computes the value for a given key while
+  the others wait for, and share, its result;
+- across processes, only the holder of a short lease (acquired with an atomic
+  `cache.add`) computes the value, while the others poll the cache for it,
+  and fall back to computing it themselves if it doesn't show up in time.
+
+It optionally supports stale-while-revalidate semantics: given a
+`stale_timeout`, values are kept for `timeout + stale_timeout` seconds, with a
+separate freshness marker expiring after `timeout`. Once the marker has
+expired, the stale value is still served while the holder of the lease
+triggers a background rebuild through the `revalidate` callback, which is
+expected to eventually call `refresh`.
+"""
+
+import logging
+import threading
+import time
+import typing
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+T = typing.TypeVar("T")
+
+LEASE_KEY_SUFFIX = ":single-flight-lease"
+FRESH_KEY_SUFFIX = ":single-flight-fresh"
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: typing.Any = None
+        self.exception: BaseException | None = None
+
+
+_calls: dict[tuple[int, str], _Call] = {}
+_calls_lock = threading.Lock()
+
+
+def get_or_set(
+    cache: BaseCache,
+    key: str,
+    compute: typing.Callable[[], T],
+    timeout: float | None = DEFAULT_TIMEOUT,
+    *,
+    stale_timeout: int = 0,
+    revalidate: typing.Callable[[], None] | None = None,
+) -> tuple[T, bool]:
+    """
+    Get a value from `cache`, computing and storing it on a miss, while
+    making sure concurrent misses for the same key are coalesced.
+
+    When `stale_timeout` and `revalidate` are given, values older than
+    `timeout` are served as-is for up to `stale_timeout` more seconds, and
+    `revalidate` is called (at most once per lease) to rebuild them.
+
+    Returns the value, and whether it was served from the cache.
+    """
+    if stale_timeout and revalidate:
+        fresh_key = f"{key}{FRESH_KEY_SUFFIX}"
+        values = cache.get_many([key, fresh_key])
+        if (value := values.get(key)) is not None:
+            if fresh_key not in values:
+                _revalidate(cache, key, revalidate)
+            return value, True
+    elif (value := cache.get(key)) is not None:
+        return value, True
+
+    call_key = (id(cache), key)
+    with _calls_lock:
+        if is_follower := call_key in _calls:
+            call = _calls[call_key]
+        else:
+            call = _calls[call_key] = _Call()
+
+    if is_follower:
+        call.done.wait()
+        if call.exception:
+            raise call.exception
+        return call.value, False
+
+    try:
+        call.value = _get_or_set_with_lease(cache, key, compute, timeout, stale_timeout)
+    except BaseException as exception:
+        call.exception = exception
+        raise
+    finally:
+        with _calls_lock:
+            del _calls[call_key]
+        call.done.set()
+
+    return call.value, False
+
+
+def _get_or_set_with_lease(
+    cache: BaseCache,
+    key: str,
+    compute: typing.Callable[[], T],
+    timeout: float | None,
+    stale_timeout: int,
+) -> T:
+    lease_key = f"{key}{LEASE_KEY_SUFFIX}"
+    if cache.add(lease_key, True, timeout=settings.CACHE_SINGLE_FLIGHT_LEASE_SECONDS):
+        try:
+            return _compute_and_set(cache, key, compute, timeout, stale_timeout)
+        finally:
+            cache.delete(lease_key)
+
+    # Another process holds the lease: wait for it to populate the cache.
+    deadline = time.monotonic() + settings.CACHE_SINGLE_FLIGHT_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL_SECONDS)
+        if (value := cache.get(key)) is not None:
+            return value  # type: ignore[no-any-return]
+
+    logger.warning(
+        "Timed out waiting for cache key %s to be populated, computing it.", key
+    )
+    return _compute_and_set(cache, key, compute, timeout, stale_timeout)
+
+
+def refresh(
+    cache: BaseCache,
+    key: str,
+    compute: typing.Callable[[], T],
+    timeout: float | None = DEFAULT_TIMEOUT,
+    *,
+    stale_timeout: int = 0,
+) -> T:
+    """
+    Rebuild a value served stale by `get_or_set`, and release the lease
+    acquired to revalidate it.
+    """
+    try:
+        return _compute_and_set(cache, key, compute, timeout, stale_timeout)
+    finally:
+        cache.delete(f"{key}{LEASE_KEY_SUFFIX}")
+
+
+def _revalidate(
+    cache: BaseCache,
+    key: str,
+    revalidate: typing.Callable[[], None],
+) -> None:
+    lease_key = f"{key}{LEASE_KEY_SUFFIX}"
+    if not cache.add(
+        lease_key, True, timeout=settings.CACHE_SINGLE_FLIGHT_LEASE_SECONDS
+    ):
+        return
+
+    try:
+        revalidate()
+    except Exception:
+        # Keep serving the stale value; the next request will retry.
+        logger.exception("Failed to trigger revalidation of cache key %s.", key)
+        cache.delete(lease_key)
+
+
+def _compute_and_set(
+    cache: BaseCache,
+    key: str,
+    compute: typing.Callable[[], T],
+    timeout: float | None,
+    stale_timeout: int,
+) -> T:
+    value = compute()
+    if stale_timeout and timeout is not DEFAULT_TIMEOUT and timeout is not None:
+        cache.set(key, value, timeout + stale_timeout)
+        cache.set(f"{key}{FRESH_KEY_SUFFIX}", True, timeout)
+    elif timeout is DEFAULT_TIMEOUT:
+        cache.set(key, value)
+    else:
+        cache.set(key, value, timeout)
+    return value
@@ -1,12 +1,30 @@
+from collections import Counter
+from typing import Any, Collection, Mapping
+
+from django.conf import settings
+from django.core.cache import caches
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
 
 from edge_api.identities.models import EdgeIdentity
 from environments.dynamodb import DynamoEnvironmentV2Wrapper
+from environments.dynamodb.constants import (
+    ENVIRONMENTS_V2_PARTITION_KEY,
+    ENVIRONMENTS_V2_SORT_KEY,
+)
 from environments.dynamodb.types import (
     IdentityOverrideV2,
 )
+from environments.dynamodb.utils import (
+    get_feature_id_from_identity_override_document_key,
+)
+from environments.models import EdgeIdentityOverridesCount, Environment
+from features.models import Feature
 
 ddb_environment_v2_wrapper = DynamoEnvironmentV2Wrapper()
+edge_identity_overrides_cache = caches[settings.EDGE_IDENTITY_OVERRIDES_CACHE_NAME]
 
 
 def get_edge_identity_overrides(
@@ -19,26 +37,227 @@ def get_edge_identity_overrides(
             feature_id=feature_id,
         )
     )
-    return [
-        IdentityOverrideV2.model_validate(
-            {**item, "environment_id": str(item["environment_id"])}
+    return [_map_item_to_identity_override(item) for item in override_items]
+
+
+def get_edge_identity_overrides_page(
+    environment_id: int,
+    page_size: int,
+    feature_id: int | None = None,
+    start_document_key: str | None = None,
+) -> tuple[list[IdentityOverrideV2], str | None]:
+    """
+    Get a page of identity overrides for an environment, starting after
+    `start_document_key`. Returns the page along with the document key to
+    start the next page after, or `None` for the last page.
+    """
+    cache_key = f"{environment_id}:{feature_id}:{page_size}:{start_document_key}"
+    page: tuple[list[dict[str, Any]], str | None] | None = (
+        edge_identity_overrides_cache.get(cache_key)
+    )
+    if page is None:
+        start_key = None
+        if start_document_key:
+            start_key = {
+                ENVIRONMENTS_V2_PARTITION_KEY: str(environment_id),
+                ENVIRONMENTS_V2_SORT_KEY: start_document_key,
+            }
+        response = ddb_environment_v2_wrapper.get_identity_overrides_page(
+            environment_id=environment_id,
+            limit=page_size,
+            feature_id=feature_id,
+            start_key=start_key,
         )
-        for item in override_items
-    ]
+        next_document_key = None
+        if last_evaluated_key := response.get("LastEvaluatedKey"):
+            next_document_key = str(last_evaluated_key[ENVIRONMENTS_V2_SORT_KEY])
+        page = ([*response["Items"]], next_document_key)
+        edge_identity_overrides_cache.set(cache_key, page)
+
+    items, next_document_key = page
+    return [_map_item_to_identity_override(item) for item in items], next_document_key
 
 
-def get_edge_identity_override_keys(environment_id: int) -> list[str]:
+def get_edge_identity_override_keys(
+    environment_id: int,
+    feature_ids: Collection[int] | None = None,
+) -> list[str]:
     """
     Get all the identity overrides for an environment, returning only the document key
     for optimised performance when the key is all that is needed.
+
+    When `feature_ids` is given, only the keys of overrides for those features
+    are returned, queried per feature if
+    `ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS` is set.
     """
-    override_items = (
-        ddb_environment_v2_wrapper.get_identity_overrides_by_environment_id(
+    projection_expression_attributes = ["document_key"]
+    if (
+        feature_ids is not None
+        and settings.ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS
+    ):
+        return [
+            item["document_key"]
+            for item in ddb_environment_v2_wrapper.iter_identity_overrides_by_feature_ids(
+                environment_id=environment_id,
+                feature_ids=feature_ids,
+                projection_expression_attributes=projection_expression_attributes,
+            )
+        ]
+    document_keys = [
+        item["document_key"]
+        for item in ddb_environment_v2_wrapper.iter_identity_overrides_by_environment_id(
             environment_id=environment_id,
-            projection_expression_attributes=["document_key"],
+            projection_expression_attributes=projection_expression_attributes,
+        )
+    ]
+    if feature_ids is None:
+        return document_keys
+    return [
+        document_key
+        for document_key in document_keys
+        if get_feature_id_from_identity_override_document_key(document_key)
+        in feature_ids
+    ]
+
+
+def get_edge_identity_overrides_count(
+    environment: Environment,
+    feature_id: int | None = None,
+) -> int:
+    """
+    Count the identity overrides for an environment's live features, or for
+    a single feature, from the maintained per-feature counts. Environments
+    that haven't been counted yet are counted from DynamoDB once.
+    """
+    counts = EdgeIdentityOverridesCount.objects.filter(environment=environment)
+    if not counts.exists():
+        set_edge_identity_overrides_counts(
+            environment.id,
+            _count_edge_identity_overrides_by_feature_id(environment),
+            overwrite=False,
+        )
+    if feature_id is not None:
+        counts = counts.filter(feature_id=feature_id)
+    else:
+        counts = counts.filter(
+            feature__is_archived=False,
+            feature__deleted_at__isnull=True,
+        )
+    total: int | None = counts.aggregate(total=Sum("count"))["total"]
+    return total or 0
+
+
+def _count_edge_identity_overrides_by_feature_id(
+    environment: Environment,
+) -> Mapping[int, int]:
+    if settings.ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS:
+        # Count each feature's overrides with `Select=COUNT` queries, so that
+        # no override is read back at all.
+        return ddb_environment_v2_wrapper.count_identity_overrides_by_feature_ids(
+            environment_id=environment.id,
+            feature_ids=environment.project.features.values_list("id", flat=True),
+        )
+    return Counter(
+        get_feature_id_from_identity_override_document_key(document_key)
+        for document_key in get_edge_identity_override_keys(environment.id)
+    )
+
+
+def recount_edge_identity_overrides_counts(environment: Environment) -> None:
+    """
+    Recount an environment's identity overrides from DynamoDB, correcting
+    any drift of the maintained counts.
+    """
+    set_edge_identity_overrides_counts(
+        environment.id,
+        _count_edge_identity_overrides_by_feature_id(environment),
+    )
+
+
+def set_edge_identity_overrides_counts(
+    environment_id: int,
+    counts_by_feature_id: Mapping[int, int],
+    overwrite: bool = True,
+) -> None:
+    """
+    Replace an environment's identity override counts. Every feature in the
+    environment's project gets a count, so that the environment is known to
+    have been counted even when it has no overrides.
+
+    Provide `overwrite=False` to leave counts set concurrently, e.g. by
+    another first count of the environment, in place.
+    """
+    with transaction.atomic():
+        project_id = _lock_environment(environment_id)
+        counts = EdgeIdentityOverridesCount.objects.filter(
+            environment_id=environment_id
         )
+        if not overwrite and counts.exists():
+            return
+        counts.delete()
+        EdgeIdentityOverridesCount.objects.bulk_create(
+            EdgeIdentityOverridesCount(
+                environment_id=environment_id,
+                feature_id=feature_id,
+                count=counts_by_feature_id.get(feature_id, 0),
+            )
+            for feature_id in Feature.objects.filter(project_id=project_id).values_list(
+                "id", flat=True
+            )
+        )
+
+
+def update_edge_identity_overrides_counts(
+    environment_id: int,
+    deltas_by_feature_id: Mapping[int, int],
+) -> None:
+    """
+    Apply changes in the number of identity overrides per feature. Environments
+    that haven't been counted yet are left alone, as their first count will
+    include these changes.
+
+    Changes that are applied twice, or are stale, make the counts drift until
+    the environment is recounted with `recount_edge_identity_overrides_counts`.
+    """
+    with transaction.atomic():
+        _lock_environment(environment_id)
+        counts = EdgeIdentityOverridesCount.objects.filter(
+            environment_id=environment_id
+        )
+        if not counts.exists():
+            return
+        for feature_id, delta in deltas_by_feature_id.items():
+            if not delta:
+                continue
+            if not counts.filter(feature_id=feature_id).update(
+                count=Greatest(F("count") + delta, 0)
+            ):
+                EdgeIdentityOverridesCount.objects.create(
+                    environment_id=environment_id,
+                    feature_id=feature_id,
+                    count=max(delta, 0),
+                )
+
+
+def _lock_environment(environment_id: int) -> int:
+    # Counts are replaced and updated in turn, under a lock on their
+    # environment. Returns the environment's project id.
+    project_id: int = (
+        Environment.objects.select_for_update()
+        .values_list("project_id", flat=True)
+        .get(id=environment_id)
+    )
+    return project_id
+
+
+def reset_edge_identity_overrides_counts(feature_id: int) -> None:
+    EdgeIdentityOverridesCount.objects.filter(feature_id=feature_id).update(count=0)
+
+
+def _map_item_to_identity_override(item: dict[str, Any]) -> IdentityOverrideV2:
+    return IdentityOverrideV2.model_validate(
+        {**item, "environment_id": str(item["environment_id"])}
     )
-    return [item["document_key"] for item in override_items]
 
 
 def get_overridden_feature_ids_for_edge_identity(identity_uuid: str) -> set[int]:
@@ -1,6 +1,7 @@
 import logging
 import typing
 import uuid
+from collections.abc import Iterator
 from decimal import Decimal
 
 from django.utils import timezone
@@ -16,96 +17,107 @@ EXPORT_EDGE_IDENTITY_PAGINATION_LIMIT = 20000
 logger = logging.getLogger(__name__)
 
 
-def export_edge_identity_and_overrides(  # noqa: C901
+def export_edge_identity_and_overrides(
     environment_api_key: str,
-) -> tuple[list, list, list]:  # type: ignore[type-arg]
-    kwargs = {
-        "environment_api_key": environment_api_key,
-        "limit": EXPORT_EDGE_IDENTITY_PAGINATION_LIMIT,
-    }
-    identity_export = []
-    traits_export = []
-    identity_override_export = []
-
+) -> Iterator[dict[str, typing.Any]]:
+    """
+    Export the edge identities of an environment along with their traits and
+    overrides, reading a single page of identities from DynamoDB at a time.
+
+    Within each page, identities are yielded before traits, and traits before
+    overrides, so that every record follows the records it refers to.
+    """
     feature_id_to_uuid: dict[int, str] = get_feature_uuid_cache(environment_api_key)
     mv_feature_option_id_to_uuid: dict[int, str] = get_mv_feature_option_uuid_cache(
         environment_api_key
     )
+    for items in iter_edge_identity_pages(environment_api_key):
+        for item in items:
+            yield export_edge_identity(
+                item["identifier"],
+                environment_api_key,
+                item["created_date"],
+            )
+        for item in items:
+            for trait in item["identity_traits"]:
+                yield export_edge_trait(trait, item["identifier"], environment_api_key)
+        for item in items:
+            yield from export_edge_identity_overrides(
+                item,
+                environment_api_key,
+                feature_id_to_uuid,
+                mv_feature_option_id_to_uuid,
+            )
+
+
+def iter_edge_identity_pages(
+    environment_api_key: str,
+) -> Iterator[list[dict[str, typing.Any]]]:
+    kwargs = {
+        "environment_api_key": environment_api_key,
+        "limit": EXPORT_EDGE_IDENTITY_PAGINATION_LIMIT,
+    }
     while True:
         response = EdgeIdentity.dynamo_wrapper.get_all_items(**kwargs)  # type: ignore[arg-type]
-        for item in response["Items"]:
-            identifier = item["identifier"]
-            # export identity
-            identity_export.append(
-                export_edge_identity(
-                    identifier,  # type: ignore[arg-type]
-                    environment_api_key,
-                    item["created_date"],  # type: ignore[arg-type]
-                )
-            )
-            # export traits
-            for trait in item["identity_traits"]:  # type: ignore[union-attr]
-                traits_export.append(
-                    export_edge_trait(trait, identifier, environment_api_key)  # type: ignore[arg-type]
-                )
-            for override in item["identity_features"]:  # type: ignore[union-attr]
-                featurestate_uuid = override["featurestate_uuid"]  # type: ignore[call-overload,index]
-                feature_id = override["feature"]["id"]  # type: ignore[call-overload,index]
-                if feature_id not in feature_id_to_uuid:
-                    logging.warning("Feature with id %s does not exist", feature_id)
-                    continue
+        yield response["Items"]
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["start_key"] = response["LastEvaluatedKey"]
 
-                feature_uuid = feature_id_to_uuid[feature_id]  # type: ignore[index]
 
-                # export feature state
-                identity_override_export.append(
-                    export_edge_feature_state(
-                        identifier,  # type: ignore[arg-type]
-                        environment_api_key,
-                        featurestate_uuid,
-                        feature_uuid,
-                        override["enabled"],  # type: ignore[arg-type,call-overload,index]
+def export_edge_identity_overrides(
+    item: dict[str, typing.Any],
+    environment_api_key: str,
+    feature_id_to_uuid: dict[int, str],
+    mv_feature_option_id_to_uuid: dict[int, str],
+) -> Iterator[dict[str, typing.Any]]:
+    identifier = item["identifier"]
+    for override in item["identity_features"]:
+        featurestate_uuid = override["featurestate_uuid"]
+        feature_id = override["feature"]["id"]
+        if feature_id not in feature_id_to_uuid:
+            logging.warning("Feature with id %s does not exist", feature_id)
+            continue
+
+        feature_uuid = feature_id_to_uuid[feature_id]
+
+        # export feature state
+        yield export_edge_feature_state(
+            identifier,
+            environment_api_key,
+            featurestate_uuid,
+            feature_uuid,
+            override["enabled"],
+        )
+
+        # We always want to create the FeatureStateValue, but if there is none in the
+        # dynamo object, we just create a default object with a value of null.
+        featurestate_value = override.get("feature_state_value")
+        yield export_featurestate_value(featurestate_value, featurestate_uuid)
+
+        if mvfsv_overrides := override.get("multivariate_feature_state_values"):
+            for mvfsv_override in mvfsv_overrides:
+                mv_feature_option_id = mvfsv_override["multivariate_feature_option"][
+                    "id"
+                ]
+                if mv_feature_option_id not in mv_feature_option_id_to_uuid:
+                    logging.warning(
+                        "MultivariateFeatureOption with id %s does not exist",
+                        mv_feature_option_id,
                     )
-                )
+                    continue
 
-                # We always want to create the FeatureStateValue, but if there is none in the
-                # dynamo object, we just create a default object with a value of null.
-                featurestate_value = override.get("feature_state_value")  # type: ignore[union-attr]
-                identity_override_export.append(
-                    export_featurestate_value(featurestate_value, featurestate_uuid)
+                mv_feature_option_uuid = mv_feature_option_id_to_uuid[
+                    mv_feature_option_id
+                ]
+                percentage_allocation = float(mvfsv_override["percentage_allocation"])
+                # export mv feature state value
+                yield export_mv_featurestate_value(
+                    featurestate_uuid,
+                    mv_feature_option_uuid,  # type: ignore[arg-type]
+                    percentage_allocation,
                 )
 
-                if mvfsv_overrides := override.get("multivariate_feature_state_values"):  # type: ignore[union-attr]
-                    for mvfsv_override in mvfsv_overrides:
-                        mv_feature_option_id = mvfsv_override[
-                            "multivariate_feature_option"
-                        ]["id"]
-                        if mv_feature_option_id not in mv_feature_option_id_to_uuid:
-                            logging.warning(
-                                "MultivariateFeatureOption with id %s does not exist",
-                                mv_feature_option_id,
-                            )
-                            continue
-
-                        mv_feature_option_uuid = mv_feature_option_id_to_uuid[
-                            mv_feature_option_id
-                        ]
-                        percentage_allocation = float(
-                            mvfsv_override["percentage_allocation"]
-                        )
-                        # export mv feature state value
-                        identity_override_export.append(
-                            export_mv_featurestate_value(
-                                featurestate_uuid,
-                                mv_feature_option_uuid,  # type: ignore[arg-type]
-                                percentage_allocation,
-                            )
-                        )
-        if "LastEvaluatedKey" not in response:
-            break
-        kwargs["start_key"] = response["LastEvaluatedKey"]
-    return identity_export, traits_export, identity_override_export
-
 
 def get_feature_uuid_cache(environment_api_key: str) -> dict[int, str]:
     qs = Feature.objects.filter(
@@ -1,3 +1,4 @@
+import base64
 import copy
 import typing
 
@@ -9,6 +10,9 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from environments.dynamodb.types import IdentityOverrideV2
+from environments.dynamodb.utils import (
+    get_environments_v2_identity_override_document_key,
+)
 from environments.models import Environment
 from features.models import Feature, FeatureState, FeatureStateValue
 from features.multivariate.models import MultivariateFeatureOption
@@ -275,6 +279,31 @@ class EdgeIdentityFsQueryparamSerializer(serializers.Serializer):  # type: ignor
 
 class GetEdgeIdentityOverridesQuerySerializer(serializers.Serializer):  # type: ignore[type-arg]
     feature = serializers.IntegerField(required=False)
+    page_size = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=100,
+        help_text="Return the overrides a page at a time, along with a "
+        "`last_evaluated_key` to request the next page with, and their count.",
+    )
+    last_evaluated_key = serializers.CharField(required=False, allow_null=True)
+
+    def validate(self, attrs: dict[str, typing.Any]) -> dict[str, typing.Any]:
+        if last_evaluated_key := attrs.get("last_evaluated_key"):
+            try:
+                document_key = base64.urlsafe_b64decode(last_evaluated_key).decode()
+            except ValueError:
+                document_key = ""
+            if not document_key.startswith(
+                get_environments_v2_identity_override_document_key(
+                    feature_id=attrs.get("feature"),
+                )
+            ):
+                raise ValidationError(
+                    {"last_evaluated_key": "Invalid last evaluated key."}
+                )
+            attrs["last_evaluated_key"] = document_key
+        return attrs
 
 
 class EdgeIdentitySearchField(serializers.CharField):
@@ -333,6 +362,8 @@ class GetEdgeIdentityOverridesResultSerializer(serializers.Serializer):  # type:
 
 class GetEdgeIdentityOverridesSerializer(serializers.Serializer):  # type: ignore[type-arg]
     results = GetEdgeIdentityOverridesResultSerializer(many=True)
+    last_evaluated_key = serializers.CharField(required=False, allow_null=True)
+    count = serializers.IntegerField(required=False)
 
 
 class EdgeIdentitySourceIdentityRequestSerializer(serializers.Serializer):  # type: ignore[type-arg]
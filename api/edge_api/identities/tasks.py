@@ -1,5 +1,6 @@
 import logging
 import typing
+from collections import Counter
 
 from django.utils import timezone
 from task_processor.decorators import (
@@ -171,9 +172,26 @@ def update_flagsmith_environments_v2_identity_overrides(
     )
     dynamodb_wrapper_v2.update_identity_overrides(identity_override_changeset)
 
+    from edge_api.identities.edge_identity_service import (
+        update_edge_identity_overrides_counts,
+    )
+
+    deltas_by_feature_id: Counter[int] = Counter()
+    for change_details in feature_override_changes.values():
+        match change_details["change_type"]:
+            case "+":
+                deltas_by_feature_id[change_details["new"]["feature"]["id"]] += 1
+            case "-":
+                deltas_by_feature_id[change_details["old"]["feature"]["id"]] -= 1
+    update_edge_identity_overrides_counts(environment.id, deltas_by_feature_id)
+
 
 @register_task_handler()
 def delete_environments_v2_identity_overrides_by_feature(feature_id: int) -> None:
+    from edge_api.identities.edge_identity_service import (
+        reset_edge_identity_overrides_counts,
+    )
+
     dynamodb_wrapper_v2 = DynamoEnvironmentV2Wrapper()
 
     feature = Feature.objects.all_with_deleted().get(id=feature_id)
@@ -181,6 +199,7 @@ def delete_environments_v2_identity_overrides_by_feature(feature_id: int) -> Non
         dynamodb_wrapper_v2.delete_identity_overrides(
             environment_id=environment.id, feature_id=feature_id
         )
+    reset_edge_identity_overrides_counts(feature_id)
 
 
 forward_identity_request = register_task_handler(
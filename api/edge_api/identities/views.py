@@ -400,10 +400,31 @@ def get_edge_identity_overrides(  # type: ignore[no-untyped-def]
     query_serializer.is_valid(raise_exception=True)
     feature_id = query_serializer.validated_data.get("feature")
     environment = Environment.objects.get(api_key=environment_api_key)
-    items = edge_identity_service.get_edge_identity_overrides(
-        environment_id=environment.id, feature_id=feature_id
+
+    if (page_size := query_serializer.validated_data.get("page_size")) is None:
+        items = edge_identity_service.get_edge_identity_overrides(
+            environment_id=environment.id, feature_id=feature_id
+        )
+        response_serializer = GetEdgeIdentityOverridesSerializer(
+            instance={"results": items}, context={"environment": environment}
+        )
+        return Response(response_serializer.data)
+
+    items, next_document_key = edge_identity_service.get_edge_identity_overrides_page(
+        environment_id=environment.id,
+        page_size=page_size,
+        feature_id=feature_id,
+        start_document_key=query_serializer.validated_data.get("last_evaluated_key"),
     )
     response_serializer = GetEdgeIdentityOverridesSerializer(
-        instance={"results": items}, context={"environment": environment}
+        instance={
+            "results": items,
+            "last_evaluated_key": next_document_key
+            and base64.urlsafe_b64encode(next_document_key.encode()).decode(),
+            "count": edge_identity_service.get_edge_identity_overrides_count(
+                environment, feature_id=feature_id
+            ),
+        },
+        context={"environment": environment},
     )
     return Response(response_serializer.data)
@@ -0,0 +1,46 @@
+import logging
+from typing import Any
+
+from django.core.management import BaseCommand, CommandParser
+
+from edge_api.identities.edge_identity_service import (
+    recount_edge_identity_overrides_counts,
+)
+from environments.models import Environment
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the identity overrides of environments from DynamoDB, "
+        "correcting any drift of their maintained counts."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--environment-id",
+            type=int,
+            action="append",
+            dest="environment_ids",
+            help="Environment to recount. Can be repeated. Defaults to every "
+            "environment with maintained counts.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        environments = Environment.objects.select_related("project")
+        if options["environment_ids"]:
+            environments = environments.filter(id__in=options["environment_ids"])
+        else:
+            environments = environments.filter(
+                edge_identity_overrides_counts__isnull=False
+            ).distinct()
+
+        for environment in environments:
+            try:
+                recount_edge_identity_overrides_counts(environment)
+            except Exception:  # pragma: no cover
+                logger.exception(
+                    "Error recounting identity overrides for environment id=%d",
+                    environment.id,
+                )
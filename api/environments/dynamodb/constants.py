@@ -7,6 +7,8 @@ ENVIRONMENTS_V2_SECONDARY_INDEX = "environment_api_key-index"
 ENVIRONMENTS_V2_SECONDARY_INDEX_PARTITION_KEY = "environment_api_key"
 
 DYNAMODB_MAX_BATCH_WRITE_ITEM_COUNT = 25
+# One write capacity unit covers a write of an item up to 1 KB in size.
+DYNAMODB_WRITE_CAPACITY_UNIT_SIZE = 1024
 IDENTITIES_PAGINATION_LIMIT = 1000
 
 SYSTEM_TRAIT_WRITE_MAX_ATTEMPTS = 3
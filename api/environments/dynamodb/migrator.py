@@ -1,6 +1,13 @@
+import logging
+import math
+import threading
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
-from django.db.models import Prefetch
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Min, Prefetch
 
 from edge_api.identities.events import send_migration_event
 from environments.identities.models import Identity
@@ -9,12 +16,19 @@ from features.models import FeatureState
 from features.multivariate.models import MultivariateFeatureStateValue
 from projects.models import Project
 
-from .types import DynamoProjectMetadata, ProjectIdentityMigrationStatus
+from .types import (
+    DynamoProjectMetadata,
+    IdentityMigrationPartition,
+    ProjectIdentityMigrationStatus,
+)
 from .wrappers import (
     DynamoEnvironmentAPIKeyWrapper,
     DynamoEnvironmentWrapper,
     DynamoIdentityWrapper,
 )
+from .wrappers.exceptions import CapacityBudgetExceeded
+
+logger = logging.getLogger(__name__)
 
 
 class IdentityMigrator:
@@ -22,8 +36,19 @@ class IdentityMigrator:
     def iter_identities_in_chunks(
         project_id: int, chunk_size: int = 2000
     ) -> Iterator[Identity]:
+        for chunk in IdentityMigrator.iter_identity_chunks(project_id, chunk_size):
+            yield from chunk
+
+    @staticmethod
+    def iter_identity_chunks(
+        project_id: int,
+        chunk_size: int = 2000,
+        after_pk: int | None = None,
+        end_pk: int | None = None,
+    ) -> Iterator[list[Identity]]:
         """
-        Yield identities in fixed-size chunks using keyset pagination.
+        Yield identities in fixed-size chunks using keyset pagination,
+        optionally limited to identities with `after_pk < pk <= end_pk`.
 
         We don't use Django's built-in QuerySet.iterator() here because
         it uses server-side cursors (DECLARE/FETCH), which plan the
@@ -52,8 +77,10 @@ class IdentityMigrator:
                 ),
             )
         )
+        if end_pk is not None:
+            identities_qs = identities_qs.filter(pk__lte=end_pk)
         queryset = identities_qs.order_by("pk")
-        last_pk = None
+        last_pk = after_pk
 
         while True:
             chunk_qs = (
@@ -62,11 +89,35 @@ class IdentityMigrator:
             chunk = list(chunk_qs[:chunk_size])
             if not chunk:
                 break
-            yield from chunk
+            yield chunk
             last_pk = chunk[-1].pk
 
+    @staticmethod
+    def get_identity_migration_partitions(
+        project_id: int, partition_count: int
+    ) -> list[IdentityMigrationPartition]:
+        """
+        Split the pk range of the project's identities into (at most)
+        `partition_count` ranges of equal width.
+        """
+        pk_range = Identity.objects.filter(
+            environment__project__id=project_id
+        ).aggregate(min_pk=Min("pk"), max_pk=Max("pk"))
+        if pk_range["min_pk"] is None:
+            return []
+        first_after_pk = pk_range["min_pk"] - 1
+        max_pk = pk_range["max_pk"]
+        partition_size = math.ceil((max_pk - first_after_pk) / partition_count)
+        return [
+            {"after_pk": after_pk, "end_pk": min(after_pk + partition_size, max_pk)}
+            for after_pk in range(first_after_pk, max_pk, partition_size)
+        ]
+
     def __init__(self, project_id):  # type: ignore[no-untyped-def]
         self.project_metadata = DynamoProjectMetadata.get_or_new(project_id)
+        # Guards the checkpoints and capacity spent by partition workers.
+        self._lock = threading.Lock()
+        self._capacity_spent = Decimal(0)
 
     @property
     def migration_status(self) -> ProjectIdentityMigrationStatus:
@@ -84,6 +135,13 @@ class IdentityMigrator:
             ProjectIdentityMigrationStatus.MIGRATION_SCHEDULED,
         )
 
+    @property
+    def can_resume(self) -> bool:
+        return (
+            self.migration_status
+            == ProjectIdentityMigrationStatus.MIGRATION_IN_PROGRESS
+        )
+
     def trigger_migration(self):  # type: ignore[no-untyped-def]
         # Note: since we mark the project as `migration in progress` before we start the migration,
         # there is a small chance for the project of being stuck in `migration in progress`
@@ -92,8 +150,14 @@ class IdentityMigrator:
         send_migration_event(self.project_metadata.id)
         self.project_metadata.trigger_identity_migration()  # type: ignore[no-untyped-call]
 
-    def migrate(self):  # type: ignore[no-untyped-def]
-        self.project_metadata.start_identity_migration()  # type: ignore[no-untyped-call]
+    def migrate(self) -> None:
+        """
+        Migrate the project to DynamoDB, resuming from the last checkpoints
+        if the migration is already in progress.
+        """
+        is_resuming = self.can_resume
+        if not is_resuming:
+            self.project_metadata.start_identity_migration()  # type: ignore[no-untyped-call]
 
         project_id = self.project_metadata.id
 
@@ -108,6 +172,93 @@ class IdentityMigrator:
         api_keys = EnvironmentAPIKey.objects.filter(environment__project_id=project_id)
         api_key_wrapper.write_api_keys(api_keys)
 
-        identity_wrapper = DynamoIdentityWrapper()
-        identity_wrapper.write_identities(self.iter_identities_in_chunks(project_id))
+        if is_resuming or settings.IDENTITY_MIGRATION_PARTITIONS > 1:
+            try:
+                self.migrate_identities_in_partitions()
+            except CapacityBudgetExceeded as e:
+                logger.warning(
+                    "Identity migration for project %d spent %s of %s write capacity "
+                    "units and needs to be resumed.",
+                    project_id,
+                    e.capacity_spent,
+                    e.capacity_budget,
+                )
+                return
+        else:
+            identity_wrapper = DynamoIdentityWrapper()
+            identity_wrapper.write_identities(
+                self.iter_identities_in_chunks(project_id)
+            )
         self.project_metadata.finish_identity_migration()  # type: ignore[no-untyped-call]
+
+    def migrate_identities_in_partitions(self) -> None:
+        """
+        Migrate the identities in pk ranges on a pool of workers, checkpointing
+        each range as its chunks are written.
+
+        Raises `CapacityBudgetExceeded` once the write capacity spent exceeds
+        `IDENTITY_MIGRATION_WRITE_CAPACITY_BUDGET`; each worker may overspend
+        the budget by up to one chunk of identities.
+        """
+        project_id = self.project_metadata.id
+        partitions = self.project_metadata.identity_migration_partitions
+        if not partitions:
+            partitions = self.get_identity_migration_partitions(
+                project_id, settings.IDENTITY_MIGRATION_PARTITIONS
+            )
+            self.project_metadata.set_identity_migration_partitions(partitions)
+
+        capacity_budget = Decimal(
+            settings.IDENTITY_MIGRATION_WRITE_CAPACITY_BUDGET or "Inf"
+        )
+        with ThreadPoolExecutor(
+            max_workers=settings.IDENTITY_MIGRATION_MAX_WORKERS
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._migrate_identity_partition,
+                    partition_index=partition_index,
+                    capacity_budget=capacity_budget,
+                )
+                for partition_index, partition in enumerate(partitions)
+                if partition["after_pk"] < partition["end_pk"]
+            ]
+
+        for future in futures:
+            future.result()
+
+    def _migrate_identity_partition(
+        self,
+        partition_index: int,
+        capacity_budget: Decimal,
+    ) -> None:
+        project_id = self.project_metadata.id
+        partition = self.project_metadata.identity_migration_partitions[partition_index]
+        # boto3 resources are not thread safe, so each worker needs its own.
+        identity_wrapper = DynamoIdentityWrapper()
+        try:
+            for chunk in self.iter_identity_chunks(
+                project_id,
+                # DynamoDB returns numbers as decimals.
+                after_pk=int(partition["after_pk"]),
+                end_pk=int(partition["end_pk"]),
+            ):
+                with self._lock:
+                    remaining_capacity = capacity_budget - self._capacity_spent
+                try:
+                    capacity_spent = identity_wrapper.write_identities(
+                        chunk, capacity_budget=remaining_capacity
+                    )
+                except CapacityBudgetExceeded as e:
+                    with self._lock:
+                        self._capacity_spent += e.capacity_spent
+                        e.capacity_budget = capacity_budget
+                        e.capacity_spent = self._capacity_spent
+                    raise
+                with self._lock:
+                    self._capacity_spent += capacity_spent
+                    self.project_metadata.checkpoint_identity_migration_partition(
+                        partition_index, chunk[-1].pk
+                    )
+        finally:
+            connection.close()
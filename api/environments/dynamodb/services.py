@@ -1,7 +1,11 @@
 import logging
+from collections import Counter, defaultdict
 from decimal import Decimal
 from typing import Generator, Iterable
 
+from edge_api.identities.edge_identity_service import (
+    set_edge_identity_overrides_counts,
+)
 from environments.dynamodb import (
     CapacityBudgetExceeded,
     DynamoEnvironmentV2Wrapper,
@@ -73,6 +77,12 @@ def migrate_environments_to_v2(
     dynamo_wrapper_v2.write_environments(environments_to_migrate)
     dynamo_wrapper_v2.update_identity_overrides(identity_overrides_changeset)
 
+    if result_status == EdgeV2MigrationStatus.COMPLETE:
+        _set_identity_overrides_counts(
+            environments=environments_to_migrate,
+            identity_overrides=identity_overrides_changeset.to_put,
+        )
+
     logger.info("Finished migrating environments to v2 for project %d", project_id)
     return EdgeV2MigrationResult(
         identity_overrides_changeset=identity_overrides_changeset,
@@ -80,6 +90,23 @@ def migrate_environments_to_v2(
     )
 
 
+def _set_identity_overrides_counts(
+    *,
+    environments: Iterable[Environment],
+    identity_overrides: Iterable[IdentityOverrideV2],
+) -> None:
+    counts_by_environment_id: dict[str, Counter[int]] = defaultdict(Counter)
+    for identity_override in identity_overrides:
+        counts_by_environment_id[identity_override.environment_id][
+            identity_override.feature_state.feature.id
+        ] += 1
+    for environment in environments:
+        set_edge_identity_overrides_counts(
+            environment.id,
+            counts_by_environment_id[str(environment.id)],
+        )
+
+
 def _iter_paginated_overrides(
     *,
     identity_wrapper: DynamoIdentityWrapper,
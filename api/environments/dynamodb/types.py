@@ -21,6 +21,13 @@ if settings.PROJECT_METADATA_TABLE_NAME_DYNAMO:
     )
 
 
+class IdentityMigrationPartition(typing.TypedDict):
+    # Identities with `after_pk < pk <= end_pk` belong to the partition;
+    # `after_pk` is advanced as chunks of identities are migrated.
+    after_pk: int
+    end_pk: int
+
+
 class ProjectIdentityMigrationStatus(enum.Enum):
     MIGRATION_SCHEDULED = "MIGRATION_SCHEDULED"
     MIGRATION_COMPLETED = "MIGRATION_COMPLETED"
@@ -37,6 +44,7 @@ class DynamoProjectMetadata:
     migration_start_time: str = None  # type: ignore[assignment]
     migration_end_time: str = None  # type: ignore[assignment]
     triggered_at: str = None  # type: ignore[assignment]
+    identity_migration_partitions: list[IdentityMigrationPartition] = None  # type: ignore[assignment]
 
     @classmethod
     def get_or_new(cls, project_id: int) -> "DynamoProjectMetadata":
@@ -75,6 +83,21 @@ class DynamoProjectMetadata:
         self.migration_end_time = datetime.now().isoformat()
         self._save()  # type: ignore[no-untyped-call]
 
+    def set_identity_migration_partitions(
+        self,
+        partitions: list[IdentityMigrationPartition],
+    ) -> None:
+        self.identity_migration_partitions = partitions
+        self._save()  # type: ignore[no-untyped-call]
+
+    def checkpoint_identity_migration_partition(
+        self,
+        partition_index: int,
+        after_pk: int,
+    ) -> None:
+        self.identity_migration_partitions[partition_index]["after_pk"] = after_pk
+        self._save()  # type: ignore[no-untyped-call]
+
     def _save(self):  # type: ignore[no-untyped-def]
         return project_metadata_table.put_item(Item=asdict(self))  # type: ignore[union-attr]
 
@@ -1,8 +1,11 @@
 import json
+import math
 from collections.abc import Mapping
 from decimal import Decimal
 from typing import Any
 
+from environments.dynamodb.constants import DYNAMODB_WRITE_CAPACITY_UNIT_SIZE
+
 
 def estimate_document_size(document: Mapping[str, Any]) -> int:
     """Estimate the size of a DynamoDB item in bytes.
@@ -15,6 +18,14 @@ def estimate_document_size(document: Mapping[str, Any]) -> int:
     )
 
 
+def estimate_write_capacity_units(document: Mapping[str, Any]) -> int:
+    """Estimate the write capacity units consumed by putting a DynamoDB item."""
+    return max(
+        math.ceil(estimate_document_size(document) / DYNAMODB_WRITE_CAPACITY_UNIT_SIZE),
+        1,
+    )
+
+
 def _json_default(obj: object) -> Any:
     if isinstance(obj, bytes):
         # Binary values: use raw byte length as a placeholder string
@@ -53,6 +53,14 @@ class BaseDynamoWrapper:
         response_getter_method: "typing.Callable[..., DynamoDBOutput]",
         **kwargs: typing.Any,
     ) -> typing.Generator[dict[str, "TableAttributeValueTypeDef"], None, None]:
+        for response in self._iter_all_responses(response_getter_method, **kwargs):
+            yield from response["Items"]
+
+    def _iter_all_responses(
+        self,
+        response_getter_method: "typing.Callable[..., DynamoDBOutput]",
+        **kwargs: typing.Any,
+    ) -> "typing.Generator[DynamoDBOutput, None, None]":
         response_getter = partial(response_getter_method, **kwargs)
         set_context(
             "dynamodb",
@@ -61,9 +69,7 @@ class BaseDynamoWrapper:
 
         while True:
             query_response = response_getter()
-
-            for item in query_response["Items"]:
-                yield item
+            yield query_response
 
             last_evaluated_key = query_response.get("LastEvaluatedKey")
             if not last_evaluated_key:
@@ -88,3 +94,16 @@ class BaseDynamoWrapper:
     ) -> typing.Generator[dict[str, "TableAttributeValueTypeDef"], None, None]:
         assert self.table is not None
         return self._iter_all_items(self.table.query, **kwargs)
+
+    def query_count_all_items(self, **kwargs: typing.Any) -> int:
+        """
+        Count the items matching a query without reading them back, using
+        `Select=COUNT` across every page of the query.
+        """
+        assert self.table is not None
+        return sum(
+            response["Count"]
+            for response in self._iter_all_responses(
+                self.table.query, Select="COUNT", **kwargs
+            )
+        )
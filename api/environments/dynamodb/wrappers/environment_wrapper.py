@@ -1,5 +1,7 @@
 import abc
+import threading
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Iterable
 
 import structlog
@@ -35,13 +37,18 @@ from util.util import iter_paired_chunks
 from .base import BaseDynamoWrapper
 
 if typing.TYPE_CHECKING:
-    from mypy_boto3_dynamodb.type_defs import QueryInputRequestTypeDef
+    from mypy_boto3_dynamodb.type_defs import (
+        QueryInputRequestTypeDef,
+        QueryOutputTableTypeDef,
+    )
 
     from environments.models import Environment
     from util.dataclasses import CompressedEnvironmentDocument
 
 logger = structlog.get_logger("dynamodb")
 
+_T = typing.TypeVar("_T")
+
 
 class BaseDynamoEnvironmentWrapper(BaseDynamoWrapper, abc.ABC):
     def write_environment(self, environment: "Environment") -> None:
@@ -136,6 +143,23 @@ class DynamoEnvironmentV2Wrapper(BaseDynamoEnvironmentWrapper):
         feature_id: int | None = None,
         projection_expression_attributes: list[str] | None = None,
     ) -> list[dict[str, Any]]:
+        try:
+            return list(
+                self.iter_identity_overrides_by_environment_id(
+                    environment_id=environment_id,
+                    feature_id=feature_id,
+                    projection_expression_attributes=projection_expression_attributes,
+                )
+            )
+        except KeyError as e:
+            raise ObjectDoesNotExist() from e
+
+    def iter_identity_overrides_by_environment_id(
+        self,
+        environment_id: int,
+        feature_id: int | None = None,
+        projection_expression_attributes: list[str] | None = None,
+    ) -> typing.Iterator[dict[str, Any]]:
         key_condition_expression = self.get_identity_overrides_key_condition_expression(
             environment_id=environment_id,
             feature_id=feature_id,
@@ -147,11 +171,93 @@ class DynamoEnvironmentV2Wrapper(BaseDynamoEnvironmentWrapper):
             query_kwargs["ProjectionExpression"] = ",".join(
                 projection_expression_attributes
             )
+        return self.query_iter_all_items(**query_kwargs)
 
-        try:
-            return list(self.query_iter_all_items(**query_kwargs))
-        except KeyError as e:
-            raise ObjectDoesNotExist() from e
+    def get_identity_overrides_page(
+        self,
+        environment_id: int,
+        limit: int,
+        feature_id: int | None = None,
+        start_key: dict[str, Any] | None = None,
+    ) -> "QueryOutputTableTypeDef":
+        query_kwargs: dict[str, Any] = {
+            "KeyConditionExpression": self.get_identity_overrides_key_condition_expression(
+                environment_id=environment_id,
+                feature_id=feature_id,
+            ),
+            "Limit": limit,
+        }
+        if start_key:
+            query_kwargs["ExclusiveStartKey"] = start_key
+        return self.table.query(**query_kwargs)  # type: ignore[union-attr]
+
+    def iter_identity_overrides_by_feature_ids(
+        self,
+        environment_id: int,
+        feature_ids: Iterable[int],
+        projection_expression_attributes: list[str] | None = None,
+    ) -> typing.Iterator[dict[str, Any]]:
+        """
+        Yield the identity overrides for the given features, querying each
+        feature's sort key prefix concurrently when
+        `ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS` is set.
+        """
+        for feature_overrides in self._map_feature_ids(
+            lambda wrapper,
+            feature_id: wrapper.get_identity_overrides_by_environment_id(
+                environment_id=environment_id,
+                feature_id=feature_id,
+                projection_expression_attributes=projection_expression_attributes,
+            ),
+            feature_ids,
+        ):
+            yield from feature_overrides
+
+    def count_identity_overrides(
+        self,
+        environment_id: int,
+        feature_id: int | None = None,
+    ) -> int:
+        return self.query_count_all_items(
+            KeyConditionExpression=self.get_identity_overrides_key_condition_expression(
+                environment_id=environment_id,
+                feature_id=feature_id,
+            ),
+        )
+
+    def count_identity_overrides_by_feature_ids(
+        self,
+        environment_id: int,
+        feature_ids: Iterable[int],
+    ) -> dict[int, int]:
+        feature_ids = list(feature_ids)
+        counts = self._map_feature_ids(
+            lambda wrapper, feature_id: wrapper.count_identity_overrides(
+                environment_id=environment_id,
+                feature_id=feature_id,
+            ),
+            feature_ids,
+        )
+        return dict(zip(feature_ids, counts))
+
+    def _map_feature_ids(
+        self,
+        func: "typing.Callable[[DynamoEnvironmentV2Wrapper, int], _T]",
+        feature_ids: Iterable[int],
+    ) -> Iterable[_T]:
+        if not (workers := settings.ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS):
+            return (func(self, feature_id) for feature_id in feature_ids)
+
+        local = threading.local()
+
+        def call(feature_id: int) -> _T:
+            # boto3 resources are not thread safe, so each worker needs its own.
+            if not hasattr(local, "wrapper"):
+                local.wrapper = type(self)()
+            return func(local.wrapper, feature_id)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(call, feature_ids))
 
     def get_identity_overrides_key_condition_expression(
         self,
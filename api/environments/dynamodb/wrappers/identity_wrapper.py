@@ -8,6 +8,8 @@ from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from flag_engine.context.types import EvaluationContext
+from flag_engine.engine import get_evaluation_result
 from rest_framework.exceptions import NotFound
 
 from edge_api.identities.search import EdgeIdentitySearchData
@@ -15,12 +17,13 @@ from environments.dynamodb.constants import (
     IDENTITIES_PAGINATION_LIMIT,
     SYSTEM_TRAIT_WRITE_MAX_ATTEMPTS,
 )
+from environments.dynamodb.utils import estimate_write_capacity_units
 from environments.dynamodb.wrappers.exceptions import (
     CapacityBudgetExceeded,
     SystemTraitWriteRaceError,
 )
+from segments.types import SegmentEngineMetadata
 from util.engine_models.context.mappers import (
-    is_context_in_segment,
     map_environment_identity_to_context,
 )
 from util.engine_models.identities.models import IdentityModel
@@ -68,7 +71,18 @@ class DynamoIdentityWrapper(BaseDynamoWrapper):
     def put_item(self, identity_dict: dict):  # type: ignore[type-arg,no-untyped-def]
         self.table.put_item(Item=identity_dict)  # type: ignore[union-attr]
 
-    def write_identities(self, identities: Iterable["Identity"]):  # type: ignore[no-untyped-def]
+    def write_identities(
+        self,
+        identities: Iterable["Identity"],
+        capacity_budget: Decimal = Decimal("Inf"),
+    ) -> Decimal:
+        """
+        Write the given identities, returning the write capacity spent.
+
+        Write capacity is only tracked, using an estimate based on the size
+        of each document, when a capacity budget is given.
+        """
+        capacity_spent = Decimal(0)
         with self.table.batch_writer() as batch:  # type: ignore[union-attr]
             for identity in identities:
                 identity_document = map_identity_to_identity_document(identity)
@@ -79,7 +93,15 @@ class DynamoIdentityWrapper(BaseDynamoWrapper):
                         f"Can't migrate identity {identity.id}; identifier too long"
                     )
                     continue
+                if capacity_budget != Decimal("Inf"):
+                    if capacity_spent >= capacity_budget:
+                        raise CapacityBudgetExceeded(
+                            capacity_budget=capacity_budget,
+                            capacity_spent=capacity_spent,
+                        )
+                    capacity_spent += estimate_write_capacity_units(identity_document)
                 batch.put_item(Item=identity_document)
+        return capacity_spent
 
     def get_item(self, composite_key: str) -> typing.Optional[dict]:  # type: ignore[type-arg]
         return self.table.get_item(Key={"composite_key": composite_key}).get("Item")  # type: ignore[union-attr]
@@ -315,28 +337,34 @@ class DynamoIdentityWrapper(BaseDynamoWrapper):
         identity_model: IdentityModel = None,  # type: ignore[assignment]
     ) -> list:  # type: ignore[type-arg]
         from environments.models import Environment
-        from util.mappers.engine import map_segment_to_engine
+        from projects.services import get_project_segment_contexts_from_cache
 
         if not (identity_pk or identity_model):
             raise ValueError("Must provide one of identity_pk or identity_model.")
 
-        with suppress(ObjectDoesNotExist):
+        try:
             identity = identity_model or IdentityModel.model_validate(
                 self.get_item_from_uuid(identity_pk)
             )
-            environment = Environment.objects.select_related("project").get(
-                api_key=identity.environment_api_key,
+        except ObjectDoesNotExist:
+            return []
+
+        if not (
+            environment := Environment.get_from_cache(identity.environment_api_key)
+        ):
+            raise Environment.DoesNotExist(
+                f"Environment {identity.environment_api_key} does not exist."
             )
-            segments = environment.project.get_segments_from_cache()
-            context = map_environment_identity_to_context(
+        context: EvaluationContext[SegmentEngineMetadata, object] = {
+            **map_environment_identity_to_context(  # type: ignore[typeddict-item]
                 environment=environment,
                 identity=identity,
                 override_traits=None,
-            )
-            return [
-                segment.id
-                for segment in segments
-                if is_context_in_segment(context, map_segment_to_engine(segment))
-            ]
-
-        return []
+            ),
+            "segments": get_project_segment_contexts_from_cache(environment.project_id),
+        }
+        # Evaluate all of the project's segments in a single pass
+        return [
+            segment_result["metadata"]["pk"]
+            for segment_result in get_evaluation_result(context)["segments"]
+        ]
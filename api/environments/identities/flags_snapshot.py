@@ -0,0 +1,228 @@
+"""
+Compiled snapshots of the flags in an environment, used to evaluate identity
+flags in memory.
+
+A snapshot holds the environment default for each feature along with its
+segment overrides in priority order, so that resolving the flags for an
+identity only needs a query for the identity's own overrides.
+"""
+
+import typing
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Prefetch, Q
+
+from features.models import FeatureState
+from features.multivariate.models import MultivariateFeatureStateValue
+from features.versioning.versioning_service import get_environment_flags_list
+
+if typing.TYPE_CHECKING:
+    from environments.identities.models import Identity
+    from environments.identities.traits.models import Trait
+    from environments.models import Environment
+    from segments.models import Segment
+
+environment_flags_snapshot_cache = caches[
+    settings.ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_NAME
+]
+
+# Hides server-side only features from client-side SDKs.
+CLIENT_FEATURES_FILTER = Q(feature__is_server_key_only=False)
+
+FeatureStatePredicate = typing.Callable[[FeatureState], bool]
+
+
+@dataclass
+class EnvironmentFlagsSnapshot:
+    environment_defaults: dict[int, FeatureState] = field(default_factory=dict)
+    # Keyed on feature id, highest priority override first.
+    segment_overrides: dict[int, list[FeatureState]] = field(default_factory=dict)
+
+
+def is_environment_flags_snapshot_enabled() -> bool:
+    return settings.ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS > 0
+
+
+def get_multivariate_feature_state_values_prefetch() -> Prefetch[typing.Any]:
+    return Prefetch(
+        "multivariate_feature_state_values",
+        queryset=MultivariateFeatureStateValue.objects.select_related(
+            "multivariate_feature_option"
+        ),
+    )
+
+
+def get_feature_state_predicate(
+    additional_filters: Q | None,
+) -> FeatureStatePredicate | None:
+    """
+    Translate the filters applied to identity flags by the SDK endpoints into a
+    predicate that can be applied in memory. Returns None if the filters can
+    only be applied by the database.
+    """
+    if not additional_filters:
+        return lambda feature_state: True
+
+    if additional_filters == CLIENT_FEATURES_FILTER:
+        return lambda feature_state: not feature_state.feature.is_server_key_only
+
+    return None
+
+
+def get_environment_flags_snapshot(
+    environment: "Environment",
+) -> EnvironmentFlagsSnapshot:
+    snapshot: EnvironmentFlagsSnapshot | None = environment_flags_snapshot_cache.get(
+        environment.id
+    )
+    if snapshot is None:
+        snapshot = build_environment_flags_snapshot(environment)
+        environment_flags_snapshot_cache.set(environment.id, snapshot)
+
+    # The snapshot is a copy, so point it at the caller's environment rather
+    # than the (possibly outdated) one it was cached with.
+    for feature_state in snapshot.environment_defaults.values():
+        feature_state.environment = environment
+    for overrides in snapshot.segment_overrides.values():
+        for feature_state in overrides:
+            feature_state.environment = environment
+
+    return snapshot
+
+
+def build_environment_flags_snapshot(
+    environment: "Environment",
+) -> EnvironmentFlagsSnapshot:
+    snapshot = EnvironmentFlagsSnapshot()
+
+    for feature_state in get_environment_flags_list(
+        environment=environment,
+        additional_filters=Q(identity=None),
+        additional_prefetch_related_args=[
+            get_multivariate_feature_state_values_prefetch()
+        ],
+    ):
+        if feature_state.feature_segment_id:
+            snapshot.segment_overrides.setdefault(feature_state.feature_id, []).append(
+                feature_state
+            )
+        else:
+            snapshot.environment_defaults[feature_state.feature_id] = feature_state
+
+    for overrides in snapshot.segment_overrides.values():
+        # Priority 1 is the highest.
+        overrides.sort(key=lambda feature_state: feature_state.feature_segment.priority)  # type: ignore[union-attr]
+
+    return snapshot
+
+
+def get_identity_flags_from_snapshot(
+    identity: "Identity",
+    segments: list["Segment"],
+    predicate: FeatureStatePredicate,
+    feature_name: str | None = None,
+) -> dict[int, FeatureState]:
+    """
+    Resolve the highest priority flag for each feature for the given identity,
+    keyed on feature id.
+    """
+    identity_overrides = get_identity_overrides(
+        identity.environment, [identity], feature_name
+    )
+    return resolve_identity_flags(
+        snapshot=get_environment_flags_snapshot(identity.environment),
+        segments=segments,
+        identity_overrides=identity_overrides.get(identity.id, []),
+        predicate=predicate,
+        feature_name=feature_name,
+    )
+
+
+def get_identities_flags_from_snapshot(
+    environment: "Environment",
+    identities_and_traits: list[tuple["Identity", list["Trait"]]],
+    predicate: FeatureStatePredicate,
+) -> list[dict[int, FeatureState]]:
+    """
+    Resolve the flags for a number of identities in the same environment,
+    sharing the snapshot and segments between them, and fetching the identity
+    overrides for all of them in a single query.
+    """
+    snapshot = get_environment_flags_snapshot(environment)
+    all_segments = environment.get_segments_from_cache()
+    identity_overrides = get_identity_overrides(
+        environment, [identity for identity, _ in identities_and_traits]
+    )
+    return [
+        resolve_identity_flags(
+            snapshot=snapshot,
+            segments=identity.get_segments(traits=traits, all_segments=all_segments),
+            identity_overrides=identity_overrides.get(identity.id, []),
+            predicate=predicate,
+        )
+        for identity, traits in identities_and_traits
+    ]
+
+
+def get_identity_overrides(
+    environment: "Environment",
+    identities: list["Identity"],
+    feature_name: str | None = None,
+) -> dict[int, list[FeatureState]]:
+    """
+    Get the live overrides for the given identities, keyed on identity id.
+    """
+    # skip identity overrides for transient identities
+    identity_ids = [identity.id for identity in identities if identity.id]
+    if not identity_ids:
+        return {}
+
+    identity_overrides: dict[int, list[FeatureState]] = {}
+    for feature_state in get_environment_flags_list(
+        environment=environment,
+        feature_name=feature_name,
+        additional_filters=Q(identity_id__in=identity_ids),
+        additional_prefetch_related_args=[
+            get_multivariate_feature_state_values_prefetch()
+        ],
+    ):
+        identity_overrides.setdefault(feature_state.identity_id, []).append(  # type: ignore[arg-type]
+            feature_state
+        )
+    return identity_overrides
+
+
+def resolve_identity_flags(
+    snapshot: EnvironmentFlagsSnapshot,
+    segments: list["Segment"],
+    identity_overrides: list[FeatureState],
+    predicate: FeatureStatePredicate,
+    feature_name: str | None = None,
+) -> dict[int, FeatureState]:
+    segment_ids = {segment.id for segment in segments}
+
+    def _is_included(feature_state: FeatureState) -> bool:
+        if feature_name and feature_state.feature.name.lower() != feature_name.lower():
+            return False
+        return predicate(feature_state)
+
+    identity_flags = {
+        feature_id: feature_state
+        for feature_id, feature_state in snapshot.environment_defaults.items()
+        if _is_included(feature_state)
+    }
+
+    for feature_id, overrides in snapshot.segment_overrides.items():
+        for feature_state in overrides:
+            if feature_state.feature_segment.segment_id in segment_ids:  # type: ignore[union-attr]
+                if _is_included(feature_state):
+                    identity_flags[feature_id] = feature_state
+                break
+
+    for feature_state in identity_overrides:
+        if _is_included(feature_state):
+            identity_flags[feature_state.feature_id] = feature_state
+
+    return identity_flags
@@ -33,6 +33,50 @@ class IdentityManager(Manager["Identity"]):
         replace_identity_environment(identity, environment)
         return identity, created
 
+    def get_or_create_many_for_sdk(
+        self,
+        identifiers: "Iterable[str]",
+        environment: "Environment",
+    ) -> "list[Identity]":
+        """
+        Get or create the identities for all of the given identifiers, returned
+        in the order of the identifiers.
+
+        Only the missing identities are inserted, since conflicting inserts
+        still consume values of the primary key sequence.
+        """
+        identifiers = list(identifiers)
+        identities_by_identifier = {
+            identity.identifier: identity
+            for identity in self.with_traits().filter(
+                environment=environment,
+                identifier__in=identifiers,
+            )
+        }
+        if missing_identifiers := [
+            identifier
+            for identifier in identifiers
+            if identifier not in identities_by_identifier
+        ]:
+            # Identities created concurrently are fetched along with ours.
+            self.bulk_create(
+                [
+                    self.model(identifier=identifier, environment=environment)
+                    for identifier in missing_identifiers
+                ],
+                ignore_conflicts=True,
+            )
+            identities_by_identifier.update(
+                (identity.identifier, identity)
+                for identity in self.with_traits().filter(
+                    environment=environment,
+                    identifier__in=missing_identifiers,
+                )
+            )
+        for identity in identities_by_identifier.values():
+            replace_identity_environment(identity, environment)
+        return [identities_by_identifier[identifier] for identifier in identifiers]
+
     def with_traits(
         self,
         extra_prefetch_related: "Iterable[str | Prefetch] | None" = None,  # type: ignore[type-arg]
@@ -1,20 +1,35 @@
+from dataclasses import dataclass
 from itertools import chain
 
 from django.db import models
-from django.db.models import Prefetch, Q
+from django.db.models import Q
 from flag_engine.engine import get_evaluation_result
 
+from environments.identities.flags_snapshot import (
+    get_feature_state_predicate,
+    get_identity_flags_from_snapshot,
+    get_multivariate_feature_state_values_prefetch,
+    is_environment_flags_snapshot_enabled,
+)
 from environments.identities.managers import IdentityManager
 from environments.identities.traits.models import Trait
 from environments.models import Environment
 from environments.sdk.types import SDKTraitData
 from features.models import FeatureState
-from features.multivariate.models import MultivariateFeatureStateValue
 from features.versioning.versioning_service import get_environment_flags_list
 from segments.models import Segment
 from util.mappers.engine import map_environment_to_evaluation_context
 
 
+@dataclass
+class IdentityTraitChanges:
+    identity: "Identity"
+    keys_to_delete: set[str]
+    new_traits: list[Trait]
+    updated_traits: list[Trait]
+    traits: list[Trait]
+
+
 class Identity(models.Model):
     identifier = models.CharField(max_length=2000)
     created_date = models.DateTimeField("DateCreated", auto_now_add=True)
@@ -70,6 +85,34 @@ class Identity(models.Model):
         """
         segments = self.get_segments(traits=traits, overrides_only=True)
 
+        if is_environment_flags_snapshot_enabled() and (
+            predicate := get_feature_state_predicate(additional_filters)
+        ):
+            identity_flags = get_identity_flags_from_snapshot(
+                identity=self,
+                segments=segments,
+                predicate=predicate,
+                feature_name=feature_name,
+            )
+        else:
+            identity_flags = self._get_identity_flags_from_db(
+                segments=segments,
+                feature_name=feature_name,
+                additional_filters=additional_filters,
+            )
+
+        if self.environment.get_hide_disabled_flags() is True:
+            # filter out any flags that are disabled
+            return [value for value in identity_flags.values() if value.enabled]
+
+        return list(identity_flags.values())
+
+    def _get_identity_flags_from_db(
+        self,
+        segments: list[Segment],
+        feature_name: str | None = None,
+        additional_filters: Q | None = None,
+    ) -> dict[int, FeatureState]:
         # define sub queries
         belongs_to_environment_query = Q(environment=self.environment)
         if self.id:
@@ -99,12 +142,7 @@ class Identity(models.Model):
             feature_name=feature_name,
             additional_filters=full_query,
             additional_prefetch_related_args=[
-                Prefetch(
-                    "multivariate_feature_state_values",
-                    queryset=MultivariateFeatureStateValue.objects.select_related(
-                        "multivariate_feature_option"
-                    ),
-                )
+                get_multivariate_feature_state_values_prefetch()
             ],
         )
 
@@ -119,11 +157,7 @@ class Identity(models.Model):
                 if flag > current_flag:
                     identity_flags[flag.feature_id] = flag
 
-        if self.environment.get_hide_disabled_flags() is True:
-            # filter out any flags that are disabled
-            return [value for value in identity_flags.values() if value.enabled]
-
-        return list(identity_flags.values())
+        return identity_flags
 
     def get_overridden_feature_states(self) -> dict[int, FeatureState]:
         """
@@ -138,22 +172,26 @@ class Identity(models.Model):
         self,
         traits: list[Trait] | None = None,
         overrides_only: bool = False,
+        all_segments: list[Segment] | None = None,
     ) -> list[Segment]:
         """
         Get the list of segments this identity is a part of.
 
         :param traits: override the identity's traits when evaluating segments
         :param overrides_only: only retrieve the segments which have a valid override in the environment
+        :param all_segments: the segments to evaluate, if already retrieved
         :return: List of matching segments
         """
         db_traits = (
             self.identity_traits.all() if (traits is None and self.id) else traits or []
         )
 
-        if overrides_only:
-            all_segments = self.environment.get_segments_from_cache()
-        else:
-            all_segments = self.environment.project.get_segments_from_cache()
+        if all_segments is None:
+            all_segments = (
+                self.environment.get_segments_from_cache()
+                if overrides_only
+                else self.environment.project.get_segments_from_cache()
+            )
 
         segments_by_pk = {segment.pk: segment for segment in all_segments}
         context = map_environment_to_evaluation_context(
@@ -224,6 +262,20 @@ class Identity(models.Model):
         :param trait_data_items: list of dictionaries validated by TraitSerializerFull
         :return: queryset of updated trait models
         """
+        trait_changes = self.get_trait_changes(trait_data_items)
+        Identity.apply_trait_changes([trait_changes])
+        return trait_changes.traits
+
+    def get_trait_changes(
+        self,
+        trait_data_items: list[SDKTraitData],
+    ) -> IdentityTraitChanges:
+        """
+        Given a list of traits, determine the changes to be made to the identity's
+        stored traits without writing them, see `Identity.apply_trait_changes`.
+
+        :param trait_data_items: list of dictionaries validated by TraitSerializerFull
+        """
         current_traits = {t.trait_key: t for t in self.identity_traits.all()}
 
         keys_to_delete = set()
@@ -277,34 +329,60 @@ class Identity(models.Model):
                 )
             )
 
-        # delete the traits that had their keys set to None
+        # drop the traits that had their keys set to None
         # (except the transient ones)
-        if keys_to_delete:
-            current_traits = {
-                trait_key: trait
-                for trait_key, trait in current_traits.items()
-                if trait_key not in keys_to_delete
-            }
-            self.identity_traits.filter(trait_key__in=keys_to_delete).delete()
+        current_traits = {
+            trait_key: trait
+            for trait_key, trait in current_traits.items()
+            if trait_key not in keys_to_delete
+        }
+
+        return IdentityTraitChanges(
+            identity=self,
+            keys_to_delete=keys_to_delete,
+            new_traits=new_traits,
+            updated_traits=updated_traits,
+            # the full list of traits for this identity, overriding persisted
+            # traits by transient traits in case of key collisions
+            traits=[
+                *{
+                    trait.trait_key: trait
+                    for trait in chain(
+                        current_traits.values(),
+                        updated_traits,
+                        new_traits,
+                        transient_traits,
+                    )
+                }.values()
+            ],
+        )
+
+    @staticmethod
+    def apply_trait_changes(trait_changes: list[IdentityTraitChanges]) -> None:
+        """
+        Write the trait changes for any number of identities, using a single
+        query per type of change.
+        """
+        delete_query = Q()
+        for changes in trait_changes:
+            if changes.keys_to_delete:
+                delete_query |= Q(
+                    identity=changes.identity,
+                    trait_key__in=changes.keys_to_delete,
+                )
+        if delete_query:
+            Trait.objects.filter(delete_query).delete()
 
-        Trait.objects.bulk_update(updated_traits, fields=Trait.BULK_UPDATE_FIELDS)
+        Trait.objects.bulk_update(
+            [trait for changes in trait_changes for trait in changes.updated_traits],
+            fields=Trait.BULK_UPDATE_FIELDS,
+        )
 
         # use ignore_conflicts to handle race conditions which result in IntegrityError if another request
         # has added a particular trait_key for the identity while this method has been determining what to
         # update or create.
         # See: https://github.com/Flagsmith/flagsmith/issues/370
-        Trait.objects.bulk_create(new_traits, ignore_conflicts=True)
-
-        # return the full list of traits for this identity
-        # override persisted traits by transient traits in case of key collisions
-        return [
-            *{
-                trait.trait_key: trait
-                for trait in chain(
-                    current_traits.values(),
-                    updated_traits,
-                    new_traits,
-                    transient_traits,
-                )
-            }.values()
-        ]
+        Trait.objects.bulk_create(
+            [trait for changes in trait_changes for trait in changes.new_traits],
+            ignore_conflicts=True,
+        )
@@ -16,12 +16,15 @@ from drf_spectacular.utils import extend_schema
 from flagsmith_schemas import api as api_schemas
 from rest_framework import status, viewsets
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
 from rest_framework.response import Response
 
 from app.pagination import CustomPagination
 from core.constants import FLAGSMITH_UPDATED_AT_HEADER, SDK_ENVIRONMENT_KEY_HEADER
 from core.request_origin import RequestOrigin
 from edge_api.identities.tasks import forward_identity_request
+from environments.authentication import EnvironmentKeyAuthentication
+from environments.identities.flags_snapshot import CLIENT_FEATURES_FILTER
 from environments.identities.models import Identity
 from environments.identities.serializers import (
     IdentitySerializer,
@@ -33,6 +36,7 @@ from environments.permissions.permissions import NestedEnvironmentPermissions
 from environments.sdk.serializers import (
     IdentifyWithTraitsSerializer,
     IdentitySerializerWithTraitsAndSegments,
+    SDKBulkIdentifyWithTraitsSerializer,
 )
 from features.serializers import SDKIdentityFeatureStateSerializer
 from integrations.integration import identify_integrations
@@ -278,7 +282,7 @@ class SDKIdentities(SDKAPIView):
 
     def _get_additional_filters(self) -> Q | None:
         if self.request.originated_from is RequestOrigin.CLIENT:
-            return Q(feature__is_server_key_only=False)
+            return CLIENT_FEATURES_FILTER
         return None
 
     def _get_single_feature_state_response(
@@ -335,3 +339,63 @@ class SDKIdentities(SDKAPIView):
         return Response(
             data=serializer.data, status=status.HTTP_200_OK, headers=headers
         )
+
+
+class SDKIdentitiesBulk(SDKAPIView):
+    serializer_class = SDKBulkIdentifyWithTraitsSerializer
+    pagination_class = None  # set here to ensure documentation is correct
+    throttle_classes = []
+
+    def get_authenticators(self):  # type: ignore[no-untyped-def]
+        return [EnvironmentKeyAuthentication(required_key_prefix="ser.")]
+
+    def get_serializer_context(self):  # type: ignore[no-untyped-def]
+        context = super().get_serializer_context()
+        if hasattr(self.request, "environment"):
+            # only set it if the request has the attribute to ensure that the
+            # documentation works correctly still
+            context["environment"] = self.request.environment
+        return context
+
+    @extend_schema(
+        request=SDKBulkIdentifyWithTraitsSerializer,
+        responses={200: SDKBulkIdentifyWithTraitsSerializer},
+        operation_id="sdk_v1_post_identities_bulk",
+    )
+    def post(self, request: Request) -> Response:
+        """
+        Identify a number of users, set their traits, and retrieve their flags.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        identified = serializer.save()
+
+        if settings.EDGE_API_URL and request.environment.project.enable_dynamo_db:
+            # the Edge API identifies a single identity per request
+            for identity_data in request.data["identities"]:
+                forward_identity_request.delay(
+                    args=(
+                        request.method,
+                        dict(request.headers),
+                        request.environment.project.id,
+                    ),
+                    kwargs={"request_data": identity_data},
+                )
+
+        context = self.get_serializer_context()  # type: ignore[no-untyped-call]
+        return Response(
+            {
+                "identities": [
+                    # we need to serialize each identity with its own context to
+                    # ensure that multivariate values are evaluated for it
+                    IdentifyWithTraitsSerializer(
+                        instance=instance,
+                        context={**context, "identity": instance["identity"]},
+                    ).data
+                    for instance in identified
+                ]
+            },
+            headers={
+                FLAGSMITH_UPDATED_AT_HEADER: request.environment.updated_at.timestamp()
+            },
+        )
@@ -10,12 +10,22 @@ class Command(BaseCommand):
         parser.add_argument(
             "project", type=int, help="Id of the project being migrated"
         )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Resume an identity migration that is in progress from its last checkpoints",
+        )
 
     def handle(self, *args, **options):  # type: ignore[no-untyped-def]
         project_id = options["project"]
         identity_migrator = IdentityMigrator(project_id)  # type: ignore[no-untyped-call]
-        if not identity_migrator.can_migrate:
+        if options["resume"]:
+            if not identity_migrator.can_resume:
+                raise CommandError(
+                    "Identities migration for this project is not in progress"
+                )
+        elif not identity_migrator.can_migrate:
             raise CommandError(
                 "Identities migration for this project is either done or is in progress"
             )
-        identity_migrator.migrate()  # type: ignore[no-untyped-call]
+        identity_migrator.migrate()
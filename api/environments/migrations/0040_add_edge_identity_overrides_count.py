@@ -0,0 +1,53 @@
+# Generated by Django 5.2.16 on 2026-10-17 10:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("environments", "0039_use_no_ssrf_url_field"),
+        ("features", "0067_add_feature_state_mv_hashing_salt"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EdgeIdentityOverridesCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "environment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="edge_identity_overrides_counts",
+                        to="environments.environment",
+                    ),
+                ),
+                (
+                    "feature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="edge_identity_overrides_counts",
+                        to="features.feature",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("environment", "feature"),
+                        name="unique_edge_identity_overrides_count",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
+import json
 import logging
+import time
 import typing
 import uuid
+from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime
 from typing import TYPE_CHECKING, Literal
@@ -31,8 +34,10 @@ from audit.constants import (
     ENVIRONMENT_UPDATED_MESSAGE,
 )
 from audit.related_object_type import RelatedObjectType
+from core.local_cache import LocalCache
 from core.models import abstract_base_auditable_model_factory
 from core.request_origin import RequestOrigin
+from core.single_flight import POLL_INTERVAL_SECONDS, get_or_set, refresh
 from environments.api_keys import (
     generate_client_api_key,
     generate_server_api_key,
@@ -57,8 +62,11 @@ from integrations.flagsmith.client import get_openfeature_client
 from metadata.models import Metadata
 from projects.models import Project
 from segments.models import Segment
+from util.dataclasses import RenderedEnvironmentDocument
 from util.mappers import (
     map_environment_to_sdk_document,
+    map_feature_state_to_sdk_document_feature_state,
+    map_sdk_document_to_rendered_document,
 )
 from webhooks.models import AbstractBaseExportableWebhookModel
 
@@ -73,12 +81,57 @@ environment_document_cache = caches[settings.CACHE_ENVIRONMENT_DOCUMENT_LOCATION
 environment_segments_cache = caches[settings.ENVIRONMENT_SEGMENTS_CACHE_NAME]
 bad_environments_cache = caches[settings.BAD_ENVIRONMENTS_CACHE_LOCATION]
 
+ENVIRONMENT_DOCUMENT_PATCH_LEASE_KEY_SUFFIX = ":patch-lease"
+
+# In-process tiers in front of the shared environment caches
+environment_local_cache = LocalCache(
+    name=settings.ENVIRONMENT_CACHE_NAME,
+    timeout=settings.ENVIRONMENT_LOCAL_CACHE_SECONDS,
+    max_entries=settings.ENVIRONMENT_LOCAL_CACHE_MAX_ENTRIES,
+    # Environments are mutated by request handlers, e.g. when lazily loading
+    # relations, so each request gets its own instance.
+    copy_values=True,
+)
+environment_document_local_cache = LocalCache(
+    name=settings.CACHE_ENVIRONMENT_DOCUMENT_LOCATION,
+    timeout=settings.ENVIRONMENT_LOCAL_CACHE_SECONDS,
+    max_entries=settings.ENVIRONMENT_LOCAL_CACHE_MAX_ENTRIES,
+)
+
 # Intialize the dynamo environment wrapper(s) globaly
 environment_wrapper = DynamoEnvironmentWrapper()
 environment_v2_wrapper = DynamoEnvironmentV2Wrapper()
 environment_api_key_wrapper = DynamoEnvironmentAPIKeyWrapper()
 
 
+def _get_environment_document_patch_lease_key(api_key: str) -> str:
+    return f"{api_key}{ENVIRONMENT_DOCUMENT_PATCH_LEASE_KEY_SUFFIX}"
+
+
+@contextmanager
+def _hold_environment_document_patch_leases(
+    api_keys: typing.Iterable[str],
+) -> typing.Iterator[None]:
+    """
+    Hold the patch leases of the given environment documents, waiting for the
+    patches holding them to finish, up to the lease timeout.
+    """
+    lease_keys = sorted(map(_get_environment_document_patch_lease_key, api_keys))
+    deadline = time.monotonic() + settings.CACHE_SINGLE_FLIGHT_LEASE_SECONDS
+    for lease_key in lease_keys:
+        while not environment_document_cache.add(
+            lease_key, True, timeout=settings.CACHE_SINGLE_FLIGHT_LEASE_SECONDS
+        ):
+            if time.monotonic() >= deadline:
+                # The lease has expired, or is about to: go ahead anyway.
+                break
+            time.sleep(POLL_INTERVAL_SECONDS)
+    try:
+        yield
+    finally:
+        environment_document_cache.delete_many(lease_keys)
+
+
 class Environment(
     LifecycleModel,  # type: ignore[misc]
     abstract_base_auditable_model_factory(  # type: ignore[misc]
@@ -187,13 +240,17 @@ class Environment(
     @hook(AFTER_UPDATE)  # type: ignore[misc]
     def clear_environment_cache(self) -> None:
         # TODO: this could rebuild the cache itself (using an async task)
-        environment_cache.delete_many(
-            [self.initial_value("api_key"), *[eak.key for eak in self.api_keys.all()]]
-        )
+        api_keys = [
+            self.initial_value("api_key"),
+            *[eak.key for eak in self.api_keys.all()],
+        ]
+        environment_cache.delete_many(api_keys)
+        environment_local_cache.invalidate(api_keys)
 
     @hook(AFTER_UPDATE, when="api_key", has_changed=True)  # type: ignore[misc]
     def update_environment_document_cache(self) -> None:
         environment_document_cache.delete(self.initial_value("api_key"))
+        environment_document_local_cache.invalidate([self.initial_value("api_key")])
         self.write_environment_documents(self.id)
 
     @hook(AFTER_DELETE)  # type: ignore[misc]
@@ -205,12 +262,9 @@ class Environment(
 
     @hook(AFTER_DELETE)  # type: ignore[misc]
     def delete_environment_document_from_cache(self) -> None:
-        if (
-            settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
-            == EnvironmentDocumentCacheMode.PERSISTENT
-            or settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS > 0
-        ):
+        if self._is_environment_document_cache_enabled():
             environment_document_cache.delete(self.api_key)
+            environment_document_local_cache.invalidate([self.api_key])
 
     # Use the BEFORE_SAVE hook instead of BEFORE_CREATE to account for the logic in the
     # Environment.clone() method
@@ -290,7 +344,11 @@ class Environment(
         if cls.is_bad_key(api_key):
             return None
 
-        environment: "Environment" = environment_cache.get(api_key)
+        environment: "Environment | None" = environment_local_cache.get(api_key)
+        if environment:
+            return environment
+
+        environment = environment_cache.get(api_key)
         if not environment:
             select_related_args = (
                 "project",
@@ -316,6 +374,7 @@ class Environment(
                     timeout=settings.ENVIRONMENT_CACHE_SECONDS,
                 )
 
+        environment_local_cache.set(api_key, environment)
         return environment
 
     @classmethod
@@ -324,10 +383,28 @@ class Environment(
         environment_id: int = None,  # type: ignore[assignment]
         project_id: int = None,  # type: ignore[assignment]
     ) -> None:
-        # use a list to make sure the entire qs is evaluated up front
         environments_filter = (
             Q(id=environment_id) if environment_id else Q(project_id=project_id)
         )
+        if (
+            settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
+            != EnvironmentDocumentCacheMode.PERSISTENT
+        ):
+            cls._write_environment_documents(environments_filter)
+            return
+
+        # Wait for patches of the cached documents in progress, and keep new
+        # ones from starting, so that they can't overwrite the rebuilt documents
+        # with ones read before them.
+        api_keys = cls.objects.filter(environments_filter).values_list(
+            "api_key", flat=True
+        )
+        with _hold_environment_document_patch_leases(api_keys):
+            cls._write_environment_documents(environments_filter)
+
+    @classmethod
+    def _write_environment_documents(cls, environments_filter: Q) -> None:
+        # use a list to make sure the entire qs is evaluated up front
         environments = list(
             cls.objects.filter_for_document_builder(
                 environments_filter,
@@ -377,11 +454,120 @@ class Environment(
             environment_document_cache.set_many(
                 {
                     # Use the SDK mapper so the cache perfectly matches the DB fallback
-                    e.api_key: map_environment_to_sdk_document(e)
+                    e.api_key: cls._prepare_environment_document_for_cache(
+                        map_environment_to_sdk_document(e)
+                    )
                     for e in environments
                 }
             )
 
+        environment_document_local_cache.invalidate([e.api_key for e in environments])
+
+    @classmethod
+    def patch_environment_document(
+        cls,
+        environment_id: int,
+        feature_ids: typing.Collection[int],
+    ) -> bool:
+        """
+        Patch the environment default feature states for the given features in
+        the cached environment document, instead of rebuilding the whole
+        document.
+
+        Returns False if the document can't be patched, e.g. it isn't cached,
+        the change is structural, or another patch of the document is in
+        progress, in which case a full rebuild is required.
+        """
+        if (
+            settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
+            != EnvironmentDocumentCacheMode.PERSISTENT
+        ):
+            return False
+
+        environment = cls.objects.get(id=environment_id)
+        if environment.project.enable_dynamo_db and environment_wrapper.is_enabled:
+            return False
+
+        # Patches read, modify and write the cached document, so only one of
+        # them, or a full rebuild, may run at a time for a given environment.
+        lease_key = _get_environment_document_patch_lease_key(environment.api_key)
+        if not environment_document_cache.add(
+            lease_key, True, timeout=settings.CACHE_SINGLE_FLIGHT_LEASE_SECONDS
+        ):
+            return False
+        try:
+            return cls._patch_cached_environment_document(environment, feature_ids)
+        finally:
+            environment_document_cache.delete(lease_key)
+
+    @classmethod
+    def _patch_cached_environment_document(
+        cls,
+        environment: "Environment",
+        feature_ids: typing.Collection[int],
+    ) -> bool:
+        from features.versioning.versioning_service import get_environment_flags_list
+
+        if (
+            cached_document := environment_document_cache.get(environment.api_key)
+        ) is None:
+            return False
+        if isinstance(cached_document, RenderedEnvironmentDocument):
+            environment_document = json.loads(cached_document.content)
+        else:
+            # Leave the cached document as read, to compare it before writing.
+            environment_document = {
+                **cached_document,
+                "feature_states": [*cached_document["feature_states"]],
+            }
+
+        feature_states = get_environment_flags_list(
+            environment=environment,
+            additional_filters=Q(
+                feature_id__in=feature_ids,
+                feature_segment=None,
+                identity=None,
+            ),
+            additional_prefetch_related_args=[
+                Prefetch(
+                    "multivariate_feature_state_values",
+                    queryset=MultivariateFeatureStateValue.objects.select_related(
+                        "multivariate_feature_option"
+                    ),
+                ),
+            ],
+        )
+        if len(feature_states) != len(feature_ids):
+            return False
+
+        document_feature_states = environment_document["feature_states"]
+        document_feature_state_index_by_feature_id = {
+            document_feature_state["feature"]["id"]: index
+            for index, document_feature_state in enumerate(document_feature_states)
+        }
+        for feature_state in feature_states:
+            if (
+                index := document_feature_state_index_by_feature_id.get(
+                    feature_state.feature_id
+                )
+            ) is None:
+                # The feature is new to the document.
+                return False
+            document_feature_states[index] = (
+                map_feature_state_to_sdk_document_feature_state(feature_state)
+            )
+        environment_document["updated_at"] = environment.updated_at
+
+        # Don't overwrite a document rebuilt in full in the meantime.
+        if environment_document_cache.get(environment.api_key) != cached_document:
+            return False
+        environment_document_cache.set(
+            environment.api_key,
+            cls._prepare_environment_document_for_cache(environment_document),
+        )
+        environment_document_local_cache.invalidate([environment.api_key])
+        return True
+
     def get_feature_state(
         self,
         feature_id: int,
@@ -411,6 +597,24 @@ class Environment(
         result: QuerySet[FeatureState] = FeatureState.objects.filter(id__in=ids)
         return result
 
+    def get_identity_overrides_count(self) -> int:
+        """
+        Count the identity overrides for the environment's live features,
+        equivalent to `get_identity_overrides_queryset().count()` but
+        counted by the database without collecting the latest ids first.
+        """
+        return (
+            FeatureState.objects.get_live_feature_states(
+                environment=self,
+                identity__isnull=False,
+                feature_segment__isnull=True,
+            )
+            .filter(feature__is_archived=False)
+            .values("feature_id", "identity_id")
+            .distinct()
+            .count()
+        )
+
     def _get_active_feature_states_ids(
         self,
         extra_group_by_fields: Literal["identity_id"] | None = None,
@@ -554,14 +758,31 @@ class Environment(
         cls,
         api_key: str,
     ) -> dict[str, typing.Any]:
-        if (
-            settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS > 0
-            or settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
-            == EnvironmentDocumentCacheMode.PERSISTENT
-        ):
-            return cls._get_environment_document_from_cache(api_key)
+        if cls._is_environment_document_cache_enabled():
+            environment_document = cls._get_environment_document_from_cache(api_key)
+            if isinstance(environment_document, RenderedEnvironmentDocument):
+                return json.loads(environment_document.content)  # type: ignore[no-any-return]
+            return environment_document
         return cls._get_environment_document_from_db(api_key)
 
+    @classmethod
+    def get_rendered_environment_document(
+        cls,
+        api_key: str,
+    ) -> RenderedEnvironmentDocument:
+        """
+        Get the environment document rendered to JSON bytes, taking it
+        from the cache as-is when pre-rendered documents are cached.
+        """
+        environment_document: dict[str, typing.Any] | RenderedEnvironmentDocument
+        if cls._is_environment_document_cache_enabled():
+            environment_document = cls._get_environment_document_from_cache(api_key)
+        else:
+            environment_document = cls._get_environment_document_from_db(api_key)
+        if isinstance(environment_document, RenderedEnvironmentDocument):
+            return environment_document
+        return map_sdk_document_to_rendered_document(environment_document)
+
     def get_create_log_message(self, history_instance) -> typing.Optional[str]:  # type: ignore[no-untyped-def]
         return ENVIRONMENT_CREATED_MESSAGE % self.name  # type: ignore[no-any-return]
 
@@ -574,15 +795,44 @@ class Environment(
 
         return self.project.hide_disabled_flags  # type: ignore[no-any-return]
 
+    @staticmethod
+    def _is_environment_document_cache_enabled() -> bool:
+        return (
+            settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS > 0
+            or settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
+            == EnvironmentDocumentCacheMode.PERSISTENT
+        )
+
+    @staticmethod
+    def _prepare_environment_document_for_cache(
+        environment_document: dict[str, typing.Any],
+    ) -> dict[str, typing.Any] | RenderedEnvironmentDocument:
+        if settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED:
+            return map_sdk_document_to_rendered_document(environment_document)
+        return environment_document
+
     @classmethod
     def _get_environment_document_from_cache(
         cls,
         api_key: str,
-    ) -> dict[str, typing.Any]:
-        environment_document = environment_document_cache.get(api_key)
-        if not (cache_hit := environment_document is not None):
-            environment_document = cls._get_environment_document_from_db(api_key)
-            environment_document_cache.set(api_key, environment_document)
+    ) -> dict[str, typing.Any] | RenderedEnvironmentDocument:
+        if (
+            environment_document := environment_document_local_cache.get(api_key)
+        ) is not None:
+            flagsmith_environment_document_cache_queries_total.labels(
+                result=CACHE_HIT,
+            ).inc()
+            return environment_document  # type: ignore[no-any-return]
+
+        environment_document, cache_hit = get_or_set(
+            environment_document_cache,
+            api_key,
+            lambda: cls._prepare_environment_document_for_cache(
+                cls._get_environment_document_from_db(api_key),
+            ),
+            **cls._get_environment_document_cache_stale_kwargs(api_key),
+        )
+        environment_document_local_cache.set(api_key, environment_document)
 
         flagsmith_environment_document_cache_queries_total.labels(
             result=CACHE_HIT if cache_hit else CACHE_MISS,
@@ -590,6 +840,43 @@ class Environment(
 
         return environment_document  # type: ignore[no-any-return]
 
+    @classmethod
+    def refresh_environment_document_cache(cls, api_key: str) -> None:
+        """
+        Rebuild a stale environment document served from the cache.
+        """
+        environment_document = refresh(
+            environment_document_cache,
+            api_key,
+            lambda: cls._prepare_environment_document_for_cache(
+                cls._get_environment_document_from_db(api_key),
+            ),
+            settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS,
+            stale_timeout=settings.CACHE_ENVIRONMENT_DOCUMENT_STALE_SECONDS,
+        )
+        environment_document_local_cache.set(api_key, environment_document)
+
+    @staticmethod
+    def _get_environment_document_cache_stale_kwargs(
+        api_key: str,
+    ) -> dict[str, typing.Any]:
+        if not (
+            settings.CACHE_ENVIRONMENT_DOCUMENT_STALE_SECONDS > 0
+            and settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
+            == EnvironmentDocumentCacheMode.EXPIRING
+        ):
+            return {}
+
+        from environments.tasks import rebuild_environment_document_cache
+
+        return {
+            "timeout": settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS,
+            "stale_timeout": settings.CACHE_ENVIRONMENT_DOCUMENT_STALE_SECONDS,
+            "revalidate": lambda: rebuild_environment_document_cache.delay(
+                kwargs={"api_key": api_key},
+            ),
+        }
+
     @classmethod
     def _get_environment_document_from_db(
         cls,
@@ -778,3 +1065,34 @@ class EnvironmentAPIKey(LifecycleModel):  # type: ignore[misc]
             self.environment.project.enable_dynamo_db
             and environment_api_key_wrapper.is_enabled
         )
+
+
+class EdgeIdentityOverridesCount(models.Model):
+    """
+    Number of identity overrides stored in the `environments_v2` table for a
+    feature in an environment, kept up to date as overrides are written so
+    that counting them doesn't need to read every override document.
+
+    An environment without any rows has not been counted yet; see
+    `edge_api.identities.edge_identity_service.get_edge_identity_overrides_count`.
+    """
+
+    environment = models.ForeignKey(
+        Environment,
+        on_delete=models.CASCADE,
+        related_name="edge_identity_overrides_counts",
+    )
+    feature = models.ForeignKey(
+        Feature,
+        on_delete=models.CASCADE,
+        related_name="edge_identity_overrides_counts",
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["environment", "feature"],
+                name="unique_edge_identity_overrides_count",
+            ),
+        ]
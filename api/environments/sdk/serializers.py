@@ -1,6 +1,7 @@
 import typing
 from collections import defaultdict
 
+from django.conf import settings
 from rest_framework import serializers
 
 from core.constants import BOOLEAN, FLOAT, INTEGER, STRING
@@ -11,12 +12,17 @@ from environments.identities.serializers import (
 from environments.identities.traits.fields import TraitValueField
 from environments.identities.traits.models import Trait
 from environments.identities.traits.serializers import TraitSerializerBasic
+from environments.models import Environment
 from environments.sdk.services import (
+    IdentityAndTraits,
     get_identified_transient_identity_and_traits,
+    get_identities_feature_states,
+    get_persisted_identities_and_traits,
     get_persisted_identity_and_traits,
     get_transient_identity_and_traits,
 )
 from environments.sdk.types import SDKTraitData
+from features.models import FeatureState
 from features.serializers import (
     FeatureStateSerializerFull,
     SDKIdentityFeatureStateSerializer,
@@ -147,51 +153,131 @@ class IdentifyWithTraitsSerializer(
         Create the identity with the associated traits
         (optionally store traits if flag set on org)
         """
-        identifier = self.validated_data.get("identifier")
-        environment = self.context["environment"]
-        transient = self.validated_data["transient"]
-        sdk_trait_data: list[SDKTraitData] = self.validated_data.get("traits", [])
+        identity, traits = _get_identity_and_traits(
+            environment=self.context["environment"],
+            identity_data=self.validated_data,
+        )
+        all_feature_states = identity.get_all_feature_states(
+            traits=traits,
+            additional_filters=self.context.get("feature_states_additional_filters"),
+        )
+        return _identify(identity, traits, all_feature_states)
 
-        if not identifier:
-            # We have a fully transient identity that should never be persisted.
-            identity, traits = get_transient_identity_and_traits(
-                environment=environment,
-                sdk_trait_data=sdk_trait_data,
+    def validate_traits(self, traits: typing.List[dict] = None):  # type: ignore[no-untyped-def,type-arg,assignment]
+        request = self.context["request"]
+        if traits and not request.environment.trait_persistence_allowed(request):
+            return []
+        return traits
+
+
+class SDKBulkIdentifyWithTraitsSerializer(serializers.Serializer):  # type: ignore[type-arg]
+    identities = IdentifyWithTraitsSerializer(  # type: ignore[call-arg]
+        many=True,
+        allow_empty=False,
+        max_length=settings.SDK_BULK_IDENTIFY_MAX_IDENTITIES,
+    )
+
+    def validate_identities(
+        self,
+        identities: list[dict[str, typing.Any]],
+    ) -> list[dict[str, typing.Any]]:
+        identifiers = [identity.get("identifier") for identity in identities]
+        if not all(identifiers):
+            raise serializers.ValidationError(
+                "An identifier is required for each identity."
             )
+        if len(set(identifiers)) != len(identifiers):
+            raise serializers.ValidationError("Identifiers must be unique.")
+        return identities
+
+    def save(self, **kwargs: typing.Any) -> list[dict[str, typing.Any]]:
+        """
+        Create the identities with their associated traits, writing them in
+        bulk, and evaluate their flags against a single snapshot of the
+        environment's flags.
+        """
+        environment = self.context["environment"]
+        identities_data = self.validated_data["identities"]
 
-        elif transient:
-            # Don't persist incoming data but load presently stored
-            # overrides and traits, if any.
-            identity, traits = get_identified_transient_identity_and_traits(
+        identities_and_traits: dict[str, IdentityAndTraits] = {
+            identity_data["identifier"]: _get_identity_and_traits(
                 environment=environment,
-                identifier=identifier,
-                sdk_trait_data=sdk_trait_data,
+                identity_data=identity_data,
             )
+            for identity_data in identities_data
+            if identity_data["transient"]
+        }
 
-        else:
-            # Persist the identity in accordance with individual trait transiency
-            # and persistence settings outside of request context.
-            identity, traits = get_persisted_identity_and_traits(
+        if sdk_trait_data_by_identifier := {
+            identity_data["identifier"]: identity_data.get("traits", [])
+            for identity_data in identities_data
+            if not identity_data["transient"]
+        }:
+            for identity, traits in get_persisted_identities_and_traits(
                 environment=environment,
-                identifier=identifier,
-                sdk_trait_data=sdk_trait_data,
+                sdk_trait_data_by_identifier=sdk_trait_data_by_identifier,
+            ):
+                identities_and_traits[identity.identifier] = (identity, traits)
+
+        ordered_identities_and_traits = [
+            identities_and_traits[identity_data["identifier"]]
+            for identity_data in identities_data
+        ]
+        all_feature_states = get_identities_feature_states(
+            environment=environment,
+            identities_and_traits=ordered_identities_and_traits,
+            additional_filters=self.context.get("feature_states_additional_filters"),
+        )
+
+        return [
+            _identify(identity, traits, feature_states)
+            for (identity, traits), feature_states in zip(
+                ordered_identities_and_traits, all_feature_states
             )
+        ]
 
-        all_feature_states = identity.get_all_feature_states(
-            traits=traits,
-            additional_filters=self.context.get("feature_states_additional_filters"),
+
+def _get_identity_and_traits(
+    environment: Environment,
+    identity_data: dict[str, typing.Any],
+) -> IdentityAndTraits:
+    identifier = identity_data.get("identifier")
+    sdk_trait_data: list[SDKTraitData] = identity_data.get("traits", [])
+
+    if not identifier:
+        # We have a fully transient identity that should never be persisted.
+        return get_transient_identity_and_traits(
+            environment=environment,
+            sdk_trait_data=sdk_trait_data,
         )
-        identify_integrations(identity, all_feature_states, traits)  # type: ignore[no-untyped-call]
 
-        return {
-            "identity": identity,
-            "identifier": identity.identifier,
-            "traits": traits,
-            "flags": all_feature_states,
-        }
+    if identity_data["transient"]:
+        # Don't persist incoming data but load presently stored
+        # overrides and traits, if any.
+        return get_identified_transient_identity_and_traits(
+            environment=environment,
+            identifier=identifier,
+            sdk_trait_data=sdk_trait_data,
+        )
 
-    def validate_traits(self, traits: typing.List[dict] = None):  # type: ignore[no-untyped-def,type-arg,assignment]
-        request = self.context["request"]
-        if traits and not request.environment.trait_persistence_allowed(request):
-            return []
-        return traits
+    # Persist the identity in accordance with individual trait transiency
+    # and persistence settings outside of request context.
+    return get_persisted_identity_and_traits(
+        environment=environment,
+        identifier=identifier,
+        sdk_trait_data=sdk_trait_data,
+    )
+
+
+def _identify(
+    identity: Identity,
+    traits: list[Trait],
+    feature_states: list[FeatureState],
+) -> dict[str, typing.Any]:
+    identify_integrations(identity, feature_states, traits)  # type: ignore[no-untyped-call]
+    return {
+        "identity": identity,
+        "identifier": identity.identifier,
+        "traits": traits,
+        "flags": feature_states,
+    }
@@ -4,13 +4,20 @@ from itertools import chain
 from operator import itemgetter
 from typing import TypeAlias
 
+from django.db.models import Q
 from django.utils import timezone
 
+from environments.identities.flags_snapshot import (
+    get_feature_state_predicate,
+    get_identities_flags_from_snapshot,
+    is_environment_flags_snapshot_enabled,
+)
 from environments.identities.models import Identity
 from environments.identities.services import replace_identity_environment
 from environments.identities.traits.models import Trait
 from environments.models import Environment
 from environments.sdk.types import SDKTraitData
+from features.models import FeatureState
 
 IdentityAndTraits: TypeAlias = tuple[Identity, list[Trait]]
 
@@ -83,15 +90,76 @@ def get_persisted_identity_and_traits(
         )
     if persist_trait_data:
         return identity, identity.update_traits(sdk_trait_data)
-    return identity, list(
-        {
-            trait.trait_key: trait
-            for trait in chain(
-                identity.identity_traits.all(),
-                identity.generate_traits(sdk_trait_data, persist=False),
-            )
-        }.values()
+    return identity, _get_unpersisted_traits(identity, sdk_trait_data)
+
+
+def get_persisted_identities_and_traits(
+    environment: Environment,
+    sdk_trait_data_by_identifier: dict[str, list[SDKTraitData]],
+) -> list[IdentityAndTraits]:
+    """
+    Bulk counterpart of `get_persisted_identity_and_traits`, persisting any
+    number of identities and their traits with a fixed number of queries.
+    """
+    identities = Identity.objects.get_or_create_many_for_sdk(
+        identifiers=sdk_trait_data_by_identifier,
+        environment=environment,
     )
+    if environment.project.organisation.persist_trait_data:
+        trait_changes = [
+            identity.get_trait_changes(
+                sdk_trait_data_by_identifier[identity.identifier]
+            )
+            for identity in identities
+        ]
+        Identity.apply_trait_changes(trait_changes)
+        return [(changes.identity, changes.traits) for changes in trait_changes]
+    return [
+        (
+            identity,
+            _get_unpersisted_traits(
+                identity, sdk_trait_data_by_identifier[identity.identifier]
+            ),
+        )
+        for identity in identities
+    ]
+
+
+def get_identities_feature_states(
+    environment: Environment,
+    identities_and_traits: list[IdentityAndTraits],
+    additional_filters: Q | None = None,
+) -> list[list[FeatureState]]:
+    """
+    Get the flags for a number of identities in the environment, evaluating
+    all of them against a single snapshot of the environment's flags when
+    the snapshot is enabled.
+    """
+    if (
+        not is_environment_flags_snapshot_enabled()
+        or (predicate := get_feature_state_predicate(additional_filters)) is None
+    ):
+        return [
+            identity.get_all_feature_states(
+                traits=traits,
+                additional_filters=additional_filters,
+            )
+            for identity, traits in identities_and_traits
+        ]
+
+    hide_disabled_flags = environment.get_hide_disabled_flags() is True
+    return [
+        [
+            feature_state
+            for feature_state in identity_flags.values()
+            if feature_state.enabled or not hide_disabled_flags
+        ]
+        for identity_flags in get_identities_flags_from_snapshot(
+            environment=environment,
+            identities_and_traits=identities_and_traits,
+            predicate=predicate,
+        )
+    ]
 
 
 def get_transient_identifier(sdk_trait_data: list[SDKTraitData]) -> str:
@@ -107,6 +175,21 @@ def get_transient_identifier(sdk_trait_data: list[SDKTraitData]) -> str:
     return uuid.uuid4().hex
 
 
+def _get_unpersisted_traits(
+    identity: Identity,
+    sdk_trait_data: list[SDKTraitData],
+) -> list[Trait]:
+    return list(
+        {
+            trait.trait_key: trait
+            for trait in chain(
+                identity.identity_traits.all(),
+                identity.generate_traits(sdk_trait_data, persist=False),
+            )
+        }.values()
+    )
+
+
 def _get_transient_identity(
     environment: Environment,
     identifier: str,
@@ -1,7 +1,11 @@
 from datetime import datetime
 from typing import Optional
 
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.views.decorators.http import condition
 from drf_spectacular.utils import extend_schema
 from flagsmith_schemas.api import V1EnvironmentDocumentResponse
@@ -22,6 +26,26 @@ def get_last_modified(request: Request) -> datetime | None:
     return updated_at
 
 
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an `Accept-Encoding` header value accepts gzip, i.e. lists it,
+    or `*`, with a non-zero q-value.
+    """
+    qvalues: dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *params = (part.strip() for part in coding.split(";"))
+        qvalue = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[name.lower()] = qvalue
+    return qvalues.get("gzip", qvalues.get("*", 0.0)) > 0
+
+
 @extend_schema(tags=["sdk"])
 class SDKEnvironmentAPIView(APIView):
     permission_classes = (EnvironmentKeyPermissions,)
@@ -35,16 +59,53 @@ class SDKEnvironmentAPIView(APIView):
         operation_id="sdk_v1_environment_document",
     )
     @method_decorator(condition(last_modified_func=get_last_modified))
-    def get(self, request: Request) -> Response:
+    def get(self, request: Request) -> HttpResponseBase:
         """
         Retrieve the environment document.
         Used by SDKs in local evaluation mode, and Edge Proxy.
         """
+        updated_at = self.request.environment.updated_at
+        if settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED:
+            return self._get_prerendered_response(
+                request,
+                headers={FLAGSMITH_UPDATED_AT_HEADER: str(updated_at.timestamp())},
+            )
+
         environment_document = Environment.get_environment_document(
             request.environment.api_key,
         )
-        updated_at = self.request.environment.updated_at
         return Response(
             environment_document,
             headers={FLAGSMITH_UPDATED_AT_HEADER: updated_at.timestamp()},
         )
+
+    def _get_prerendered_response(
+        self,
+        request: Request,
+        headers: dict[str, str],
+    ) -> HttpResponseBase:
+        """
+        Serve the pre-rendered environment document bytes, skipping
+        serialisation. Gzip is served to clients that accept it, and
+        requests carrying a matching `If-None-Match` get a 304.
+        """
+        rendered_document = Environment.get_rendered_environment_document(
+            request.environment.api_key,
+        )
+        if accepts_gzip(request.headers.get("Accept-Encoding", "")):
+            content = rendered_document.gzip_content
+            etag = quote_etag(f"{rendered_document.etag}-gzip")
+            headers = {**headers, "Content-Encoding": "gzip"}
+        else:
+            content = rendered_document.content
+            etag = quote_etag(rendered_document.etag)
+
+        response = HttpResponse(
+            content,
+            content_type="application/json",
+            headers={**headers, "ETag": etag},
+        )
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return (
+            get_conditional_response(request, etag=etag, response=response) or response
+        )
@@ -1,49 +1,167 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
 from django.db.models import Prefetch, Q
 from django.utils import timezone
 from task_processor.decorators import (
     register_task_handler,
 )
 from task_processor.models import TaskPriority
+from task_processor.task_run_method import TaskRunMethod
 
 from audit.models import AuditLog
+from audit.related_object_type import RelatedObjectType
+from audit.services import get_audited_instance_from_audit_log_record
 from environments.dynamodb import DynamoIdentityWrapper
 from environments.models import (
     Environment,
     environment_v2_wrapper,
     environment_wrapper,
 )
+from features.models import FeatureState, FeatureStateValue
 from features.multivariate.models import MultivariateFeatureStateValue
 from features.versioning.models import EnvironmentFeatureVersion
 from features.versioning.versioning_service import (
     get_environment_flags_list,
 )
+from projects.services import invalidate_project_segment_contexts_cache
 from sse import (  # type: ignore[attr-defined]
     send_environment_update_message_for_environment,
     send_environment_update_message_for_project,
 )
 
+environment_update_debounce_cache = caches[
+    settings.ENVIRONMENT_UPDATE_DEBOUNCE_CACHE_NAME
+]
+
 
 @register_task_handler(priority=TaskPriority.HIGH)
 def rebuild_environment_document(environment_id: int) -> None:
     Environment.write_environment_documents(environment_id=environment_id)
 
 
+@register_task_handler(priority=TaskPriority.HIGH)
+def rebuild_environment_document_cache(api_key: str) -> None:
+    Environment.refresh_environment_document_cache(api_key)
+
+
+def schedule_process_environment_update(audit_log: AuditLog) -> None:
+    """
+    Schedule processing of the environment update described by the given
+    audit log.
+
+    When ENVIRONMENT_UPDATE_DEBOUNCE_SECONDS is set, the task is delayed by
+    that many seconds, and any further updates to the same environment (or
+    project) in the meantime are picked up by the already scheduled task.
+    """
+    if not _is_environment_update_debounce_enabled():
+        process_environment_update.delay(args=(audit_log.id,))
+        return
+
+    debounce_seconds = settings.ENVIRONMENT_UPDATE_DEBOUNCE_SECONDS
+    if not environment_update_debounce_cache.add(
+        _get_environment_update_debounce_key(audit_log),
+        audit_log.id,
+        # Should the scheduled task be lost, or run late, let a new one
+        # be scheduled rather than dropping updates.
+        timeout=debounce_seconds * 2,
+    ):
+        return
+
+    process_environment_update.delay(
+        delay_until=timezone.now() + timedelta(seconds=debounce_seconds),
+        args=(audit_log.id,),
+    )
+
+
 @register_task_handler(priority=TaskPriority.HIGHEST)
 def process_environment_update(audit_log_id: int):  # type: ignore[no-untyped-def]
     audit_log = AuditLog.objects.get(id=audit_log_id)
 
-    # Send environment document to dynamodb
-    Environment.write_environment_documents(
-        environment_id=audit_log.environment_id, project_id=audit_log.project_id
-    )
+    audit_logs = [audit_log]
+    if _is_environment_update_debounce_enabled():
+        # Updates made from here on schedule a new task.
+        environment_update_debounce_cache.delete(
+            _get_environment_update_debounce_key(audit_log)
+        )
+        # Audit logs created before this one may only have been scheduled
+        # once the debounce marker was set, and so be left to this task:
+        # coalesce from a debounce interval before it, rather than from its id.
+        audit_logs = [
+            coalesced_audit_log
+            for coalesced_audit_log in AuditLog.objects.filter(
+                created_date__gte=audit_log.created_date
+                - timedelta(seconds=settings.ENVIRONMENT_UPDATE_DEBOUNCE_SECONDS),
+                project_id=audit_log.project_id,
+                environment_id=audit_log.environment_id,
+            )
+            if coalesced_audit_log.environment_document_updated
+        ]
+
+    # Send environment document to dynamodb, patching the cached document
+    # in place when only environment default flags changed
+    if not (
+        (feature_ids := _get_environment_default_feature_ids(audit_logs))
+        and Environment.patch_environment_document(
+            audit_log.environment_id, feature_ids
+        )
+    ):
+        Environment.write_environment_documents(
+            environment_id=audit_log.environment_id, project_id=audit_log.project_id
+        )
 
     # send environment update message
     if audit_log.environment_id:
         send_environment_update_message_for_environment(audit_log.environment)
     else:
+        # Project wide updates include changes to segments
+        invalidate_project_segment_contexts_cache(audit_log.project_id)
         send_environment_update_message_for_project(audit_log.project)
 
 
+def _is_environment_update_debounce_enabled() -> bool:
+    return (
+        settings.ENVIRONMENT_UPDATE_DEBOUNCE_SECONDS > 0
+        and settings.TASK_RUN_METHOD == TaskRunMethod.TASK_PROCESSOR
+    )
+
+
+def _get_environment_update_debounce_key(audit_log: AuditLog) -> str:
+    if audit_log.environment_id:
+        return f"environment:{audit_log.environment_id}"
+    return f"project:{audit_log.project_id}"
+
+
+def _get_environment_default_feature_ids(audit_logs: list[AuditLog]) -> set[int] | None:
+    feature_ids = set()
+    for audit_log in audit_logs:
+        if (feature_id := _get_environment_default_feature_id(audit_log)) is None:
+            return None
+        feature_ids.add(feature_id)
+    return feature_ids
+
+
+def _get_environment_default_feature_id(audit_log: AuditLog) -> int | None:
+    if not (
+        audit_log.environment_id
+        and audit_log.related_object_type == RelatedObjectType.FEATURE_STATE.name
+    ):
+        return None
+
+    audited_instance = get_audited_instance_from_audit_log_record(audit_log)
+    if isinstance(audited_instance, (FeatureStateValue, MultivariateFeatureStateValue)):
+        feature_state = audited_instance.feature_state
+    elif isinstance(audited_instance, FeatureState):
+        feature_state = audited_instance
+    else:
+        return None
+
+    if feature_state.feature_segment_id or feature_state.identity_id:
+        return None
+    return feature_state.feature_id
+
+
 @register_task_handler()
 def delete_environment_from_dynamo(api_key: str, environment_id: str):  # type: ignore[no-untyped-def]
     # Delete environment
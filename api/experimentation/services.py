@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import hashlib
 import json
+import threading
 import time
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import replace
 from functools import lru_cache
 
@@ -18,6 +20,7 @@ from django.db.models import Q
 from django.utils import timezone
 from flag_engine.segments.constants import PERCENTAGE_SPLIT
 from rest_framework.exceptions import ValidationError
+from structlog.typing import FilteringBoundLogger
 
 from audit.models import AuditLog
 from audit.related_object_type import RelatedObjectType
@@ -915,11 +918,97 @@ def mark_warehouse_delivery_succeeded(connection: WarehouseConnection) -> None:
     connection.save(update_fields=["status", "status_detail"])
 
 
+class _ObjectOutcome(typing.NamedTuple):
+    s3_key: str
+    rows_count: int | None = None
+    error: warehouse_delivery_service.ObjectRejectedError | None = None
+
+
+def _deliver_pending_batch(
+    client: ClickHouseHTTPClient,
+    *,
+    bucket_name: str,
+    s3_keys: list[str],
+) -> list[_ObjectOutcome]:
+    """Deliver a batch of pending objects, compacted into one insert when
+    there are several, and return each object's outcome.
+
+    A rejected compacted insert is retried one object at a time, so a single
+    bad object does not hold back the others in its batch.
+    """
+    if len(s3_keys) > 1:
+        try:
+            rows_count = warehouse_delivery_service.deliver_objects(
+                client,
+                bucket_name,
+                s3_keys,
+            )
+        except warehouse_delivery_service.ObjectRejectedError:
+            pass
+        else:
+            # Rows cannot be attributed to the objects of a single insert, so
+            # the batch's count is recorded against its first object.
+            return [
+                _ObjectOutcome(s3_keys[0], rows_count=rows_count),
+                *(_ObjectOutcome(s3_key) for s3_key in s3_keys[1:]),
+            ]
+
+    outcomes = []
+    for s3_key in s3_keys:
+        try:
+            rows_count = warehouse_delivery_service.deliver_object(
+                client,
+                bucket_name,
+                s3_key,
+            )
+        except warehouse_delivery_service.ObjectRejectedError as exc:
+            # This object's contents are the problem; the ones behind it are
+            # still deliverable.
+            outcomes.append(_ObjectOutcome(s3_key, error=exc))
+        else:
+            outcomes.append(_ObjectOutcome(s3_key, rows_count=rows_count))
+    return outcomes
+
+
+def _complete_pending_object(
+    outcome: _ObjectOutcome,
+    *,
+    connection: WarehouseConnection,
+    log: FilteringBoundLogger,
+) -> tuple[WarehouseDeliveryLog, str]:
+    """Account for a pending object's delivery outcome, and return its
+    unsaved delivery log along with the prefix to move the object to."""
+    if outcome.error:
+        flagsmith_experimentation_warehouse_delivery_objects_total.labels(
+            result="rejected"
+        ).inc()
+        log.error(
+            "delivery.object_rejected",
+            s3__key=outcome.s3_key,
+            exc_info=outcome.error,
+        )
+        return WarehouseDeliveryLog(
+            connection=connection,
+            s3_key=outcome.s3_key,
+            outcome=WarehouseDeliveryOutcome.REJECTED,
+            error=str(outcome.error),
+        ), warehouse_delivery_service.FAILED_PREFIX
+    flagsmith_experimentation_warehouse_delivery_objects_total.labels(
+        result="delivered"
+    ).inc()
+    return WarehouseDeliveryLog(
+        connection=connection,
+        s3_key=outcome.s3_key,
+        outcome=WarehouseDeliveryOutcome.DELIVERED,
+        rows_count=outcome.rows_count,
+    ), warehouse_delivery_service.ARCHIVE_PREFIX
+
+
 def _deliver_pending_objects(
     client: ClickHouseHTTPClient,
     *,
     bucket_name: str,
-    pending: list[str],
+    pending: list[list[str]],
     connection: WarehouseConnection,
 ) -> tuple[int, int, int]:
     log = logger.bind(
@@ -932,60 +1021,126 @@ def _deliver_pending_objects(
     # on the next tick.
     deadline = time.monotonic() + DELIVERY_TIME_BUDGET_SECONDS
     delivered_count = rejected_count = rows_count = 0
-    for index, s3_key in enumerate(pending):
+    for index, batch in enumerate(pending):
         if time.monotonic() > deadline:
             log.info(
                 "delivery.budget_exhausted",
-                objects__remaining_count=len(pending) - index,
+                objects__remaining_count=sum(map(len, pending[index:])),
             )
             break
-        try:
-            object_rows_count = warehouse_delivery_service.deliver_object(
-                client,
-                bucket_name,
-                s3_key,
+        for outcome in _deliver_pending_batch(
+            client,
+            bucket_name=bucket_name,
+            s3_keys=batch,
+        ):
+            delivery_log, to_prefix = _complete_pending_object(
+                outcome, connection=connection, log=log
             )
-        except warehouse_delivery_service.ObjectRejectedError as exc:
-            # This object's contents are the problem; the ones behind it are
-            # still deliverable.
             warehouse_delivery_service.move_object(
                 bucket_name,
-                s3_key,
-                to_prefix=warehouse_delivery_service.FAILED_PREFIX,
-            )
-            WarehouseDeliveryLog.objects.create(
-                connection=connection,
-                s3_key=s3_key,
-                outcome=WarehouseDeliveryOutcome.REJECTED,
-                error=str(exc),
-            )
-            rejected_count += 1
-            flagsmith_experimentation_warehouse_delivery_objects_total.labels(
-                result="rejected"
-            ).inc()
-            log.error(
-                "delivery.object_rejected",
-                s3__key=s3_key,
-                exc_info=True,
+                outcome.s3_key,
+                to_prefix=to_prefix,
             )
-            continue
-        warehouse_delivery_service.move_object(
+            delivery_log.save()
+            if outcome.error:
+                rejected_count += 1
+            else:
+                delivered_count += 1
+                rows_count += outcome.rows_count or 0
+    return delivered_count, rejected_count, rows_count
+
+
+def _deliver_pending_objects_concurrently(
+    connection: WarehouseConnection,
+    *,
+    bucket_name: str,
+    pending: list[list[str]],
+    max_workers: int,
+) -> tuple[int, int, int]:
+    """Deliver pending objects as `_deliver_pending_objects` does, with up to
+    `max_workers` batches in flight at once.
+
+    Each worker streams batches through its own client. Delivered and
+    rejected objects are copied out of `events/` as they complete, then
+    deleted in batches and logged in bulk once every worker is done. The
+    first warehouse error stops every worker and is raised once the objects
+    completed so far are accounted for.
+    """
+    log = logger.bind(
+        connection__id=connection.id,
+        environment__id=connection.environment_id,
+        organisation__id=connection.environment.project.organisation_id,
+    )
+    deadline = time.monotonic() + DELIVERY_TIME_BUDGET_SECONDS
+    pending_batches = iter(pending)
+    lock = threading.Lock()
+    stopped = threading.Event()
+    delivery_logs: list[WarehouseDeliveryLog] = []
+
+    def _next_batch() -> list[str] | None:
+        with lock:
+            if stopped.is_set() or time.monotonic() > deadline:
+                return None
+            return next(pending_batches, None)
+
+    def _deliver_batches() -> None:
+        try:
+            with warehouse_delivery_service.delivery_client(connection) as client:
+                while (batch := _next_batch()) is not None:
+                    delivery_logs.extend(
+                        _complete_object(outcome)
+                        for outcome in _deliver_pending_batch(
+                            client,
+                            bucket_name=bucket_name,
+                            s3_keys=batch,
+                        )
+                    )
+        except BaseException:
+            stopped.set()
+            raise
+
+    def _complete_object(outcome: _ObjectOutcome) -> WarehouseDeliveryLog:
+        delivery_log, to_prefix = _complete_pending_object(
+            outcome, connection=connection, log=log
+        )
+        warehouse_delivery_service.copy_object(
             bucket_name,
-            s3_key,
-            to_prefix=warehouse_delivery_service.ARCHIVE_PREFIX,
+            outcome.s3_key,
+            to_prefix=to_prefix,
         )
-        WarehouseDeliveryLog.objects.create(
-            connection=connection,
-            s3_key=s3_key,
-            outcome=WarehouseDeliveryOutcome.DELIVERED,
-            rows_count=object_rows_count,
+        return delivery_log
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_deliver_batches)
+                for _ in range(min(max_workers, len(pending)))
+            ]
+        for future in futures:
+            future.result()
+    finally:
+        warehouse_delivery_service.delete_objects(
+            bucket_name,
+            [delivery_log.s3_key for delivery_log in delivery_logs],
+        )
+        WarehouseDeliveryLog.objects.bulk_create(delivery_logs)
+
+    if remaining_count := sum(map(len, pending_batches)):
+        log.info(
+            "delivery.budget_exhausted",
+            objects__remaining_count=remaining_count,
         )
-        rows_count += object_rows_count
-        delivered_count += 1
-        flagsmith_experimentation_warehouse_delivery_objects_total.labels(
-            result="delivered"
-        ).inc()
-    return delivered_count, rejected_count, rows_count
+
+    delivered_logs = [
+        delivery_log
+        for delivery_log in delivery_logs
+        if delivery_log.outcome == WarehouseDeliveryOutcome.DELIVERED
+    ]
+    return (
+        len(delivered_logs),
+        len(delivery_logs) - len(delivered_logs),
+        sum(delivery_log.rows_count or 0 for delivery_log in delivered_logs),
+    )
 
 
 def deliver_warehouse_events(
@@ -1000,21 +1155,34 @@ def deliver_warehouse_events(
         environment__id=connection.environment_id,
         organisation__id=connection.environment.project.organisation_id,
     )
-    pending = warehouse_delivery_service.list_pending_objects(
-        bucket_name,
-        environment_key=connection.environment.api_key,
+    pending = warehouse_delivery_service.compact_objects(
+        warehouse_delivery_service.list_pending_object_sizes(
+            bucket_name,
+            environment_key=connection.environment.api_key,
+        ),
+        max_bytes=settings.WAREHOUSE_DELIVERY_COMPACTION_MAX_BYTES,
     )
     if not pending:
         return
 
     try:
-        with warehouse_delivery_service.delivery_client(connection) as client:
-            delivered_count, rejected_count, rows_count = _deliver_pending_objects(
-                client,
-                bucket_name=bucket_name,
-                pending=pending,
-                connection=connection,
+        if settings.WAREHOUSE_DELIVERY_MAX_WORKERS > 1:
+            delivered_count, rejected_count, rows_count = (
+                _deliver_pending_objects_concurrently(
+                    connection,
+                    bucket_name=bucket_name,
+                    pending=pending,
+                    max_workers=settings.WAREHOUSE_DELIVERY_MAX_WORKERS,
+                )
             )
+        else:
+            with warehouse_delivery_service.delivery_client(connection) as client:
+                delivered_count, rejected_count, rows_count = _deliver_pending_objects(
+                    client,
+                    bucket_name=bucket_name,
+                    pending=pending,
+                    connection=connection,
+                )
     except (warehouse_delivery_service.DeliveryConfigError, ClickHouseError) as exc:
         # The warehouse itself is unusable; deliver nothing, leave every
         # remaining object in place for the next run, and surface the
@@ -1,3 +1,4 @@
+import gzip
 import typing
 from contextlib import contextmanager
 from functools import lru_cache
@@ -14,9 +15,10 @@ from urllib3 import PoolManager
 from core.network import is_internal_address
 from experimentation.ingestion_infra_service import AWS_REGION
 from experimentation.types import ClickHouseConfig, ClickHouseCredentials
+from util.util import batched
 
 if typing.TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Generator, Iterator, Mapping, Sequence
     from typing import Any
 
     from clickhouse_connect.driver.client import Client
@@ -37,6 +39,13 @@ FAILED_PREFIX = "failed/"
 CONNECT_TIMEOUT_SECONDS = 10
 INSERT_TIMEOUT_SECONDS = 300
 
+# The most keys S3 accepts in one DeleteObjects request.
+DELETE_OBJECTS_BATCH_SIZE = 1000
+
+# Separates the records of compacted objects, in case an object's last record
+# is not newline-terminated. Blank lines are skipped by JSONEachRow.
+_RECORD_SEPARATOR_MEMBER = gzip.compress(b"\n")
+
 
 class _NoRedirectPoolManager(PoolManager):
     """The internal-address guard validates the host we dial; following a
@@ -139,12 +148,47 @@ def list_pending_objects(bucket_name: str, environment_key: str) -> list[str]:
     prefix is outstanding. The partition path is zero-padded, so the keys S3
     returns in lexicographic order are also in chronological order.
     """
+    return list(list_pending_object_sizes(bucket_name, environment_key))
+
+
+def list_pending_object_sizes(
+    bucket_name: str,
+    environment_key: str,
+) -> dict[str, int]:
+    """Return the sizes, in bytes, of an environment's undelivered event
+    objects, keyed by object key, oldest first."""
     paginator = _get_s3_client().get_paginator("list_objects_v2")
     pages = paginator.paginate(
         Bucket=bucket_name,
         Prefix=get_pending_prefix(environment_key),
     )
-    return [obj["Key"] for page in pages for obj in page.get("Contents", [])]
+    return {
+        obj["Key"]: obj["Size"] for page in pages for obj in page.get("Contents", [])
+    }
+
+
+def compact_objects(
+    object_sizes: "Mapping[str, int]",
+    *,
+    max_bytes: int,
+) -> list[list[str]]:
+    """Group consecutive objects into batches of at most `max_bytes`, each
+    batch to be delivered with a single insert. Order is preserved, and an
+    object larger than `max_bytes` is a batch of its own. A `max_bytes` of
+    0 or less disables compaction."""
+    if max_bytes <= 0:
+        return [[s3_key] for s3_key in object_sizes]
+
+    batches: list[list[str]] = []
+    batch_bytes = 0
+    for s3_key, size in object_sizes.items():
+        if batches and batch_bytes + size <= max_bytes:
+            batches[-1].append(s3_key)
+            batch_bytes += size
+        else:
+            batches.append([s3_key])
+            batch_bytes = size
+    return batches
 
 
 def move_object(bucket_name: str, s3_key: str, *, to_prefix: str) -> str:
@@ -155,17 +199,35 @@ def move_object(bucket_name: str, s3_key: str, *, to_prefix: str) -> str:
     place, so it is delivered again on the next run. Delivery is therefore
     at-least-once, as it already is upstream of here.
     """
+    destination_key = copy_object(bucket_name, s3_key, to_prefix=to_prefix)
+    _get_s3_client().delete_object(Bucket=bucket_name, Key=s3_key)
+    return destination_key
+
+
+def copy_object(bucket_name: str, s3_key: str, *, to_prefix: str) -> str:
+    """Copy an object out of `events/` to `to_prefix`, preserving its
+    partition path, and return its new key. The object stays pending until
+    it is deleted, e.g. by `delete_objects`."""
     destination_key = f"{to_prefix}{s3_key.removeprefix(PENDING_PREFIX)}"
-    s3 = _get_s3_client()
-    s3.copy_object(
+    _get_s3_client().copy_object(
         Bucket=bucket_name,
         Key=destination_key,
         CopySource={"Bucket": bucket_name, "Key": s3_key},
     )
-    s3.delete_object(Bucket=bucket_name, Key=s3_key)
     return destination_key
 
 
+def delete_objects(bucket_name: str, s3_keys: "Sequence[str]") -> None:
+    """Delete objects with as few requests as S3 allows. An object that fails
+    to delete stays pending, and is delivered again on the next run."""
+    s3 = _get_s3_client()
+    for batch in batched(s3_keys, DELETE_OBJECTS_BATCH_SIZE):
+        s3.delete_objects(
+            Bucket=bucket_name,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+
+
 @contextmanager
 def delivery_client(
     connection: "WarehouseConnection",
@@ -250,3 +312,48 @@ def deliver_object(client: "Client", bucket_name: str, s3_key: str) -> int:
         # Releases the pooled S3 connection if the insert failed mid-read.
         body.close()
     return summary.written_rows
+
+
+def deliver_objects(
+    client: "Client", bucket_name: str, s3_keys: "Sequence[str]"
+) -> int:
+    """Stream several gzipped events objects into the customer's warehouse as
+    one insert, and return the number of rows written.
+
+    Gzip members can be concatenated as they are, so the objects are neither
+    decompressed nor recompressed here. Raises ``ObjectRejectedError`` if any
+    of the objects is rejected, in which case rows from the others may already
+    have been written: callers deliver them one by one to find the culprit,
+    which delivery being at-least-once already allows for.
+    """
+    body = _iter_objects_body(bucket_name, s3_keys)
+    try:
+        summary = client.raw_insert(
+            EVENTS_TABLE_NAME,
+            insert_block=body,
+            fmt=EVENTS_FORMAT,
+            compression=EVENTS_COMPRESSION,
+        )
+    except DatabaseError as exc:
+        if exc.code in OBJECT_LEVEL_ERROR_CODES:
+            raise ObjectRejectedError(str(exc)) from exc
+        raise
+    finally:
+        body.close()
+    return summary.written_rows
+
+
+def _iter_objects_body(
+    bucket_name: str,
+    s3_keys: "Sequence[str]",
+) -> "Generator[bytes, None, None]":
+    s3 = _get_s3_client()
+    for index, s3_key in enumerate(s3_keys):
+        if index:
+            yield _RECORD_SEPARATOR_MEMBER
+        # Opened one at a time, so a batch holds a single S3 connection.
+        body = s3.get_object(Bucket=bucket_name, Key=s3_key)["Body"]
+        try:
+            yield from body.iter_chunks()
+        finally:
+            body.close()
@@ -109,6 +109,7 @@ def get_edge_overrides_data(
         get_overrides_data_future = executor.submit(
             get_edge_identity_override_keys,
             environment_id=environment.id,
+            feature_ids=feature_ids,
         )
         flags_list = get_environment_flags_list(
             environment,
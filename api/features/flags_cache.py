@@ -0,0 +1,100 @@
+import typing
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from core.request_origin import RequestOrigin
+from core.single_flight import get_or_set, refresh
+from features.serializers import SDKFeatureStateSerializer
+from features.versioning.versioning_service import get_environment_flags_list
+
+if typing.TYPE_CHECKING:
+    from environments.models import Environment
+
+flags_cache = caches[settings.FLAGS_CACHE_LOCATION]
+
+
+def get_environment_flags_filters(
+    environment: "Environment",
+    request_origin: RequestOrigin,
+) -> Q:
+    """
+    Get the filters selecting the environment default flags served to the SDKs.
+    """
+    filters = Q(feature_segment=None, identity=None)
+
+    if environment.get_hide_disabled_flags() is True:
+        return filters & Q(enabled=True)
+
+    if request_origin is RequestOrigin.CLIENT:
+        return filters & Q(feature__is_server_key_only=False)
+
+    return filters
+
+
+def get_environment_flags_data(
+    environment: "Environment",
+    request_origin: RequestOrigin,
+    from_replica: bool = False,
+) -> list[typing.Any]:
+    return SDKFeatureStateSerializer(  # type: ignore[return-value]
+        get_environment_flags_list(
+            environment=environment,
+            additional_filters=get_environment_flags_filters(
+                environment, request_origin
+            ),
+            from_replica=from_replica,
+        ),
+        many=True,
+        context={"environment": environment},
+    ).data
+
+
+def get_cached_environment_flags_data(
+    environment: "Environment",
+    request_origin: RequestOrigin,
+    from_replica: bool = False,
+) -> list[typing.Any]:
+    """
+    Get the environment flags from the flags cache, serving stale flags while
+    they're rebuilt in a background thread if `CACHE_FLAGS_STALE_SECONDS` is set.
+    """
+    from features.tasks import rebuild_environment_flags_cache
+
+    data: list[typing.Any]
+    data, _ = get_or_set(
+        flags_cache,
+        _get_cache_key(environment, request_origin),
+        lambda: get_environment_flags_data(environment, request_origin, from_replica),
+        timeout=settings.CACHE_FLAGS_SECONDS,
+        stale_timeout=settings.CACHE_FLAGS_STALE_SECONDS,
+        # The flags cache is local to the process, so it has to be rebuilt here.
+        revalidate=lambda: rebuild_environment_flags_cache.run_in_thread(
+            kwargs={
+                "environment_api_key": environment.api_key,
+                "request_origin": request_origin.value,
+            },
+        ),
+    )
+    return data
+
+
+def refresh_environment_flags_cache(
+    environment: "Environment",
+    request_origin: RequestOrigin,
+) -> None:
+    refresh(
+        flags_cache,
+        _get_cache_key(environment, request_origin),
+        lambda: get_environment_flags_data(
+            environment, request_origin, from_replica=True
+        ),
+        timeout=settings.CACHE_FLAGS_SECONDS,
+        stale_timeout=settings.CACHE_FLAGS_STALE_SECONDS,
+    )
+
+
+def _get_cache_key(environment: "Environment", request_origin: RequestOrigin) -> str:
+    # Include request origin in cache key to isolate client vs server requests
+    return f"{environment.api_key}:{request_origin.value}"
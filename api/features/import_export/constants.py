@@ -8,6 +8,10 @@ FEATURE_IMPORT_STRATEGIES = (
 MAX_FEATURE_EXPORT_SIZE = 1000_000
 MAX_FEATURE_IMPORT_SIZE = MAX_FEATURE_EXPORT_SIZE
 
+# Features exported or imported per batch, bounding the rows held in memory.
+FEATURE_EXPORT_BATCH_SIZE = 500
+FEATURE_IMPORT_BATCH_SIZE = 500
+
 
 SUCCESS = "SUCCESS"
 PROCESSING = "PROCESSING"
@@ -1,6 +1,7 @@
+import io
 import json
 from datetime import timedelta
-from typing import Optional
+from typing import Any, Iterator, Optional
 
 from django.conf import settings
 from django.db.models import Q
@@ -10,8 +11,11 @@ from task_processor.decorators import (
     register_task_handler,
 )
 
+from environments.models import Environment
 from features.import_export.constants import (
     FAILED,
+    FEATURE_EXPORT_BATCH_SIZE,
+    FEATURE_IMPORT_BATCH_SIZE,
     PROCESSING,
     SKIP,
     SUCCESS,
@@ -26,6 +30,8 @@ from features.import_export.services import overwrite_feature_for_environment
 from features.import_export.types import FeatureExportData
 from features.models import Feature
 from features.versioning.versioning_service import get_environment_flags_list
+from import_export.import_ import iter_json_array
+from util.util import batched
 
 
 @register_recurring_task(
@@ -68,38 +74,57 @@ def _export_features_for_environment(
     """
     Caller for the export_features_for_environment to handle fails.
     """
+    # Written item by item, so only the serialised export is held in memory,
+    # rather than every feature state alongside it.
+    data = io.StringIO()
+    data.write("[")
+    for index, feature_data in enumerate(
+        _iter_feature_export_data(feature_export.environment, tag_ids)
+    ):
+        if index:
+            data.write(", ")
+        json.dump(feature_data, data)
+    data.write("]")
+
+    feature_export.status = SUCCESS
+    feature_export.data = data.getvalue()
+    feature_export.save()
+
+
+def _iter_feature_export_data(
+    environment: Environment,
+    tag_ids: Optional[list[int]],
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield the export of each of the environment's features, ordered by id.
+    Features are paginated by id, so each batch is a bounded number of
+    queries regardless of the environment's size.
+    """
+    features = Feature.objects.filter(project=environment.project, is_archived=False)
     additional_filters = Q(
         identity__isnull=True,
         feature_segment__isnull=True,
         feature_state_value__isnull=False,
-        feature__is_archived=False,
     )
-
     if tag_ids:
-        additional_filters &= Q(feature__tags__in=tag_ids)
+        features = features.filter(tags__in=tag_ids).distinct()
 
-    environment = feature_export.environment
-    feature_states = get_environment_flags_list(
-        environment=environment,
-        additional_filters=additional_filters,
-    )
-
-    payload = []
-    for feature_state in feature_states:
-        multivariate = [
-            {
-                "percentage_allocation": mv_fsv.percentage_allocation,
-                "default_percentage_allocation": mv_fsv.multivariate_feature_option.default_percentage_allocation,
-                "value": mv_fsv.multivariate_feature_option.value,
-                "type": mv_fsv.multivariate_feature_option.type,
-            }
-            for mv_fsv in feature_state.multivariate_feature_state_values.select_related(
-                "multivariate_feature_option"
-            ).all()
-        ]
-
-        payload.append(
-            {
+    last_feature_id = 0
+    while feature_ids := list(
+        features.filter(id__gt=last_feature_id)
+        .order_by("id")
+        .values_list("id", flat=True)[:FEATURE_EXPORT_BATCH_SIZE]
+    ):
+        last_feature_id = feature_ids[-1]
+        feature_states = get_environment_flags_list(
+            environment=environment,
+            additional_filters=additional_filters & Q(feature_id__in=feature_ids),
+            additional_prefetch_related_args=[
+                "multivariate_feature_state_values__multivariate_feature_option",
+            ],
+        )
+        for feature_state in sorted(feature_states, key=lambda fs: fs.feature_id):
+            yield {
                 "name": feature_state.feature.name,
                 "default_enabled": feature_state.feature.default_enabled,
                 "is_server_key_only": feature_state.feature.is_server_key_only,
@@ -107,13 +132,16 @@ def _export_features_for_environment(
                 "value": feature_state.feature_state_value.value,
                 "type": feature_state.feature_state_value.type,
                 "enabled": feature_state.enabled,
-                "multivariate": multivariate,
+                "multivariate": [
+                    {
+                        "percentage_allocation": mv_fsv.percentage_allocation,
+                        "default_percentage_allocation": mv_fsv.multivariate_feature_option.default_percentage_allocation,
+                        "value": mv_fsv.multivariate_feature_option.value,
+                        "type": mv_fsv.multivariate_feature_option.type,
+                    }
+                    for mv_fsv in feature_state.multivariate_feature_state_values.all()
+                ],
             }
-        )
-
-    feature_export.status = SUCCESS
-    feature_export.data = json.dumps(payload)
-    feature_export.save()
 
 
 @register_task_handler()
@@ -144,23 +172,38 @@ def import_features_for_environment(feature_import_id: int) -> None:
 
 def _import_features_for_environment(feature_import: FeatureImport) -> None:
     environment = feature_import.environment
-    input_data: list[FeatureExportData] = json.loads(feature_import.data)
     project = environment.project
+    input_data: Iterator[FeatureExportData] = iter_json_array(
+        io.StringIO(feature_import.data)
+    )
 
-    for feature_data in input_data:
-        existing_feature = Feature.objects.filter(
-            name=feature_data["name"],
-            project=project,
-        ).first()
-
-        if existing_feature and feature_import.strategy == SKIP:
-            continue
-
-        if existing_feature is None:
-            existing_feature = map_feature_export_data_to_feature(feature_data, project)
-            existing_feature.save()
-
-        overwrite_feature_for_environment(feature_data, existing_feature, environment)
+    for batch in batched(input_data, FEATURE_IMPORT_BATCH_SIZE):
+        # Features are created one by one, as saving a feature creates its
+        # states in every environment of the project, but are looked up once
+        # per batch.
+        existing_features = {
+            feature.name: feature
+            for feature in Feature.objects.filter(
+                name__in=[feature_data["name"] for feature_data in batch],
+                project=project,
+            )
+        }
+        for feature_data in batch:
+            existing_feature = existing_features.get(feature_data["name"])
+
+            if existing_feature and feature_import.strategy == SKIP:
+                continue
+
+            if existing_feature is None:
+                existing_feature = map_feature_export_data_to_feature(
+                    feature_data, project
+                )
+                existing_feature.save()
+                existing_features[existing_feature.name] = existing_feature
+
+            overwrite_feature_for_environment(
+                feature_data, existing_feature, environment
+            )
 
     feature_import.status = SUCCESS
     feature_import.save()
@@ -2,7 +2,7 @@ import json
 
 from django.conf import settings
 from django.db.models import QuerySet
-from django.http import Http404
+from django.http import Http404, HttpResponse
 from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, serializers
 from rest_framework.decorators import api_view, permission_classes
@@ -68,7 +68,7 @@ def feature_import(request: Request, environment_id: int) -> Response:
 )
 @api_view(["GET"])
 @permission_classes([DownloadFeatureExportPermissions])
-def download_feature_export(request: Request, feature_export_id: int) -> Response:
+def download_feature_export(request: Request, feature_export_id: int) -> HttpResponse:
     feature_export = get_object_or_404(FeatureExport, id=feature_export_id)
 
     if feature_export.status != SUCCESS:
@@ -78,10 +78,9 @@ def download_feature_export(request: Request, feature_export_id: int) -> Respons
             }
         )
 
-    response = Response(
-        json.loads(feature_export.data),  # type: ignore[arg-type]
-        content_type="application/json",
-    )
+    # The export is stored as JSON already, so it is served as-is rather
+    # than parsed and rendered again.
+    response = HttpResponse(feature_export.data, content_type="application/json")
     response.headers["Content-Disposition"] = (
         f"attachment; filename=feature_export.{feature_export_id}.json"
     )
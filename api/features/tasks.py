@@ -5,7 +5,8 @@ from task_processor.decorators import (
     register_task_handler,
 )
 
-from environments.models import Webhook
+from core.request_origin import RequestOrigin
+from environments.models import Environment, Webhook
 from features.models import Feature, FeatureState
 from features.multivariate.models import MultivariateFeatureStateValue
 from webhooks.constants import WEBHOOK_DATETIME_FORMAT
@@ -160,3 +161,14 @@ def _get_previous_multivariate_values(
 @register_task_handler()
 def delete_feature(feature_id: int) -> None:
     Feature.objects.get(pk=feature_id).delete()
+
+
+@register_task_handler()
+def rebuild_environment_flags_cache(
+    environment_api_key: str,
+    request_origin: str,
+) -> None:
+    from features.flags_cache import refresh_environment_flags_cache
+
+    if environment := Environment.get_from_cache(environment_api_key):
+        refresh_environment_flags_cache(environment, RequestOrigin(request_origin))
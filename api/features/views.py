@@ -6,7 +6,6 @@ from functools import reduce
 from common.core.utils import is_database_replica_setup, using_database_replica
 from common.projects.permissions import VIEW_PROJECT
 from django.conf import settings
-from django.core.cache import caches
 from django.db.models import (
     BooleanField,
     Case,
@@ -45,7 +44,6 @@ from app_analytics.influxdb_wrapper import get_multiple_event_list_for_feature
 from app_analytics.mappers import map_request_to_sdk_label
 from app_analytics.throttles import InfluxQueryThrottle
 from core.constants import FLAGSMITH_UPDATED_AT_HEADER, SDK_ENVIRONMENT_KEY_HEADER
-from core.request_origin import RequestOrigin
 from edge_api.identities.edge_identity_service import (
     get_overridden_feature_ids_for_edge_identity,
 )
@@ -76,6 +74,10 @@ from webhooks.webhooks import WebhookEventType
 
 from .constants import INTERSECTION, UNION
 from .features_service import get_overrides_data
+from .flags_cache import (
+    get_cached_environment_flags_data,
+    get_environment_flags_filters,
+)
 from .models import Feature, FeatureSegment, FeatureState
 from .multivariate.serializers import (
     FeatureMVOptionsValuesResponseSerializer,
@@ -119,8 +121,6 @@ from .versioning.versioning_service import (
 
 logger = logging.getLogger(__name__)
 
-flags_cache = caches[settings.FLAGS_CACHE_LOCATION]
-
 
 @extend_schema(responses={200: CreateFeatureSerializer()})
 @api_view(["GET"])
@@ -1080,37 +1080,18 @@ class SDKFeatureStates(GenericAPIView):  # type: ignore[type-arg]
 
     @property
     def _additional_filters(self) -> Q:
-        filters = Q(feature_segment=None, identity=None)
-
-        if self.request.environment.get_hide_disabled_flags() is True:
-            return filters & Q(enabled=True)
-
-        if self.request.originated_from is RequestOrigin.CLIENT:
-            return filters & Q(feature__is_server_key_only=False)
-
-        return filters
+        return get_environment_flags_filters(
+            self.request.environment, self.request.originated_from
+        )
 
     def _get_flags_from_cache(
         self,
         environment: Environment,
         from_replica: bool = False,
     ) -> list[typing.Any]:
-        data: list[typing.Any]
-        # Include request origin in cache key to isolate client vs server requests
-        cache_key = f"{environment.api_key}:{self.request.originated_from.value}"
-        data = flags_cache.get(cache_key)
-        if not data:
-            data = self.get_serializer(
-                get_environment_flags_list(
-                    environment=environment,
-                    additional_filters=self._additional_filters,
-                    from_replica=from_replica,
-                ),
-                many=True,
-            ).data
-            flags_cache.set(cache_key, data, settings.CACHE_FLAGS_SECONDS)
-
-        return data
+        return get_cached_environment_flags_data(
+            environment, self.request.originated_from, from_replica=from_replica
+        )
 
     def _get_flags_response_with_identifier(
         self, request: Request, identifier: str
@@ -10,6 +10,7 @@ import boto3
 import smart_open  # type: ignore[import-untyped]
 
 if TYPE_CHECKING:
+    from django.db.models import QuerySet
     from mypy_boto3_s3.client import S3Client
 from django.core import serializers
 from django.core.serializers.json import DjangoJSONEncoder
@@ -56,6 +57,8 @@ from segments.models import Condition, Segment, SegmentRule
 
 logger = logging.getLogger(__name__)
 
+EXPORT_CHUNK_SIZE = 2000
+
 
 class S3OrganisationExporter:
     MIN_PART_SIZE = 64 * 1024 * 1024
@@ -214,6 +217,7 @@ def export_identities(
                     identity__environment__project__organisation__id=organisation_id,
                     identity__environment__project__enable_dynamo_db=False,
                 ),
+                select_related=["identity__environment"],
             ),
         )
     )
@@ -237,12 +241,7 @@ def export_edge_identities(
     for environment in Environment.objects.filter(
         project__organisation__id=organisation_id, project__enable_dynamo_db=True
     ):
-        exported_identities, exported_traits, exported_overrides = (
-            export_edge_identity_and_overrides(environment.api_key)
-        )
-        yield from exported_identities
-        yield from exported_traits
-        yield from exported_overrides
+        yield from export_edge_identity_and_overrides(environment.api_key)
 
 
 def export_features(
@@ -257,7 +256,9 @@ def export_features(
     feature_states: list[dict[str, typing.Any]] = []
     for feature_state in _export_entities(
         _EntityExportConfig(
-            FeatureState, Q(feature__project__organisation__id=organisation_id)
+            FeatureState,
+            Q(feature__project__organisation__id=organisation_id),
+            select_related=["identity__environment"],
         )
     ):
         # Since we're not exporting any user objects, we want to exclude change
@@ -307,6 +308,9 @@ class _EntityExportConfig:
     model_class: type(Model)  # type: ignore[valid-type]
     qs_filter: Q
     exclude_fields: typing.List[str] = None  # type: ignore[assignment]
+    # Relations needed by the natural keys of related objects, e.g. the
+    # environment of a related identity.
+    select_related: typing.List[str] = None  # type: ignore[assignment]
 
 
 def _export_entities(
@@ -315,18 +319,65 @@ def _export_entities(
     for config in export_configs:
         queryset = config.model_class.objects.filter(config.qs_filter)
         kwargs: dict[str, typing.Any] = {}
+        fields = None
         if config.exclude_fields:
-            kwargs["fields"] = [
+            fields = kwargs["fields"] = [
                 f.name
                 for f in config.model_class._meta.get_fields()
                 if f.name not in config.exclude_fields
             ]
-        # Serialise one instance at a time over an iterator so a single large
-        # table is never fully materialised in memory. Django's "python"
-        # serializer buffers its entire output into a list, so passing the
-        # whole queryset would defeat the streaming export.
-        for instance in queryset.iterator():
-            yield from _serialize_natural("python", [instance], **kwargs)
+        select_related, prefetch_related = _get_natural_key_relations(
+            config.model_class, fields
+        )
+        queryset = queryset.select_related(
+            *select_related, *(config.select_related or [])
+        ).prefetch_related(*prefetch_related)
+        # Serialise a chunk of instances at a time so a single large table is
+        # never fully materialised in memory, while the natural keys of each
+        # chunk's related objects are fetched in bulk rather than per instance.
+        for chunk in _iter_in_chunks(queryset):
+            yield from _serialize_natural("python", chunk, **kwargs)
+
+
+def _get_natural_key_relations(
+    model_class: type[Model],
+    fields: typing.List[str] | None,
+) -> tuple[list[str], list[str]]:
+    """
+    Get the foreign keys and many-to-many fields of a model that are
+    serialised using the natural keys of the related objects.
+    """
+    select_related = []
+    prefetch_related = []
+    opts = model_class._meta.concrete_model._meta  # type: ignore[union-attr]
+    for field in [*opts.local_fields, *opts.local_many_to_many]:
+        if not field.remote_field or (fields and field.name not in fields):
+            continue
+        if not hasattr(field.remote_field.model, "natural_key"):
+            continue
+        if field.many_to_many:
+            prefetch_related.append(field.name)
+        else:
+            select_related.append(field.name)
+    return select_related, prefetch_related
+
+
+def _iter_in_chunks(
+    queryset: "QuerySet[Model]",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[list[Model]]:
+    """
+    Iterate over a queryset in chunks using keyset pagination on the primary key.
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        chunk_qs = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+        chunk = list(chunk_qs[:chunk_size])
+        if not chunk:
+            break
+        yield chunk
+        last_pk = chunk[-1].pk
 
 
 _serialize_natural = functools.partial(
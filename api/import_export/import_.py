@@ -1,17 +1,62 @@
+import codecs
+import json
 import logging
+import typing
 import uuid
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
 
 import boto3
+from django.apps import apps
 from django.core.management import call_command
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.db import connection, transaction
+from django.db.models import Model, Q
+
+from core.models import AbstractBaseExportableModel
+from environments.identities.models import Identity
+from environments.models import Environment, EnvironmentAPIKey
+from import_export.json_serializers_with_metadata_support import (
+    deserialize_python_objects,
+)
+from metadata.models import Metadata, MetadataModelFieldRequirement
+
+if typing.TYPE_CHECKING:
+    from _typeshed import SupportsRead
 
 logger = logging.getLogger(__name__)
 
+BULK_IMPORT_BATCH_SIZE = 1000
+JSON_STREAM_READ_SIZE = 64 * 1024
+
+# Fields used to look up models by natural key, other than the exportable
+# models whose natural key is their uuid.
+NATURAL_KEY_LOOKUP_FIELDS: dict[type[Model], tuple[str, ...]] = {
+    Environment: ("api_key",),
+    EnvironmentAPIKey: ("key",),
+    Identity: ("identifier", "environment__api_key"),
+}
+
+# Models that need extra handling on import, see `deserialize_python_objects`.
+NON_BULK_IMPORTABLE_MODELS: tuple[type[Model], ...] = (
+    Metadata,
+    MetadataModelFieldRequirement,
+)
+
+NaturalKey = tuple[str, ...]
+
 
 class OrganisationImporter:
     def __init__(self, s3_client=None):  # type: ignore[no-untyped-def]
         self._s3_client = s3_client or boto3.client("s3")
 
-    def import_organisation(self, s3_bucket: str, s3_key: str) -> None:
+    def import_organisation(
+        self,
+        s3_bucket: str,
+        s3_key: str,
+        bulk: bool = False,
+    ) -> None:
         """
         Import an organisation from a json file containing the django fixtures
         as exported by the `export` module in this package.
@@ -24,11 +69,22 @@ class OrganisationImporter:
         call_command function. We store it in /tmp/ with a unique uuid and remove it
         after, regardless of the success of the task to ensure we're not clogging up
         the task's storage.
+
+        If `bulk` is set, the file is instead streamed from S3 and imported with
+        `bulk_import`, which is considerably faster for large organisations, but
+        expects that none of the objects exist yet.
         """
 
         logger.info("Starting organisation import.")
 
         obj = self._s3_client.get_object(Bucket=s3_bucket, Key=s3_key)
+
+        if bulk:
+            logger.debug("Streaming bulk import")
+            bulk_import(iter_json_array(codecs.getreader("utf-8")(obj["Body"])))
+            logger.debug("Finished loading data")
+            return
+
         file_path = f"/tmp/{uuid.uuid4()}.json"
 
         with open(file_path, "a+") as f:
@@ -39,3 +95,327 @@ class OrganisationImporter:
             logger.debug("Calling loaddata")
             call_command("loaddata", f.name, format="json")
             logger.debug("Finished loading data")
+
+
+def iter_json_array(
+    stream: "SupportsRead[str]",
+    read_size: int = JSON_STREAM_READ_SIZE,
+) -> Iterator[typing.Any]:
+    """
+    Yield the items of a JSON array from a text stream without loading the
+    whole array in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    is_exhausted = False
+    started = False
+
+    while True:
+        # Skip whitespace and the array delimiters between items.
+        while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+            if buffer[position] == "[":
+                started = True
+            position += 1
+
+        if started and position < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if is_exhausted:
+                    raise
+            else:
+                # The item may be a number that continues in the next read.
+                if end < len(buffer) or is_exhausted:
+                    yield item
+                    position = end
+                    continue
+
+        if is_exhausted:
+            return
+
+        chunk = stream.read(read_size)
+        is_exhausted = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def bulk_import(
+    objects: Iterable[dict[str, typing.Any]],
+    batch_size: int = BULK_IMPORT_BATCH_SIZE,
+) -> None:
+    """
+    Import objects serialised with natural keys, as exported by the `export`
+    module in this package, using `bulk_create`.
+
+    Consecutive objects of the same model are imported in batches, resolving
+    the natural keys of each batch's related objects with a single query per
+    related model. Each batch is committed separately, so that the import
+    doesn't hold a long running transaction. As a result, a failed import
+    leaves the earlier batches committed, and can't be resumed or rerun.
+    """
+    imported_models: set[type[Model]] = set()
+    batch: list[dict[str, typing.Any]] = []
+    batch_model: type[Model] | None = None
+    batch_natural_keys: set[NaturalKey] = set()
+
+    for obj in objects:
+        model = apps.get_model(obj["model"])
+        if batch and (
+            model is not batch_model
+            or len(batch) >= batch_size
+            # Objects referring to a previous object of the same batch, e.g.
+            # nested segment rules, need the batch to be created first.
+            or _get_self_referenced_natural_keys(model, obj) & batch_natural_keys
+        ):
+            _import_batch(batch_model, batch)  # type: ignore[arg-type]
+            batch, batch_natural_keys = [], set()
+
+        batch_model = model
+        batch.append(obj)
+        if natural_key := _get_natural_key(model, obj):
+            batch_natural_keys.add(natural_key)
+        imported_models.add(model)
+
+    if batch:
+        _import_batch(batch_model, batch)  # type: ignore[arg-type]
+
+    # Objects exported with their primary key don't advance the sequences.
+    if sequence_sql := connection.ops.sequence_reset_sql(
+        no_style(), list(imported_models)
+    ):
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+
+
+def _import_batch(
+    model: type[Model],
+    batch: list[dict[str, typing.Any]],
+) -> None:
+    with transaction.atomic():
+        related_natural_keys = _get_related_natural_keys(model, batch)
+        if issubclass(model, NON_BULK_IMPORTABLE_MODELS) or not all(
+            _get_natural_key_lookup_fields(related_model)
+            for related_model in related_natural_keys
+        ):
+            for deserialized_object in deserialize_python_objects(batch):
+                deserialized_object.save()
+            return
+
+        related_pks = {
+            related_model: _get_pks_by_natural_key(related_model, natural_keys)
+            for related_model, natural_keys in related_natural_keys.items()
+        }
+        batch_natural_keys = {
+            natural_key
+            for obj in batch
+            if (natural_key := _get_natural_key(model, obj))
+        }
+        instances = []
+        m2m_pks: list[dict[typing.Any, list[typing.Any]]] = []
+        self_references: list[dict[typing.Any, NaturalKey]] = []
+        for obj in batch:
+            instance, instance_m2m_pks, instance_self_references = _build_instance(
+                model, obj, related_pks, batch_natural_keys
+            )
+            instances.append(instance)
+            m2m_pks.append(instance_m2m_pks)
+            self_references.append(instance_self_references)
+
+        _bulk_create_keeping_auto_now_values(model, instances)
+
+        # Objects referring to another object of the batch, e.g. segments
+        # referring to themselves as `version_of`, can only be linked up once
+        # the batch is created.
+        if any(self_references):
+            batch_pks = _get_pks_by_natural_key(model, batch_natural_keys)
+            updated_fields = set()
+            for instance, instance_self_references in zip(instances, self_references):
+                for field, natural_key in instance_self_references.items():
+                    setattr(instance, field.attname, batch_pks[natural_key])
+                    updated_fields.add(field.name)
+            model._base_manager.bulk_update(
+                [
+                    instance
+                    for instance, refs in zip(instances, self_references)
+                    if refs
+                ],
+                updated_fields,
+            )
+
+        through_objects: dict[type[Model], list[Model]] = defaultdict(list)
+        for instance, instance_m2m_pks in zip(instances, m2m_pks):
+            for field, pks in instance_m2m_pks.items():
+                through_model: type[Model] = field.remote_field.through
+                through_objects[through_model].extend(
+                    through_model(
+                        **{
+                            f"{field.m2m_field_name()}_id": instance.pk,
+                            f"{field.m2m_reverse_field_name()}_id": pk,
+                        }
+                    )
+                    for pk in pks
+                )
+        for through_model, objects in through_objects.items():
+            through_model._base_manager.bulk_create(objects)
+
+
+def _bulk_create_keeping_auto_now_values(
+    model: type[Model],
+    instances: list[Model],
+) -> None:
+    # `bulk_create` overwrites `auto_now` and `auto_now_add` fields with the
+    # current time, where loaddata's raw saves keep the exported values.
+    auto_now_fields = [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    exported_values = [
+        {field.attname: getattr(instance, field.attname) for field in auto_now_fields}
+        for instance in instances
+    ]
+
+    model._base_manager.bulk_create(instances)
+
+    if not auto_now_fields:
+        return
+    for instance, values in zip(instances, exported_values):
+        for attname, value in values.items():
+            if value is not None:
+                setattr(instance, attname, value)
+    model._base_manager.bulk_update(
+        instances, [field.name for field in auto_now_fields]
+    )
+
+
+def _build_instance(
+    model: type[Model],
+    obj: dict[str, typing.Any],
+    related_pks: dict[type[Model], dict[NaturalKey, typing.Any]],
+    batch_natural_keys: set[NaturalKey],
+) -> tuple[Model, dict[typing.Any, list[typing.Any]], dict[typing.Any, NaturalKey]]:
+    data = {}
+    m2m_pks = {}
+    self_references = {}
+    if "pk" in obj:
+        data[model._meta.pk.attname] = model._meta.pk.to_python(obj["pk"])
+
+    for field_name, value in obj["fields"].items():
+        field = model._meta.get_field(field_name)
+        if field.many_to_many:
+            m2m_pks[field] = [
+                _get_related_pk(field, related_value, related_pks)
+                for related_value in value
+            ]
+        elif (
+            field.related_model is model
+            and _is_natural_key(value)
+            and (natural_key := _to_natural_key(value)) in batch_natural_keys
+        ):
+            self_references[field] = natural_key
+        elif field.remote_field:
+            data[field.attname] = (  # type: ignore[union-attr]
+                None if value is None else _get_related_pk(field, value, related_pks)
+            )
+        else:
+            data[field.name] = field.to_python(value)  # type: ignore[union-attr]
+
+    return model(**data), m2m_pks, self_references
+
+
+def _get_related_pk(
+    field: typing.Any,
+    value: typing.Any,
+    related_pks: dict[type[Model], dict[NaturalKey, typing.Any]],
+) -> typing.Any:
+    related_model = field.related_model
+    if not _is_natural_key(value):
+        return related_model._meta.pk.to_python(value)
+    natural_key = _to_natural_key(value)
+    try:
+        return related_pks[related_model][natural_key]
+    except KeyError:
+        raise DeserializationError(
+            f"{related_model.__name__} matching natural key {natural_key} does not exist."
+        )
+
+
+def _get_related_natural_keys(
+    model: type[Model],
+    batch: list[dict[str, typing.Any]],
+) -> dict[type[Model], set[NaturalKey]]:
+    natural_keys: dict[type[Model], set[NaturalKey]] = defaultdict(set)
+    for obj in batch:
+        for field_name, value in obj["fields"].items():
+            field = model._meta.get_field(field_name)
+            if not field.remote_field or value is None:
+                continue
+            values = value if field.many_to_many else [value]
+            for related_value in values:
+                if _is_natural_key(related_value):
+                    natural_keys[field.related_model].add(  # type: ignore[index]
+                        _to_natural_key(related_value)
+                    )
+    return natural_keys
+
+
+def _get_pks_by_natural_key(
+    model: type[Model],
+    natural_keys: set[NaturalKey],
+) -> dict[NaturalKey, typing.Any]:
+    first_field, *other_fields = _get_natural_key_lookup_fields(model)  # type: ignore[misc]
+    first_values_by_other_values: dict[NaturalKey, list[str]] = defaultdict(list)
+    for natural_key in natural_keys:
+        first_values_by_other_values[natural_key[1:]].append(natural_key[0])
+
+    query = Q()
+    for other_values, first_values in first_values_by_other_values.items():
+        query |= Q(
+            **{f"{first_field}__in": first_values},
+            **dict(zip(other_fields, other_values)),
+        )
+
+    return {
+        tuple(str(value) for value in row[:-1]): row[-1]
+        for row in model._base_manager.filter(query).values_list(
+            first_field, *other_fields, "pk"
+        )
+    }
+
+
+def _get_natural_key_lookup_fields(model: type[Model]) -> tuple[str, ...] | None:
+    if issubclass(model, AbstractBaseExportableModel):
+        return ("uuid",)
+    return NATURAL_KEY_LOOKUP_FIELDS.get(model)
+
+
+def _get_natural_key(
+    model: type[Model],
+    obj: dict[str, typing.Any],
+) -> NaturalKey | None:
+    lookup_fields = _get_natural_key_lookup_fields(model)
+    if not lookup_fields or any(field not in obj["fields"] for field in lookup_fields):
+        return None
+    return tuple(str(obj["fields"][field]) for field in lookup_fields)
+
+
+def _get_self_referenced_natural_keys(
+    model: type[Model],
+    obj: dict[str, typing.Any],
+) -> set[NaturalKey]:
+    return {
+        _to_natural_key(value)
+        for field_name, value in obj["fields"].items()
+        if _is_natural_key(value)
+        and model._meta.get_field(field_name).related_model is model
+    }
+
+
+def _is_natural_key(value: typing.Any) -> bool:
+    return isinstance(value, (list, tuple))
+
+
+def _to_natural_key(value: typing.Sequence[typing.Any]) -> NaturalKey:
+    return tuple(str(item) for item in value)
@@ -1,6 +1,7 @@
 import json
+import typing
 
-from django.core.serializers.base import DeserializationError
+from django.core.serializers.base import DeserializationError, DeserializedObject
 from django.core.serializers.json import Serializer as JsonSerializer
 from django.core.serializers.python import Deserializer as PythonDeserializer
 
@@ -17,20 +18,26 @@ def Deserializer(stream_or_string, **options):  # type: ignore[no-untyped-def]
         stream_or_string = stream_or_string.decode()
     try:
         objects = json.loads(stream_or_string)
-        for obj in PythonDeserializer(objects, **options):
-            # For metadata object resolve object_id to int using
-            # the stored natural_key
-            if isinstance(obj.object, Metadata) or isinstance(
-                obj.object, MetadataModelFieldRequirement
-            ):
-                content_type = obj.object.content_type
-                content_object = content_type.model_class().objects.get_by_natural_key(  # type: ignore[union-attr]
-                    obj.object.object_id
-                )
-                obj.object.object_id = content_object.pk
-            yield obj
-
+        yield from deserialize_python_objects(objects, **options)
     except GeneratorExit:
         raise
     except Exception as exc:
         raise DeserializationError() from exc
+
+
+def deserialize_python_objects(
+    objects: typing.Iterable[dict[str, typing.Any]],
+    **options: typing.Any,
+) -> typing.Iterator[DeserializedObject]:
+    for obj in PythonDeserializer(objects, **options):
+        # For metadata object resolve object_id to int using
+        # the stored natural_key
+        if isinstance(obj.object, Metadata) or isinstance(
+            obj.object, MetadataModelFieldRequirement
+        ):
+            content_type = obj.object.content_type
+            content_object = content_type.model_class().objects.get_by_natural_key(  # type: ignore[union-attr]
+                obj.object.object_id
+            )
+            obj.object.object_id = content_object.pk
+        yield obj
@@ -23,6 +23,14 @@ class Command(BaseCommand):
             type=str,
             help="S3 location key to retrieve the organisation data from.",
         )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Stream the organisation data and import it with bulk inserts. "
+            "None of the organisation's objects may exist yet. Batches are "
+            "committed as they are imported, so a failed import can't be "
+            "resumed or rerun.",
+        )
 
     def handle(self, *args, **options):  # type: ignore[no-untyped-def]
         bucket_name = options["bucket-name"]
@@ -32,4 +40,4 @@ class Command(BaseCommand):
             "Importing organisation from bucket '%s' with key '%s'", bucket_name, key
         )
 
-        self.importer.import_organisation(bucket_name, key)
+        self.importer.import_organisation(bucket_name, key, bulk=options["bulk"])
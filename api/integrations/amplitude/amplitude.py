@@ -7,8 +7,13 @@ import requests
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
-from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from integrations.common.delivery import get_delivery_session
+from integrations.common.wrapper import (
+    AbstractBaseIdentityIntegrationWrapper,
+    iter_feature_state_values,
+)
 
+from .constants import AMPLITUDE_IDENTIFY_MAX_BATCH_SIZE
 from .models import AmplitudeConfiguration
 
 AmplitudeUserData: typing.TypeAlias = dict[str, typing.Any]
@@ -17,10 +22,16 @@ logger = logging.getLogger(__name__)
 
 
 class AmplitudeWrapper(AbstractBaseIdentityIntegrationWrapper[AmplitudeUserData]):
+    max_batch_size = AMPLITUDE_IDENTIFY_MAX_BATCH_SIZE
+
     def __init__(self, config: AmplitudeConfiguration):
         self.api_key = config.api_key
         self.url = f"{config.base_url}/identify"
 
+    @property
+    def batch_key(self) -> typing.Hashable:
+        return (self.url, self.api_key)
+
     def _identify_user(self, user_data: AmplitudeUserData) -> None:
         payload = {"api_key": self.api_key, "identification": json.dumps([user_data])}
 
@@ -29,6 +40,17 @@ class AmplitudeWrapper(AbstractBaseIdentityIntegrationWrapper[AmplitudeUserData]
             "Sent event to Amplitude. Response code was: %s" % response.status_code
         )
 
+    def _identify_users(self, user_data: list[AmplitudeUserData]) -> None:
+        # The Identify API takes a list of identifications per request.
+        payload = {"api_key": self.api_key, "identification": json.dumps(user_data)}
+
+        response = get_delivery_session().post(self.url, data=payload)
+        response.raise_for_status()
+        logger.debug(
+            "Sent %d events to Amplitude. Response code was: %s"
+            % (len(user_data), response.status_code)
+        )
+
     def generate_user_data(
         self,
         identity: Identity,
@@ -37,8 +59,7 @@ class AmplitudeWrapper(AbstractBaseIdentityIntegrationWrapper[AmplitudeUserData]
     ) -> AmplitudeUserData:
         feature_properties = {}
 
-        for feature_state in feature_states:
-            value = feature_state.get_feature_state_value(identity=identity)
+        for feature_state, value in iter_feature_state_values(identity, feature_states):
             feature_properties[feature_state.feature.name] = (
                 value
                 if (feature_state.enabled and value is not None)
@@ -1 +1,4 @@
 DEFAULT_AMPLITUDE_API_URL = "https://api2.amplitude.com"
+
+# Identifications sent per request by the identity delivery pipeline.
+AMPLITUDE_IDENTIFY_MAX_BATCH_SIZE = 100
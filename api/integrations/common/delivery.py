@@ -0,0 +1,186 @@
+import logging
+import queue
+import threading
+import time
+import typing
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections
+
+from integrations.common.metrics import (
+    flagsmith_identity_integrations_requests_total,
+    flagsmith_identity_integrations_user_data_total,
+)
+from util.util import batched
+
+if typing.TYPE_CHECKING:
+    from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+
+logger = logging.getLogger(__name__)
+
+_QueueItem: typing.TypeAlias = tuple[
+    "AbstractBaseIdentityIntegrationWrapper[typing.Any]",
+    typing.Callable[[], typing.Any],
+]
+
+_local = threading.local()
+
+
+def get_delivery_session() -> requests.Session:
+    """Return a keep-alive session for the calling thread. Pipeline workers
+    are long-lived, so their connections to each integration are reused."""
+    session: requests.Session | None = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+class IdentityDeliveryPipeline:
+    """
+    Deliver user data to identity integrations from a fixed pool of worker
+    threads, in place of a thread per identify call.
+
+    User data waits in a bounded queue, and is dropped when the queue is
+    full rather than holding up the request that produced it. Workers drain
+    the queue in micro-batches, and user data bound for the same integration
+    configuration is sent with a single request where the integration has a
+    batch API.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        queue_size: int,
+        batch_size: int,
+        linger_seconds: float,
+    ) -> None:
+        self.workers = workers
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self._queue: queue.Queue[_QueueItem] = queue.Queue(maxsize=queue_size)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        wrapper: "AbstractBaseIdentityIntegrationWrapper[typing.Any]",
+        get_user_data: typing.Callable[[], typing.Any],
+    ) -> bool:
+        """
+        Queue user data for delivery, returning whether it was accepted. The
+        user data is generated by the worker delivering it, off the request
+        path.
+        """
+        self._start()
+        try:
+            self._queue.put_nowait((wrapper, get_user_data))
+        except queue.Full:
+            flagsmith_identity_integrations_user_data_total.labels(
+                integration=wrapper.integration_name,
+                result="dropped",
+            ).inc()
+            logger.warning(
+                "Identity integration delivery queue is full, dropping user data for %s",
+                wrapper.integration_name,
+            )
+            return False
+        return True
+
+    def deliver_pending(self) -> None:
+        """Deliver whatever is queued right now from the calling thread."""
+        items: list[_QueueItem] = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._deliver(items)
+
+    def _start(self) -> None:
+        if len(self._threads) == self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"identity-integrations-delivery-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            self._deliver(self._collect())
+            # Generating user data can query the database, and this thread
+            # outlives any request that would close its connection.
+            close_old_connections()
+
+    def _collect(self) -> list[_QueueItem]:
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.linger_seconds
+        while len(items) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return items
+
+    def _deliver(self, items: list[_QueueItem]) -> None:
+        user_data_by_batch_key: dict[
+            typing.Hashable,
+            tuple[
+                "AbstractBaseIdentityIntegrationWrapper[typing.Any]", list[typing.Any]
+            ],
+        ] = {}
+        for wrapper, get_user_data in items:
+            try:
+                user_data = get_user_data()
+            except Exception:
+                logger.exception(
+                    "Failed to generate user data for %s", wrapper.integration_name
+                )
+                flagsmith_identity_integrations_user_data_total.labels(
+                    integration=wrapper.integration_name,
+                    result="failed",
+                ).inc()
+                continue
+            _, batch_user_data = user_data_by_batch_key.setdefault(
+                wrapper.batch_key, (wrapper, [])
+            )
+            batch_user_data.append(user_data)
+
+        for wrapper, user_data_list in user_data_by_batch_key.values():
+            for batch in batched(user_data_list, wrapper.max_batch_size):
+                flagsmith_identity_integrations_requests_total.labels(
+                    integration=wrapper.integration_name,
+                ).inc()
+                try:
+                    wrapper._identify_users(batch)
+                except Exception:
+                    result = "failed"
+                    logger.exception(
+                        "Failed to deliver user data to %s", wrapper.integration_name
+                    )
+                else:
+                    result = "delivered"
+                flagsmith_identity_integrations_user_data_total.labels(
+                    integration=wrapper.integration_name,
+                    result=result,
+                ).inc(len(batch))
+
+
+@lru_cache(maxsize=1)
+def get_identity_delivery_pipeline() -> IdentityDeliveryPipeline:
+    return IdentityDeliveryPipeline(
+        workers=settings.IDENTITY_INTEGRATIONS_DELIVERY_WORKERS,
+        queue_size=settings.IDENTITY_INTEGRATIONS_DELIVERY_QUEUE_SIZE,
+        batch_size=settings.IDENTITY_INTEGRATIONS_DELIVERY_BATCH_SIZE,
+        linger_seconds=settings.IDENTITY_INTEGRATIONS_DELIVERY_LINGER_SECONDS,
+    )
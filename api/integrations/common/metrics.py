@@ -0,0 +1,17 @@
+import prometheus_client
+
+flagsmith_identity_integrations_user_data_total = prometheus_client.Counter(
+    "flagsmith_identity_integrations_user_data_total",
+    "User data sent to identity integrations through the delivery pipeline. "
+    "`result` label is `delivered`, `failed` for user data in a request the "
+    "integration did not accept, or `dropped` for user data discarded because "
+    "the pipeline's queue was full.",
+    ["integration", "result"],
+)
+
+flagsmith_identity_integrations_requests_total = prometheus_client.Counter(
+    "flagsmith_identity_integrations_requests_total",
+    "Requests made to identity integrations by the delivery pipeline, each "
+    "carrying a batch of user data.",
+    ["integration"],
+)
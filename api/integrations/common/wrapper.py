@@ -1,5 +1,6 @@
 import typing
 from abc import ABC, abstractmethod
+from functools import cached_property
 
 from util.util import postpone
 
@@ -12,6 +13,44 @@ if typing.TYPE_CHECKING:
 T = typing.TypeVar("T")
 
 
+class IdentityFeatureStates(typing.List["FeatureState"]):
+    """
+    An identity's feature states, with their values for the identity resolved
+    once and shared by every integration the identity is sent to.
+    """
+
+    def __init__(
+        self,
+        identity: "Identity",
+        feature_states: typing.Iterable["FeatureState"],
+    ) -> None:
+        super().__init__(feature_states)
+        self.identity = identity
+
+    @cached_property
+    def values(self) -> list[typing.Any]:
+        return [
+            feature_state.get_feature_state_value(identity=self.identity)
+            for feature_state in self
+        ]
+
+
+def iter_feature_state_values(
+    identity: "Identity",
+    feature_states: typing.Iterable["FeatureState"],
+) -> typing.Iterator[tuple["FeatureState", typing.Any]]:
+    """Yield each feature state with its value for the identity."""
+    if (
+        isinstance(feature_states, IdentityFeatureStates)
+        and feature_states.identity is identity
+    ):
+        return zip(feature_states, feature_states.values)
+    return (
+        (feature_state, feature_state.get_feature_state_value(identity=identity))
+        for feature_state in feature_states
+    )
+
+
 class AbstractBaseEventIntegrationWrapper(ABC):
     @abstractmethod
     def _track_event(self, event: dict) -> None:  # type: ignore[type-arg]
@@ -28,12 +67,34 @@ class AbstractBaseEventIntegrationWrapper(ABC):
 
 
 class AbstractBaseIdentityIntegrationWrapper(ABC, typing.Generic[T]):
+    # Most user data sent with one `_identify_users` call. Integrations with
+    # a batch API raise it and override `_identify_users`.
+    max_batch_size: int = 1
+
     @abstractmethod
     def _identify_user(self, user_data: T) -> None:
         raise NotImplementedError()
 
+    def _identify_users(self, user_data: typing.List[T]) -> None:
+        for data in user_data:
+            self._identify_user(data)
+
+    @property
+    def integration_name(self) -> str:
+        return type(self).__name__.removesuffix("Wrapper").lower()
+
+    @property
+    def batch_key(self) -> typing.Hashable:
+        """
+        User data from wrappers with equal keys can be sent together, so
+        wrappers supporting batches key on their destination.
+        """
+        return id(self)
+
     @postpone  # type: ignore[misc]
     def identify_user_async(self, data: T) -> None:
+        # With the delivery pipeline enabled, `identify_integrations` submits
+        # user data to it instead.
         self._identify_user(data)
 
     @abstractmethod
@@ -6,7 +6,10 @@ import requests
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
-from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from integrations.common.wrapper import (
+    AbstractBaseIdentityIntegrationWrapper,
+    iter_feature_state_values,
+)
 
 from .constants import DEFAULT_HEAP_API_URL
 from .models import HeapConfiguration
@@ -32,8 +35,7 @@ class HeapWrapper(AbstractBaseIdentityIntegrationWrapper):  # type: ignore[type-
     ) -> dict:  # type: ignore[type-arg]
         feature_properties = {}
 
-        for feature_state in feature_states:
-            value = feature_state.get_feature_state_value(identity=identity)
+        for feature_state, value in iter_feature_state_values(identity, feature_states):
             feature_properties[feature_state.feature.name] = (
                 value
                 if (feature_state.enabled and value is not None)
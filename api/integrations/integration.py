@@ -1,8 +1,15 @@
+from functools import partial
 from typing import Type, TypedDict
 
+from django.conf import settings
+
 from environments.constants import IDENTITY_INTEGRATIONS_RELATION_NAMES
 from integrations.amplitude.amplitude import AmplitudeWrapper
-from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from integrations.common.delivery import get_identity_delivery_pipeline
+from integrations.common.wrapper import (
+    AbstractBaseIdentityIntegrationWrapper,
+    IdentityFeatureStates,
+)
 from integrations.heap.heap import HeapWrapper
 from integrations.mixpanel.mixpanel import MixpanelWrapper
 from integrations.rudderstack.rudderstack import RudderstackWrapper
@@ -37,14 +44,21 @@ assert set(IDENTITY_INTEGRATIONS_RELATION_NAMES) == (
 
 
 def identify_integrations(identity, all_feature_states, trait_models=None):  # type: ignore[no-untyped-def]
+    feature_states = IdentityFeatureStates(identity, all_feature_states)
     for integration in IDENTITY_INTEGRATIONS:
         config = getattr(identity.environment, integration.get("relation_name"), None)  # type: ignore[arg-type]
         if config and not config.deleted:
             wrapper = integration.get("wrapper")
             wrapper_instance = wrapper(config)  # type: ignore[call-arg,misc]
-            user_data = wrapper_instance.generate_user_data(
+            generate_user_data = partial(
+                wrapper_instance.generate_user_data,
                 identity=identity,
-                feature_states=all_feature_states,
+                feature_states=feature_states,
                 trait_models=trait_models,
             )
-            wrapper_instance.identify_user_async(data=user_data)
+            if settings.IDENTITY_INTEGRATIONS_DELIVERY_WORKERS:
+                get_identity_delivery_pipeline().submit(
+                    wrapper_instance, generate_user_data
+                )
+            else:
+                wrapper_instance.identify_user_async(data=generate_user_data())
@@ -1 +1,5 @@
 DEFAULT_MIXPANEL_API_URL = "https://api.mixpanel.com"
+
+# Users whose profile updates are sent per request by the identity delivery
+# pipeline. The Engage API accepts up to 2000 updates per request.
+MIXPANEL_ENGAGE_MAX_BATCH_SIZE = 200
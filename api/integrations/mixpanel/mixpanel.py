@@ -6,9 +6,13 @@ import requests
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
-from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from integrations.common.delivery import get_delivery_session
+from integrations.common.wrapper import (
+    AbstractBaseIdentityIntegrationWrapper,
+    iter_feature_state_values,
+)
 
-from .constants import DEFAULT_MIXPANEL_API_URL
+from .constants import DEFAULT_MIXPANEL_API_URL, MIXPANEL_ENGAGE_MAX_BATCH_SIZE
 from .models import MixpanelConfiguration
 
 MixpanelUserData: typing.TypeAlias = list[dict[str, typing.Any]]
@@ -18,6 +22,8 @@ logger = logging.getLogger(__name__)
 
 
 class MixpanelWrapper(AbstractBaseIdentityIntegrationWrapper[MixpanelUserData]):
+    max_batch_size = MIXPANEL_ENGAGE_MAX_BATCH_SIZE
+
     def __init__(self, config: MixpanelConfiguration):
         self.api_key = config.api_key
         base_url = (config.base_url or DEFAULT_MIXPANEL_API_URL).rstrip("/")
@@ -36,6 +42,23 @@ class MixpanelWrapper(AbstractBaseIdentityIntegrationWrapper[MixpanelUserData]):
         )
         logger.debug("Sent event to Mixpanel. Response content was: %s" % response.text)
 
+    @property
+    def batch_key(self) -> typing.Hashable:
+        return (self.url, self.api_key)
+
+    def _identify_users(self, user_data: list[MixpanelUserData]) -> None:
+        # Each user's data is a list of profile updates, and the Engage API
+        # takes any number of updates per request.
+        updates = [update for data in user_data for update in data]
+        response = get_delivery_session().post(
+            self.url, headers=self.headers, json=updates
+        )
+        response.raise_for_status()
+        logger.debug(
+            "Sent %d events to Mixpanel. Response code was: %s"
+            % (len(user_data), response.status_code)
+        )
+
     def generate_user_data(
         self,
         identity: Identity,
@@ -44,8 +67,7 @@ class MixpanelWrapper(AbstractBaseIdentityIntegrationWrapper[MixpanelUserData]):
     ) -> MixpanelUserData:
         feature_properties = {}
 
-        for feature_state in feature_states:
-            value = feature_state.get_feature_state_value(identity=identity)
+        for feature_state, value in iter_feature_state_values(identity, feature_states):
             feature_properties[feature_state.feature.name] = (
                 value if (feature_state.enabled and value) else feature_state.enabled
             )
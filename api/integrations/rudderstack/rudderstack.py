@@ -6,7 +6,10 @@ from rudderstack import analytics as rudder_analytics  # type: ignore[import-unt
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
-from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from integrations.common.wrapper import (
+    AbstractBaseIdentityIntegrationWrapper,
+    iter_feature_state_values,
+)
 
 from .models import RudderstackConfiguration
 
@@ -29,8 +32,7 @@ class RudderstackWrapper(AbstractBaseIdentityIntegrationWrapper):  # type: ignor
     ) -> dict:  # type: ignore[type-arg]
         feature_properties = {}
 
-        for feature_state in feature_states:
-            value = feature_state.get_feature_state_value(identity=identity)
+        for feature_state, value in iter_feature_state_values(identity, feature_states):
             feature_properties[feature_state.feature.name] = (
                 value if (feature_state.enabled and value) else feature_state.enabled
             )
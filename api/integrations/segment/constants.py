@@ -1,2 +1,6 @@
 DEFAULT_BASE_URL = "https://api.segment.io/"
 DUBLIN_BASE_URL = "https://events.eu1.segmentapis.com/"
+
+# Messages sent per request by the identity delivery pipeline, well within the
+# batch endpoint's 500KB request limit.
+SEGMENT_MAX_BATCH_SIZE = 100
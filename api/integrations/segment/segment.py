@@ -2,26 +2,53 @@ import logging
 import typing
 
 from analytics.client import Client as SegmentClient  # type: ignore[import-untyped]
+from analytics.request import post as segment_post  # type: ignore[import-untyped]
 
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from features.models import FeatureState
-from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
+from integrations.common.wrapper import (
+    AbstractBaseIdentityIntegrationWrapper,
+    iter_feature_state_values,
+)
 
+from .constants import SEGMENT_MAX_BATCH_SIZE
 from .models import SegmentConfiguration
 
 logger = logging.getLogger(__name__)
 
 
 class SegmentWrapper(AbstractBaseIdentityIntegrationWrapper):  # type: ignore[type-arg]
+    max_batch_size = SEGMENT_MAX_BATCH_SIZE
+
     def __init__(self, config: SegmentConfiguration):
         self.analytics = SegmentClient(
             write_key=config.api_key, sync_mode=True, host=config.base_url
         )
 
+    @property
+    def batch_key(self) -> typing.Hashable:
+        return (self.analytics.host, self.analytics.write_key)
+
     def _identify_user(self, data: dict) -> None:  # type: ignore[type-arg]
         self.analytics.identify(**data)
 
+    def _identify_users(self, user_data: list[dict]) -> None:  # type: ignore[type-arg]
+        # The client only builds the messages here; they are sent together
+        # to the batch endpoint it would otherwise post each one to.
+        message_builder = SegmentClient(
+            write_key=self.analytics.write_key,
+            host=self.analytics.host,
+            sync_mode=True,
+            send=False,
+        )
+        segment_post(
+            self.analytics.write_key,
+            host=self.analytics.host,
+            timeout=self.analytics.timeout,
+            batch=[message_builder.identify(**data)[1] for data in user_data],
+        )
+
     def generate_user_data(
         self,
         identity: Identity,
@@ -30,8 +57,7 @@ class SegmentWrapper(AbstractBaseIdentityIntegrationWrapper):  # type: ignore[ty
     ) -> dict:  # type: ignore[type-arg]
         feature_properties = {}
 
-        for feature_state in feature_states:
-            value = feature_state.get_feature_state_value(identity=identity)
+        for feature_state, value in iter_feature_state_values(identity, feature_states):
             feature_properties[feature_state.feature.name] = (
                 value
                 if (feature_state.enabled and value is not None)
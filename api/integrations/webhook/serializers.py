@@ -28,6 +28,9 @@ class SegmentSerializer(serializers.ModelSerializer):  # type: ignore[type-arg]
         fields = ("id", "name", "member")
 
     def get_member(self, obj: Segment) -> bool:
+        if (member_segment_ids := self.context.get("member_segment_ids")) is not None:
+            return obj.pk in member_segment_ids
+
         identity = self.context["identity"]
         context = map_environment_to_evaluation_context(
             identity=identity,
@@ -39,10 +39,15 @@ class WebhookWrapper(AbstractBaseIdentityIntegrationWrapper):  # type: ignore[ty
         serialized_traits = TraitSerializerBasic(
             trait_models or identity.identity_traits.all(), many=True
         )
+        segments = identity.environment.project.get_segments_from_cache()
+        # Membership of every segment is evaluated at once, not per segment.
+        member_segment_ids = {
+            segment.pk for segment in identity.get_segments(all_segments=segments)
+        }
         serialized_segments = SegmentSerializer(
-            identity.environment.project.get_segments_from_cache(),
+            segments,
             many=True,
-            context={"identity": identity},
+            context={"identity": identity, "member_segment_ids": member_segment_ids},
         )
 
         data = {
@@ -7,7 +7,6 @@ from django.db.models import Q
 
 from edge_api.identities import edge_identity_service
 from environments.models import Environment
-from features.models import Feature
 from metrics.constants import DEFAULT_METRIC_DEFINITIONS, WORKFLOW_METRIC_DEFINITIONS
 from metrics.types import EnvMetricsName, EnvMetricsPayload, MetricDefinition
 
@@ -81,29 +80,11 @@ class EnvironmentMetricsService:
                 lambda: self._get_active_identity_edge_overrides_count()
             )
             if self.uses_dynamo
-            else (lambda: self.environment.get_identity_overrides_queryset().count()),
+            else (lambda: self.environment.get_identity_overrides_count()),
         }
 
     def _get_active_identity_edge_overrides_count(self) -> int:
-        environment_feature_ids = set(
-            Feature.objects.filter(
-                project=self.environment.project,
-                is_archived=False,
-                deleted_at__isnull=True,
-            ).values_list("id", flat=True)
-        )
-
-        all_overrides = edge_identity_service.get_edge_identity_overrides(
-            environment_id=self.environment.id,
-            feature_id=None,
-        )
-
-        count = 0
-        for override in all_overrides:
-            if override.feature_state.feature.id in environment_feature_ids:
-                count += 1
-
-        return count
+        return edge_identity_service.get_edge_identity_overrides_count(self.environment)
 
     def _get_feature_metrics(
         self,
@@ -182,15 +182,15 @@ class Organisation(LifecycleModelMixin, SoftDeleteExportableModel):  # type: ign
 
     @hook(AFTER_SAVE)
     def clear_environment_caches(self):  # type: ignore[no-untyped-def]
-        from environments.models import Environment
+        from environments.models import Environment, environment_local_cache
 
-        environment_cache.delete_many(
-            list(
-                Environment.objects.filter(project__organisation=self).values_list(
-                    "api_key", flat=True
-                )
+        api_keys = list(
+            Environment.objects.filter(project__organisation=self).values_list(
+                "api_key", flat=True
             )
         )
+        environment_cache.delete_many(api_keys)
+        environment_local_cache.invalidate(api_keys)
 
     @hook(AFTER_SAVE, when="stop_serving_flags", has_changed=True)
     def rebuild_environments(self):  # type: ignore[no-untyped-def]
@@ -160,9 +160,11 @@ class Project(LifecycleModelMixin, SoftDeleteExportableModel):  # type: ignore[d
 
     @hook(AFTER_SAVE)
     def clear_environments_cache(self):  # type: ignore[no-untyped-def]
-        environment_cache.delete_many(
-            list(self.environments.values_list("api_key", flat=True))
-        )
+        from environments.models import environment_local_cache
+
+        api_keys = list(self.environments.values_list("api_key", flat=True))
+        environment_cache.delete_many(api_keys)
+        environment_local_cache.invalidate(api_keys)
 
     @hook(  # type: ignore[misc]
         AFTER_SAVE,
@@ -4,32 +4,80 @@ from django.apps import apps
 from django.conf import settings
 from django.core.cache import caches
 
+from core.local_cache import LocalCache
+
 if typing.TYPE_CHECKING:
     from django.db.models import QuerySet
+    from flag_engine.context.types import SegmentContext
 
     from segments.models import Segment
+    from segments.types import SegmentEngineMetadata
 
 project_segments_cache = caches[settings.PROJECT_SEGMENTS_CACHE_LOCATION]
 
+# Segments mapped to flag engine segment contexts, keyed on project id
+project_segment_contexts_local_cache = LocalCache(
+    name="project-segment-contexts",
+    timeout=settings.CACHE_PROJECT_SEGMENT_CONTEXTS_SECONDS,
+    max_entries=settings.ENVIRONMENT_LOCAL_CACHE_MAX_ENTRIES,
+)
 
-def get_project_segments_from_cache(project_id: int) -> "QuerySet[Segment]":
-    Segment = apps.get_model("segments", "Segment")
 
+def get_project_segments_from_cache(project_id: int) -> "QuerySet[Segment]":
     segments = project_segments_cache.get(project_id)
     if not segments:
-        # This is optimised to account for rules nested one levels deep (since we
-        # don't support anything above that from the UI at the moment). Anything
-        # past that will require additional queries / thought on how to optimise.
-        segments = Segment.live_objects.filter(project_id=project_id).prefetch_related(
-            "rules",
-            "rules__conditions",
-            "rules__rules",
-            "rules__rules__conditions",
-            "rules__rules__rules",
-        )
-
+        segments = _get_project_segments(project_id)
         project_segments_cache.set(
             project_id, segments, timeout=settings.CACHE_PROJECT_SEGMENTS_SECONDS
         )
 
     return segments  # type: ignore[no-any-return]
+
+
+def get_project_segment_contexts_from_cache(
+    project_id: int,
+) -> "dict[str, SegmentContext[SegmentEngineMetadata, object]]":
+    """
+    Get the project's segments as flag engine segment contexts, keyed on
+    segment key, ready to be added to an evaluation context.
+    """
+    from util.mappers.engine import map_segment_to_segment_context
+
+    segment_contexts: "dict[str, SegmentContext[SegmentEngineMetadata, object]] | None" = project_segment_contexts_local_cache.get(
+        str(project_id)
+    )
+    if segment_contexts is None:
+        # The segments cache is private to each process, and so isn't
+        # invalidated along with the contexts in other processes.
+        segments = (
+            _get_project_segments(project_id)
+            if project_segment_contexts_local_cache.is_enabled
+            else get_project_segments_from_cache(project_id)
+        )
+        segment_contexts = {
+            str(segment.pk): map_segment_to_segment_context(segment)
+            for segment in segments
+        }
+        project_segment_contexts_local_cache.set(str(project_id), segment_contexts)
+    return segment_contexts
+
+
+def invalidate_project_segment_contexts_cache(project_id: int) -> None:
+    project_segments_cache.delete(project_id)
+    project_segment_contexts_local_cache.invalidate([str(project_id)])
+
+
+def _get_project_segments(project_id: int) -> "QuerySet[Segment]":
+    Segment = apps.get_model("segments", "Segment")
+
+    # This is optimised to account for rules nested one levels deep (since we
+    # don't support anything above that from the UI at the moment). Anything
+    # past that will require additional queries / thought on how to optimise.
+    segments = Segment.live_objects.filter(project_id=project_id).prefetch_related(
+        "rules",
+        "rules__conditions",
+        "rules__rules",
+        "rules__rules__conditions",
+        "rules__rules__rules",
+    )
+    return segments  # type: ignore[no-any-return]
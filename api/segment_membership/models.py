@@ -2,6 +2,7 @@ from django.db import models
 
 from environments.models import Environment
 from organisations.models import Organisation
+from projects.models import Project
 from segments.models import Segment
 
 
@@ -42,3 +43,21 @@ class SegmentMembershipSeed(models.Model):
         related_name="+",
     )
     seeded_at = models.DateTimeField(null=True)
+
+
+class SegmentMembershipWatermark(models.Model):
+    """Tracks how far a project's membership counts are up to date, so that
+    incremental refreshes only count the identities ingested since.
+
+    `identities_ingested_until` is in ClickHouse time, and bounds the
+    `IDENTITIES.ingested_at` of the rows counted so far. Segments updated
+    after `segments_counted_at` are recounted in full."""
+
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    identities_ingested_until = models.DateTimeField()
+    segments_counted_at = models.DateTimeField()
+    fully_counted_at = models.DateTimeField()
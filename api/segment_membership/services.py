@@ -1,8 +1,11 @@
+from collections import defaultdict
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Iterator
 
 import structlog
+from django.conf import settings
+from django.core.cache import caches
 from django.db import connections
 from django.db.backends.utils import CursorWrapper
 from django.db.models import Q
@@ -20,7 +23,10 @@ from environments.models import Environment
 from integrations.flagsmith.client import get_openfeature_client
 from organisations.models import Organisation
 from projects.models import Project
-from segment_membership.models import SegmentMembershipCount
+from segment_membership.models import (
+    SegmentMembershipCount,
+    SegmentMembershipWatermark,
+)
 from segment_membership.types import ClickHouseReadIdentityRow, SegmentMember
 from segments.models import Segment
 from util.engine_models.context.mappers import map_segment_to_segment_context
@@ -28,6 +34,8 @@ from util.mappers.engine import map_segment_to_engine
 
 logger = structlog.get_logger("segment_membership")
 
+segment_predicates_cache = caches[settings.SEGMENT_PREDICATES_CACHE_NAME]
+
 
 def is_membership_enabled(organisation: Organisation) -> bool:
     """Resolve the per-org segment-membership inspection flag, default False."""
@@ -106,14 +114,29 @@ def get_projects_to_process() -> Iterator[Project]:
         yield project
 
 
+def get_clickhouse_now(cursor: CursorWrapper) -> datetime:
+    """Return the current ClickHouse time, to compare with `ingested_at`
+    without depending on the clocks of ClickHouse and the API agreeing."""
+    cursor.execute("SELECT toUnixTimestamp(now())")
+    (timestamp,) = cursor.fetchone()
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
 def compute_segment_counts_for_project(
-    project: Project, cursor: CursorWrapper
+    project: Project,
+    cursor: CursorWrapper,
+    segments: list[Segment] | None = None,
+    *,
+    ingested_until: datetime | None = None,
 ) -> list[SegmentMembershipCount]:
     """Count identity matches per (canonical-segment, environment) for
     `project`, scanning each environment once.
 
     A single `GROUP BY environment_id` over `IDENTITIES FINAL` counts every
-    segment in one pass via `countIf(<predicate>)` per segment.
+    segment in one pass via `countIf(<predicate>)` per segment. Provide
+    `segments` to only count those of the project's canonical segments.
+    Provide `ingested_until` to count identities in their latest version
+    ingested before it, so the count lines up with an incremental watermark.
 
     Returns unsaved `SegmentMembershipCount` instances with `count` and
     keys populated; the caller stamps `last_synced_at` consistently
@@ -122,50 +145,45 @@ def compute_segment_counts_for_project(
     ReplacingMergeTree to dedupe at read time so counts reflect the
     most-recent backfill regardless of merge state.
     """
-    segments = list(Segment.live_objects.filter(project=project))
+    if segments is None:
+        segments = list(Segment.live_objects.filter(project=project))
     env_id_by_key: dict[str, int] = dict(
         project.environments.values_list("api_key", "id"),
     )
     if not segments or not env_id_by_key:
         return []
 
-    dialect = ClickHouseDialect()
-    binder = Binder(PyformatParamStyle())
-    count_columns: list[str] = []
-    counted_segment_ids: list[int] = []
-    for seg in segments:
-        translate_ctx = TranslateContext(
-            evaluation_context=EvaluationContext(
-                environment={"key": "_count", "name": project.name}
-            ),
-            dialect=dialect,
-            binder=binder,
-        )
-        predicate = translate_segment(
-            map_segment_to_segment_context(map_segment_to_engine(seg)),
-            translate_ctx,
-        )
-        if predicate is None:
-            logger.error(
-                "compute.segment.skipped",
-                project__id=project.id,
-                segment__id=seg.id,
-                reason="untranslatable",
-            )
-            continue
-        count_columns.append(f"countIf({predicate}) AS c{seg.id}")
-        counted_segment_ids.append(seg.id)
-
+    count_columns, counted_segment_ids, params = _get_segment_count_columns(
+        project, segments
+    )
     if not count_columns:
         return []
 
+    query_params: dict[str, Any] = {"env_keys": tuple(env_id_by_key), **params}
+    if ingested_until is None:
+        identities_sql = "IDENTITIES AS i FINAL"
+    else:
+        # Same version resolution as `FINAL`, as of `ingested_until`. This
+        # doesn't sort all of the project's identities: the `ORDER BY` is
+        # prefixed with the table's sorting key, so ClickHouse reads the rows
+        # in order and only sorts the versions of each identity, and
+        # `LIMIT 1 BY` streams over them.
+        identities_sql = (
+            "(SELECT * FROM IDENTITIES "
+            "WHERE environment_id IN %(env_keys)s "
+            "AND ingested_at < toDateTime(%(until)s) "
+            "ORDER BY environment_id, identifier, inserted_at DESC, ingested_at DESC "
+            "LIMIT 1 BY environment_id, identifier) AS i"
+        )
+        query_params["until"] = int(ingested_until.timestamp())
+
     sql = (
         f"SELECT i.environment_id AS env_key, {', '.join(count_columns)} "
-        f"FROM IDENTITIES AS i FINAL "
+        f"FROM {identities_sql} "
         f"WHERE i.environment_id IN %(env_keys)s AND i.is_deleted = false "
         f"GROUP BY i.environment_id"
     )
-    cursor.execute(sql, {"env_keys": tuple(env_id_by_key), **binder.params})
+    cursor.execute(sql, query_params)
     rows: list[tuple[Any, ...]] = cursor.fetchall()
     membership_counts: list[SegmentMembershipCount] = []
     for row in rows:
@@ -185,6 +203,204 @@ def compute_segment_counts_for_project(
     return membership_counts
 
 
+def compute_segment_count_deltas_for_project(
+    project: Project,
+    cursor: CursorWrapper,
+    segments: list[Segment],
+    *,
+    ingested_since: datetime,
+    ingested_until: datetime,
+) -> dict[tuple[int, int], int]:
+    """Return the change in identity matches per (segment, environment) for
+    `project`, from the identities ingested between `ingested_since` and
+    `ingested_until`.
+
+    Only the identities with a row in that window are read, rather than
+    every identity of the project. Each one is counted in its latest version
+    ingested before `ingested_until`, and discounted in its latest version
+    ingested before `ingested_since`, so that new, updated and deleted
+    identities all net out. Pairs whose count is unchanged are absent.
+    """
+    env_id_by_key: dict[str, int] = dict(
+        project.environments.values_list("api_key", "id"),
+    )
+    if not segments or not env_id_by_key:
+        return {}
+
+    count_columns, counted_segment_ids, params = _get_segment_count_columns(
+        project, segments
+    )
+    if not count_columns:
+        return {}
+
+    changed_identities_sql = (
+        "SELECT environment_id, identifier FROM IDENTITIES "
+        "WHERE environment_id IN %(env_keys)s "
+        "AND ingested_at >= toDateTime(%(since)s) "
+        "AND ingested_at < toDateTime(%(until)s)"
+    )
+
+    def _latest_versions_sql(is_new: bool, ingested_before: str) -> str:
+        # Same version resolution as `FINAL`, as of `ingested_before`.
+        return (
+            f"SELECT *, {int(is_new)} AS is_new FROM IDENTITIES "
+            "WHERE environment_id IN %(env_keys)s "
+            f"AND ingested_at < toDateTime(%({ingested_before})s) "
+            f"AND (environment_id, identifier) IN ({changed_identities_sql}) "
+            "ORDER BY environment_id, identifier, inserted_at DESC, ingested_at DESC "
+            "LIMIT 1 BY environment_id, identifier"
+        )
+
+    sql = (
+        f"SELECT i.environment_id AS env_key, i.is_new, {', '.join(count_columns)} "
+        f"FROM ({_latest_versions_sql(True, 'until')} "
+        f"UNION ALL {_latest_versions_sql(False, 'since')}) AS i "
+        "WHERE i.is_deleted = false "
+        "GROUP BY i.environment_id, i.is_new"
+    )
+    cursor.execute(
+        sql,
+        {
+            "env_keys": tuple(env_id_by_key),
+            "since": int(ingested_since.timestamp()),
+            "until": int(ingested_until.timestamp()),
+            **params,
+        },
+    )
+    rows: list[tuple[Any, ...]] = cursor.fetchall()
+    deltas: dict[tuple[int, int], int] = defaultdict(int)
+    for row in rows:
+        env_id = env_id_by_key.get(str(row[0]))
+        if env_id is None:
+            continue
+        sign = 1 if row[1] else -1
+        for segment_id, count in zip(counted_segment_ids, row[2:]):
+            deltas[(segment_id, env_id)] += sign * int(count)
+    return {pair: delta for pair, delta in deltas.items() if delta}
+
+
+def compute_segment_counts_for_project_incrementally(
+    project: Project,
+    cursor: CursorWrapper,
+    watermark: SegmentMembershipWatermark,
+    *,
+    ingested_until: datetime,
+) -> list[SegmentMembershipCount]:
+    """Count identity matches per (canonical-segment, environment) for
+    `project`, building on the counts stored as of `watermark`.
+
+    Segments updated since `watermark.segments_counted_at` are recounted in
+    full, as of `ingested_until`. The stored counts of every other segment are adjusted with the
+    identities ingested since `watermark.identities_ingested_until`.
+
+    Returns unsaved `SegmentMembershipCount` instances, in the same shape as
+    `compute_segment_counts_for_project`.
+    """
+    updated_segments: list[Segment] = []
+    unchanged_segments: list[Segment] = []
+    for segment in Segment.live_objects.filter(project=project):
+        if segment.updated_at and segment.updated_at >= watermark.segments_counted_at:
+            updated_segments.append(segment)
+        else:
+            unchanged_segments.append(segment)
+
+    membership_counts = (
+        compute_segment_counts_for_project(
+            project, cursor, updated_segments, ingested_until=ingested_until
+        )
+        if updated_segments
+        else []
+    )
+    if not unchanged_segments:
+        return membership_counts
+
+    deltas = compute_segment_count_deltas_for_project(
+        project,
+        cursor,
+        unchanged_segments,
+        ingested_since=watermark.identities_ingested_until,
+        ingested_until=ingested_until,
+    )
+    counts = {
+        (segment_id, environment_id): count
+        for segment_id, environment_id, count in SegmentMembershipCount.objects.filter(
+            segment__in=unchanged_segments,
+            environment__in=project.environments.all(),
+        ).values_list("segment_id", "environment_id", "count")
+    }
+    for pair in counts.keys() | deltas.keys():
+        count = counts.get(pair, 0) + deltas.get(pair, 0)
+        # Zero-match pairs are absent, as for a full count.
+        if count > 0:
+            segment_id, environment_id = pair
+            membership_counts.append(
+                SegmentMembershipCount(
+                    segment_id=segment_id,
+                    environment_id=environment_id,
+                    count=count,
+                )
+            )
+    return membership_counts
+
+
+def get_segment_predicate(
+    segment: Segment,
+    project: Project,
+) -> tuple[str | None, dict[str, str]]:
+    """Translate `segment` to a predicate on `IDENTITIES AS i`, along with its
+    bound parameters, or `None` if it can't be translated.
+
+    Translations are cached for each version of a segment, and shared by the
+    membership counts and the members pages. Parameter names are namespaced
+    to the segment, so that predicates can be combined in one query.
+    """
+    updated_at = segment.updated_at and segment.updated_at.timestamp()
+    cache_key = f"{segment.id}:{segment.version}:{updated_at}"
+    cached: tuple[str | None, dict[str, str]] | None = segment_predicates_cache.get(
+        cache_key
+    )
+    if cached is not None:
+        return cached
+
+    binder = Binder(PyformatParamStyle(), prefix=f"s{segment.id}_")
+    translate_ctx = TranslateContext(
+        evaluation_context=EvaluationContext(
+            environment={"key": "_segment_membership", "name": project.name}
+        ),
+        dialect=ClickHouseDialect(),
+        binder=binder,
+    )
+    predicate = translate_segment(
+        map_segment_to_segment_context(map_segment_to_engine(segment)),
+        translate_ctx,
+    )
+    segment_predicates_cache.set(cache_key, (predicate, binder.params))
+    return predicate, binder.params
+
+
+def _get_segment_count_columns(
+    project: Project,
+    segments: list[Segment],
+) -> tuple[list[str], list[int], dict[str, str]]:
+    count_columns: list[str] = []
+    counted_segment_ids: list[int] = []
+    params: dict[str, str] = {}
+    for seg in segments:
+        predicate, predicate_params = get_segment_predicate(seg, project)
+        if predicate is None:
+            logger.error(
+                "compute.segment.skipped",
+                project__id=project.id,
+                segment__id=seg.id,
+                reason="untranslatable",
+            )
+            continue
+        count_columns.append(f"countIf({predicate}) AS c{seg.id}")
+        counted_segment_ids.append(seg.id)
+        params.update(predicate_params)
+    return count_columns, counted_segment_ids, params
+
+
 def get_segment_members_page(
     segment: Segment,
     environment: Environment,
@@ -199,18 +415,7 @@ def get_segment_members_page(
     Provide identifier as `cursor` to get a page after that identifier.
     Provide `q` to filter to identifiers containing it (case-insensitive).
     """
-    binder = Binder(PyformatParamStyle())
-    translate_ctx = TranslateContext(
-        evaluation_context=EvaluationContext(
-            environment={"key": "_members", "name": segment.project.name}
-        ),
-        dialect=ClickHouseDialect(),
-        binder=binder,
-    )
-    predicate = translate_segment(
-        map_segment_to_segment_context(map_segment_to_engine(segment)),
-        translate_ctx,
-    )
+    predicate, predicate_params = get_segment_predicate(segment, segment.project)
     if predicate is None:
         logger.error(
             "members.segment.skipped",
@@ -226,7 +431,7 @@ def get_segment_members_page(
     params: dict[str, Any] = {
         "env_key": environment.api_key,
         "limit": limit,
-        **binder.params,
+        **predicate_params,
     }
     if cursor:
         conditions.append("i.identifier > %(cursor)s")
@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import cast
 
 import structlog
@@ -22,10 +22,16 @@ from segment_membership.metrics import (
     flagsmith_segment_membership_refresh_duration_seconds,
     flagsmith_segment_membership_refresh_failures_total,
 )
-from segment_membership.models import SegmentMembershipCount, SegmentMembershipSeed
+from segment_membership.models import (
+    SegmentMembershipCount,
+    SegmentMembershipSeed,
+    SegmentMembershipWatermark,
+)
 from segment_membership.services import (
     compute_segment_counts_for_project,
+    compute_segment_counts_for_project_incrementally,
     enqueue_membership_refresh,
+    get_clickhouse_now,
     get_projects_to_process,
     is_membership_enabled,
     open_clickhouse_cursor,
@@ -201,7 +207,11 @@ def refresh_all_segment_counts() -> None:
 def refresh_project_segment_counts(project_id: int) -> None:
     """Compute per-segment match counts for one project and upsert into
     `SegmentMembershipCount`. Re-checks the org flag so a stale fan-out
-    skips orgs disabled since dispatch."""
+    skips orgs disabled since dispatch.
+
+    With incremental refreshes enabled, counts are only recomputed in full
+    once per `SEGMENT_MEMBERSHIP_FULL_REFRESH_INTERVAL_HOURS`, and otherwise
+    adjusted from the identities ingested since the previous refresh."""
     if not settings.CLICKHOUSE_ENABLED:
         logger.info(
             "refresh.project.skipped",
@@ -215,6 +225,7 @@ def refresh_project_segment_counts(project_id: int) -> None:
         deleted, _ = SegmentMembershipCount.objects.filter(
             segment__project=project
         ).delete()
+        SegmentMembershipWatermark.objects.filter(project=project).delete()
         logger.info(
             "refresh.project.skipped",
             project__id=project_id,
@@ -232,14 +243,42 @@ def refresh_project_segment_counts(project_id: int) -> None:
         flagsmith_segment_membership_refresh_duration_seconds.time(),
         open_clickhouse_cursor(log_comment=log_comment) as cursor,
     ):
+        now = timezone.now()
+        watermark: SegmentMembershipWatermark | None = None
+        ingested_until: datetime | None = None
         try:
-            membership_counts = compute_segment_counts_for_project(project, cursor)
+            if settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_ENABLED:
+                # Count, and save the watermark, up to a safety lag ago, so
+                # that the next refresh re-reads the identities that may not
+                # have been visible yet.
+                ingested_until = get_clickhouse_now(cursor) - timedelta(
+                    seconds=settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_LAG_SECONDS
+                )
+                watermark = SegmentMembershipWatermark.objects.filter(
+                    project=project,
+                    fully_counted_at__gt=now
+                    - timedelta(
+                        hours=settings.SEGMENT_MEMBERSHIP_FULL_REFRESH_INTERVAL_HOURS
+                    ),
+                ).first()
+            if watermark and ingested_until:
+                membership_counts = compute_segment_counts_for_project_incrementally(
+                    project,
+                    cursor,
+                    watermark,
+                    ingested_until=ingested_until,
+                )
+            else:
+                # Bound by the watermark saved below, so the identities
+                # ingested meanwhile are left to the next incremental refresh.
+                membership_counts = compute_segment_counts_for_project(
+                    project, cursor, ingested_until=ingested_until
+                )
         except Exception:
             flagsmith_segment_membership_refresh_failures_total.inc()
             logger.exception("refresh.project.failed", project__id=project_id)
             return
 
-        now = timezone.now()
         for m in membership_counts:
             m.last_synced_at = now
 
@@ -263,9 +302,21 @@ def refresh_project_segment_counts(project_id: int) -> None:
             unique_fields=["segment", "environment"],
             update_fields=["count", "last_synced_at"],
         )
+        if settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_ENABLED:
+            SegmentMembershipWatermark.objects.update_or_create(
+                project=project,
+                defaults={
+                    "identities_ingested_until": ingested_until,
+                    "segments_counted_at": now,
+                    "fully_counted_at": watermark.fully_counted_at
+                    if watermark
+                    else now,
+                },
+            )
         logger.info(
             "refresh.project.completed",
             project__id=project_id,
+            is_incremental=watermark is not None,
             membership_counts__count=len(membership_counts),
             stale_counts__count=stale_deleted,
         )
@@ -9,6 +9,8 @@ from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django_lifecycle import (  # type: ignore[import-untyped]
     AFTER_CREATE,
+    AFTER_DELETE,
+    AFTER_SAVE,
     LifecycleModelMixin,
     hook,
 )
@@ -28,6 +30,7 @@ from core.models import (
 from features.models import Feature
 from metadata.models import Metadata
 from projects.models import Project
+from projects.services import invalidate_project_segment_contexts_cache
 from segments.services import copy_segment_rules_and_conditions
 
 ModelT = typing.TypeVar("ModelT", bound=models.Model)
@@ -148,6 +151,16 @@ class Segment(
         self.version_of = self
         self.save_without_historical_record()
 
+    @hook(AFTER_SAVE)  # type: ignore[misc]
+    @hook(AFTER_DELETE)  # type: ignore[misc]
+    def clear_project_segment_contexts_cache(self) -> None:
+        # Rules and conditions are written after the segment itself, so wait
+        # for them to be committed before the contexts can be rebuilt.
+        project_id = self.project_id
+        transaction.on_commit(
+            lambda: invalidate_project_segment_contexts_cache(project_id)
+        )
+
     @transaction.atomic
     def clone(self, is_revision: bool = False, **extra_attrs: typing.Any) -> "Segment":
         """
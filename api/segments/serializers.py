@@ -145,7 +145,10 @@ class SegmentSerializer(MetadataSerializerMixin, WritableNestedModelSerializer):
 
     def create(self, validated_data: dict[str, Any]):  # type: ignore[no-untyped-def]
         metadata_data = validated_data.pop("metadata", [])
-        segment = super().create(validated_data)  # type: ignore[no-untyped-call]
+        # Write the segment and its rules together, so that caches of the
+        # project's segments are invalidated once both are committed.
+        with transaction.atomic():
+            segment = super().create(validated_data)  # type: ignore[no-untyped-call]
         self._update_metadata(segment, metadata_data)
         enqueue_membership_refresh(segment.project)
         return segment
@@ -5,6 +5,7 @@ from django.db import models, transaction
 from django.utils import timezone
 
 from core.dataclasses import AuthorData
+from projects.services import invalidate_project_segment_contexts_cache
 
 if typing.TYPE_CHECKING:
     from segments.models import Segment
@@ -66,6 +67,8 @@ def delete_segment(
         SegmentRule.objects.filter(id__in=all_rule_ids_list).update(deleted_at=now)
         Segment.objects.filter(id__in=segment_ids).update(deleted_at=now)
 
+    invalidate_project_segment_contexts_cache(project_id)
+
     create_segment_deleted_audit_log.delay(
         args=(
             project_id,
@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta
 
 import pytest
+from django.db import connections
 from django.utils import timezone
 from freezegun.api import FrozenDateTimeFactory
+from pytest_django import DjangoAssertNumQueries
 from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
@@ -19,6 +21,7 @@ from app_analytics.tasks import (
     populate_feature_evaluation_bucket,
     track_feature_evaluations_by_environment,
     track_request,
+    track_requests,
 )
 from app_analytics.types import TrackFeatureEvaluationsByEnvironmentData
 from environments.models import Environment
@@ -205,6 +208,114 @@ def test_track_request__influx__calls_expected(
     )
 
 
+def test_track_requests__postgres__bulk_inserts_expected(
+    settings: SettingsWrapper,
+    environment: Environment,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+    host = "testserver"
+    labels = {"client_application_name": "test-app"}
+
+    # the environment is cached, as it would be after serving the requests
+    Environment.get_from_cache(environment.api_key)
+
+    # When
+    with django_assert_num_queries(1, connection=connections["analytics"]):
+        track_requests(
+            requests=[
+                {
+                    "resource": Resource.FLAGS.value,
+                    "host": host,
+                    "environment_key": environment.api_key,
+                    "count": 10,
+                    "labels": {},
+                },
+                {
+                    "resource": Resource.IDENTITIES.value,
+                    "host": host,
+                    "environment_key": environment.api_key,
+                    "count": 5,
+                    "labels": labels,  # type: ignore[typeddict-item]
+                },
+                {
+                    "resource": Resource.FLAGS.value,
+                    "host": host,
+                    "environment_key": "unknown",
+                    "count": 1,
+                    "labels": {},
+                },
+            ]
+        )
+
+    # Then
+    assert list(
+        APIUsageRaw.objects.order_by("resource").values(
+            "resource", "host", "environment_id", "count", "labels"
+        )
+    ) == [
+        {
+            "resource": Resource.FLAGS,
+            "host": host,
+            "environment_id": environment.id,
+            "count": 10,
+            "labels": {},
+        },
+        {
+            "resource": Resource.IDENTITIES,
+            "host": host,
+            "environment_id": environment.id,
+            "count": 5,
+            "labels": labels,
+        },
+    ]
+
+
+def test_track_requests__influx__calls_expected(
+    db: None,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+    environment: Environment,
+) -> None:
+    # Given
+    settings.INFLUXDB_TOKEN = "test_token"
+    track_request_influxdb_mock = mocker.patch(
+        "app_analytics.tasks.track_request_influxdb",
+        autospec=True,
+    )
+    host = "testserver"
+
+    # When
+    track_requests(
+        requests=[
+            {
+                "resource": Resource.FLAGS.value,
+                "host": host,
+                "environment_key": environment.api_key,
+                "count": 10,
+                "labels": {},
+            },
+            {
+                "resource": Resource.FLAGS.value,
+                "host": host,
+                "environment_key": "unknown",
+                "count": 1,
+                "labels": {},
+            },
+        ]
+    )
+
+    # Then
+    track_request_influxdb_mock.assert_called_once_with(
+        resource=Resource.FLAGS,
+        host=host,
+        environment=environment,
+        count=10,
+        labels={},
+    )
+
+
 @pytest.mark.use_analytics_db
 def test_track_feature_evaluations_by_environment__postgres__inserts_expected(
     settings: SettingsWrapper,
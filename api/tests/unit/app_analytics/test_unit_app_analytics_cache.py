@@ -1,6 +1,6 @@
-from django.utils import timezone
-from freezegun import freeze_time
-from pytest_django.fixtures import SettingsWrapper
+import threading
+
+import pytest
 from pytest_mock import MockerFixture
 
 from app_analytics.cache import APIUsageCache, FeatureEvaluationCache
@@ -8,100 +8,141 @@ from app_analytics.models import Resource
 from app_analytics.types import TrackFeatureEvaluationsByEnvironmentData
 
 
-def test_api_usage_cache__cache_interval_elapsed__flushes_tracked_requests(
+@pytest.fixture()
+def mock_ensure_flusher(mocker: MockerFixture) -> None:
+    mocker.patch("app_analytics.cache._ShardedCounterCache._ensure_flusher")
+
+
+def test_api_usage_cache__flush__flushes_tracked_requests(
+    mock_ensure_flusher: None,
     mocker: MockerFixture,
-    settings: SettingsWrapper,
 ) -> None:
     # Given
-    settings.API_USAGE_CACHE_SECONDS = 60
-
     cache = APIUsageCache()
-    now = timezone.now()
-    mocked_track_request_task = mocker.patch("app_analytics.cache.track_request")
+    mocked_track_requests_task = mocker.patch("app_analytics.cache.track_requests")
     host = "host"
     environment_key_1 = "environment_key_1"
     environment_key_2 = "environment_key_2"
 
-    with freeze_time(now) as frozen_time:
-        # Make some tracking requests
-        for _ in range(10):
-            for resource in Resource:
-                cache.track_request(
-                    resource=resource,
-                    host=host,
-                    environment_key=environment_key_1,
-                    labels={},
-                )
-                cache.track_request(
-                    resource=resource,
-                    host=host,
-                    environment_key=environment_key_2,
-                    labels={},
-                )
-
-        # make sure track_request task was not called
-        assert not mocked_track_request_task.called
-
-        # When
-        frozen_time.tick(settings.API_USAGE_CACHE_SECONDS + 1)
-
-        # let's track another request(to trigger flush)
-        cache.track_request(
-            resource=Resource.FLAGS,
-            host=host,
-            environment_key=environment_key_1,
-            labels={},
-        )
-
-        # Then - track request lambda was called for every resource and environment_key combination
-        expected_calls = []
+    for _ in range(10):
         for resource in Resource:
-            expected_calls.append(
-                mocker.call(
-                    kwargs={
-                        "resource": resource.value,
-                        "host": host,
-                        "environment_key": environment_key_1,
-                        "count": 11 if resource == Resource.FLAGS else 10,
-                        "labels": {},
-                    }
-                )
+            cache.track_request(
+                resource=resource,
+                host=host,
+                environment_key=environment_key_1,
+                labels={},
+            )
+            cache.track_request(
+                resource=resource,
+                host=host,
+                environment_key=environment_key_2,
+                labels={},
+            )
+
+    # track requests are not flushed inline
+    assert not mocked_track_requests_task.called
+
+    # When
+    cache.flush()
+
+    # Then
+    expected_requests = []
+    for resource in Resource:
+        for environment_key in (environment_key_1, environment_key_2):
+            expected_requests.append(
+                {
+                    "resource": resource.value,
+                    "host": host,
+                    "environment_key": environment_key,
+                    "count": 10,
+                    "labels": {},
+                }
             )
-            expected_calls.append(
-                mocker.call(
-                    kwargs={
-                        "resource": resource.value,
-                        "host": host,
-                        "environment_key": environment_key_2,
-                        "count": 10,
-                        "labels": {},
-                    }
-                )
+    # all buffered counts are flushed in a single batch
+    mocked_track_requests_task.run_in_thread.assert_called_once()
+    requests = mocked_track_requests_task.run_in_thread.call_args.kwargs["kwargs"][
+        "requests"
+    ]
+    assert sorted(requests, key=repr) == sorted(expected_requests, key=repr)
+
+    # and the buffer is empty afterwards
+    mocked_track_requests_task.reset_mock()
+    cache.flush()
+    assert not mocked_track_requests_task.called
+
+
+def test_api_usage_cache__requests_tracked_from_many_threads__flushes_total_count(
+    mock_ensure_flusher: None,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    cache = APIUsageCache()
+    mocked_track_requests_task = mocker.patch("app_analytics.cache.track_requests")
+
+    def track_requests() -> None:
+        for _ in range(100):
+            cache.track_request(
+                resource=Resource.FLAGS,
+                host="host",
+                environment_key="environment_key",
+                labels={},
             )
-        mocked_track_request_task.run_in_thread.assert_has_calls(expected_calls)
 
-        # Next, let's reset the mock
-        mocked_track_request_task.reset_mock()
+    threads = [threading.Thread(target=track_requests) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # When
+    cache.flush()
+
+    # Then
+    mocked_track_requests_task.run_in_thread.assert_called_once_with(
+        kwargs={
+            "requests": [
+                {
+                    "resource": Resource.FLAGS.value,
+                    "host": "host",
+                    "environment_key": "environment_key",
+                    "count": 2000,
+                    "labels": {},
+                }
+            ]
+        }
+    )
+
 
-        # and track another request
+def test_api_usage_cache__track_request__starts_flusher_thread_once(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    cache = APIUsageCache()
+    mock_thread = mocker.patch("app_analytics.cache.threading.Thread")
+
+    # When
+    for _ in range(3):
         cache.track_request(
             resource=Resource.FLAGS,
-            host=host,
-            environment_key=environment_key_1,
+            host="host",
+            environment_key="environment_key",
             labels={},
         )
 
-        # finally, make sure track_request task was not called
-        assert not mocked_track_request_task.called
+    # Then
+    mock_thread.assert_called_once_with(
+        target=cache._run_flusher,
+        name="api-usage-cache-flusher",
+        daemon=True,
+    )
+    mock_thread.return_value.start.assert_called_once_with()
 
 
-def test_feature_evaluation_cache__cache_interval_elapsed__flushes_tracked_evaluations(
+def test_feature_evaluation_cache__flush__flushes_tracked_evaluations(
+    mock_ensure_flusher: None,
     mocker: MockerFixture,
-    settings: SettingsWrapper,
 ) -> None:
     # Given
-    settings.FEATURE_EVALUATION_CACHE_SECONDS = 60
-
     mocked_track_evaluation_task = mocker.patch(
         "app_analytics.cache.track_feature_evaluations_by_environment"
     )
@@ -111,105 +152,73 @@ def test_feature_evaluation_cache__cache_interval_elapsed__flushes_tracked_evalu
     feature_2_name = "feature_2_name"
 
     cache = FeatureEvaluationCache()
-    now = timezone.now()
-
-    with freeze_time(now) as frozen_time:
-        # Track some feature evaluations
-        for _ in range(10):
-            cache.track_feature_evaluation(
-                environment_id=environment_1_id,
-                feature_name=feature_1_name,
-                evaluation_count=1,
-                labels={},
-            )
-            cache.track_feature_evaluation(
-                environment_id=environment_1_id,
-                feature_name=feature_2_name,
-                evaluation_count=1,
-                labels={},
-            )
-            cache.track_feature_evaluation(
-                environment_id=environment_2_id,
-                feature_name=feature_2_name,
-                evaluation_count=1,
-                labels={},
-            )
 
-        # When
-        frozen_time.tick(settings.FEATURE_EVALUATION_CACHE_SECONDS + 1)
-
-        # track another evaluation(to trigger cache flush)
+    for _ in range(10):
         cache.track_feature_evaluation(
             environment_id=environment_1_id,
             feature_name=feature_1_name,
             evaluation_count=1,
             labels={},
         )
-
         cache.track_feature_evaluation(
             environment_id=environment_1_id,
-            feature_name=feature_1_name,
+            feature_name=feature_2_name,
             evaluation_count=1,
-            labels={"client_application_name": "test-app"},
+            labels={},
         )
-
-        # move time forward again
-        frozen_time.tick(settings.FEATURE_EVALUATION_CACHE_SECONDS + 1)
-
-        # track another one(to trigger cache flush)
         cache.track_feature_evaluation(
-            environment_id=environment_1_id,
-            feature_name=feature_1_name,
+            environment_id=environment_2_id,
+            feature_name=feature_2_name,
             evaluation_count=1,
             labels={},
         )
+    cache.track_feature_evaluation(
+        environment_id=environment_1_id,
+        feature_name=feature_1_name,
+        evaluation_count=1,
+        labels={"client_application_name": "test-app"},
+    )
 
-        # Then
-        assert mocked_track_evaluation_task.delay.call_args_list == [
-            mocker.call(
-                kwargs={
-                    "environment_id": 1,
-                    "feature_evaluations": [
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_1_name",
-                            labels={},
-                            evaluation_count=11,
-                        ),
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_2_name",
-                            labels={},
-                            evaluation_count=10,
-                        ),
-                    ],
-                }
-            ),
-            mocker.call(
-                kwargs={
-                    "environment_id": 2,
-                    "feature_evaluations": [
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_2_name",
-                            labels={},
-                            evaluation_count=10,
-                        )
-                    ],
-                }
-            ),
-            mocker.call(
-                kwargs={
-                    "environment_id": 1,
-                    "feature_evaluations": [
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_1_name",
-                            labels={"client_application_name": "test-app"},
-                            evaluation_count=1,
-                        ),
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_1_name",
-                            labels={},
-                            evaluation_count=1,
-                        ),
-                    ],
-                }
-            ),
-        ]
+    # evaluations are not flushed inline
+    assert not mocked_track_evaluation_task.called
+
+    # When
+    cache.flush()
+
+    # Then
+    assert mocked_track_evaluation_task.delay.call_args_list == [
+        mocker.call(
+            kwargs={
+                "environment_id": 1,
+                "feature_evaluations": [
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_1_name",
+                        labels={},
+                        evaluation_count=10,
+                    ),
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_2_name",
+                        labels={},
+                        evaluation_count=10,
+                    ),
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_1_name",
+                        labels={"client_application_name": "test-app"},
+                        evaluation_count=1,
+                    ),
+                ],
+            }
+        ),
+        mocker.call(
+            kwargs={
+                "environment_id": 2,
+                "feature_evaluations": [
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_2_name",
+                        labels={},
+                        evaluation_count=10,
+                    )
+                ],
+            }
+        ),
+    ]
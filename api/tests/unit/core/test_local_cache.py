@@ -0,0 +1,219 @@
+import json
+from typing import Generator
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
+from redis.exceptions import RedisError
+
+from core import local_cache
+from core.local_cache import (
+    INVALIDATION_CHANNEL,
+    LocalCache,
+    handle_invalidation_message,
+)
+
+
+@pytest.fixture()
+def cache() -> Generator[LocalCache, None, None]:
+    cache = LocalCache(name="test-local-cache", timeout=60, max_entries=2)
+    yield cache
+    local_cache._local_caches.pop(cache.name, None)
+
+
+@pytest.fixture()
+def mock_redis_client(
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+) -> Generator[MagicMock, None, None]:
+    settings.ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL = "redis://localhost:6379"
+    local_cache._get_client.cache_clear()
+    mock_from_url = mocker.patch("core.local_cache.Redis.from_url")
+    mocker.patch("core.local_cache._ensure_invalidation_subscriber")
+    yield mock_from_url.return_value
+    local_cache._get_client.cache_clear()
+
+
+def test_local_cache_get__key_set__returns_value(cache: LocalCache) -> None:
+    # Given
+    cache.set("key", "value")
+
+    # When
+    result = cache.get("key")
+
+    # Then
+    assert result == "value"
+
+
+def test_local_cache_get__copy_values__returns_copy_per_call() -> None:
+    # Given
+    copying_cache = LocalCache(
+        name="test-copying-local-cache", timeout=60, max_entries=2, copy_values=True
+    )
+    value = {"key": ["value"]}
+    copying_cache.set("key", value)
+    value["key"].append("mutated")
+
+    # When
+    first_result = copying_cache.get("key")
+    first_result["key"].append("mutated")
+    second_result = copying_cache.get("key")
+
+    # Then
+    assert second_result == {"key": ["value"]}
+    assert second_result is not first_result
+    local_cache._local_caches.pop(copying_cache.name, None)
+
+
+def test_local_cache_get__entry_expired__returns_none(
+    cache: LocalCache,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocked_monotonic = mocker.patch("core.local_cache.time.monotonic")
+    mocked_monotonic.return_value = 100.0
+    cache.set("key", "value")
+    mocked_monotonic.return_value = 100.0 + cache.timeout
+
+    # When
+    result = cache.get("key")
+
+    # Then
+    assert result is None
+
+
+def test_local_cache_set__max_entries_exceeded__evicts_least_recently_used(
+    cache: LocalCache,
+) -> None:
+    # Given
+    cache.set("key-1", "value-1")
+    cache.set("key-2", "value-2")
+    cache.get("key-1")
+
+    # When
+    cache.set("key-3", "value-3")
+
+    # Then
+    assert cache.get("key-1") == "value-1"
+    assert cache.get("key-2") is None
+    assert cache.get("key-3") == "value-3"
+
+
+def test_local_cache_get__timeout_zero__returns_none() -> None:
+    # Given
+    cache = LocalCache(name="test-disabled-local-cache", timeout=0, max_entries=10)
+    cache.set("key", "value")
+
+    # When
+    result = cache.get("key")
+
+    # Then
+    assert result is None
+
+
+def test_local_cache_invalidate__redis_url_not_set__deletes_local_entries(
+    cache: LocalCache,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mock_get_client = mocker.patch("core.local_cache._get_client")
+    cache.set("key", "value")
+
+    # When
+    cache.invalidate(["key"])
+
+    # Then
+    assert cache.get("key") is None
+    mock_get_client.assert_not_called()
+
+
+def test_local_cache_invalidate__redis_url_set__publishes_invalidation(
+    cache: LocalCache,
+    mock_redis_client: MagicMock,
+) -> None:
+    # Given
+    cache.set("key", "value")
+
+    # When
+    cache.invalidate(["key"])
+
+    # Then
+    assert cache.get("key") is None
+    mock_redis_client.publish.assert_called_once_with(
+        INVALIDATION_CHANNEL,
+        json.dumps({"cache": cache.name, "keys": ["key"]}),
+    )
+
+
+def test_local_cache_invalidate__publish_fails__logs_exception(
+    cache: LocalCache,
+    mock_redis_client: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    # Given
+    mock_redis_client.publish.side_effect = RedisError
+
+    # When
+    cache.invalidate(["key"])
+
+    # Then
+    assert "Failed to publish local cache invalidation." in caplog.text
+
+
+def test_handle_invalidation_message__known_cache__deletes_keys(
+    cache: LocalCache,
+) -> None:
+    # Given
+    cache.set("key-1", "value-1")
+    cache.set("key-2", "value-2")
+
+    # When
+    handle_invalidation_message(json.dumps({"cache": cache.name, "keys": ["key-1"]}))
+
+    # Then
+    assert cache.get("key-1") is None
+    assert cache.get("key-2") == "value-2"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"not-json", json.dumps({"cache": "unknown-cache", "keys": ["key"]})],
+)
+def test_handle_invalidation_message__invalid_message__ignores_message(
+    cache: LocalCache,
+    data: bytes | str,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    # Given
+    cache.set("key", "value")
+
+    # When
+    handle_invalidation_message(data)
+
+    # Then
+    assert cache.get("key") == "value"
+    assert "Ignoring malformed local cache invalidation message." in caplog.text
+
+
+def test_local_cache_get__redis_url_set__starts_subscriber_once_per_process(
+    cache: LocalCache,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.ENVIRONMENT_LOCAL_CACHE_INVALIDATION_REDIS_URL = "redis://localhost:6379"
+    mocker.patch("core.local_cache._subscriber_pid", None)
+    mock_thread = mocker.patch("core.local_cache.threading.Thread")
+
+    # When
+    cache.get("key")
+    cache.get("key")
+
+    # Then
+    mock_thread.assert_called_once_with(
+        target=local_cache._run_invalidation_subscriber,
+        name="local-cache-invalidation-subscriber",
+        daemon=True,
+    )
+    mock_thread.return_value.start.assert_called_once_with()
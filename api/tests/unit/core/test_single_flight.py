@@ -0,0 +1,244 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
+
+from core.single_flight import (
+    FRESH_KEY_SUFFIX,
+    LEASE_KEY_SUFFIX,
+    get_or_set,
+    refresh,
+)
+
+
+@pytest.fixture()
+def cache() -> LocMemCache:
+    cache = LocMemCache("test-single-flight", {})
+    cache.clear()
+    return cache
+
+
+def test_get_or_set__value_in_cache__returns_cached_value(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    cache.set("key", "cached")
+    compute = MagicMock()
+
+    # When
+    result = get_or_set(cache, "key", compute)
+
+    # Then
+    assert result == ("cached", True)
+    compute.assert_not_called()
+
+
+def test_get_or_set__cache_miss__computes_and_sets_value(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    compute = MagicMock(return_value="computed")
+
+    # When
+    result = get_or_set(cache, "key", compute, timeout=30)
+
+    # Then
+    assert result == ("computed", False)
+    assert cache.get("key") == "computed"
+    assert cache.get(f"key{LEASE_KEY_SUFFIX}") is None
+    compute.assert_called_once_with()
+
+
+def test_get_or_set__concurrent_misses__computes_once(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    started = threading.Event()
+    release = threading.Event()
+    compute_calls = []
+
+    def compute() -> str:
+        compute_calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "computed"
+
+    results: list[tuple[str, bool]] = []
+    leader = threading.Thread(
+        target=lambda: results.append(get_or_set(cache, "key", compute))
+    )
+    leader.start()
+    started.wait(timeout=5)
+
+    # When
+    followers = [
+        threading.Thread(
+            target=lambda: results.append(get_or_set(cache, "key", compute))
+        )
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    release.set()
+    for thread in (leader, *followers):
+        thread.join(timeout=5)
+
+    # Then
+    assert len(compute_calls) == 1
+    assert results == [("computed", False)] * 4
+
+
+def test_get_or_set__compute_raises__propagates_and_releases_lease(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    compute = MagicMock(side_effect=ValueError("boom"))
+
+    # When
+    with pytest.raises(ValueError):
+        get_or_set(cache, "key", compute)
+
+    # Then
+    assert cache.get(f"key{LEASE_KEY_SUFFIX}") is None
+    assert cache.get("key") is None
+
+
+def test_get_or_set__lease_held_elsewhere__waits_for_value(
+    cache: LocMemCache,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    cache.add(f"key{LEASE_KEY_SUFFIX}", True)
+    compute = MagicMock()
+
+    def populate_cache(_: float) -> None:
+        cache.set("key", "computed elsewhere")
+
+    mocker.patch("core.single_flight.time.sleep", side_effect=populate_cache)
+
+    # When
+    result = get_or_set(cache, "key", compute)
+
+    # Then
+    assert result == ("computed elsewhere", False)
+    compute.assert_not_called()
+
+
+def test_get_or_set__lease_held_elsewhere_wait_times_out__computes_value(
+    cache: LocMemCache,
+    settings: SettingsWrapper,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    # Given
+    settings.CACHE_SINGLE_FLIGHT_WAIT_SECONDS = 0
+    cache.add(f"key{LEASE_KEY_SUFFIX}", True)
+    compute = MagicMock(return_value="computed")
+
+    # When
+    result = get_or_set(cache, "key", compute)
+
+    # Then
+    assert result == ("computed", False)
+    assert cache.get("key") == "computed"
+    assert "Timed out waiting for cache key key" in caplog.text
+
+
+def test_get_or_set__stale_timeout_cache_miss__sets_value_and_fresh_marker(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    compute = MagicMock(return_value="computed")
+    revalidate = MagicMock()
+
+    # When
+    result = get_or_set(
+        cache, "key", compute, timeout=30, stale_timeout=60, revalidate=revalidate
+    )
+
+    # Then
+    assert result == ("computed", False)
+    assert cache.get("key") == "computed"
+    assert cache.get(f"key{FRESH_KEY_SUFFIX}") is True
+    revalidate.assert_not_called()
+
+
+def test_get_or_set__fresh_value_in_cache__does_not_revalidate(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    cache.set("key", "cached")
+    cache.set(f"key{FRESH_KEY_SUFFIX}", True)
+    compute = MagicMock()
+    revalidate = MagicMock()
+
+    # When
+    result = get_or_set(
+        cache, "key", compute, timeout=30, stale_timeout=60, revalidate=revalidate
+    )
+
+    # Then
+    assert result == ("cached", True)
+    compute.assert_not_called()
+    revalidate.assert_not_called()
+
+
+def test_get_or_set__stale_value_in_cache__returns_stale_value_and_revalidates_once(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    cache.set("key", "stale")
+    compute = MagicMock()
+    revalidate = MagicMock()
+
+    # When
+    results = [
+        get_or_set(
+            cache, "key", compute, timeout=30, stale_timeout=60, revalidate=revalidate
+        )
+        for _ in range(2)
+    ]
+
+    # Then
+    assert results == [("stale", True)] * 2
+    compute.assert_not_called()
+    revalidate.assert_called_once_with()
+    assert cache.get(f"key{LEASE_KEY_SUFFIX}") is True
+
+
+def test_get_or_set__revalidate_raises__returns_stale_value_and_releases_lease(
+    cache: LocMemCache,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    # Given
+    cache.set("key", "stale")
+    revalidate = MagicMock(side_effect=ValueError("boom"))
+
+    # When
+    result = get_or_set(
+        cache, "key", MagicMock(), timeout=30, stale_timeout=60, revalidate=revalidate
+    )
+
+    # Then
+    assert result == ("stale", True)
+    assert cache.get(f"key{LEASE_KEY_SUFFIX}") is None
+    assert "Failed to trigger revalidation of cache key key." in caplog.text
+
+
+def test_refresh__stale_value_in_cache__sets_fresh_value_and_releases_lease(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    cache.set("key", "stale")
+    cache.add(f"key{LEASE_KEY_SUFFIX}", True)
+
+    # When
+    result = refresh(cache, "key", lambda: "computed", timeout=30, stale_timeout=60)
+
+    # Then
+    assert result == "computed"
+    assert cache.get("key") == "computed"
+    assert cache.get(f"key{FRESH_KEY_SUFFIX}") is True
+    assert cache.get(f"key{LEASE_KEY_SUFFIX}") is None
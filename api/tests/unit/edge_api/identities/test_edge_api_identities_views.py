@@ -1,3 +1,4 @@
+import base64
 import typing
 
 from common.environments.permissions import (
@@ -11,6 +12,9 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.test import APIClient
 
+from edge_api.identities.edge_identity_service import (
+    set_edge_identity_overrides_counts,
+)
 from edge_api.identities.models import EdgeIdentity
 from edge_api.identities.views import EdgeIdentityViewSet
 from environments.models import Environment
@@ -162,6 +166,106 @@ def test_get_edge_identity_overrides__valid_feature__returns_overrides(
     )
 
 
+def test_get_edge_identity_overrides__page_size_given__returns_page_with_cursor_and_count(
+    staff_client: APIClient,
+    with_environment_permissions: WithEnvironmentPermissionsCallable,
+    mocker: MockerFixture,
+    feature: Feature,
+    environment: Environment,
+    edge_identity_override_document: dict,  # type: ignore[type-arg]
+    edge_identity_override_document_2: dict,  # type: ignore[type-arg]
+) -> None:
+    # Given
+    base_url = reverse(
+        "api-v1:environments:edge-identity-overrides", args=[environment.api_key]
+    )
+    with_environment_permissions([VIEW_IDENTITIES])  # type: ignore[call-arg]
+    set_edge_identity_overrides_counts(environment.id, {feature.id: 2})
+
+    mock_dynamodb_wrapper = mocker.patch(
+        "edge_api.identities.edge_identity_service.ddb_environment_v2_wrapper",
+    )
+    first_document_key = edge_identity_override_document["document_key"]
+    mock_dynamodb_wrapper.get_identity_overrides_page.side_effect = [
+        {
+            "Items": [edge_identity_override_document],
+            "LastEvaluatedKey": {
+                "environment_id": str(environment.id),
+                "document_key": first_document_key,
+            },
+        },
+        {"Items": [edge_identity_override_document_2]},
+    ]
+
+    # When
+    first_response = staff_client.get(f"{base_url}?feature={feature.id}&page_size=1")
+    last_evaluated_key = first_response.json()["last_evaluated_key"]
+    second_response = staff_client.get(
+        f"{base_url}?feature={feature.id}&page_size=1"
+        f"&last_evaluated_key={last_evaluated_key}"
+    )
+
+    # Then
+    assert first_response.status_code == status.HTTP_200_OK
+    first_response_json = first_response.json()
+    assert [result["identifier"] for result in first_response_json["results"]] == [
+        edge_identity_override_document["identifier"]
+    ]
+    assert first_response_json["count"] == 2
+
+    assert second_response.status_code == status.HTTP_200_OK
+    second_response_json = second_response.json()
+    assert [result["identifier"] for result in second_response_json["results"]] == [
+        edge_identity_override_document_2["identifier"]
+    ]
+    assert second_response_json["last_evaluated_key"] is None
+    assert second_response_json["count"] == 2
+
+    assert mock_dynamodb_wrapper.get_identity_overrides_page.call_args_list == [
+        mocker.call(
+            environment_id=environment.id,
+            limit=1,
+            feature_id=feature.id,
+            start_key=None,
+        ),
+        mocker.call(
+            environment_id=environment.id,
+            limit=1,
+            feature_id=feature.id,
+            start_key={
+                "environment_id": str(environment.id),
+                "document_key": first_document_key,
+            },
+        ),
+    ]
+
+
+def test_get_edge_identity_overrides__last_evaluated_key_for_other_feature__returns_400(
+    staff_client: APIClient,
+    with_environment_permissions: WithEnvironmentPermissionsCallable,
+    feature: Feature,
+    environment: Environment,
+) -> None:
+    # Given
+    base_url = reverse(
+        "api-v1:environments:edge-identity-overrides", args=[environment.api_key]
+    )
+    with_environment_permissions([VIEW_IDENTITIES])  # type: ignore[call-arg]
+    last_evaluated_key = base64.urlsafe_b64encode(
+        f"identity_override:{feature.id + 1}:identity-uuid".encode()
+    ).decode()
+
+    # When
+    response = staff_client.get(
+        f"{base_url}?feature={feature.id}&page_size=1"
+        f"&last_evaluated_key={last_evaluated_key}"
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"last_evaluated_key": ["Invalid last evaluated key."]}
+
+
 def test_get_edge_identity_overrides__without_view_identities_permission__returns_403(
     staff_client: APIClient,
     with_environment_permissions: WithEnvironmentPermissionsCallable,
@@ -2,16 +2,24 @@ from typing import Any
 from unittest.mock import MagicMock
 
 import pytest
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.exceptions import ObjectDoesNotExist
 from mypy_boto3_dynamodb.service_resource import Table
+from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
+from edge_api.identities import edge_identity_service
 from edge_api.identities.edge_identity_service import (
     get_edge_identity_override_keys,
+    get_edge_identity_overrides_count,
+    get_edge_identity_overrides_page,
     get_overridden_feature_ids_for_edge_identity,
+    recount_edge_identity_overrides_counts,
+    set_edge_identity_overrides_counts,
+    update_edge_identity_overrides_counts,
 )
 from environments.dynamodb import DynamoEnvironmentV2Wrapper
-from environments.models import Environment
+from environments.models import EdgeIdentityOverridesCount, Environment
 from features.models import Feature
 from projects.models import Project
 
@@ -138,3 +146,206 @@ def test_get_edge_identity_override_keys__override_exists__returns_document_keys
 
     # Then
     assert document_keys == [identity_override_document["document_key"]]
+
+
+def test_get_edge_identity_overrides_count__not_counted__counts_override_keys_once(
+    mocker: MockerFixture,
+    flagsmith_environments_v2_table: Table,
+    dynamodb_wrapper_v2: DynamoEnvironmentV2Wrapper,
+    dynamo_enabled_project: Project,
+    environment: Environment,
+    feature: Feature,
+    identity_override_document: dict[str, Any],
+) -> None:
+    # Given
+    get_override_keys = mocker.spy(
+        edge_identity_service, "get_edge_identity_override_keys"
+    )
+
+    # When
+    first_count = get_edge_identity_overrides_count(environment)
+    second_count = get_edge_identity_overrides_count(environment)
+
+    # Then
+    assert first_count == second_count == 1
+    get_override_keys.assert_called_once_with(environment.id)
+    assert (
+        EdgeIdentityOverridesCount.objects.get(
+            environment=environment, feature=feature
+        ).count
+        == 1
+    )
+
+
+def test_get_edge_identity_overrides_count__archived_feature__excludes_its_overrides(
+    environment: Environment,
+    feature: Feature,
+    project: Project,
+) -> None:
+    # Given
+    archived_feature = Feature.objects.create(
+        project=project, name="archived_feature", is_archived=True
+    )
+    set_edge_identity_overrides_counts(
+        environment.id, {feature.id: 2, archived_feature.id: 5}
+    )
+
+    # When
+    count = get_edge_identity_overrides_count(environment)
+
+    # Then
+    assert count == 2
+
+
+def test_set_edge_identity_overrides_counts__counted_and_no_overwrite__keeps_counts(
+    environment: Environment,
+    feature: Feature,
+) -> None:
+    # Given
+    set_edge_identity_overrides_counts(environment.id, {feature.id: 2})
+
+    # When
+    set_edge_identity_overrides_counts(environment.id, {feature.id: 5}, overwrite=False)
+
+    # Then
+    assert EdgeIdentityOverridesCount.objects.get(environment=environment).count == 2
+
+
+def test_recount_edge_identity_overrides_counts__drifted_counts__recounts_from_dynamodb(
+    flagsmith_environments_v2_table: Table,
+    dynamodb_wrapper_v2: DynamoEnvironmentV2Wrapper,
+    dynamo_enabled_project: Project,
+    environment: Environment,
+    feature: Feature,
+    identity_override_document: dict[str, Any],
+) -> None:
+    # Given
+    set_edge_identity_overrides_counts(environment.id, {feature.id: 3})
+
+    # When
+    recount_edge_identity_overrides_counts(environment)
+
+    # Then
+    assert get_edge_identity_overrides_count(environment) == 1
+
+
+def test_update_edge_identity_overrides_counts__counted_environment__applies_deltas(
+    environment: Environment,
+    feature: Feature,
+    project: Project,
+) -> None:
+    # Given
+    set_edge_identity_overrides_counts(environment.id, {feature.id: 1})
+    new_feature = Feature.objects.create(project=project, name="new_feature")
+
+    # When
+    update_edge_identity_overrides_counts(
+        environment.id, {feature.id: -2, new_feature.id: 3}
+    )
+
+    # Then
+    assert dict(
+        EdgeIdentityOverridesCount.objects.filter(environment=environment).values_list(
+            "feature_id", "count"
+        )
+    ) == {feature.id: 0, new_feature.id: 3}
+
+
+def test_update_edge_identity_overrides_counts__environment_not_counted__leaves_counts_to_first_count(
+    environment: Environment,
+    feature: Feature,
+) -> None:
+    # When
+    update_edge_identity_overrides_counts(environment.id, {feature.id: 1})
+
+    # Then
+    assert not EdgeIdentityOverridesCount.objects.filter(
+        environment=environment
+    ).exists()
+
+
+@pytest.mark.parametrize("query_workers", [0, 2])
+def test_get_edge_identity_override_keys__feature_ids_given__returns_only_their_keys(
+    settings: SettingsWrapper,
+    query_workers: int,
+    flagsmith_environments_v2_table: Table,
+    dynamodb_wrapper_v2: DynamoEnvironmentV2Wrapper,
+    environment: Environment,
+    feature: Feature,
+    identity_override_document: dict[str, Any],
+) -> None:
+    # Given
+    settings.ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS = query_workers
+    flagsmith_environments_v2_table.put_item(
+        Item={
+            "environment_id": str(environment.id),
+            "document_key": f"identity_override:{feature.id + 1}:identity-uuid",
+        }
+    )
+
+    # When
+    document_keys = get_edge_identity_override_keys(
+        environment_id=environment.id, feature_ids=[feature.id]
+    )
+
+    # Then
+    assert document_keys == [identity_override_document["document_key"]]
+
+
+def test_get_edge_identity_overrides_count__query_workers_configured__counts_each_feature(
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+    environment: Environment,
+    feature: Feature,
+) -> None:
+    # Given
+    settings.ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS = 2
+    count_by_feature_ids = mocker.patch.object(
+        edge_identity_service.ddb_environment_v2_wrapper,
+        "count_identity_overrides_by_feature_ids",
+        return_value={feature.id: 4},
+    )
+
+    # When
+    count = get_edge_identity_overrides_count(environment)
+
+    # Then
+    assert count == 4
+    count_by_feature_ids.assert_called_once_with(
+        environment_id=environment.id, feature_ids=mocker.ANY
+    )
+
+
+def test_get_edge_identity_overrides_page__page_cached__does_not_query_dynamodb(
+    mocker: MockerFixture,
+    environment: Environment,
+    feature: Feature,
+    identity_override_document: dict[str, Any],
+) -> None:
+    # Given
+    mocker.patch.object(
+        edge_identity_service,
+        "edge_identity_overrides_cache",
+        LocMemCache("edge-identity-overrides-test", {"TIMEOUT": 60}),
+    )
+    get_page = mocker.patch.object(
+        edge_identity_service.ddb_environment_v2_wrapper,
+        "get_identity_overrides_page",
+        return_value={"Items": [identity_override_document]},
+    )
+
+    # When
+    pages = [
+        get_edge_identity_overrides_page(
+            environment_id=environment.id, page_size=10, feature_id=feature.id
+        )
+        for _ in range(2)
+    ]
+
+    # Then
+    get_page.assert_called_once()
+    for identity_overrides, next_document_key in pages:
+        assert [
+            identity_override.document_key for identity_override in identity_overrides
+        ] == [identity_override_document["document_key"]]
+        assert next_document_key is None
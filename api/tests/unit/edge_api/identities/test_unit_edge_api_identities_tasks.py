@@ -7,18 +7,22 @@ from pytest_mock import MockerFixture
 
 from audit.models import AuditLog
 from audit.related_object_type import RelatedObjectType
+from edge_api.identities.edge_identity_service import (
+    set_edge_identity_overrides_counts,
+)
 from edge_api.identities.tasks import (
     call_environment_webhook_for_feature_state_change,
     generate_audit_log_records,
     sync_identity_document_features,
     update_flagsmith_environments_v2_identity_overrides,
 )
+from edge_api.identities.types import IdentityChangeset
 from environments.dynamodb.types import (
     IdentityOverridesV2Changeset,
     IdentityOverrideV2,
 )
 from environments.identities.models import Identity
-from environments.models import Environment, Webhook
+from environments.models import EdgeIdentityOverridesCount, Environment, Webhook
 from features.models import Feature
 from users.models import FFAdminUser
 from webhooks.webhooks import WebhookEventType
@@ -550,3 +554,43 @@ def test_update_flagsmith_environments_v2_identity_overrides__no_overrides__call
 
     # Then
     dynamodb_wrapper_v2_mock.update_identity_overrides.assert_not_called()
+
+
+def test_update_flagsmith_environments_v2_identity_overrides__counted_environment__updates_overrides_counts(
+    mocker: MockerFixture,
+    environment: Environment,
+    feature: Feature,
+) -> None:
+    # Given
+    mocker.patch("edge_api.identities.tasks.DynamoEnvironmentV2Wrapper")
+    set_edge_identity_overrides_counts(environment.id, {feature.id: 1})
+    feature_dict = {"id": feature.id, "name": feature.name, "type": "STANDARD"}
+    changes: IdentityChangeset = {
+        "feature_overrides": {
+            feature.name: {
+                "change_type": "-",
+                "old": {
+                    "enabled": True,
+                    "feature_state_value": None,
+                    "featurestate_uuid": "80f6dbdd-97c0-47de-9333-cd1e1c100713",
+                    "feature": feature_dict,
+                },
+            },
+        }
+    }
+
+    # When
+    update_flagsmith_environments_v2_identity_overrides(
+        environment_api_key=environment.api_key,
+        identity_uuid="a35a02f2-fefd-4932-8f5c-e84a0bf542c7",
+        changes=changes,
+        identifier="identity1",
+    )
+
+    # Then
+    assert (
+        EdgeIdentityOverridesCount.objects.get(
+            environment=environment, feature=feature
+        ).count
+        == 0
+    )
@@ -3,9 +3,14 @@ import uuid
 
 from django.core.management import call_command
 
+from edge_api.identities.edge_identity_service import (
+    set_edge_identity_overrides_counts,
+)
 from edge_api.management.commands.ensure_identity_traits_blanks import (
     identity_wrapper,
 )
+from environments.models import Environment
+from features.models import Feature
 from projects.models import EdgeV2MigrationStatus, Project
 
 if typing.TYPE_CHECKING:
@@ -240,3 +245,42 @@ def test_ensure_identity_traits_blanks__exclusive_start_key__calls_expected(
 
     # Then
     identity_wrapper_mock.scan_iter_all_items.assert_called_once_with(**expected_kwargs)
+
+
+def test_recount_edge_identity_overrides__no_environment_given__recounts_counted_environments(
+    mocker: "MockerFixture",
+    project: Project,
+    environment: Environment,
+    feature: Feature,
+) -> None:
+    # Given
+    Environment.objects.create(name="uncounted", project=project)
+    set_edge_identity_overrides_counts(environment.id, {feature.id: 1})
+    recount_mock = mocker.patch(
+        "edge_api.management.commands.recount_edge_identity_overrides.recount_edge_identity_overrides_counts",
+        autospec=True,
+    )
+
+    # When
+    call_command("recount_edge_identity_overrides")
+
+    # Then
+    recount_mock.assert_called_once_with(environment)
+
+
+def test_recount_edge_identity_overrides__environment_given__recounts_it(
+    mocker: "MockerFixture",
+    project: Project,
+    environment: Environment,
+) -> None:
+    # Given
+    recount_mock = mocker.patch(
+        "edge_api.management.commands.recount_edge_identity_overrides.recount_edge_identity_overrides_counts",
+        autospec=True,
+    )
+
+    # When
+    call_command("recount_edge_identity_overrides", "--environment-id", environment.id)
+
+    # Then
+    recount_mock.assert_called_once_with(environment)
@@ -1,5 +1,8 @@
+import pytest
+from mypy_boto3_dynamodb.service_resource import Table
 from pytest_django.asserts import assertQuerySetEqual as assert_queryset_equal
-from pytest_django.fixtures import DjangoAssertNumQueries
+from pytest_django.fixtures import DjangoAssertNumQueries, SettingsWrapper
+from pytest_mock import MockerFixture
 
 from environments.dynamodb.migrator import IdentityMigrator
 from environments.dynamodb.types import (
@@ -40,7 +43,7 @@ def test_migrate__valid_project__calls_internal_methods_correctly(  # type: igno
     identity_migrator = IdentityMigrator(project.id)  # type: ignore[no-untyped-call]
 
     # When
-    identity_migrator.migrate()  # type: ignore[no-untyped-call]
+    identity_migrator.migrate()
 
     # Then
     mocked_identity_wrapper.assert_called_once_with()
@@ -236,3 +239,128 @@ def test_iter_identities_in_chunks__empty_queryset__yields_nothing(
 
     # Then
     assert result == []
+
+
+def test_get_identity_migration_partitions__identities_exist__splits_pk_range(
+    project: Project,
+    environment: Environment,
+) -> None:
+    # Given
+    identities = [
+        Identity.objects.create(identifier=f"identity_{i}", environment=environment)
+        for i in range(5)
+    ]
+    min_pk = identities[0].pk
+    max_pk = identities[-1].pk
+
+    # When
+    partitions = IdentityMigrator.get_identity_migration_partitions(
+        project.id, partition_count=2
+    )
+
+    # Then
+    assert partitions == [
+        {"after_pk": min_pk - 1, "end_pk": min_pk + 2},
+        {"after_pk": min_pk + 2, "end_pk": max_pk},
+    ]
+
+
+def test_get_identity_migration_partitions__no_identities__returns_empty_list(
+    project: Project,
+) -> None:
+    # When
+    partitions = IdentityMigrator.get_identity_migration_partitions(
+        project.id, partition_count=4
+    )
+
+    # Then
+    assert partitions == []
+
+
+@pytest.fixture()
+def partitioned_migration(
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+    flagsmith_project_metadata_table: Table,
+    flagsmith_identities_table: Table,
+) -> None:
+    settings.IDENTITY_MIGRATION_PARTITIONS = 3
+    settings.IDENTITY_MIGRATION_MAX_WORKERS = 2
+    settings.IDENTITIES_TABLE_NAME_DYNAMO = flagsmith_identities_table.name
+    mocker.patch(
+        "environments.dynamodb.types.project_metadata_table",
+        flagsmith_project_metadata_table,
+    )
+    mocker.patch("environments.dynamodb.migrator.DynamoEnvironmentWrapper")
+    mocker.patch("environments.dynamodb.migrator.DynamoEnvironmentAPIKeyWrapper")
+
+
+# Partitions are migrated by worker threads, which need to see committed data.
+@pytest.mark.django_db(transaction=True)
+def test_migrate__multiple_partitions__writes_all_identities_and_checkpoints(
+    partitioned_migration: None,
+    project: Project,
+    environment: Environment,
+    flagsmith_identities_table: Table,
+) -> None:
+    # Given
+    identities = [
+        Identity.objects.create(identifier=f"identity_{i}", environment=environment)
+        for i in range(7)
+    ]
+    identity_migrator = IdentityMigrator(project.id)  # type: ignore[no-untyped-call]
+
+    # When
+    identity_migrator.migrate()
+
+    # Then
+    assert identity_migrator.is_migration_done is True
+    assert {
+        item["identifier"] for item in flagsmith_identities_table.scan()["Items"]
+    } == {identity.identifier for identity in identities}
+
+    project_metadata = DynamoProjectMetadata.get_or_new(project.id)
+    assert len(project_metadata.identity_migration_partitions) == 3
+    assert all(
+        partition["after_pk"] == partition["end_pk"]
+        for partition in project_metadata.identity_migration_partitions
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migrate__capacity_budget_exceeded__stops_and_resumes_from_checkpoints(
+    partitioned_migration: None,
+    settings: SettingsWrapper,
+    project: Project,
+    environment: Environment,
+    flagsmith_identities_table: Table,
+) -> None:
+    # Given
+    settings.IDENTITY_MIGRATION_PARTITIONS = 2
+    settings.IDENTITY_MIGRATION_MAX_WORKERS = 1
+    settings.IDENTITY_MIGRATION_WRITE_CAPACITY_BUDGET = 1
+    identities = [
+        Identity.objects.create(identifier=f"identity_{i}", environment=environment)
+        for i in range(4)
+    ]
+    # When
+    IdentityMigrator(project.id).migrate()  # type: ignore[no-untyped-call]
+
+    # Then
+    identity_migrator = IdentityMigrator(project.id)  # type: ignore[no-untyped-call]
+    assert identity_migrator.can_resume is True
+    # the first identity used up the budget before the first chunk was written
+    # in full, so no checkpoint was made
+    assert flagsmith_identities_table.scan()["Count"] == 1
+    assert (
+        identity_migrator.project_metadata.identity_migration_partitions[0]["after_pk"]
+        == identities[0].pk - 1
+    )
+
+    # When
+    settings.IDENTITY_MIGRATION_WRITE_CAPACITY_BUDGET = 0
+    identity_migrator.migrate()
+
+    # Then
+    assert identity_migrator.is_migration_done is True
+    assert flagsmith_identities_table.scan()["Count"] == 4
@@ -12,7 +12,7 @@ from environments.dynamodb import (
 from environments.dynamodb.services import migrate_environments_to_v2
 from environments.dynamodb.wrappers.exceptions import CapacityBudgetExceeded
 from environments.identities.models import Identity
-from environments.models import Environment
+from environments.models import EdgeIdentityOverridesCount, Environment
 from features.models import FeatureState
 from projects.models import EdgeV2MigrationStatus
 from util.mappers import (
@@ -66,6 +66,12 @@ def test_migrate_environments_to_v2__environment_with_overrides__writes_expected
     assert len(results) == 2
     assert results[0] == expected_environment_document
     assert results[1] == expected_identity_override_document
+    assert (
+        EdgeIdentityOverridesCount.objects.get(
+            environment=environment, feature=identity_featurestate.feature
+        ).count
+        == 1
+    )
 
 
 def test_migrate_environments_to_v2__wrapper_disabled__does_not_write(
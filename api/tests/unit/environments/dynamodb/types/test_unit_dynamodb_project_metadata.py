@@ -83,6 +83,7 @@ def test_start_identity_migration__new_project__calls_put_item_correctly(mocker)
             "migration_end_time": None,
             "migration_start_time": migration_start_time.isoformat(),
             "triggered_at": None,
+            "identity_migration_partitions": None,
         }
     )
 
@@ -150,6 +151,7 @@ def test_finish_identity_migration__started_migration__calls_put_item_correctly(
             "migration_start_time": migration_start_time,
             "migration_end_time": migration_end_time.isoformat(),
             "triggered_at": None,
+            "identity_migration_partitions": None,
         }
     )
 
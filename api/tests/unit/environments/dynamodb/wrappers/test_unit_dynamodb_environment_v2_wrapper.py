@@ -83,6 +83,109 @@ def test_environment_v2_wrapper__get_identity_overrides_by_environment_id__pagin
     )
 
 
+def test_environment_v2_wrapper__count_identity_overrides__paginated__sums_page_counts(
+    flagsmith_environments_v2_table: Table,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    wrapper = DynamoEnvironmentV2Wrapper()
+    mocker.patch.object(wrapper, "get_table").return_value = table_mock = (
+        mocker.MagicMock(spec=flagsmith_environments_v2_table)
+    )
+    table_mock.query.side_effect = [
+        {"Count": 3, "LastEvaluatedKey": "next_page_key"},
+        {"Count": 2},
+    ]
+
+    # When
+    count = wrapper.count_identity_overrides(environment_id=1, feature_id=2)
+
+    # Then
+    assert count == 5
+    table_mock.query.assert_has_calls(
+        [
+            mocker.call(KeyConditionExpression=mocker.ANY, Select="COUNT"),
+            mocker.call(
+                KeyConditionExpression=mocker.ANY,
+                Select="COUNT",
+                ExclusiveStartKey="next_page_key",
+            ),
+        ]
+    )
+
+
+def test_environment_v2_wrapper__identity_overrides_by_feature_ids__query_workers_configured__queries_each_feature(
+    settings: SettingsWrapper,
+    environment: Environment,
+    dynamodb_wrapper_v2: DynamoEnvironmentV2Wrapper,
+    flagsmith_environments_v2_table: Table,
+) -> None:
+    # Given
+    settings.ENVIRONMENTS_V2_IDENTITY_OVERRIDES_QUERY_WORKERS = 2
+    document_keys = [
+        get_environments_v2_identity_override_document_key(
+            feature_id=feature_id, identity_uuid=str(uuid.uuid4())
+        )
+        for feature_id in (1, 1, 12)
+    ]
+    for document_key in document_keys:
+        flagsmith_environments_v2_table.put_item(
+            Item={"environment_id": str(environment.id), "document_key": document_key}
+        )
+
+    # When
+    overrides = list(
+        dynamodb_wrapper_v2.iter_identity_overrides_by_feature_ids(
+            environment_id=environment.id,
+            feature_ids=[1, 2],
+            projection_expression_attributes=["document_key"],
+        )
+    )
+    counts = dynamodb_wrapper_v2.count_identity_overrides_by_feature_ids(
+        environment_id=environment.id,
+        feature_ids=[1, 2, 12],
+    )
+
+    # Then
+    assert sorted(override["document_key"] for override in overrides) == sorted(
+        document_keys[:2]
+    )
+    assert counts == {1: 2, 2: 0, 12: 1}
+
+
+def test_environment_v2_wrapper__get_identity_overrides_page__limit_reached__returns_last_evaluated_key(
+    environment: Environment,
+    dynamodb_wrapper_v2: DynamoEnvironmentV2Wrapper,
+    flagsmith_environments_v2_table: Table,
+) -> None:
+    # Given
+    document_keys = sorted(
+        get_environments_v2_identity_override_document_key(
+            feature_id=1, identity_uuid=str(uuid.uuid4())
+        )
+        for _ in range(2)
+    )
+    for document_key in document_keys:
+        flagsmith_environments_v2_table.put_item(
+            Item={"environment_id": str(environment.id), "document_key": document_key}
+        )
+
+    # When
+    first_page = dynamodb_wrapper_v2.get_identity_overrides_page(
+        environment_id=environment.id, limit=1, feature_id=1
+    )
+    second_page = dynamodb_wrapper_v2.get_identity_overrides_page(
+        environment_id=environment.id,
+        limit=1,
+        feature_id=1,
+        start_key=first_page["LastEvaluatedKey"],
+    )
+
+    # Then
+    assert [item["document_key"] for item in first_page["Items"]] == document_keys[:1]
+    assert [item["document_key"] for item in second_page["Items"]] == document_keys[1:]
+
+
 def test_environment_v2_wrapper__update_identity_overrides__put_expected(
     settings: SettingsWrapper,
     environment: Environment,
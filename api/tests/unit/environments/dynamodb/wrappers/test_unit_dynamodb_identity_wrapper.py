@@ -13,6 +13,7 @@ from pytest_mock import MockerFixture
 from rest_framework.exceptions import NotFound
 
 from core.constants import INTEGER
+from core.local_cache import LocalCache
 from edge_api.identities.search import (
     IDENTIFIER_ATTRIBUTE,
     EdgeIdentitySearchData,
@@ -25,6 +26,7 @@ from environments.dynamodb.wrappers.exceptions import (
 )
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
+from environments.models import Environment
 from features.models import Feature, FeatureSegment, FeatureState
 from features.multivariate.models import (
     MultivariateFeatureOption,
@@ -32,13 +34,13 @@ from features.multivariate.models import (
 )
 from segments.models import Condition, Segment, SegmentRule
 from util.engine_models.identities.models import IdentityModel
+from util.mappers import engine as engine_mappers
 from util.mappers import (
     map_environment_to_compressed_environment_document,
     map_identity_to_identity_document,
 )
 
 if typing.TYPE_CHECKING:
-    from environments.models import Environment
     from projects.models import Project
 
 
@@ -278,6 +280,32 @@ def test_write_identities__identifier_too_large__skips_identity(  # type: ignore
     mocked_dynamo_table.batch_writer.return_value.__enter__.return_value.put_item.assert_not_called()
 
 
+def test_write_identities__capacity_budget_exceeded__raises_after_budget_spent(
+    mocker: MockerFixture,
+    environment: "Environment",
+) -> None:
+    # Given
+    dynamo_identity_wrapper = DynamoIdentityWrapper()
+    mocked_dynamo_table = mocker.patch.object(dynamo_identity_wrapper, "_table")
+    for i in range(3):
+        Identity.objects.create(identifier=f"identity_{i}", environment=environment)
+
+    # When
+    with pytest.raises(CapacityBudgetExceeded) as exc_info:
+        dynamo_identity_wrapper.write_identities(
+            Identity.objects.filter(environment=environment),
+            capacity_budget=Decimal(2),
+        )
+
+    # Then
+    assert exc_info.value.capacity_budget == 2
+    assert exc_info.value.capacity_spent == 2
+    mocked_put_item = (
+        mocked_dynamo_table.batch_writer.return_value.__enter__.return_value.put_item
+    )
+    assert mocked_put_item.call_count == 2
+
+
 def test_is_enabled__table_name_not_set__returns_false(settings, mocker):  # type: ignore[no-untyped-def]
     # Given
     mocker.patch(
@@ -436,6 +464,38 @@ def test_get_segment_ids__in_operator_with_integer_traits__returns_matching_segm
     assert segment_ids == [segment.id]
 
 
+def test_get_segment_ids__segment_contexts_cached__maps_segments_once(
+    project: "Project",
+    environment: "Environment",
+    identity: "Identity",
+    identity_matching_segment: "Segment",
+    mocker: "MockerFixture",
+) -> None:
+    # Given
+    mocker.patch(
+        "projects.services.project_segment_contexts_local_cache",
+        LocalCache(name="test-project-segment-contexts", timeout=60, max_entries=10),
+    )
+    map_segment_spy = mocker.spy(engine_mappers, "map_segment_to_segment_context")
+    Segment.objects.create(name="Non matching segment", project=project)
+
+    identity_document = map_identity_to_identity_document(identity)
+    dynamo_identity_wrapper = DynamoIdentityWrapper()
+    mocker.patch.object(
+        dynamo_identity_wrapper, "get_item_from_uuid", return_value=identity_document
+    )
+
+    # When
+    segment_ids = [
+        dynamo_identity_wrapper.get_segment_ids(identity_document["identity_uuid"])  # type: ignore[arg-type]
+        for _ in range(3)
+    ]
+
+    # Then
+    assert segment_ids == [[identity_matching_segment.id]] * 3
+    assert map_segment_spy.call_count == 2
+
+
 def test_get_segment_ids__identity_does_not_exist__returns_empty_list(  # type: ignore[no-untyped-def]
     project, environment, identity, mocker
 ):
@@ -454,6 +514,23 @@ def test_get_segment_ids__identity_does_not_exist__returns_empty_list(  # type:
     assert segment_ids == []
 
 
+def test_get_segment_ids__environment_does_not_exist__raises_does_not_exist(
+    identity: "Identity",
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    identity_document = map_identity_to_identity_document(identity)
+    identity_document["environment_api_key"] = "unknown"
+    dynamo_identity_wrapper = DynamoIdentityWrapper()
+    mocker.patch.object(
+        dynamo_identity_wrapper, "get_item_from_uuid", return_value=identity_document
+    )
+
+    # When / Then
+    with pytest.raises(Environment.DoesNotExist):
+        dynamo_identity_wrapper.get_segment_ids(identity_document["identity_uuid"])
+
+
 def test_get_segment_ids__no_arguments__raises_value_error():  # type: ignore[no-untyped-def]
     # Given
     dynamo_identity_wrapper = DynamoIdentityWrapper()
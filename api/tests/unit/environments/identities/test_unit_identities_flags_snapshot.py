@@ -0,0 +1,223 @@
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Q
+from flag_engine.segments.constants import EQUAL
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
+
+from environments.identities import flags_snapshot
+from environments.identities.flags_snapshot import CLIENT_FEATURES_FILTER
+from environments.identities.models import Identity
+from environments.identities.traits.models import Trait
+from environments.models import Environment
+from environments.sdk.services import get_identities_feature_states
+from features.models import Feature, FeatureSegment, FeatureState
+from projects.models import Project
+from segments.models import Condition, Segment, SegmentRule
+
+
+@pytest.fixture()
+def environment_flags_snapshot_cache(
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> LocMemCache:
+    settings.ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS = 60
+    cache = LocMemCache("test-environment-flags-snapshot", {})
+    mocker.patch.object(flags_snapshot, "environment_flags_snapshot_cache", cache)
+    return cache
+
+
+def _create_segment(project: Project, name: str, trait_value: str) -> Segment:
+    segment: Segment = Segment.objects.create(name=name, project=project)
+    rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    Condition.objects.create(
+        rule=rule, property="plan", operator=EQUAL, value=trait_value
+    )
+    return segment
+
+
+def _create_segment_override(
+    feature: Feature,
+    segment: Segment,
+    environment: Environment,
+    priority: int,
+) -> FeatureState:
+    feature_segment = FeatureSegment.objects.create(
+        feature=feature,
+        segment=segment,
+        environment=environment,
+        priority=priority,
+    )
+    return FeatureState.objects.create(  # type: ignore[no-any-return]
+        feature=feature,
+        feature_segment=feature_segment,
+        environment=environment,
+    )
+
+
+@pytest.fixture()
+def identity_with_overrides(
+    project: Project,
+    environment: Environment,
+) -> Identity:
+    identity: Identity = Identity.objects.create(
+        identifier="test-identity", environment=environment
+    )
+    Trait.objects.create(identity=identity, trait_key="plan", string_value="premium")
+
+    matching_segment = _create_segment(project, "matching", "premium")
+    another_matching_segment = _create_segment(project, "another", "premium")
+    non_matching_segment = _create_segment(project, "non-matching", "free")
+
+    segment_feature = Feature.objects.create(name="segment_feature", project=project)
+    _create_segment_override(segment_feature, non_matching_segment, environment, 1)
+    _create_segment_override(segment_feature, matching_segment, environment, 2)
+    _create_segment_override(segment_feature, another_matching_segment, environment, 3)
+
+    identity_feature = Feature.objects.create(
+        name="identity_feature", project=project, is_server_key_only=True
+    )
+    _create_segment_override(identity_feature, matching_segment, environment, 1)
+    FeatureState.objects.create(
+        feature=identity_feature, environment=environment, identity=identity
+    )
+
+    Feature.objects.create(name="default_feature", project=project)
+
+    return identity
+
+
+def _get_flags_by_feature_name(
+    feature_states: list[FeatureState],
+) -> dict[str, FeatureState]:
+    return {
+        feature_state.feature.name: feature_state for feature_state in feature_states
+    }
+
+
+@pytest.mark.parametrize(
+    "additional_filters",
+    [None, CLIENT_FEATURES_FILTER],
+)
+def test_get_all_feature_states__flags_snapshot_enabled__returns_same_flags_as_db(
+    environment_flags_snapshot_cache: LocMemCache,
+    settings: SettingsWrapper,
+    identity_with_overrides: Identity,
+    additional_filters: Q | None,
+) -> None:
+    # Given
+    settings.ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS = 0
+    expected_flags = _get_flags_by_feature_name(
+        identity_with_overrides.get_all_feature_states(
+            additional_filters=additional_filters
+        )
+    )
+    settings.ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS = 60
+
+    # When
+    flags = _get_flags_by_feature_name(
+        identity_with_overrides.get_all_feature_states(
+            additional_filters=additional_filters
+        )
+    )
+
+    # Then
+    assert {name: flag.id for name, flag in flags.items()} == {
+        name: flag.id for name, flag in expected_flags.items()
+    }
+    assert flags["segment_feature"].feature_segment.priority == 2  # type: ignore[union-attr]
+    if additional_filters is None:
+        assert flags["identity_feature"].identity_id == identity_with_overrides.id
+    else:
+        assert "identity_feature" not in flags
+
+
+def test_get_all_feature_states__flags_snapshot_enabled__builds_snapshot_once(
+    environment_flags_snapshot_cache: LocMemCache,
+    mocker: MockerFixture,
+    identity_with_overrides: Identity,
+) -> None:
+    # Given
+    build_snapshot_spy = mocker.spy(flags_snapshot, "build_environment_flags_snapshot")
+    another_identity = Identity.objects.create(
+        identifier="another-identity",
+        environment=identity_with_overrides.environment,
+    )
+
+    # When
+    identity_with_overrides.get_all_feature_states()
+    flags = _get_flags_by_feature_name(another_identity.get_all_feature_states())
+
+    # Then
+    build_snapshot_spy.assert_called_once_with(identity_with_overrides.environment)
+    assert environment_flags_snapshot_cache.get(another_identity.environment_id)
+    # the other identity matches no segments, so receives the environment defaults
+    assert all(
+        flag.feature_segment_id is None and flag.identity_id is None
+        for flag in flags.values()
+    )
+
+
+def test_get_all_feature_states__flags_snapshot_enabled_and_feature_name__returns_single_flag(
+    environment_flags_snapshot_cache: LocMemCache,
+    identity_with_overrides: Identity,
+) -> None:
+    # When
+    feature_states = identity_with_overrides.get_all_feature_states(
+        feature_name="SEGMENT_FEATURE"
+    )
+
+    # Then
+    assert len(feature_states) == 1
+    assert feature_states[0].feature.name == "segment_feature"
+    assert feature_states[0].feature_segment.priority == 2  # type: ignore[union-attr]
+
+
+def test_get_all_feature_states__flags_snapshot_enabled_and_unsupported_filters__queries_db(
+    environment_flags_snapshot_cache: LocMemCache,
+    mocker: MockerFixture,
+    identity_with_overrides: Identity,
+) -> None:
+    # Given
+    build_snapshot_spy = mocker.spy(flags_snapshot, "build_environment_flags_snapshot")
+
+    # When
+    feature_states = identity_with_overrides.get_all_feature_states(
+        additional_filters=Q(enabled=False),
+    )
+
+    # Then
+    build_snapshot_spy.assert_not_called()
+    assert {feature_state.feature.name for feature_state in feature_states} == {
+        "segment_feature",
+        "identity_feature",
+        "default_feature",
+    }
+
+
+def test_get_identities_feature_states__flags_snapshot_disabled__queries_db(
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+    identity_with_overrides: Identity,
+) -> None:
+    # Given
+    settings.ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS = 0
+    build_snapshot_spy = mocker.spy(flags_snapshot, "build_environment_flags_snapshot")
+    traits = list(identity_with_overrides.identity_traits.all())
+
+    # When
+    (feature_states,) = get_identities_feature_states(
+        environment=identity_with_overrides.environment,
+        identities_and_traits=[(identity_with_overrides, traits)],
+    )
+
+    # Then
+    build_snapshot_spy.assert_not_called()
+    assert {
+        feature_state.feature.name: feature_state.id for feature_state in feature_states
+    } == {
+        feature_state.feature.name: feature_state.id
+        for feature_state in identity_with_overrides.get_all_feature_states(
+            traits=traits
+        )
+    }
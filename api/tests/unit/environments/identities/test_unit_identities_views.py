@@ -8,10 +8,14 @@ from common.environments.permissions import (
     MANAGE_IDENTITIES,
     VIEW_IDENTITIES,
 )
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from flag_engine.segments.constants import PERCENTAGE_SPLIT
+from flag_engine.segments.constants import EQUAL, PERCENTAGE_SPLIT
 from pytest_django import DjangoAssertNumQueries
+from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -22,7 +26,7 @@ from core.constants import (
     SDK_ENVIRONMENT_KEY_HEADER,
     STRING,
 )
-from environments.identities import views
+from environments.identities import flags_snapshot, views
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from environments.models import Environment, EnvironmentAPIKey
@@ -1447,3 +1451,227 @@ def test_sdk_identities_get__given_identifier__retrieves_feature_states(
 
     # Then
     assert response.status_code == status.HTTP_200_OK
+
+
+def _create_bulk_identify_segment_override(
+    project: Project,
+    environment: Environment,
+    feature: Feature,
+) -> FeatureState:
+    # a segment matching identities with the trait `plan` set to `premium`
+    segment = Segment.objects.create(name="premium", project=project)
+    rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    Condition.objects.create(
+        rule=rule, property="plan", operator=EQUAL, value="premium"
+    )
+    feature_segment = FeatureSegment.objects.create(
+        feature=feature, segment=segment, environment=environment
+    )
+    return FeatureState.objects.create(  # type: ignore[no-any-return]
+        feature=feature,
+        feature_segment=feature_segment,
+        environment=environment,
+        enabled=True,
+    )
+
+
+def test_sdk_identities_bulk_post__multiple_identities__persists_and_evaluates_each(
+    identity: Identity,
+    environment: Environment,
+    project: Project,
+    feature: Feature,
+    environment_api_key: EnvironmentAPIKey,
+    api_client: APIClient,
+) -> None:
+    # Given
+    url = reverse("api-v1:sdk-identities-bulk")
+    _create_bulk_identify_segment_override(project, environment, feature)
+
+    # an existing identity with a trait which is removed by the request
+    Trait.objects.create(
+        identity=identity,
+        trait_key="to_delete",
+        value_type=STRING,
+        string_value="value",
+    )
+
+    data = {
+        "identities": [
+            {
+                "identifier": identity.identifier,
+                "traits": [
+                    {"trait_key": "plan", "trait_value": "premium"},
+                    {"trait_key": "to_delete", "trait_value": None},
+                ],
+            },
+            {
+                "identifier": "new-identity",
+                "traits": [{"trait_key": "plan", "trait_value": "free"}],
+            },
+            {
+                "identifier": "transient-identity",
+                "traits": [{"trait_key": "plan", "trait_value": "premium"}],
+                "transient": True,
+            },
+        ]
+    }
+
+    # When
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+    response = api_client.post(
+        url, data=json.dumps(data), content_type="application/json"
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    response_json = response.json()
+    assert [
+        (
+            identity_data["identifier"],
+            {
+                trait["trait_key"]: trait["trait_value"]
+                for trait in identity_data["traits"]
+            },
+            [flag["enabled"] for flag in identity_data["flags"]],
+        )
+        for identity_data in response_json["identities"]
+    ] == [
+        (identity.identifier, {"plan": "premium"}, [True]),
+        ("new-identity", {"plan": "free"}, [False]),
+        ("transient-identity", {"plan": "premium"}, [True]),
+    ]
+
+    # and the traits of the persisted identities are stored
+    assert list(
+        Trait.objects.filter(identity__environment=environment)
+        .order_by("identity__identifier")
+        .values_list("identity__identifier", "trait_key", "string_value")
+    ) == [
+        ("new-identity", "plan", "free"),
+        (identity.identifier, "plan", "premium"),
+    ]
+    assert not Identity.objects.filter(identifier="transient-identity").exists()
+
+
+def test_sdk_identities_bulk_post__flags_snapshot_enabled_and_more_identities__does_not_add_queries(
+    environment: Environment,
+    project: Project,
+    feature: Feature,
+    environment_api_key: EnvironmentAPIKey,
+    api_client: APIClient,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+    django_assert_max_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    settings.ENVIRONMENT_FLAGS_SNAPSHOT_CACHE_SECONDS = 60
+    mocker.patch.object(
+        flags_snapshot,
+        "environment_flags_snapshot_cache",
+        LocMemCache("test-environment-flags-snapshot", {}),
+    )
+    url = reverse("api-v1:sdk-identities-bulk")
+    _create_bulk_identify_segment_override(project, environment, feature)
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    def _get_data(identities_count: int) -> str:
+        return json.dumps(
+            {
+                "identities": [
+                    {
+                        "identifier": f"identity-{identities_count}-{i}",
+                        "traits": [{"trait_key": "plan", "trait_value": "premium"}],
+                    }
+                    for i in range(identities_count)
+                ]
+            }
+        )
+
+    with CaptureQueriesContext(connection) as captured_queries:
+        api_client.post(url, data=_get_data(2), content_type="application/json")
+
+    # When
+    with django_assert_max_num_queries(len(captured_queries)):
+        response = api_client.post(
+            url, data=_get_data(10), content_type="application/json"
+        )
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["identities"]) == 10
+
+
+def test_sdk_identities_bulk_post__client_key__returns_403(
+    environment: Environment,
+    api_client: APIClient,
+) -> None:
+    # Given
+    url = reverse("api-v1:sdk-identities-bulk")
+    data = {"identities": [{"identifier": "identity"}]}
+
+    # When
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+    response = api_client.post(
+        url, data=json.dumps(data), content_type="application/json"
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not Identity.objects.filter(identifier="identity").exists()
+
+
+def test_sdk_identities_bulk_post__existing_identities__does_not_insert_them(
+    identity: Identity,
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    api_client: APIClient,
+) -> None:
+    # Given
+    url = reverse("api-v1:sdk-identities-bulk")
+    data = {"identities": [{"identifier": identity.identifier}]}
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    # When
+    with CaptureQueriesContext(connection) as captured_queries:
+        response = api_client.post(
+            url, data=json.dumps(data), content_type="application/json"
+        )
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert not [
+        query
+        for query in captured_queries
+        if query["sql"].startswith('INSERT INTO "environments_identity"')
+    ]
+
+
+@pytest.mark.parametrize(
+    "identities",
+    [
+        [],
+        [{"identifier": "identity"}, {"identifier": "identity"}],
+        [{"identifier": ""}],
+        # more than SDK_BULK_IDENTIFY_MAX_IDENTITIES
+        [{"identifier": f"identity-{i}"} for i in range(101)],
+    ],
+)
+def test_sdk_identities_bulk_post__invalid_identities__returns_400(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    api_client: APIClient,
+    identities: list[dict[str, str]],
+) -> None:
+    # Given
+    url = reverse("api-v1:sdk-identities-bulk")
+
+    # When
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+    response = api_client.post(
+        url,
+        data=json.dumps({"identities": identities}),
+        content_type="application/json",
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
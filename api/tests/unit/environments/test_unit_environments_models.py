@@ -1,3 +1,4 @@
+import json
 import random
 import typing
 from copy import copy
@@ -7,22 +8,27 @@ from unittest.mock import MagicMock, Mock
 
 import pytest
 from common.test_tools import AssertMetricFixture
+from django.core.cache.backends.locmem import LocMemCache
 from django.db.models import Count, Q
 from django.test import override_settings
 from django.utils import timezone
 from mypy_boto3_dynamodb.service_resource import Table
 from pytest_django import DjangoAssertNumQueries
 from pytest_django.asserts import assertQuerySetEqual as assert_queryset_equal
+from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
 from audit.models import AuditLog
 from audit.related_object_type import RelatedObjectType
 from core.constants import STRING
+from core.local_cache import LocalCache
 from core.request_origin import RequestOrigin
+from core.single_flight import FRESH_KEY_SUFFIX
 from environments.enums import EnvironmentDocumentCacheMode
 from environments.identities.models import Identity
 from environments.metrics import CACHE_HIT, CACHE_MISS
 from environments.models import (
+    ENVIRONMENT_DOCUMENT_PATCH_LEASE_KEY_SUFFIX,
     Environment,
     EnvironmentAPIKey,
     Webhook,
@@ -34,6 +40,7 @@ from features.multivariate.models import MultivariateFeatureOption
 from features.versioning.models import EnvironmentFeatureVersion
 from features.versioning.tasks import enable_v2_versioning
 from features.versioning.versioning_service import (
+    get_environment_flags_list,
     get_environment_flags_queryset,
 )
 from features.workflows.core.models import ChangeRequest
@@ -42,9 +49,11 @@ from projects.models import EdgeV2MigrationStatus, Project
 from segments.models import Segment
 from tests.types import EnableFeaturesFixture
 from users.models import FFAdminUser
+from util.dataclasses import RenderedEnvironmentDocument
 from util.mappers import (
     map_environment_to_environment_document,
     map_environment_to_sdk_document,
+    map_sdk_document_to_rendered_document,
 )
 
 if typing.TYPE_CHECKING:
@@ -241,6 +250,69 @@ def test_get_from_cache__cache_miss__stores_environment_in_cache(
     mock_cache.set.assert_called_with(environment.api_key, environment, timeout=60)
 
 
+def test_get_from_cache__environment_in_local_cache__does_not_hit_shared_cache(
+    environment: Environment,
+    mocker: MockerFixture,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    local_cache = LocalCache(name="test-environments", timeout=60, max_entries=10)
+    mocker.patch("environments.models.environment_local_cache", local_cache)
+    mock_cache = mocker.patch("environments.models.environment_cache")
+    mock_cache.get.return_value = None
+    Environment.get_from_cache(environment.api_key)
+
+    # When
+    with django_assert_num_queries(0):
+        cached_environment = Environment.get_from_cache(environment.api_key)
+
+    # Then
+    assert cached_environment == environment
+    mock_cache.get.assert_called_once_with(environment.api_key)
+
+
+def test_get_from_cache__environment_in_local_cache__returns_copy_per_call(
+    environment: Environment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    local_cache = LocalCache(
+        name="test-environments", timeout=60, max_entries=10, copy_values=True
+    )
+    mocker.patch("environments.models.environment_local_cache", local_cache)
+    mocker.patch("environments.models.environment_cache").get.return_value = None
+    first_environment = Environment.get_from_cache(environment.api_key)
+    assert first_environment
+    first_environment.name = "mutated"
+
+    # When
+    second_environment = Environment.get_from_cache(environment.api_key)
+
+    # Then
+    assert second_environment is not first_environment
+    assert second_environment
+    assert second_environment.name == environment.name
+
+
+def test_environment_save__local_cache_populated__invalidates_local_cache(
+    environment: Environment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    local_cache = LocalCache(name="test-environments", timeout=60, max_entries=10)
+    mocker.patch("environments.models.environment_local_cache", local_cache)
+    local_cache.set(environment.api_key, environment)
+    mock_invalidate = mocker.spy(local_cache, "invalidate")
+
+    # When
+    environment.name = "updated"
+    environment.save()
+
+    # Then
+    assert local_cache.get(environment.api_key) is None
+    mock_invalidate.assert_called_once_with([environment.api_key])
+
+
 def test_get_from_cache__no_matching_environment__returns_none(
     environment: Environment,
 ) -> None:
@@ -1350,3 +1422,369 @@ def test_write_environment_documents__persistent_caching_enabled__caches_sdk_doc
     expected_document = map_environment_to_sdk_document(environment)
 
     assert cached_document == expected_document
+
+
+@mock.patch("environments.models.environment_document_cache")
+def test_write_environment_documents__prerendered_caching_enabled__caches_rendered_document(
+    mock_document_cache: MagicMock, environment: Environment, settings: typing.Any
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.PERSISTENT
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = True
+
+    # When
+    Environment.write_environment_documents(environment_id=environment.id)
+
+    # Then
+    cache_payload = mock_document_cache.set_many.call_args[0][0]
+    cached_document = cache_payload[environment.api_key]
+    assert cached_document == map_sdk_document_to_rendered_document(
+        map_environment_to_sdk_document(environment)
+    )
+
+
+def test_get_rendered_environment_document__cache_miss__caches_rendered_document(
+    environment: Environment,
+    persistent_environment_document_cache: MagicMock,
+    settings: typing.Any,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = True
+
+    # When
+    rendered_document = Environment.get_rendered_environment_document(
+        environment.api_key
+    )
+
+    # Then
+    assert isinstance(rendered_document, RenderedEnvironmentDocument)
+    assert json.loads(rendered_document.content)["api_key"] == environment.api_key
+    persistent_environment_document_cache.set.assert_called_once_with(
+        environment.api_key, rendered_document
+    )
+
+
+def test_get_rendered_environment_document__cache_disabled__renders_document_from_db(
+    environment: Environment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocked_environment_document_cache = mocker.patch(
+        "environments.models.environment_document_cache"
+    )
+
+    # When
+    rendered_document = Environment.get_rendered_environment_document(
+        environment.api_key
+    )
+
+    # Then
+    assert json.loads(rendered_document.content)["api_key"] == environment.api_key
+    mocked_environment_document_cache.get.assert_not_called()
+
+
+def test_get_environment_document__rendered_document_in_cache__returns_document(
+    environment: Environment,
+    persistent_environment_document_cache: MagicMock,
+) -> None:
+    # Given
+    rendered_document = map_sdk_document_to_rendered_document(
+        map_environment_to_sdk_document(environment)
+    )
+    persistent_environment_document_cache.get.return_value = rendered_document
+
+    # When
+    environment_document = Environment.get_environment_document(environment.api_key)
+
+    # Then
+    assert environment_document == json.loads(rendered_document.content)
+    assert environment_document["api_key"] == environment.api_key
+
+
+def test_get_environment_document__document_in_local_cache__does_not_hit_shared_cache(
+    environment: Environment,
+    persistent_environment_document_cache: MagicMock,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    local_cache = LocalCache(name="test-documents", timeout=60, max_entries=10)
+    mocker.patch("environments.models.environment_document_local_cache", local_cache)
+    Environment.get_environment_document(environment.api_key)
+
+    # When
+    environment_document = Environment.get_environment_document(environment.api_key)
+
+    # Then
+    assert environment_document["api_key"] == environment.api_key
+    persistent_environment_document_cache.get.assert_called_once_with(
+        environment.api_key
+    )
+
+
+def test_write_environment_documents__local_cache_populated__invalidates_local_cache(
+    environment: Environment,
+    persistent_environment_document_cache: MagicMock,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    local_cache = LocalCache(name="test-documents", timeout=60, max_entries=10)
+    mocker.patch("environments.models.environment_document_local_cache", local_cache)
+    local_cache.set(environment.api_key, {"api_key": environment.api_key})
+
+    # When
+    Environment.write_environment_documents(environment_id=environment.id)
+
+    # Then
+    assert local_cache.get(environment.api_key) is None
+
+
+def test_get_environment_document__stale_document_in_cache__returns_it_and_schedules_rebuild(
+    environment: Environment,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.EXPIRING
+    settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS = 60
+    settings.CACHE_ENVIRONMENT_DOCUMENT_STALE_SECONDS = 60
+    cache = LocMemCache("test-environment-documents", {})
+    mocker.patch("environments.models.environment_document_cache", cache)
+    mock_rebuild_environment_document_cache = mocker.patch(
+        "environments.tasks.rebuild_environment_document_cache"
+    )
+    stale_document = {"api_key": environment.api_key, "name": "stale"}
+    cache.set(environment.api_key, stale_document)
+
+    # When
+    environment_document = Environment.get_environment_document(environment.api_key)
+
+    # Then
+    assert environment_document == stale_document
+    mock_rebuild_environment_document_cache.delay.assert_called_once_with(
+        kwargs={"api_key": environment.api_key},
+    )
+
+
+def test_refresh_environment_document_cache__stale_document_in_cache__caches_fresh_document(
+    environment: Environment,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.EXPIRING
+    settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS = 60
+    settings.CACHE_ENVIRONMENT_DOCUMENT_STALE_SECONDS = 60
+    cache = LocMemCache("test-environment-documents", {})
+    mocker.patch("environments.models.environment_document_cache", cache)
+    cache.set(environment.api_key, {"api_key": environment.api_key, "name": "stale"})
+
+    # When
+    Environment.refresh_environment_document_cache(environment.api_key)
+
+    # Then
+    assert cache.get(environment.api_key)["name"] == environment.name
+    assert cache.get(f"{environment.api_key}{FRESH_KEY_SUFFIX}") is True
+
+
+@pytest.mark.parametrize("prerendered", [False, True])
+def test_patch_environment_document__feature_state_updated__matches_full_rebuild(
+    environment: Environment,
+    feature_state: FeatureState,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+    prerendered: bool,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.PERSISTENT
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = prerendered
+    cache = LocMemCache("test-environment-documents", {})
+    mocker.patch("environments.models.environment_document_cache", cache)
+    Environment.write_environment_documents(environment_id=environment.id)
+
+    FeatureState.objects.filter(id=feature_state.id).update(
+        enabled=not feature_state.enabled
+    )
+
+    # When
+    patched = Environment.patch_environment_document(
+        environment.id, {feature_state.feature_id}
+    )
+
+    # Then
+    assert patched is True
+    patched_document = cache.get(environment.api_key)
+    Environment.write_environment_documents(environment_id=environment.id)
+    assert patched_document == cache.get(environment.api_key)
+
+
+def test_patch_environment_document__document_not_cached__returns_false(
+    environment: Environment,
+    feature_state: FeatureState,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.PERSISTENT
+    cache = LocMemCache("test-environment-documents", {})
+    cache.clear()
+    mocker.patch("environments.models.environment_document_cache", cache)
+
+    # When
+    patched = Environment.patch_environment_document(
+        environment.id, {feature_state.feature_id}
+    )
+
+    # Then
+    assert patched is False
+    assert cache.get(environment.api_key) is None
+
+
+def test_patch_environment_document__patch_in_progress__returns_false(
+    environment: Environment,
+    feature_state: FeatureState,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.PERSISTENT
+    cache = LocMemCache("test-environment-documents", {})
+    mocker.patch("environments.models.environment_document_cache", cache)
+    Environment.write_environment_documents(environment_id=environment.id)
+    document = cache.get(environment.api_key)
+    cache.add(
+        f"{environment.api_key}{ENVIRONMENT_DOCUMENT_PATCH_LEASE_KEY_SUFFIX}", True
+    )
+
+    FeatureState.objects.filter(id=feature_state.id).update(
+        enabled=not feature_state.enabled
+    )
+
+    # When
+    patched = Environment.patch_environment_document(
+        environment.id, {feature_state.feature_id}
+    )
+
+    # Then
+    assert patched is False
+    assert cache.get(environment.api_key) == document
+
+
+def test_patch_environment_document__document_rebuilt_meanwhile__returns_false(
+    environment: Environment,
+    feature_state: FeatureState,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.PERSISTENT
+    cache = LocMemCache("test-environment-documents", {})
+    mocker.patch("environments.models.environment_document_cache", cache)
+    Environment.write_environment_documents(environment_id=environment.id)
+
+    FeatureState.objects.filter(id=feature_state.id).update(
+        enabled=not feature_state.enabled
+    )
+
+    def _rebuild_and_get_environment_flags_list(
+        *args: typing.Any, **kwargs: typing.Any
+    ) -> list[FeatureState]:
+        # A full rebuild that gave up waiting for the patch lease
+        settings.CACHE_SINGLE_FLIGHT_LEASE_SECONDS = 0
+        Environment.write_environment_documents(environment_id=environment.id)
+        return get_environment_flags_list(*args, **kwargs)
+
+    mocker.patch(
+        "features.versioning.versioning_service.get_environment_flags_list",
+        side_effect=_rebuild_and_get_environment_flags_list,
+    )
+
+    # When
+    patched = Environment.patch_environment_document(
+        environment.id, {feature_state.feature_id}
+    )
+
+    # Then
+    assert patched is False
+    assert cache.get(environment.api_key)["feature_states"][0]["enabled"] is not (
+        feature_state.enabled
+    )
+    assert not cache.get(
+        f"{environment.api_key}{ENVIRONMENT_DOCUMENT_PATCH_LEASE_KEY_SUFFIX}"
+    )
+
+
+def test_write_environment_documents__patch_in_progress__waits_for_patch(
+    environment: Environment,
+    feature_state: FeatureState,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.PERSISTENT
+    cache = LocMemCache("test-environment-documents", {})
+    cache.clear()
+    mocker.patch("environments.models.environment_document_cache", cache)
+    lease_key = f"{environment.api_key}{ENVIRONMENT_DOCUMENT_PATCH_LEASE_KEY_SUFFIX}"
+    cache.add(lease_key, True)
+
+    def _finish_patch(seconds: float) -> None:
+        assert cache.get(environment.api_key) is None
+        cache.delete(lease_key)
+
+    mock_sleep = mocker.patch(
+        "environments.models.time.sleep", side_effect=_finish_patch
+    )
+
+    # When
+    Environment.write_environment_documents(environment_id=environment.id)
+
+    # Then
+    mock_sleep.assert_called_once()
+    assert cache.get(environment.api_key)["api_key"] == environment.api_key
+    assert cache.get(lease_key) is None
+
+
+def test_patch_environment_document__expiring_cache__returns_false(
+    environment: Environment,
+    feature_state: FeatureState,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.EXPIRING
+
+    # When
+    patched = Environment.patch_environment_document(
+        environment.id, {feature_state.feature_id}
+    )
+
+    # Then
+    assert patched is False
+
+
+def test_environment_get_identity_overrides_count__overrides_exist__matches_overrides_queryset(
+    environment: Environment,
+    feature: Feature,
+    project: Project,
+    identity: Identity,
+) -> None:
+    # Given
+    other_identity = Identity.objects.create(
+        identifier="other", environment=environment
+    )
+    archived_feature = Feature.objects.create(
+        project=project, name="archived_feature", is_archived=True
+    )
+    for identity_, feature_ in (
+        (identity, feature),
+        (other_identity, feature),
+        (identity, archived_feature),
+    ):
+        FeatureState.objects.create(
+            identity=identity_, feature=feature_, environment=environment
+        )
+
+    # When
+    count = environment.get_identity_overrides_count()
+
+    # Then
+    assert count == environment.get_identity_overrides_queryset().count() == 2
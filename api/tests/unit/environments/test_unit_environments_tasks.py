@@ -1,12 +1,38 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from freezegun import freeze_time
+from pytest_django.fixtures import SettingsWrapper
+from pytest_lazyfixture import lazy_fixture  # type: ignore[import-untyped]
 from pytest_mock import MockerFixture
+from task_processor.task_run_method import TaskRunMethod
 
 from audit.models import AuditLog
+from audit.related_object_type import RelatedObjectType
 from environments.models import Environment
 from environments.tasks import (
     delete_environment_from_dynamo,
     process_environment_update,
     rebuild_environment_document,
+    rebuild_environment_document_cache,
+    schedule_process_environment_update,
 )
+from features.models import Feature, FeatureState
+
+
+@pytest.fixture()
+def environment_update_debounce_cache(
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> LocMemCache:
+    settings.ENVIRONMENT_UPDATE_DEBOUNCE_SECONDS = 10
+    settings.TASK_RUN_METHOD = TaskRunMethod.TASK_PROCESSOR
+    cache = LocMemCache("test-environment-update-debounce", {})
+    cache.clear()
+    mocker.patch("environments.tasks.environment_update_debounce_cache", cache)
+    return cache
 
 
 def test_rebuild_environment_document__valid_environment__calls_write_documents(
@@ -27,6 +53,22 @@ def test_rebuild_environment_document__valid_environment__calls_write_documents(
     )
 
 
+def test_rebuild_environment_document_cache__valid_api_key__refreshes_cached_document(
+    environment: Environment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mock_refresh_environment_document_cache = mocker.patch(
+        "environments.tasks.Environment.refresh_environment_document_cache",
+    )
+
+    # When
+    rebuild_environment_document_cache(api_key=environment.api_key)
+
+    # Then
+    mock_refresh_environment_document_cache.assert_called_once_with(environment.api_key)
+
+
 def test_process_environment_update__environment_audit_log__sends_environment_message(  # type: ignore[no-untyped-def]
     environment, mocker
 ):
@@ -59,6 +101,101 @@ def test_process_environment_update__environment_audit_log__sends_environment_me
     mock_send_environment_update_message_for_project.assert_not_called()
 
 
+def test_process_environment_update__feature_state_audit_log__patches_environment_document(
+    environment: Environment,
+    feature_state: FeatureState,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    audit_log = AuditLog.objects.create(
+        project=environment.project,
+        environment=environment,
+        related_object_id=feature_state.id,
+        related_object_type=RelatedObjectType.FEATURE_STATE.name,
+    )
+    mock_patch_environment_document = mocker.patch(
+        "environments.tasks.Environment.patch_environment_document",
+        return_value=True,
+    )
+    mock_write_environment_documents = mocker.patch(
+        "environments.tasks.Environment.write_environment_documents",
+    )
+    mocker.patch("environments.tasks.send_environment_update_message_for_environment")
+
+    # When
+    process_environment_update(audit_log_id=audit_log.id)
+
+    # Then
+    mock_patch_environment_document.assert_called_once_with(
+        environment.id, {feature_state.feature_id}
+    )
+    mock_write_environment_documents.assert_not_called()
+
+
+def test_process_environment_update__environment_document_not_patched__rebuilds_documents(
+    environment: Environment,
+    feature_state: FeatureState,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    audit_log = AuditLog.objects.create(
+        project=environment.project,
+        environment=environment,
+        related_object_id=feature_state.id,
+        related_object_type=RelatedObjectType.FEATURE_STATE.name,
+    )
+    mocker.patch(
+        "environments.tasks.Environment.patch_environment_document",
+        return_value=False,
+    )
+    mock_write_environment_documents = mocker.patch(
+        "environments.tasks.Environment.write_environment_documents",
+    )
+    mocker.patch("environments.tasks.send_environment_update_message_for_environment")
+
+    # When
+    process_environment_update(audit_log_id=audit_log.id)
+
+    # Then
+    mock_write_environment_documents.assert_called_once_with(
+        environment_id=environment.id, project_id=environment.project.id
+    )
+
+
+@pytest.mark.parametrize(
+    "override",
+    [lazy_fixture("segment_featurestate"), lazy_fixture("identity_featurestate")],
+)
+def test_process_environment_update__override_audit_log__rebuilds_documents(
+    environment: Environment,
+    override: FeatureState,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    audit_log = AuditLog.objects.create(
+        project=environment.project,
+        environment=environment,
+        related_object_id=override.id,
+        related_object_type=RelatedObjectType.FEATURE_STATE.name,
+    )
+    mock_patch_environment_document = mocker.patch(
+        "environments.tasks.Environment.patch_environment_document",
+    )
+    mock_write_environment_documents = mocker.patch(
+        "environments.tasks.Environment.write_environment_documents",
+    )
+    mocker.patch("environments.tasks.send_environment_update_message_for_environment")
+
+    # When
+    process_environment_update(audit_log_id=audit_log.id)
+
+    # Then
+    mock_patch_environment_document.assert_not_called()
+    mock_write_environment_documents.assert_called_once_with(
+        environment_id=environment.id, project_id=environment.project.id
+    )
+
+
 def test_process_environment_update__project_audit_log__sends_project_message(  # type: ignore[no-untyped-def]
     environment, mocker
 ):
@@ -117,3 +254,123 @@ def test_delete_environment_from_dynamo__valid_environment__calls_all_wrappers(
     mocked_identity_wrapper.delete_all_identities.assert_called_once_with(
         environment_api_key
     )
+
+
+@freeze_time("2025-01-01T09:00:00Z")
+def test_schedule_process_environment_update__debounce_enabled__schedules_one_delayed_task(
+    environment: Environment,
+    environment_update_debounce_cache: LocMemCache,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mock_process_environment_update = mocker.patch(
+        "environments.tasks.process_environment_update"
+    )
+    audit_logs = [
+        AuditLog.objects.create(project=environment.project, environment=environment)
+        for _ in range(3)
+    ]
+    environment_update_debounce_cache.clear()
+    mock_process_environment_update.reset_mock()
+
+    # When
+    for audit_log in audit_logs:
+        schedule_process_environment_update(audit_log)
+
+    # Then
+    mock_process_environment_update.delay.assert_called_once_with(
+        delay_until=timezone.now() + timedelta(seconds=10),
+        args=(audit_logs[0].id,),
+    )
+
+
+def test_process_environment_update__debounce_enabled__processes_coalesced_updates(
+    environment: Environment,
+    feature: Feature,
+    environment_update_debounce_cache: LocMemCache,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    other_feature = Feature.objects.create(
+        name="other_feature", project=environment.project
+    )
+    audit_logs = [
+        AuditLog.objects.create(
+            project=environment.project,
+            environment=environment,
+            related_object_id=FeatureState.objects.get(
+                environment=environment, feature=feature_
+            ).id,
+            related_object_type=RelatedObjectType.FEATURE_STATE.name,
+        )
+        for feature_ in (feature, other_feature)
+    ]
+    mock_patch_environment_document = mocker.patch(
+        "environments.tasks.Environment.patch_environment_document",
+        return_value=True,
+    )
+    mock_send_environment_update_message_for_environment = mocker.patch(
+        "environments.tasks.send_environment_update_message_for_environment"
+    )
+
+    # When
+    process_environment_update(audit_log_id=audit_logs[0].id)
+
+    # Then
+    mock_patch_environment_document.assert_called_once_with(
+        environment.id, {feature.id, other_feature.id}
+    )
+    mock_send_environment_update_message_for_environment.assert_called_once_with(
+        environment
+    )
+    assert (
+        environment_update_debounce_cache.get(f"environment:{environment.id}") is None
+    )
+
+
+def test_process_environment_update__lower_id_log_scheduled_after_marker__coalesces_it(
+    environment: Environment,
+    feature: Feature,
+    environment_update_debounce_cache: LocMemCache,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    other_feature = Feature.objects.create(
+        name="other_feature", project=environment.project
+    )
+    mock_process_environment_update = mocker.patch(
+        "environments.tasks.process_environment_update"
+    )
+    earlier_audit_log, audit_log = [
+        AuditLog.objects.create(
+            project=environment.project,
+            environment=environment,
+            related_object_id=FeatureState.objects.get(
+                environment=environment, feature=feature_
+            ).id,
+            related_object_type=RelatedObjectType.FEATURE_STATE.name,
+        )
+        for feature_ in (other_feature, feature)
+    ]
+    environment_update_debounce_cache.clear()
+    mock_process_environment_update.reset_mock()
+
+    # the later audit log is scheduled first and sets the debounce marker
+    schedule_process_environment_update(audit_log)
+    schedule_process_environment_update(earlier_audit_log)
+
+    mock_patch_environment_document = mocker.patch(
+        "environments.tasks.Environment.patch_environment_document",
+        return_value=True,
+    )
+    mocker.patch("environments.tasks.send_environment_update_message_for_environment")
+
+    # When
+    process_environment_update(audit_log_id=audit_log.id)
+
+    # Then
+    assert earlier_audit_log.id < audit_log.id
+    mock_process_environment_update.delay.assert_called_once()
+    mock_patch_environment_document.assert_called_once_with(
+        environment.id, {feature.id, other_feature.id}
+    )
@@ -1,3 +1,5 @@
+import gzip
+import json
 import time
 from typing import TYPE_CHECKING
 from unittest.mock import ANY
@@ -13,6 +15,7 @@ from rest_framework.test import APIClient
 from core.constants import FLAGSMITH_UPDATED_AT_HEADER
 from environments.identities.models import Identity
 from environments.models import Environment, EnvironmentAPIKey
+from environments.sdk.views import accepts_gzip
 from features.feature_types import MULTIVARIATE
 from features.models import (  # type: ignore[attr-defined]
     STRING,
@@ -29,6 +32,7 @@ from segments.models import Segment
 
 if TYPE_CHECKING:
     from pytest_django import DjangoAssertNumQueries
+    from pytest_django.fixtures import SettingsWrapper
 
     from organisations.models import Organisation
 
@@ -317,3 +321,124 @@ def test_get_environment_document__if_modified_since_header__returns_304_or_200(
     # Then - actual environment is returned with a 200
     assert response4.status_code == status.HTTP_200_OK
     assert len(response4.content) > 0
+
+
+def test_get_environment_document__prerendered_gzip_accepted__returns_gzipped_document(
+    environment: Environment,
+    settings: "SettingsWrapper",
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = True
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+
+    # When
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].endswith('-gzip"')
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers[FLAGSMITH_UPDATED_AT_HEADER] == str(
+        environment.updated_at.timestamp()
+    )
+    document = json.loads(gzip.decompress(response.content))
+    assert document["api_key"] == environment.api_key
+
+
+def test_get_environment_document__prerendered_gzip_not_accepted__returns_plain_document(
+    environment: Environment,
+    settings: "SettingsWrapper",
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = True
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+
+    # When
+    response = client.get(url)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert "Content-Encoding" not in response.headers
+
+    # the pre-rendered document matches the one rendered on demand
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = False
+    assert response.content == client.get(url).content
+
+
+def test_get_environment_document__prerendered_gzip_refused__returns_plain_document(
+    environment: Environment,
+    settings: "SettingsWrapper",
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = True
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+
+    # When
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0, deflate")
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert "Content-Encoding" not in response.headers
+    assert json.loads(response.content)["api_key"] == environment.api_key
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected_result",
+    [
+        ("", False),
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("GZIP ; Q=1.0", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000, *", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("br, deflate", False),
+        ("gzip;q=invalid", False),
+    ],
+)
+def test_accepts_gzip__accept_encoding__returns_expected_result(
+    accept_encoding: str,
+    expected_result: bool,
+) -> None:
+    # When
+    result = accepts_gzip(accept_encoding)
+
+    # Then
+    assert result is expected_result
+
+
+def test_get_environment_document__prerendered_if_none_match_header__returns_304(
+    environment: Environment,
+    settings: "SettingsWrapper",
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = True
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+    etag = client.get(url).headers["ETag"]
+
+    # When
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Then
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert len(response.content) == 0
@@ -12,6 +12,7 @@ from django.utils import timezone
 from freezegun import freeze_time
 from moto import mock_s3  # type: ignore[import-untyped]
 from prometheus_client import REGISTRY
+from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 from pytest_structlog import StructuredLogCapture
 
@@ -1161,6 +1162,98 @@ def test_deliver_events_for_connection__time_budget_exhausted__defers_remaining(
     } in log.events
 
 
+def test_deliver_events_for_connection__compaction_enabled__inserts_batches_and_isolates_rejections(
+    clickhouse_connection: WarehouseConnection,
+    environment: Environment,
+    ingestion_infrastructure: OrganisationIngestionInfrastructure,
+    delivery_bucket: Any,
+    warehouse_client: Any,
+    settings: SettingsWrapper,
+    log: StructuredLogCapture,
+    mocker: MockerFixture,
+) -> None:
+    # Given four small objects, compacted in pairs, the warehouse rejecting
+    # one of them
+    settings.WAREHOUSE_DELIVERY_COMPACTION_MAX_BYTES = 4
+    hours = ("13", "14", "15", "16")
+    for hour in hours:
+        delivery_bucket.put_object(
+            Bucket=DELIVERY_BUCKET_NAME,
+            Key=_pending_key(environment.api_key, hour=hour),
+            Body=hour.encode(),
+        )
+
+    def _raw_insert(*args: Any, insert_block: Any, **kwargs: Any) -> Any:
+        body = (
+            insert_block.read()
+            if hasattr(insert_block, "read")
+            else b"".join(insert_block)
+        )
+        if b"15" in body:
+            raise DatabaseError("Cannot parse DateTime", code=41)
+        return mocker.Mock(written_rows=100)
+
+    warehouse_client.return_value.raw_insert.side_effect = _raw_insert
+    deliver_object_spy = mocker.spy(warehouse_delivery_service, "deliver_object")
+
+    # When
+    deliver_events_for_connection(connection_id=clickhouse_connection.id)
+
+    # Then the first pair is inserted at once, and the rejected pair is
+    # retried object by object
+    assert warehouse_client.return_value.raw_insert.call_count == 4
+    assert [call.args[2] for call in deliver_object_spy.call_args_list] == [
+        _pending_key(environment.api_key, hour="15"),
+        _pending_key(environment.api_key, hour="16"),
+    ]
+    assert (
+        warehouse_delivery_service.list_pending_objects(
+            DELIVERY_BUCKET_NAME,
+            environment_key=environment.api_key,
+        )
+        == []
+    )
+
+    # Then every object's outcome is recorded, the pair's rows against its
+    # first object
+    assert list(
+        WarehouseDeliveryLog.objects.filter(connection=clickhouse_connection)
+        .order_by("s3_key")
+        .values_list("s3_key", "outcome", "rows_count")
+    ) == [
+        (
+            _pending_key(environment.api_key, hour="13"),
+            WarehouseDeliveryOutcome.DELIVERED,
+            100,
+        ),
+        (
+            _pending_key(environment.api_key, hour="14"),
+            WarehouseDeliveryOutcome.DELIVERED,
+            None,
+        ),
+        (
+            _pending_key(environment.api_key, hour="15"),
+            WarehouseDeliveryOutcome.REJECTED,
+            None,
+        ),
+        (
+            _pending_key(environment.api_key, hour="16"),
+            WarehouseDeliveryOutcome.DELIVERED,
+            100,
+        ),
+    ]
+    assert {
+        "level": "info",
+        "event": "delivery.completed",
+        "connection__id": clickhouse_connection.id,
+        "environment__id": environment.id,
+        "organisation__id": environment.project.organisation_id,
+        "objects__count": 3,
+        "objects__rejected_count": 1,
+        "rows__count": 200,
+    } in log.events
+
+
 def test_clean_up_old_warehouse_delivery_logs__old_and_recent_logs__deletes_only_expired(
     clickhouse_connection: WarehouseConnection,
     environment: Environment,
@@ -1187,3 +1280,127 @@ def test_clean_up_old_warehouse_delivery_logs__old_and_recent_logs__deletes_only
 
     # Then
     assert list(WarehouseDeliveryLog.objects.all()) == [recent_log]
+
+
+def test_deliver_events_for_connection__concurrent_workers__delivers_and_batches_moves(
+    clickhouse_connection: WarehouseConnection,
+    environment: Environment,
+    ingestion_infrastructure: OrganisationIngestionInfrastructure,
+    delivery_bucket: Any,
+    warehouse_client: Any,
+    settings: SettingsWrapper,
+    log: StructuredLogCapture,
+    mocker: MockerFixture,
+) -> None:
+    # Given a backlog of objects, delivered by several workers at once, the
+    # warehouse rejecting one of them
+    settings.WAREHOUSE_DELIVERY_MAX_WORKERS = 3
+    hours = ("13", "14", "15", "16", "17")
+    for hour in hours:
+        delivery_bucket.put_object(
+            Bucket=DELIVERY_BUCKET_NAME,
+            Key=_pending_key(environment.api_key, hour=hour),
+            Body=hour.encode(),
+        )
+
+    def _raw_insert(*args: Any, insert_block: Any, **kwargs: Any) -> Any:
+        if insert_block.read() == b"15":
+            raise DatabaseError("Cannot parse DateTime", code=41)
+        return mocker.Mock(written_rows=100)
+
+    warehouse_client.return_value.raw_insert.side_effect = _raw_insert
+    move_object_spy = mocker.spy(warehouse_delivery_service, "move_object")
+    delete_objects_spy = mocker.spy(warehouse_delivery_service, "delete_objects")
+
+    # When
+    deliver_events_for_connection(connection_id=clickhouse_connection.id)
+
+    # Then every object is delivered with a client per worker
+    assert warehouse_client.call_count == 3
+    assert warehouse_client.return_value.raw_insert.call_count == 5
+    assert (
+        warehouse_delivery_service.list_pending_objects(
+            DELIVERY_BUCKET_NAME,
+            environment_key=environment.api_key,
+        )
+        == []
+    )
+    failed_keys = [
+        item["Key"]
+        for item in delivery_bucket.list_objects_v2(
+            Bucket=DELIVERY_BUCKET_NAME, Prefix="failed/"
+        )["Contents"]
+    ]
+    assert failed_keys == [
+        f"failed/env_key={environment.api_key}/year=2026/month=07/day=27/"
+        f"hour=15/object.gz"
+    ]
+
+    # Then the delivered objects are deleted from events/ in a single batch
+    move_object_spy.assert_not_called()
+    delete_objects_spy.assert_called_once()
+    assert sorted(delete_objects_spy.call_args.args[1]) == [
+        _pending_key(environment.api_key, hour=hour) for hour in hours
+    ]
+
+    # Then every outcome is recorded in the audit ledger
+    assert list(
+        WarehouseDeliveryLog.objects.filter(connection=clickhouse_connection)
+        .order_by("s3_key")
+        .values_list("s3_key", "outcome")
+    ) == [
+        (
+            _pending_key(environment.api_key, hour=hour),
+            WarehouseDeliveryOutcome.REJECTED
+            if hour == "15"
+            else WarehouseDeliveryOutcome.DELIVERED,
+        )
+        for hour in hours
+    ]
+    assert {
+        "level": "info",
+        "event": "delivery.completed",
+        "connection__id": clickhouse_connection.id,
+        "environment__id": environment.id,
+        "organisation__id": environment.project.organisation_id,
+        "objects__count": 4,
+        "objects__rejected_count": 1,
+        "rows__count": 400,
+    } in log.events
+
+
+def test_deliver_events_for_connection__concurrent_workers_warehouse_unusable__aborts_and_marks_errored(
+    clickhouse_connection: WarehouseConnection,
+    environment: Environment,
+    ingestion_infrastructure: OrganisationIngestionInfrastructure,
+    delivery_bucket: Any,
+    warehouse_client: Any,
+    settings: SettingsWrapper,
+) -> None:
+    # Given the warehouse rejects every request
+    settings.WAREHOUSE_DELIVERY_MAX_WORKERS = 2
+    for hour in ("13", "14", "15"):
+        delivery_bucket.put_object(
+            Bucket=DELIVERY_BUCKET_NAME,
+            Key=_pending_key(environment.api_key, hour=hour),
+            Body=b"gzipped-events",
+        )
+    warehouse_client.return_value.raw_insert.side_effect = DatabaseError(
+        "Authentication failed",
+        code=516,
+    )
+
+    # When
+    deliver_events_for_connection(connection_id=clickhouse_connection.id)
+
+    # Then nothing is moved or logged: every object waits for the next run
+    assert warehouse_delivery_service.list_pending_objects(
+        DELIVERY_BUCKET_NAME,
+        environment_key=environment.api_key,
+    ) == [_pending_key(environment.api_key, hour=hour) for hour in ("13", "14", "15")]
+    assert not WarehouseDeliveryLog.objects.filter(
+        connection=clickhouse_connection
+    ).exists()
+    clickhouse_connection.refresh_from_db()
+    assert clickhouse_connection.status == WarehouseConnectionStatus.ERRORED
+    assert clickhouse_connection.status_detail == "Authentication failed."
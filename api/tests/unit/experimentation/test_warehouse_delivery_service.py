@@ -111,6 +111,77 @@ def test_move_object__to_archive__moves_and_preserves_partition_path(
     )
 
 
+def test_delete_objects__more_keys_than_batch_size__deletes_in_batches(
+    events_bucket: Any,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocker.patch.object(warehouse_delivery_service, "DELETE_OBJECTS_BATCH_SIZE", 2)
+    s3_keys = [_event_key(hour) for hour in ("13", "14", "15")]
+    for s3_key in s3_keys:
+        events_bucket.put_object(Bucket=BUCKET_NAME, Key=s3_key, Body=OBJECT_BODY)
+    delete_objects_spy = mocker.spy(
+        warehouse_delivery_service._get_s3_client(), "delete_objects"
+    )
+
+    # When
+    warehouse_delivery_service.delete_objects(BUCKET_NAME, s3_keys)
+
+    # Then
+    assert delete_objects_spy.call_count == 2
+    assert (
+        warehouse_delivery_service.list_pending_objects(
+            BUCKET_NAME,
+            environment_key=ENVIRONMENT_KEY,
+        )
+        == []
+    )
+
+
+def test_compact_objects__mixed_sizes__groups_consecutive_objects_up_to_limit() -> None:
+    # Given
+    object_sizes = {
+        _event_key("13"): 40,
+        _event_key("14"): 50,
+        _event_key("15"): 20,
+        _event_key("16"): 150,
+        _event_key("17"): 10,
+    }
+
+    # When
+    batches = warehouse_delivery_service.compact_objects(object_sizes, max_bytes=100)
+
+    # Then order is preserved, and an oversized object is a batch of its own
+    assert batches == [
+        [_event_key("13"), _event_key("14")],
+        [_event_key("15")],
+        [_event_key("16")],
+        [_event_key("17")],
+    ]
+
+
+def test_compact_objects__no_limit__returns_one_batch_per_object() -> None:
+    # Given
+    object_sizes = {_event_key("13"): 40, _event_key("14"): 50}
+
+    # When
+    batches = warehouse_delivery_service.compact_objects(object_sizes, max_bytes=0)
+
+    # Then
+    assert batches == [[_event_key("13")], [_event_key("14")]]
+
+
+def test_compact_objects__no_limit_empty_objects__returns_batch_per_object() -> None:
+    # Given
+    object_sizes = {_event_key("13"): 0, _event_key("14"): 0}
+
+    # When
+    batches = warehouse_delivery_service.compact_objects(object_sizes, max_bytes=0)
+
+    # Then
+    assert batches == [[_event_key("13")], [_event_key("14")]]
+
+
 def test_delivery_client__incomplete_config__raises_config_error(
     clickhouse_connection: WarehouseConnection,
 ) -> None:
@@ -278,6 +349,69 @@ def test_deliver_object__valid_object__streams_body_and_returns_written_rows(
         client.raw_insert.call_args.kwargs["insert_block"].read()
 
 
+def test_deliver_objects__several_objects__streams_one_concatenated_gzip_insert(
+    events_bucket: Any,
+    mocker: MockerFixture,
+) -> None:
+    # Given objects whose last record is not newline-terminated
+    bodies = {
+        _event_key("13"): gzip.compress(b'{"event":"first"}'),
+        _event_key("14"): gzip.compress(b'{"event":"second"}\n'),
+    }
+    for s3_key, body in bodies.items():
+        events_bucket.put_object(Bucket=BUCKET_NAME, Key=s3_key, Body=body)
+    client = mocker.MagicMock()
+    streamed_bodies: list[bytes] = []
+
+    def raw_insert(*args: Any, **kwargs: Any) -> Any:
+        streamed_bodies.append(b"".join(kwargs["insert_block"]))
+        return mocker.Mock(written_rows=2)
+
+    client.raw_insert.side_effect = raw_insert
+
+    # When
+    written_rows = warehouse_delivery_service.deliver_objects(
+        client,
+        BUCKET_NAME,
+        list(bodies),
+    )
+
+    # Then both objects reach ClickHouse in a single gzip insert, their
+    # records kept on separate lines
+    assert written_rows == 2
+    client.raw_insert.assert_called_once_with(
+        "events",
+        insert_block=mocker.ANY,
+        fmt="JSONEachRow",
+        compression="gzip",
+    )
+    assert gzip.decompress(streamed_bodies[0]).splitlines() == [
+        b'{"event":"first"}',
+        b'{"event":"second"}',
+    ]
+
+
+def test_deliver_objects__object_level_error__raises_object_rejected(
+    events_bucket: Any,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    for hour in ("13", "14"):
+        events_bucket.put_object(
+            Bucket=BUCKET_NAME, Key=_event_key(hour), Body=OBJECT_BODY
+        )
+    client = mocker.MagicMock()
+    client.raw_insert.side_effect = DatabaseError("Cannot parse DateTime", code=41)
+
+    # When / Then
+    with pytest.raises(warehouse_delivery_service.ObjectRejectedError):
+        warehouse_delivery_service.deliver_objects(
+            client,
+            BUCKET_NAME,
+            [_event_key("13"), _event_key("14")],
+        )
+
+
 def test_deliver_object__object_level_error__raises_object_rejected(
     events_bucket: Any,
     mocker: MockerFixture,
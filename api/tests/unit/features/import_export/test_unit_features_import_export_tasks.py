@@ -2,10 +2,14 @@ import json
 from datetime import timedelta
 
 import pytest
+from django.db import connection
 from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from freezegun.api import FrozenDateTimeFactory
+from pytest_django import DjangoAssertNumQueries
 from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
 
 from environments.identities.models import Identity
 from environments.models import Environment
@@ -603,6 +607,99 @@ def test_export_and_import_features__overwrite_destructive_with_v2_versioning__u
     assert live_fs.feature_state_value.value == "imported_value"
 
 
+def test_export_and_import_features__more_features_than_batch_size__round_trips_in_order(
+    environment: Environment,
+    project: Project,
+    mocker: MockerFixture,
+) -> None:
+    # Given features spanning several export and import batches
+    mocker.patch("features.import_export.tasks.FEATURE_EXPORT_BATCH_SIZE", 2)
+    mocker.patch("features.import_export.tasks.FEATURE_IMPORT_BATCH_SIZE", 2)
+    for name in ("a", "b", "c", "d", "e"):
+        feature = Feature.objects.create(name=name, project=project)
+        MultivariateFeatureOption.objects.create(
+            feature=feature,
+            default_percentage_allocation=25,
+            type=STRING,
+            string_value=f"{name}_mv",
+        )
+    organisation2 = Organisation.objects.create(name="Receiving")
+    project2 = Project.objects.create(name="Web", organisation=organisation2)
+    environment2 = Environment.objects.create(name="Bat", project=project2)
+    feature_export = FeatureExport.objects.create(
+        environment=environment,
+        status=PROCESSING,
+    )
+
+    # When
+    export_features_for_environment(feature_export.id)
+    feature_export.refresh_from_db()
+    feature_import = FeatureImport.objects.create(  # type: ignore[misc]
+        environment=environment2,
+        strategy=SKIP,
+        data=feature_export.data,
+    )
+    import_features_for_environment(feature_import.id)
+
+    # Then
+    data = json.loads(feature_export.data)  # type: ignore[arg-type]
+    assert [feature_data["name"] for feature_data in data] == ["a", "b", "c", "d", "e"]
+    assert [feature_data["multivariate"][0]["value"] for feature_data in data] == [
+        "a_mv",
+        "b_mv",
+        "c_mv",
+        "d_mv",
+        "e_mv",
+    ]
+    feature_import.refresh_from_db()
+    assert feature_import.status == SUCCESS
+    assert set(project2.features.values_list("name", flat=True)) == {
+        "a",
+        "b",
+        "c",
+        "d",
+        "e",
+    }
+    assert (
+        MultivariateFeatureOption.objects.filter(feature__project=project2).count() == 5
+    )
+
+
+def test_export_features_for_environment__multivariate_features__query_count_does_not_scale(
+    environment: Environment,
+    project: Project,
+    django_assert_max_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    def _create_multivariate_feature(name: str) -> None:
+        feature = Feature.objects.create(name=name, project=project)
+        MultivariateFeatureOption.objects.create(
+            feature=feature,
+            default_percentage_allocation=50,
+            type=STRING,
+            string_value=f"{name}_mv",
+        )
+
+    _create_multivariate_feature("first")
+    feature_export = FeatureExport.objects.create(
+        environment=environment,
+        status=PROCESSING,
+    )
+    with CaptureQueriesContext(connection) as captured_queries:
+        export_features_for_environment(feature_export.id)
+
+    for index in range(5):
+        _create_multivariate_feature(f"feature_{index}")
+    feature_export = FeatureExport.objects.create(
+        environment=environment,
+        status=PROCESSING,
+    )
+
+    # When / Then
+    with django_assert_max_num_queries(len(captured_queries)):
+        export_features_for_environment(feature_export.id)
+
+
 def test_create_flagsmith_on_flagsmith_feature_export__valid_config__creates_export(
     db: None,
     settings: SettingsWrapper,
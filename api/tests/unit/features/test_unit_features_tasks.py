@@ -1,11 +1,17 @@
 import pytest
+from pytest_django.fixtures import SettingsWrapper
 from pytest_lazyfixture import lazy_fixture  # type: ignore[import-untyped]
 from pytest_mock import MockerFixture
 
 from api_keys.models import MasterAPIKey
+from core.request_origin import RequestOrigin
 from environments.models import Environment
+from features.flags_cache import flags_cache
 from features.models import Feature, FeatureState
-from features.tasks import trigger_feature_state_change_webhooks
+from features.tasks import (
+    rebuild_environment_flags_cache,
+    trigger_feature_state_change_webhooks,
+)
 from organisations.models import Organisation
 from projects.models import Project
 from users.models import FFAdminUser
@@ -164,3 +170,25 @@ def test_trigger_feature_state_change_webhooks__deleted_flag_no_history__uses_fs
 
     assert data["previous_state"]["feature"]["id"] == feature_state.feature.id
     assert event_type == WebhookEventType.FLAG_DELETED.value
+
+
+def test_rebuild_environment_flags_cache__stale_flags_in_cache__caches_fresh_flags(
+    environment: Environment,
+    feature_state: FeatureState,
+    reset_cache: None,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.CACHE_FLAGS_SECONDS = 30
+    settings.CACHE_FLAGS_STALE_SECONDS = 30
+    cache_key = f"{environment.api_key}:{RequestOrigin.SERVER.value}"
+    flags_cache.set(cache_key, [])
+
+    # When
+    rebuild_environment_flags_cache(
+        environment_api_key=environment.api_key,
+        request_origin=RequestOrigin.SERVER.value,
+    )
+
+    # Then
+    assert [flag["id"] for flag in flags_cache.get(cache_key)] == [feature_state.id]
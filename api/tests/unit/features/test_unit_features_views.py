@@ -36,6 +36,7 @@ from audit.constants import (
 )
 from audit.models import AuditLog, RelatedObjectType  # type: ignore[attr-defined]
 from core.constants import FLAGSMITH_UPDATED_AT_HEADER, SDK_ENVIRONMENT_KEY_HEADER
+from core.request_origin import RequestOrigin
 from environments.dynamodb import (
     DynamoEnvironmentV2Wrapper,
     DynamoIdentityWrapper,
@@ -46,6 +47,7 @@ from environments.permissions.models import UserEnvironmentPermission
 from features import views
 from features.dataclasses import EnvironmentFeatureOverridesData
 from features.feature_types import MULTIVARIATE, STANDARD
+from features.flags_cache import flags_cache
 from features.models import Feature, FeatureSegment, FeatureState
 from features.multivariate.models import MultivariateFeatureOption
 from features.value_types import STRING
@@ -1113,6 +1115,37 @@ def test_get_flags__server_key_only_feature__cache_isolation_between_client_and_
     assert feature.name not in client_feature_names
 
 
+def test_sdk_feature_states_get__stale_flags_in_cache__returns_them_and_schedules_rebuild(
+    api_client: APIClient,
+    environment: Environment,
+    feature_state: FeatureState,
+    mocker: MockerFixture,
+    reset_cache: None,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.CACHE_FLAGS_SECONDS = 30
+    settings.CACHE_FLAGS_STALE_SECONDS = 30
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+    flags_cache.set(f"{environment.api_key}:{RequestOrigin.CLIENT.value}", [])
+    mock_rebuild_environment_flags_cache = mocker.patch(
+        "features.tasks.rebuild_environment_flags_cache"
+    )
+
+    # When
+    response = api_client.get("/api/v1/flags/")
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    mock_rebuild_environment_flags_cache.run_in_thread.assert_called_once_with(
+        kwargs={
+            "environment_api_key": environment.api_key,
+            "request_origin": RequestOrigin.CLIENT.value,
+        },
+    )
+
+
 def test_get_feature_state_by_uuid__existing_state__returns_200(
     admin_client_new: APIClient,
     environment: Environment,
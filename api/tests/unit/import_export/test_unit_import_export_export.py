@@ -8,6 +8,8 @@ import boto3
 from django.contrib.contenttypes.models import ContentType
 from django.core.management import call_command
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from flag_engine.segments.constants import ALL_RULE, EQUAL
 from moto import mock_s3  # type: ignore[import-untyped]
 from mypy_boto3_dynamodb.service_resource import Table
@@ -15,6 +17,7 @@ from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
 
 from core.constants import STRING
+from edge_api.identities.models import EdgeIdentity
 from environments.identities.models import Identity
 from environments.models import Environment, EnvironmentAPIKey, Webhook
 from features.feature_types import MULTIVARIATE
@@ -580,6 +583,57 @@ def test_export_edge_identities__identities_with_overrides_and_traits__exports_a
     )
 
 
+def test_export_edge_identities__multiple_pages__reads_one_page_at_a_time(
+    flagsmith_identities_table: Table,
+    project: Project,
+    environment: Environment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    project.enable_dynamo_db = True
+    project.save()
+
+    for identifier in ("identity_one", "identity_two"):
+        flagsmith_identities_table.put_item(
+            Item={
+                "composite_key": f"{environment.api_key}_{identifier}",
+                "environment_api_key": environment.api_key,
+                "identifier": identifier,
+                "created_date": "2024-09-22T07:27:27.770956+00:00",
+                "identity_traits": [{"trait_key": "key", "trait_value": "value"}],
+                "identity_features": [],
+            }
+        )
+
+    mocker.patch("edge_api.identities.export.EXPORT_EDGE_IDENTITY_PAGINATION_LIMIT", 1)
+    get_all_items_spy = mocker.spy(EdgeIdentity.dynamo_wrapper, "get_all_items")
+
+    # When
+    export = export_edge_identities(project.organisation_id)
+    first_page = [next(export), next(export)]
+
+    # Then
+    get_all_items_spy.assert_called_once()
+    assert [item["model"] for item in first_page] == [
+        "identities.identity",
+        "traits.trait",
+    ]
+    assert first_page[1]["fields"]["identity"] == [
+        first_page[0]["fields"]["identifier"],
+        environment.api_key,
+    ]
+
+    # When
+    remaining = list(export)
+
+    # Then
+    assert [item["model"] for item in remaining] == [
+        "identities.identity",
+        "traits.trait",
+    ]
+    assert get_all_items_spy.call_count == 2
+
+
 @mock_s3
 def test_organisation_exporter_export_to_s3__valid_organisation__uploads_to_s3(  # type: ignore[no-untyped-def]
     organisation,
@@ -631,3 +685,32 @@ def test_export_projects__dynamo_db_project__reimports_with_dynamo_disabled(
     assert (
         Project.objects.filter(uuid=project.uuid, enable_dynamo_db=False).count() == 1
     )
+
+
+def test_export_features__many_feature_states__query_count_does_not_scale(
+    project: Project,
+    environment: Environment,
+    identity: Identity,
+) -> None:
+    # Given
+    def _create_features(count: int) -> None:
+        for _ in range(count):
+            feature = Feature.objects.create(project=project, name=uuid.uuid4().hex)
+            FeatureState.objects.create(
+                feature=feature, environment=environment, identity=identity
+            )
+
+    def _count_export_queries() -> int:
+        with CaptureQueriesContext(connection) as captured_queries:
+            list(export_features(project.organisation_id))
+        return len(captured_queries)
+
+    _create_features(2)
+    expected_query_count = _count_export_queries()
+
+    # When
+    _create_features(5)
+    query_count = _count_export_queries()
+
+    # Then
+    assert query_count == expected_query_count
@@ -1,12 +1,33 @@
+import io
 import json
+from datetime import datetime, timezone
 
 import boto3
+import pytest
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from flag_engine.segments.constants import EQUAL
 from moto import mock_s3  # type: ignore[import-untyped]
 
-from import_export.export import export_organisation
-from import_export.import_ import OrganisationImporter
+from environments.identities.models import Identity
+from environments.identities.traits.models import Trait
+from environments.models import Environment
+from features.models import Feature, FeatureSegment, FeatureState
+from import_export.export import (
+    export_identities,
+    export_organisation,
+    full_export,
+)
+from import_export.import_ import (
+    OrganisationImporter,
+    bulk_import,
+    iter_json_array,
+)
 from organisations.models import Organisation
+from projects.models import Project
+from projects.tags.models import Tag
+from segments.models import Condition, Segment, SegmentRule
 
 
 @mock_s3  # type: ignore[misc]
@@ -37,3 +58,168 @@ def test_import_organisation__valid_s3_export__imports_successfully(
 
     # Then
     assert Organisation.objects.filter(id=organisation.id).count() == 1
+
+
+def test_iter_json_array__items_split_across_reads__yields_all_items() -> None:
+    # Given
+    items = [
+        {"model": "a.b", "fields": {"name": "[not, the], end", "value": 1.5}},
+        {"model": "c.d", "fields": {"nested": [[1, 2], {"key": None}]}},
+        12345,
+        "string",
+    ]
+    stream = io.StringIO(json.dumps(items, indent=2))
+
+    # When
+    result = list(iter_json_array(stream, read_size=7))
+
+    # Then
+    assert result == items
+
+
+def test_iter_json_array__truncated_file__raises_decode_error() -> None:
+    # Given
+    stream = io.StringIO('[{"model": "a.b"}, {"model": ')
+
+    # When
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(stream))
+
+
+@mock_s3  # type: ignore[misc]
+def test_import_organisation__bulk__imports_full_export(
+    organisation: Organisation,
+    project: Project,
+    environment: Environment,
+    feature: Feature,
+    identity: Identity,
+) -> None:
+    # Given
+    bucket_name = "test-bucket"
+    file_key = "organisation-exports/org-1.json"
+
+    s3_resource = boto3.resource("s3", region_name="eu-west-2")
+    s3_resource.create_bucket(
+        Bucket=bucket_name,
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+
+    tag = Tag.objects.create(label="tag", project=project, color="#000000")
+    feature.tags.add(tag)
+
+    segment = Segment.objects.create(name="segment", project=project)
+    parent_rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    child_rule = SegmentRule.objects.create(rule=parent_rule, type=SegmentRule.ANY_RULE)
+    Condition.objects.create(
+        rule=child_rule, property="plan", operator=EQUAL, value="premium"
+    )
+    feature_segment = FeatureSegment.objects.create(
+        feature=feature, segment=segment, environment=environment
+    )
+    FeatureState.objects.create(
+        feature=feature, feature_segment=feature_segment, environment=environment
+    )
+
+    for i in range(3):
+        Trait.objects.create(
+            identity=identity, trait_key=f"trait_{i}", string_value=f"value_{i}"
+        )
+    FeatureState.objects.create(
+        feature=feature, identity=identity, environment=environment, enabled=True
+    )
+
+    export = list(full_export(organisation.id))
+    body = json.dumps(export, cls=DjangoJSONEncoder).encode("utf-8")
+
+    s3_client = boto3.client("s3")
+    s3_client.put_object(Body=body, Bucket=bucket_name, Key=file_key)
+
+    # environments, features and segments aren't deleted in cascade with
+    # their project, see e.g. `Environment.project`
+    for obj in (segment, feature, environment, organisation):
+        obj.hard_delete()
+
+    importer = OrganisationImporter(s3_client=s3_client)  # type: ignore[no-untyped-call]
+
+    # When
+    importer.import_organisation(bucket_name, file_key, bulk=True)
+
+    # Then
+    imported_feature = Feature.objects.get(uuid=feature.uuid)
+    assert imported_feature.project.organisation.uuid == organisation.uuid
+    assert list(imported_feature.tags.values_list("uuid", flat=True)) == [tag.uuid]
+
+    imported_child_rule = SegmentRule.objects.get(uuid=child_rule.uuid)
+    assert imported_child_rule.rule.uuid == parent_rule.uuid  # type: ignore[union-attr]
+    assert imported_child_rule.conditions.get().value == "premium"
+
+    imported_identity = Identity.objects.get(
+        identifier=identity.identifier, environment__api_key=environment.api_key
+    )
+    assert {trait.trait_key for trait in imported_identity.identity_traits.all()} == {
+        "trait_0",
+        "trait_1",
+        "trait_2",
+    }
+    identity_override = FeatureState.objects.get(identity=imported_identity)
+    assert identity_override.feature == imported_feature
+    assert identity_override.enabled is True
+    segment_override = FeatureState.objects.get(
+        feature_segment__segment__uuid=segment.uuid
+    )
+    assert segment_override.environment.api_key == environment.api_key
+
+    # and the sequences were reset for objects exported with their pk
+    assert Environment.objects.create(name="new", project=imported_feature.project)
+
+
+def test_bulk_import__many_traits__query_count_does_not_scale(
+    organisation: Organisation,
+    environment: Environment,
+) -> None:
+    # Given
+    def _count_import_queries(trait_count: int) -> int:
+        identity = Identity.objects.create(
+            identifier=f"identity_{trait_count}", environment=environment
+        )
+        for i in range(trait_count):
+            Trait.objects.create(
+                identity=identity, trait_key=f"trait_{i}", string_value="value"
+            )
+        data = list(export_identities(organisation.id))
+        identity.delete()
+
+        with CaptureQueriesContext(connection) as captured_queries:
+            bulk_import(data)
+        Identity.objects.filter(environment=environment).delete()
+        return len(captured_queries)
+
+    expected_query_count = _count_import_queries(2)
+
+    # When
+    query_count = _count_import_queries(7)
+
+    # Then
+    assert query_count == expected_query_count
+    assert not Identity.objects.exists()
+
+
+def test_bulk_import__auto_now_add_field__keeps_exported_value(
+    organisation: Organisation,
+    environment: Environment,
+) -> None:
+    # Given
+    created_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    identity = Identity.objects.create(identifier="identity", environment=environment)
+    Identity.objects.filter(pk=identity.pk).update(created_date=created_date)
+    data = list(export_identities(organisation.id))
+    identity.delete()
+
+    # When
+    bulk_import(data)
+
+    # Then
+    imported_identity = Identity.objects.get(
+        identifier="identity", environment=environment
+    )
+    assert imported_identity.created_date == created_date
@@ -0,0 +1,151 @@
+import json
+from functools import partial
+
+from prometheus_client import REGISTRY
+from pytest_mock import MockerFixture
+
+from integrations.amplitude.amplitude import AmplitudeWrapper
+from integrations.amplitude.models import AmplitudeConfiguration
+from integrations.common.delivery import IdentityDeliveryPipeline
+from integrations.heap.heap import HeapWrapper
+from integrations.heap.models import HeapConfiguration
+
+
+def _user_data_count(integration: str, result: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "flagsmith_identity_integrations_user_data_total",
+            {"integration": integration, "result": result},
+        )
+        or 0.0
+    )
+
+
+def _build_pipeline(queue_size: int = 100) -> IdentityDeliveryPipeline:
+    # No workers, so tests deliver from their own thread.
+    return IdentityDeliveryPipeline(
+        workers=0,
+        queue_size=queue_size,
+        batch_size=100,
+        linger_seconds=0,
+    )
+
+
+def test_identity_delivery_pipeline__user_data_for_same_destination__sends_one_batch(
+    mocker: MockerFixture,
+) -> None:
+    # Given user data for one Amplitude project, queued from separate
+    # identify calls, and for another Amplitude project
+    session = mocker.patch(
+        "integrations.amplitude.amplitude.get_delivery_session"
+    ).return_value
+    pipeline = _build_pipeline()
+    for user_id in ("user-1", "user-2"):
+        pipeline.submit(
+            AmplitudeWrapper(AmplitudeConfiguration(api_key="key-a")),
+            partial(dict, user_id=user_id, user_properties={}),
+        )
+    pipeline.submit(
+        AmplitudeWrapper(AmplitudeConfiguration(api_key="key-b")),
+        partial(dict, user_id="user-3", user_properties={}),
+    )
+    delivered_before = _user_data_count("amplitude", "delivered")
+
+    # When
+    pipeline.deliver_pending()
+
+    # Then
+    assert session.post.call_count == 2
+    first_payload = session.post.call_args_list[0].kwargs["data"]
+    assert first_payload["api_key"] == "key-a"
+    assert [
+        identification["user_id"]
+        for identification in json.loads(first_payload["identification"])
+    ] == ["user-1", "user-2"]
+    assert _user_data_count("amplitude", "delivered") == delivered_before + 3
+
+
+def test_identity_delivery_pipeline__integration_without_batch_api__sends_each_user_data(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    identify_user = mocker.patch.object(HeapWrapper, "_identify_user")
+    pipeline = _build_pipeline()
+    wrapper = HeapWrapper(HeapConfiguration(api_key="key"))
+    pipeline.submit(wrapper, partial(dict, identity="user-1"))
+    pipeline.submit(wrapper, partial(dict, identity="user-2"))
+
+    # When
+    pipeline.deliver_pending()
+
+    # Then
+    assert [call.args[0] for call in identify_user.call_args_list] == [
+        {"identity": "user-1"},
+        {"identity": "user-2"},
+    ]
+
+
+def test_identity_delivery_pipeline__queue_full__drops_user_data(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocker.patch("integrations.amplitude.amplitude.get_delivery_session")
+    pipeline = _build_pipeline(queue_size=1)
+    wrapper = AmplitudeWrapper(AmplitudeConfiguration(api_key="key"))
+    dropped_before = _user_data_count("amplitude", "dropped")
+
+    # When
+    accepted = [
+        pipeline.submit(wrapper, partial(dict, user_id=user_id))
+        for user_id in ("user-1", "user-2")
+    ]
+
+    # Then
+    assert accepted == [True, False]
+    assert _user_data_count("amplitude", "dropped") == dropped_before + 1
+
+
+def test_identity_delivery_pipeline__request_fails__counts_failed_and_continues(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    session = mocker.patch(
+        "integrations.amplitude.amplitude.get_delivery_session"
+    ).return_value
+    session.post.return_value.raise_for_status.side_effect = Exception("503")
+    identify_user = mocker.patch.object(HeapWrapper, "_identify_user")
+    pipeline = _build_pipeline()
+    pipeline.submit(
+        AmplitudeWrapper(AmplitudeConfiguration(api_key="key")),
+        partial(dict, user_id="user-1"),
+    )
+    pipeline.submit(
+        HeapWrapper(HeapConfiguration(api_key="key")), partial(dict, identity="1")
+    )
+    failed_before = _user_data_count("amplitude", "failed")
+
+    # When
+    pipeline.deliver_pending()
+
+    # Then
+    assert _user_data_count("amplitude", "failed") == failed_before + 1
+    identify_user.assert_called_once_with({"identity": "1"})
+
+
+def test_identity_delivery_pipeline__user_data_generation_fails__counts_failed_and_continues(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    identify_user = mocker.patch.object(HeapWrapper, "_identify_user")
+    pipeline = _build_pipeline()
+    wrapper = HeapWrapper(HeapConfiguration(api_key="key"))
+    pipeline.submit(wrapper, mocker.Mock(side_effect=Exception("boom")))
+    pipeline.submit(wrapper, partial(dict, identity="user-2"))
+    failed_before = _user_data_count("heap", "failed")
+
+    # When
+    pipeline.deliver_pending()
+
+    # Then
+    assert _user_data_count("heap", "failed") == failed_before + 1
+    identify_user.assert_called_once_with({"identity": "user-2"})
@@ -199,3 +199,27 @@ def test_identify_integrations__mixpanel_configured__posts_to_expected_url(
     # Then
     assert mocked_post.call_args.args[0] == expected_url
     assert mocked_post.call_args.kwargs["json"][0]["$token"] == api_key
+
+
+def test_mixpanel_identify_users__several_users__sends_updates_in_one_request(
+    mocker: "MockerFixture",
+) -> None:
+    # Given
+    session = mocker.patch(
+        "integrations.mixpanel.mixpanel.get_delivery_session"
+    ).return_value
+    mixpanel = MixpanelWrapper(MixpanelConfiguration(api_key="123key"))
+    user_data = [
+        [{"$token": "123key", "$distinct_id": "user-1", "$set": {}, "$ip": "0"}],
+        [{"$token": "123key", "$distinct_id": "user-2", "$set": {}, "$ip": "0"}],
+    ]
+
+    # When
+    mixpanel._identify_users(user_data)
+
+    # Then
+    session.post.assert_called_once_with(
+        "https://api.mixpanel.com/engage#profile-set",
+        headers={"Accept": "text/plain", "X-Mixpanel-Integration-ID": "flagsmith"},
+        json=[*user_data[0], *user_data[1]],
+    )
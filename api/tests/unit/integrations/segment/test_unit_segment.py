@@ -1,6 +1,7 @@
 import typing
 
 import pytest
+from pytest_mock import MockerFixture
 
 from environments.identities.models import Identity
 from environments.models import Environment
@@ -58,3 +59,35 @@ def test_segment_generate_user_data__correct_values__returns_expected_data(
     }
 
     assert expected_user_data == user_data
+
+
+def test_segment_identify_users__several_users__posts_one_batch(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    post = mocker.patch("integrations.segment.segment.segment_post")
+    segment_wrapper = SegmentWrapper(
+        SegmentConfiguration(api_key="123key", base_url="https://api.segment.io/")
+    )
+
+    # When
+    segment_wrapper._identify_users(
+        [
+            {"user_id": "user-1", "traits": {"feature": True}},
+            {"user_id": "user-2", "traits": {"feature": False}},
+        ]
+    )
+
+    # Then
+    post.assert_called_once_with(
+        "123key",
+        host="https://api.segment.io/",
+        timeout=segment_wrapper.analytics.timeout,
+        batch=mocker.ANY,
+    )
+    batch = post.call_args.kwargs["batch"]
+    assert [(message["type"], message["userId"]) for message in batch] == [
+        ("identify", "user-1"),
+        ("identify", "user-2"),
+    ]
+    assert batch[1]["traits"] == {"feature": False}
@@ -1,8 +1,16 @@
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
+
+from environments.identities.models import Identity
+from environments.models import Environment
+from features.models import Feature, FeatureState
+from integrations.amplitude.amplitude import AmplitudeWrapper
 from integrations.amplitude.models import AmplitudeConfiguration
 from integrations.common.models import EnvironmentIntegrationModel
 from integrations.common.wrapper import AbstractBaseIdentityIntegrationWrapper
 from integrations.integration import identify_integrations
 from integrations.segment.models import SegmentConfiguration
+from integrations.segment.segment import SegmentWrapper
 
 
 def test_identify_integrations__amplitude_configured__calls_amplitude(  # type: ignore[no-untyped-def]
@@ -119,3 +127,52 @@ def test_identify_integrations__deleted_integration__does_not_call(  # type: ign
 
     # Then
     mock_segment_wrapper.assert_not_called()
+
+
+def test_identify_integrations__multiple_integrations__resolves_feature_state_values_once(
+    mocker: MockerFixture,
+    environment: Environment,
+    identity: Identity,
+    feature: Feature,
+) -> None:
+    # Given
+    AmplitudeConfiguration.objects.create(api_key="abc-123", environment=environment)
+    SegmentConfiguration.objects.create(api_key="abc-123", environment=environment)
+    amplitude_identify = mocker.patch.object(AmplitudeWrapper, "identify_user_async")
+    segment_identify = mocker.patch.object(SegmentWrapper, "identify_user_async")
+    feature_states = identity.get_all_feature_states()
+    get_feature_state_value = mocker.spy(FeatureState, "get_feature_state_value")
+
+    # When
+    identify_integrations(identity, feature_states)  # type: ignore[no-untyped-call]
+
+    # Then
+    assert get_feature_state_value.call_count == len(feature_states)
+    feature_name = feature.name
+    assert (
+        feature_name in amplitude_identify.call_args.kwargs["data"]["user_properties"]
+    )
+    assert feature_name in segment_identify.call_args.kwargs["data"]["traits"]
+
+
+def test_identify_integrations__delivery_workers_configured__defers_user_data(
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+    environment: Environment,
+    identity: Identity,
+) -> None:
+    # Given
+    settings.IDENTITY_INTEGRATIONS_DELIVERY_WORKERS = 1
+    AmplitudeConfiguration.objects.create(api_key="abc-123", environment=environment)
+    get_pipeline = mocker.patch(
+        "integrations.integration.get_identity_delivery_pipeline"
+    )
+    generate_user_data = mocker.spy(AmplitudeWrapper, "generate_user_data")
+
+    # When
+    identify_integrations(identity, identity.get_all_feature_states())  # type: ignore[no-untyped-call]
+
+    # Then user data is only generated once the pipeline delivers it
+    generate_user_data.assert_not_called()
+    get_user_data = get_pipeline.return_value.submit.call_args.args[1]
+    assert get_user_data()["user_id"] == identity.identifier
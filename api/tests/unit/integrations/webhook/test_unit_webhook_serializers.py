@@ -38,3 +38,20 @@ def test_segment_serializer__identity_matching_segment__returns_member_true(  #
     # Then
     assert data["member"] is True
     assert data["id"] == identity_matching_segment.id
+
+
+def test_segment_serializer__member_segment_ids_in_context__returns_membership_from_context(  # type: ignore[no-untyped-def]
+    identity, identity_matching_segment
+):
+    # Given an identity that would match the segment, evaluated as not a
+    # member up front
+    serializer = SegmentSerializer(
+        identity_matching_segment,
+        context={"identity": identity, "member_segment_ids": set()},
+    )
+
+    # When
+    data = serializer.data
+
+    # Then
+    assert data["member"] is False
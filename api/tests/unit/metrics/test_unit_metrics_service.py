@@ -3,7 +3,6 @@ from unittest.mock import MagicMock
 import pytest
 
 from environments.models import Environment
-from features.models import Feature
 from metrics.metrics_service import EnvironmentMetricsService
 from metrics.types import EnvMetricsName
 
@@ -26,11 +25,7 @@ def test_environment_metrics_service__with_or_without_workflows__builds_expected
     monkeypatch.setattr(
         environment, "get_segment_metrics_queryset", lambda: MagicMock(count=lambda: 3)
     )
-    monkeypatch.setattr(
-        environment,
-        "get_identity_overrides_queryset",
-        lambda: MagicMock(count=lambda: 7),
-    )
+    monkeypatch.setattr(environment, "get_identity_overrides_count", lambda: 7)
     monkeypatch.setattr(
         environment,
         "get_change_requests_metrics_queryset",
@@ -84,26 +79,14 @@ def test_environment_metrics_service__dynamo_enabled_or_not__uses_correct_identi
     monkeypatch.setattr(
         environment, "get_segment_metrics_queryset", lambda: MagicMock(count=lambda: 1)
     )
-    feature = Feature.objects.create(
-        project=environment.project,
-        name="feature-10",
-        is_archived=False,
-        deleted_at=None,
-    )
     identity_count_mock = MagicMock(return_value=1)
     monkeypatch.setattr(
-        environment,
-        "get_identity_overrides_queryset",
-        lambda: MagicMock(count=identity_count_mock),
+        environment, "get_identity_overrides_count", identity_count_mock
     )
 
-    mock_override = MagicMock()
-    mock_override.feature_state.feature.id = feature.id
-    mock_overrides = [mock_override] * 99
-
-    dynamo_mock = MagicMock(return_value=mock_overrides)
+    dynamo_mock = MagicMock(return_value=99)
     monkeypatch.setattr(
-        "edge_api.identities.edge_identity_service.get_edge_identity_overrides",
+        "edge_api.identities.edge_identity_service.get_edge_identity_overrides_count",
         dynamo_mock,
     )
 
@@ -120,10 +103,7 @@ def test_environment_metrics_service__dynamo_enabled_or_not__uses_correct_identi
     )
 
     if uses_dynamo:
-        dynamo_mock.assert_called_once_with(
-            environment_id=environment.id,
-            feature_id=None,
-        )
+        dynamo_mock.assert_called_once_with(environment)
         identity_count_mock.assert_not_called()
     else:
         identity_count_mock.assert_called_once()
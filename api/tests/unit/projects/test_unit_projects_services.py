@@ -0,0 +1,141 @@
+import pytest
+from django.db.models import F
+from pytest_django import DjangoCaptureOnCommitCallbacks
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
+
+from core.dataclasses import AuthorData
+from core.local_cache import LocalCache
+from projects.models import Project
+from projects.services import (
+    get_project_segment_contexts_from_cache,
+    get_project_segments_from_cache,
+)
+from segments.models import Segment, SegmentRule
+from segments.services import delete_segment
+from users.models import FFAdminUser
+from util.mappers import engine as engine_mappers
+
+
+@pytest.fixture()
+def project_segment_contexts_local_cache(mocker: MockerFixture) -> LocalCache:
+    local_cache = LocalCache(
+        name="test-project-segment-contexts", timeout=60, max_entries=10
+    )
+    mocker.patch("projects.services.project_segment_contexts_local_cache", local_cache)
+    return local_cache
+
+
+def test_get_project_segment_contexts_from_cache__cache_populated__does_not_map_segments(
+    project: Project,
+    segment: Segment,
+    project_segment_contexts_local_cache: LocalCache,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    map_segment_spy = mocker.spy(engine_mappers, "map_segment_to_segment_context")
+    get_project_segment_contexts_from_cache(project.id)
+
+    # When
+    segment_contexts = get_project_segment_contexts_from_cache(project.id)
+
+    # Then
+    assert list(segment_contexts) == [str(segment.id)]
+    assert segment_contexts[str(segment.id)]["metadata"] == {"pk": segment.id}
+    map_segment_spy.assert_called_once()
+
+
+def test_get_project_segment_contexts_from_cache__segment_saved__invalidates_cache_on_commit(
+    project: Project,
+    segment: Segment,
+    project_segment_contexts_local_cache: LocalCache,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    # Given
+    get_project_segment_contexts_from_cache(project.id)
+
+    # When
+    with django_capture_on_commit_callbacks() as callbacks:
+        another_segment = Segment.objects.create(name="another", project=project)
+        SegmentRule.objects.create(segment=another_segment, type=SegmentRule.ALL_RULE)
+
+    # Then
+    # the rules written after the segment are part of the same transaction
+    assert project_segment_contexts_local_cache.get(str(project.id)) is not None
+    for callback in callbacks:
+        callback()
+    assert project_segment_contexts_local_cache.get(str(project.id)) is None
+    assert set(get_project_segment_contexts_from_cache(project.id)) == {
+        str(segment.id),
+        str(another_segment.id),
+    }
+
+
+def test_get_project_segment_contexts_from_cache__segment_deleted__invalidates_cache(
+    project: Project,
+    segment: Segment,
+    project_segment_contexts_local_cache: LocalCache,
+    admin_user: FFAdminUser,
+) -> None:
+    # Given
+    get_project_segment_contexts_from_cache(project.id)
+
+    # When
+    delete_segment(segment, author=AuthorData(user=admin_user))
+
+    # Then
+    assert project_segment_contexts_local_cache.get(str(project.id)) is None
+
+
+def test_get_project_segment_contexts_from_cache__project_segments_cached__maps_current_segments(
+    project: Project,
+    segment: Segment,
+    project_segment_contexts_local_cache: LocalCache,
+    settings: SettingsWrapper,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
+    # Given
+    settings.CACHE_PROJECT_SEGMENTS_SECONDS = 60
+    list(get_project_segments_from_cache(project.id))
+    get_project_segment_contexts_from_cache(project.id)
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        another_segment = Segment.objects.create(name="another", project=project)
+
+    # Then
+    assert {str(s.id) for s in get_project_segments_from_cache(project.id)} == {
+        str(segment.id),
+        str(another_segment.id),
+    }
+    assert set(get_project_segment_contexts_from_cache(project.id)) == {
+        str(segment.id),
+        str(another_segment.id),
+    }
+
+
+def test_get_project_segment_contexts_from_cache__invalidated_by_another_process__maps_current_segments(
+    project: Project,
+    segment: Segment,
+    project_segment_contexts_local_cache: LocalCache,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.CACHE_PROJECT_SEGMENTS_SECONDS = 60
+    list(get_project_segments_from_cache(project.id))
+    get_project_segment_contexts_from_cache(project.id)
+    # created in another process, which only broadcasts the invalidation of
+    # the contexts
+    (another_segment,) = Segment.objects.bulk_create(
+        [Segment(name="another", project=project)]
+    )
+    Segment.objects.filter(id=another_segment.id).update(version_of=F("id"))
+
+    # When
+    project_segment_contexts_local_cache.delete_many([str(project.id)])
+
+    # Then
+    assert set(get_project_segment_contexts_from_cache(project.id)) == {
+        str(segment.id),
+        str(another_segment.id),
+    }
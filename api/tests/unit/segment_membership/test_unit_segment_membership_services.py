@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 from unittest.mock import MagicMock
 
 import pytest
 from common.test_tools import RunTasksFixture
+from django.core.cache.backends.locmem import LocMemCache
 from django.db import connections
 from django.utils import timezone
 from flag_engine.segments.constants import EQUAL, REGEX
@@ -14,11 +16,20 @@ from task_processor.task_run_method import TaskRunMethod
 from environments.models import Environment
 from organisations.models import Organisation
 from projects.models import Project
+from segment_membership import services
+from segment_membership.models import (
+    SegmentMembershipCount,
+    SegmentMembershipWatermark,
+)
 from segment_membership.services import (
+    compute_segment_count_deltas_for_project,
     compute_segment_counts_for_project,
+    compute_segment_counts_for_project_incrementally,
     enqueue_membership_refresh,
+    get_clickhouse_now,
     get_projects_to_process,
     get_segment_members_page,
+    get_segment_predicate,
     is_membership_enabled,
 )
 from segment_membership.tasks import refresh_project_segment_counts
@@ -541,7 +552,9 @@ def test_enqueue_membership_refresh__flag_on__enqueues_refresh(
     run_tasks(num_tasks=2)
 
     # Then
-    compute_segment_counts_for_project_mock.assert_called_once_with(project, mocker.ANY)
+    compute_segment_counts_for_project_mock.assert_called_once_with(
+        project, mocker.ANY, ingested_until=None
+    )
 
 
 def test_enqueue_membership_refresh__flag_off__does_not_enqueue(
@@ -588,7 +601,9 @@ def test_enqueue_membership_refresh__refresh_already_pending__debounces(
     run_tasks(num_tasks=2)
 
     # Then
-    compute_segment_counts_for_project_mock.assert_called_once_with(project, mocker.ANY)
+    compute_segment_counts_for_project_mock.assert_called_once_with(
+        project, mocker.ANY, ingested_until=None
+    )
 
 
 def test_enqueue_membership_refresh__pending_for_other_project__still_enqueues(
@@ -616,7 +631,10 @@ def test_enqueue_membership_refresh__pending_for_other_project__still_enqueues(
     # Then
     assert compute_segment_counts_for_project_mock.call_count == 2
     compute_segment_counts_for_project_mock.assert_has_calls(
-        [mocker.call(project, mocker.ANY), mocker.call(project_b, mocker.ANY)],
+        [
+            mocker.call(project, mocker.ANY, ingested_until=None),
+            mocker.call(project_b, mocker.ANY, ingested_until=None),
+        ],
         any_order=True,
     )
 
@@ -716,3 +734,271 @@ def test_enqueue_membership_refresh__pending_and_no_delay__leaves_schedule(
         serialized_args=Task.serialize_data((project.id,)),
     )
     assert task.scheduled_for == scheduled
+
+
+def test_get_clickhouse_now__returns_aware_datetime() -> None:
+    # Given
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (1780315200,)
+
+    # When
+    result = get_clickhouse_now(cursor)
+
+    # Then
+    assert result == datetime(2026, 6, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def test_compute_segment_count_deltas_for_project__new_and_old_versions__nets_counts(
+    project: Project,
+    environment: Environment,
+    segment: Segment,
+    segment_rule: SegmentRule,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocker.patch(
+        "segment_membership.services.translate_segment",
+        return_value="TRUE",
+    )
+    other_segment = Segment.objects.create(name="other", project=project)
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [
+        (environment.api_key, 1, 5, 2),
+        (environment.api_key, 0, 3, 2),
+        ("ghost-env", 1, 7, 7),
+    ]
+    ingested_since = datetime(2026, 6, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+    # When
+    result = compute_segment_count_deltas_for_project(
+        project,
+        cursor,
+        [segment, other_segment],
+        ingested_since=ingested_since,
+        ingested_until=ingested_since + timedelta(hours=1),
+    )
+
+    # Then
+    assert result == {(segment.id, environment.id): 2}
+    _, params = cursor.execute.call_args.args
+    assert params["since"] == 1780315200
+    assert params["until"] == 1780318800
+
+
+def test_compute_segment_counts_for_project__ingested_until__bounds_identity_versions(
+    project: Project,
+    environment: Environment,
+    segment: Segment,
+    segment_rule: SegmentRule,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocker.patch(
+        "segment_membership.services.translate_segment",
+        return_value="TRUE",
+    )
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [(environment.api_key, 3)]
+    ingested_until = datetime(2026, 6, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+    # When
+    result = compute_segment_counts_for_project(
+        project, cursor, ingested_until=ingested_until
+    )
+
+    # Then
+    assert [(c.segment_id, c.environment_id, c.count) for c in result] == [
+        (segment.id, environment.id, 3)
+    ]
+    sql, params = cursor.execute.call_args.args
+    assert "FINAL" not in sql
+    assert "ingested_at < toDateTime(%(until)s)" in sql
+    assert params["until"] == 1780315200
+
+
+def test_compute_segment_counts_for_project_incrementally__updated_segment__recounts_it_in_full(
+    project: Project,
+    environment: Environment,
+    segment: Segment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    watermark = SegmentMembershipWatermark.objects.create(
+        project=project,
+        identities_ingested_until=timezone.now(),
+        segments_counted_at=timezone.now(),
+        fully_counted_at=timezone.now(),
+    )
+    updated_segment = Segment.objects.create(name="updated", project=project)
+    stale_segment = Segment.objects.create(name="stale", project=project)
+    Segment.objects.filter(pk__in=[segment.pk, stale_segment.pk]).update(
+        updated_at=watermark.segments_counted_at - timedelta(minutes=1)
+    )
+    for counted_segment, count in ((segment, 10), (stale_segment, 3)):
+        SegmentMembershipCount.objects.create(
+            segment=counted_segment,
+            environment=environment,
+            count=count,
+            last_synced_at=timezone.now(),
+        )
+
+    compute_counts = mocker.patch(
+        "segment_membership.services.compute_segment_counts_for_project",
+        return_value=[
+            SegmentMembershipCount(
+                segment_id=updated_segment.id, environment_id=environment.id, count=4
+            )
+        ],
+    )
+    compute_deltas = mocker.patch(
+        "segment_membership.services.compute_segment_count_deltas_for_project",
+        return_value={
+            (segment.id, environment.id): -2,
+            (stale_segment.id, environment.id): -3,
+        },
+    )
+    cursor = MagicMock()
+    ingested_until = timezone.now()
+
+    # When
+    result = compute_segment_counts_for_project_incrementally(
+        project, cursor, watermark, ingested_until=ingested_until
+    )
+
+    # Then
+    compute_counts.assert_called_once_with(
+        project, cursor, [updated_segment], ingested_until=ingested_until
+    )
+    compute_deltas.assert_called_once_with(
+        project,
+        cursor,
+        [segment, stale_segment],
+        ingested_since=watermark.identities_ingested_until,
+        ingested_until=ingested_until,
+    )
+    assert {(c.segment_id, c.environment_id): c.count for c in result} == {
+        (updated_segment.id, environment.id): 4,
+        (segment.id, environment.id): 8,
+    }
+
+
+@pytest.mark.clickhouse
+def test_compute_segment_count_deltas_for_project__identities_ingested_since__counts_changes(
+    segment_membership_identities: None,
+    matching_segment: Segment,
+    project: Project,
+    environment: Environment,
+    environment_api_key_str: str,
+) -> None:
+    # Given alice and bob were counted, then alice stopped matching, bob was
+    # deleted and dave was created
+    with connections["clickhouse"].cursor() as cursor:
+        ingested_since = get_clickhouse_now(cursor) + timedelta(seconds=1)
+        rows = [
+            (environment_api_key_str, "alice", "alice_key", {"foo": "baz"}, False),
+            (environment_api_key_str, "bob", "bob_key", {"foo": "bar"}, True),
+            (environment_api_key_str, "dave", "dave_key", {"foo": "bar"}, False),
+        ]
+        cursor.executemany(
+            "INSERT INTO IDENTITIES "
+            "(environment_id, identifier, identity_key, traits, is_deleted, "
+            "inserted_at, ingested_at) VALUES",
+            [(*row, ingested_since, ingested_since) for row in rows],  # type: ignore[misc]
+        )
+
+    # When
+    with connections["clickhouse"].cursor() as cursor:
+        deltas = compute_segment_count_deltas_for_project(
+            project,
+            cursor,
+            [matching_segment],
+            ingested_since=ingested_since,
+            ingested_until=ingested_since + timedelta(seconds=1),
+        )
+
+    # Then
+    assert deltas == {(matching_segment.id, environment.id): -1}
+
+
+@pytest.mark.clickhouse
+def test_compute_segment_counts_for_project__identities_ingested_after_until__not_counted(
+    segment_membership_identities: None,
+    matching_segment: Segment,
+    project: Project,
+    environment_api_key_str: str,
+) -> None:
+    # Given dave is ingested after the count is bounded
+    with connections["clickhouse"].cursor() as cursor:
+        ingested_until = get_clickhouse_now(cursor) + timedelta(seconds=1)
+        cursor.executemany(
+            "INSERT INTO IDENTITIES "
+            "(environment_id, identifier, identity_key, traits, is_deleted, "
+            "inserted_at, ingested_at) VALUES",
+            [
+                (  # type: ignore[list-item]
+                    environment_api_key_str,
+                    "dave",
+                    "dave_key",
+                    {"foo": "bar"},
+                    False,
+                    ingested_until,
+                    ingested_until,
+                )
+            ],
+        )
+
+    # When
+    with connections["clickhouse"].cursor() as cursor:
+        counts = compute_segment_counts_for_project(
+            project, cursor, ingested_until=ingested_until
+        )
+
+    # Then
+    assert [(c.segment_id, c.count) for c in counts] == [(matching_segment.id, 2)]
+
+
+def test_get_segment_predicate__called_twice__translates_once(
+    project: Project,
+    matching_segment: Segment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocker.patch(
+        "segment_membership.services.segment_predicates_cache",
+        LocMemCache("test-segment-predicates", {}),
+    )
+    map_segment_to_engine_spy = mocker.spy(services, "map_segment_to_engine")
+
+    # When
+    first_result = get_segment_predicate(matching_segment, project)
+    second_result = get_segment_predicate(matching_segment, project)
+
+    # Then
+    predicate, params = first_result
+    assert second_result == first_result
+    assert map_segment_to_engine_spy.call_count == 1
+    assert predicate
+    assert params
+    assert all(name.startswith(f"s{matching_segment.id}_") for name in params)
+
+
+def test_get_segment_predicate__segment_updated__translates_again(
+    project: Project,
+    matching_segment: Segment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocker.patch(
+        "segment_membership.services.segment_predicates_cache",
+        LocMemCache("test-segment-predicates", {}),
+    )
+    _, params = get_segment_predicate(matching_segment, project)
+    Condition.objects.filter(rule__segment=matching_segment).update(value="baz")
+    matching_segment.save()
+
+    # When
+    _, updated_params = get_segment_predicate(matching_segment, project)
+
+    # Then
+    assert "bar" in params.values()
+    assert "baz" in updated_params.values()
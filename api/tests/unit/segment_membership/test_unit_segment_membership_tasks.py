@@ -16,7 +16,11 @@ from environments.models import Environment
 from organisations.models import Organisation
 from projects.models import Project
 from segment_membership import tasks
-from segment_membership.models import SegmentMembershipCount, SegmentMembershipSeed
+from segment_membership.models import (
+    SegmentMembershipCount,
+    SegmentMembershipSeed,
+    SegmentMembershipWatermark,
+)
 from segment_membership.tasks import (
     reconcile_segment_membership_seeds,
     refresh_all_segment_counts,
@@ -466,6 +470,12 @@ def test_refresh_project_segment_counts__ff_disabled__skips_and_purges_stale_cou
         count=15,
         last_synced_at=timezone.now(),
     )
+    SegmentMembershipWatermark.objects.create(
+        project=project,
+        identities_ingested_until=SCAN_START,
+        segments_counted_at=SCAN_START,
+        fully_counted_at=SCAN_START,
+    )
 
     # When
     refresh_project_segment_counts(project.id)
@@ -475,6 +485,7 @@ def test_refresh_project_segment_counts__ff_disabled__skips_and_purges_stale_cou
     assert not SegmentMembershipCount.objects.filter(
         segment=segment, environment=environment
     ).exists()
+    assert not SegmentMembershipWatermark.objects.filter(project=project).exists()
     assert any(
         e["event"] == "refresh.project.skipped"
         and e["reason"] == "ff_disabled"
@@ -562,3 +573,141 @@ def test_refresh_project_segment_counts__never_matched_pair__no_row_written(
     assert not SegmentMembershipCount.objects.filter(
         segment=segment, environment=environment
     ).exists()
+
+
+def test_refresh_project_segment_counts__incremental_without_watermark__counts_in_full(
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+    project: Project,
+    environment: Environment,
+    segment: Segment,
+    enable_features: EnableFeaturesFixture,
+) -> None:
+    # Given
+    enable_features("segment_membership_inspection")
+    settings.CLICKHOUSE_ENABLED = True
+    settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_ENABLED = True
+    settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_LAG_SECONDS = 60
+    ingested_until = SCAN_START - timedelta(seconds=60)
+    cursor = MagicMock()
+    open_cursor = mocker.patch.object(tasks, "open_clickhouse_cursor")
+    open_cursor.return_value.__enter__.return_value = cursor
+    mocker.patch.object(tasks, "get_clickhouse_now", return_value=SCAN_START)
+    compute_counts = mocker.patch.object(
+        tasks,
+        "compute_segment_counts_for_project",
+        return_value=[
+            SegmentMembershipCount(
+                segment_id=segment.id, environment_id=environment.id, count=5
+            )
+        ],
+    )
+    compute_incrementally = mocker.patch.object(
+        tasks, "compute_segment_counts_for_project_incrementally"
+    )
+
+    # When
+    refresh_project_segment_counts(project.id)
+
+    # Then
+    compute_counts.assert_called_once_with(
+        project, cursor, ingested_until=ingested_until
+    )
+    compute_incrementally.assert_not_called()
+    assert SegmentMembershipCount.objects.get(segment=segment).count == 5
+    watermark = SegmentMembershipWatermark.objects.get(project=project)
+    assert watermark.identities_ingested_until == ingested_until
+    assert watermark.fully_counted_at == watermark.segments_counted_at
+
+
+def test_refresh_project_segment_counts__incremental_with_watermark__counts_since_watermark(
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+    project: Project,
+    environment: Environment,
+    segment: Segment,
+    enable_features: EnableFeaturesFixture,
+) -> None:
+    # Given
+    enable_features("segment_membership_inspection")
+    settings.CLICKHOUSE_ENABLED = True
+    settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_ENABLED = True
+    settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_LAG_SECONDS = 60
+    ingested_until = SCAN_START - timedelta(seconds=60)
+    fully_counted_at = timezone.now() - timedelta(hours=1)
+    watermark = SegmentMembershipWatermark.objects.create(
+        project=project,
+        identities_ingested_until=SCAN_START - timedelta(hours=1),
+        segments_counted_at=fully_counted_at,
+        fully_counted_at=fully_counted_at,
+    )
+    cursor = MagicMock()
+    open_cursor = mocker.patch.object(tasks, "open_clickhouse_cursor")
+    open_cursor.return_value.__enter__.return_value = cursor
+    mocker.patch.object(tasks, "get_clickhouse_now", return_value=SCAN_START)
+    compute_counts = mocker.patch.object(tasks, "compute_segment_counts_for_project")
+    compute_incrementally = mocker.patch.object(
+        tasks,
+        "compute_segment_counts_for_project_incrementally",
+        return_value=[
+            SegmentMembershipCount(
+                segment_id=segment.id, environment_id=environment.id, count=7
+            )
+        ],
+    )
+
+    # When
+    refresh_project_segment_counts(project.id)
+
+    # Then
+    compute_counts.assert_not_called()
+    compute_incrementally.assert_called_once_with(
+        project, cursor, watermark, ingested_until=ingested_until
+    )
+    assert SegmentMembershipCount.objects.get(segment=segment).count == 7
+    watermark.refresh_from_db()
+    # the identities ingested within the lag are left to the next refresh
+    assert watermark.identities_ingested_until == ingested_until
+    assert watermark.segments_counted_at > fully_counted_at
+    assert watermark.fully_counted_at == fully_counted_at
+
+
+def test_refresh_project_segment_counts__incremental_with_expired_watermark__counts_in_full(
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+    project: Project,
+    segment: Segment,
+    enable_features: EnableFeaturesFixture,
+) -> None:
+    # Given
+    enable_features("segment_membership_inspection")
+    settings.CLICKHOUSE_ENABLED = True
+    settings.SEGMENT_MEMBERSHIP_INCREMENTAL_REFRESH_ENABLED = True
+    settings.SEGMENT_MEMBERSHIP_FULL_REFRESH_INTERVAL_HOURS = 24
+    fully_counted_at = timezone.now() - timedelta(hours=25)
+    SegmentMembershipWatermark.objects.create(
+        project=project,
+        identities_ingested_until=SCAN_START - timedelta(hours=1),
+        segments_counted_at=fully_counted_at,
+        fully_counted_at=fully_counted_at,
+    )
+    open_cursor = mocker.patch.object(tasks, "open_clickhouse_cursor")
+    open_cursor.return_value.__enter__.return_value = MagicMock()
+    mocker.patch.object(tasks, "get_clickhouse_now", return_value=SCAN_START)
+    compute_counts = mocker.patch.object(
+        tasks, "compute_segment_counts_for_project", return_value=[]
+    )
+    compute_incrementally = mocker.patch.object(
+        tasks, "compute_segment_counts_for_project_incrementally"
+    )
+
+    # When
+    refresh_project_segment_counts(project.id)
+
+    # Then
+    compute_counts.assert_called_once()
+    compute_incrementally.assert_not_called()
+    assert (
+        SegmentMembershipWatermark.objects.get(project=project).fully_counted_at
+        > fully_counted_at
+    )
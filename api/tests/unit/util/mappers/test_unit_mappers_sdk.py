@@ -1,10 +1,16 @@
+import gzip
+import hashlib
+import json
 from typing import TYPE_CHECKING
 
 import pytest
 
 from environments.identities.models import Identity
 from util.mappers.engine import map_identity_to_engine
-from util.mappers.sdk import map_environment_to_sdk_document
+from util.mappers.sdk import (
+    map_environment_to_sdk_document,
+    map_sdk_document_to_rendered_document,
+)
 
 if TYPE_CHECKING:  # pragma: no cover
     from pytest_mock import MockerFixture
@@ -200,3 +206,19 @@ def test_map_environment_to_sdk_document__system_traits_set__excluded_from_docum
     assert result["identity_overrides"] == [
         engine_identity.model_dump(exclude={"system_traits"})
     ]
+
+
+def test_map_sdk_document_to_rendered_document__sdk_document__returns_rendered_variants(
+    environment: "Environment",
+) -> None:
+    # Given
+    sdk_document = map_environment_to_sdk_document(environment)
+
+    # When
+    result = map_sdk_document_to_rendered_document(sdk_document)
+
+    # Then
+    assert json.loads(result.content)["api_key"] == environment.api_key
+    assert gzip.decompress(result.gzip_content) == result.content
+    assert result.etag == hashlib.sha256(result.content).hexdigest()
+    assert map_sdk_document_to_rendered_document(sdk_document) == result
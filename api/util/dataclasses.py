@@ -10,3 +10,12 @@ class CompressedEnvironmentDocument:
     document: Document
     compressed_size_bytes: int
     compression_ratio: float
+
+
+@dataclass
+class RenderedEnvironmentDocument:
+    """SDK environment document rendered to JSON, ready to be served as-is."""
+
+    content: bytes
+    gzip_content: bytes
+    etag: str
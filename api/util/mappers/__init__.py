@@ -16,7 +16,11 @@ from util.mappers.engine import (
     map_identity_to_engine,
     map_mv_option_to_engine,
 )
-from util.mappers.sdk import map_environment_to_sdk_document
+from util.mappers.sdk import (
+    map_environment_to_sdk_document,
+    map_feature_state_to_sdk_document_feature_state,
+    map_sdk_document_to_rendered_document,
+)
 
 __all__ = (
     "map_engine_feature_state_to_identity_override",
@@ -28,10 +32,12 @@ __all__ = (
     "map_environment_to_environment_v2_document",
     "map_environment_to_sdk_document",
     "map_feature_state_to_engine",
+    "map_feature_state_to_sdk_document_feature_state",
     "map_feature_to_engine",
     "map_identity_changeset_to_identity_override_changeset",
     "map_identity_override_to_identity_override_document",
     "map_identity_to_engine",
     "map_identity_to_identity_document",
     "map_mv_option_to_engine",
+    "map_sdk_document_to_rendered_document",
 )
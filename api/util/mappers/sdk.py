@@ -1,13 +1,19 @@
+import gzip
+import hashlib
 from typing import TYPE_CHECKING, TypeAlias
 
 from environments.constants import IDENTITY_INTEGRATIONS_RELATION_NAMES
+from util.dataclasses import RenderedEnvironmentDocument
 from util.mappers.engine import (
     map_environment_to_engine,
+    map_feature_state_to_engine,
     map_identity_to_engine,
 )
+from util.renderers import PydanticJSONRenderer
 
 if TYPE_CHECKING:  # pragma: no cover
     from environments.models import Environment
+    from features.models import FeatureState
 
 
 SDKDocumentValue: TypeAlias = (
@@ -45,3 +51,33 @@ def map_environment_to_sdk_document(environment: "Environment") -> SDKDocument:
         ]
 
     return engine_environment.model_dump(exclude=SDK_DOCUMENT_EXCLUDE)
+
+
+def map_feature_state_to_sdk_document_feature_state(
+    feature_state: "FeatureState",
+) -> SDKDocument:
+    """Map an environment default `FeatureState` to its entry in the
+    `feature_states` list of an SDK document.
+    """
+    return map_feature_state_to_engine(
+        feature_state,
+        mv_fs_values=feature_state.multivariate_feature_state_values.all(),
+    ).model_dump()
+
+
+def map_sdk_document_to_rendered_document(
+    sdk_document: SDKDocument,
+) -> RenderedEnvironmentDocument:
+    """Render an SDK document to the exact bytes the SDK API would serve.
+
+    The JSON is rendered with the same renderer DRF uses for API responses,
+    so serving the pre-rendered bytes is indistinguishable from serving
+    the document through a `Response`.
+    """
+    content = PydanticJSONRenderer().render(sdk_document)
+    return RenderedEnvironmentDocument(
+        content=content,
+        # `mtime=0` keeps the compressed bytes stable for identical content.
+        gzip_content=gzip.compress(content, mtime=0),
+        etag=hashlib.sha256(content).hexdigest(),
+    )